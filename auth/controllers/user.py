@@ -2,19 +2,43 @@
 
 from typing import Optional
 
-from ..helpers.exceptions import UserAlreadyExistsError
-from ..models import User
+from config.base import BREACHED_PASSWORDS_PATH, USERNAME_POLICY_PATH, db
+from config.database.exceptions import CircuitOpenError, DeadlineExceededError
+
+from ..helpers.exceptions import (
+    BreachedPasswordError,
+    UserAlreadyExistsError,
+    UsernameNotAllowedError,
+)
+from ..models import User, UserCredentials
 from ..repository import UserService
+from ..repository.breaches import BreachedPasswordChecker
+from ..repository.usernames import UsernamePolicy
+from ..repository.workload import WorkloadRecorder
 from ..views import UserView
 
 
 class UserController:
     """Controller class for managing user authentication operations."""
 
-    def __init__(self) -> None:
-        """Initialize UserController."""
+    def __init__(self, workload_recorder: Optional[WorkloadRecorder] = None) -> None:
+        """
+        Initialize UserController.
+
+        Parameters
+        ----------
+        workload_recorder : Optional[WorkloadRecorder], optional
+            The recorder of the registrations and logins, if any.
+        """
         self.view = UserView()
-        self.service = UserService()
+        self.breach_checker = BreachedPasswordChecker.open(BREACHED_PASSWORDS_PATH)
+        self.service = UserService(
+            track_last_login=True,
+            audit_logins=True,
+            breach_checker=self.breach_checker,
+            username_policy=UsernamePolicy.open(USERNAME_POLICY_PATH),
+            workload_recorder=workload_recorder,
+        )
 
     def register(self) -> Optional[User]:
         """
@@ -27,7 +51,11 @@ class UserController:
         """
         username, password = self.view.get_credentials()
         try:
-            user = self.service.register(username=username, password=password)
+            with db.deadline():
+                user = self.service.register(username=username, password=password)
+        except (CircuitOpenError, DeadlineExceededError):
+            self._show_unavailable_msg()
+            user = None
         except UserAlreadyExistsError:
             self.view.clear_screen()
             self.view.show_message(
@@ -38,6 +66,26 @@ class UserController:
                 + "\n"  # Extra blank line
             )
             user = None
+        except UsernameNotAllowedError:
+            self.view.clear_screen()
+            self.view.show_message(
+                "\033[91m"  # Red color
+                + f"The username {username} is not allowed. Please choose another. "
+                + "\U0001f6ab"  # 🚫
+                + "\033[0m"  # Red color
+                + "\n"  # Extra blank line
+            )
+            user = None
+        except BreachedPasswordError:
+            self.view.clear_screen()
+            self.view.show_message(
+                "\033[91m"  # Red color
+                + "This password appears in a data breach. Please choose another. "
+                + "\U0001f512"  # 🔒
+                + "\033[0m"  # Red color
+                + "\n"  # Extra blank line
+            )
+            user = None
         else:
             self.view.clear_screen()
             self.view.show_message(
@@ -49,23 +97,34 @@ class UserController:
             )
         return user
 
-    def login(self) -> tuple[Optional[User], bool]:
+    def login(self) -> tuple[Optional[UserCredentials], bool]:
         """
         Log in an existing user.
 
         Returns
         -------
-        tuple[Optional[User], bool]
-            A tuple containing the user object and a boolean indicating
+        tuple[Optional[UserCredentials], bool]
+            A tuple containing the user credentials and a boolean indicating
             whether the login attempt was successful.
         """
         username, password = self.view.get_credentials()
-        user, is_authenticated = self.service.login(
-            username=username, password=password
-        )
+        try:
+            with db.deadline():
+                user, is_authenticated = self.service.login(
+                    username=username, password=password
+                )
+        except (CircuitOpenError, DeadlineExceededError):
+            self._show_unavailable_msg()
+            return None, False
         self._show_login_msg(user, is_authenticated)
         return user, is_authenticated
 
+    def close(self) -> None:
+        """Release the resources held by the controller."""
+        self.service.close()
+        if self.breach_checker:
+            self.breach_checker.close()
+
     def show_welcome_msg(self) -> None:
         """Display a welcome message to the user."""
         self.view.clear_screen()
@@ -76,14 +135,16 @@ class UserController:
             + "\n"  # Extra blank line
         )
 
-    def _show_login_msg(self, user: Optional[User], is_authenticated: bool) -> None:
+    def _show_login_msg(
+        self, user: Optional[UserCredentials], is_authenticated: bool
+    ) -> None:
         """
         Show a login message based on authentication status.
 
         Parameters
         ----------
-        user : Optional[User]
-            The user object if authentication was successful, otherwise None.
+        user : Optional[UserCredentials]
+            The user credentials if authentication was successful, otherwise None.
         is_authenticated : bool
             A boolean indicating whether the login attempt was successful.
         """
@@ -105,3 +166,14 @@ class UserController:
                 + "\033[0m"  # Red color
                 + "\n"  # Extra blank line
             )
+
+    def _show_unavailable_msg(self) -> None:
+        """Show a message when the database is too slow or unreachable."""
+        self.view.clear_screen()
+        self.view.show_message(
+            "\033[91m"  # Red color
+            + "The service is taking too long to respond. Please try again later. "
+            + "\u23f3"  # ⏳
+            + "\033[0m"  # Red color
+            + "\n"  # Extra blank line
+        )
@@ -3,3 +3,15 @@
 
 class UserAlreadyExistsError(Exception):
     """Exception raised when attempting to create a user that already exists."""
+
+
+class InvalidCursorError(ValueError):
+    """Exception raised when a pagination cursor is malformed or used out of place."""
+
+
+class BreachedPasswordError(Exception):
+    """Exception raised when registering with a password known from a data breach."""
+
+
+class UsernameNotAllowedError(Exception):
+    """Exception raised when registering with a reserved or blocked username."""
@@ -1 +1,14 @@
+from .credentials import UserCredentials as UserCredentials
+from .data_migration import DataMigrationCheckpoint as DataMigrationCheckpoint
+from .event_outbox import OutboxEvent as OutboxEvent
+from .events import USER_EVENTS as USER_EVENTS
+from .events import UserEvent as UserEvent
+from .events import UserLoggedIn as UserLoggedIn
+from .events import UserRegistered as UserRegistered
+from .login_attempt import LoginAttempt as LoginAttempt
 from .user import User as User
+from .user_archive import ARCHIVED_USER_COLUMNS as ARCHIVED_USER_COLUMNS
+from .user_archive import UserArchive as UserArchive
+from .user_stat import ALL_TIME as ALL_TIME
+from .user_stat import UserMetric as UserMetric
+from .user_stat import UserStat as UserStat
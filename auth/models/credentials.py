@@ -0,0 +1,57 @@
+"""Define the UserCredentials class, a lightweight record of a user's credentials."""
+
+
+class UserCredentials:
+    """
+    Represents the credentials of a user, as read for authentication.
+
+    Unlike a User, the record is not mapped, so reading it does not register anything
+    in the session or track it for changes, and its slots keep it small.
+    """
+
+    __slots__ = ("archived", "id", "password", "username")
+
+    def __init__(
+        self, id: int, username: str, password: str, archived: bool = False
+    ) -> None:
+        """
+        Initialize the UserCredentials.
+
+        Parameters
+        ----------
+        id : int
+            The primary key of the user.
+        username : str
+            The username of the user.
+        password : str
+            The password hash of the user.
+        archived : bool, optional
+            Whether the user was read from the archive of inactive users, in which
+            case the id is that of the archived row. Defaults to False.
+        """
+        self.id = id
+        self.username = username
+        self.password = password
+        self.archived = archived
+
+    def __str__(self) -> str:
+        """
+        Return a human-readable string representation of the credentials.
+
+        Returns
+        -------
+        str
+            A string containing the username, without the password hash.
+        """
+        return f"<UserCredentials(username={self.username})>"
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the credentials.
+
+        Returns
+        -------
+        str
+            A string containing the class name and the id and username.
+        """
+        return f"UserCredentials(id={self.id}, username={self.username})"
@@ -0,0 +1,50 @@
+"""Define the DataMigrationCheckpoint class for database ORM mapping."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from config.database.mixins import CommonMixin
+from config.database.orm import Base
+
+
+class DataMigrationCheckpoint(Base, CommonMixin):
+    """Represents the progress of a data migration through its table."""
+
+    __tablename__ = "auth_data_migration"
+
+    name: Mapped[str] = mapped_column(nullable=False, unique=True)
+    last_key: Mapped[Optional[int]] = mapped_column(nullable=True)
+    rows_scanned: Mapped[int] = mapped_column(nullable=False, default=0)
+    rows_changed: Mapped[int] = mapped_column(nullable=False, default=0)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+    def __str__(self) -> str:
+        """
+        Return a human-readable string representation of the checkpoint.
+
+        Returns
+        -------
+        str
+            A string containing the name, last key, and completion time.
+        """
+        return (
+            f"<DataMigrationCheckpoint(name={self.name}, last_key={self.last_key}, "
+            f"completed_at={self.completed_at})>"
+        )
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the checkpoint.
+
+        Returns
+        -------
+        str
+            A string containing the class name and attribute values.
+        """
+        return (
+            f"DataMigrationCheckpoint(name={self.name}, last_key={self.last_key}, "
+            f"rows_scanned={self.rows_scanned}, rows_changed={self.rows_changed}, "
+            f"completed_at={self.completed_at})"
+        )
@@ -0,0 +1,54 @@
+"""Define the OutboxEvent class for database ORM mapping."""
+
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from config.database.mixins import CommonMixin
+from config.database.orm import Base
+
+
+class OutboxEvent(Base, CommonMixin):
+    """
+    Represents a published user event not yet handled by every subscriber.
+
+    An event is claimed by the process publishing it, and can only be published again
+    by another process once the claim has expired.
+    """
+
+    __tablename__ = "auth_event_outbox"
+
+    event_id: Mapped[str] = mapped_column(nullable=False, unique=True)
+    event_type: Mapped[str] = mapped_column(nullable=False)
+    payload: Mapped[str] = mapped_column(nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(nullable=False)
+    claimed_by: Mapped[str] = mapped_column(nullable=True)
+    claimed_at: Mapped[datetime] = mapped_column(nullable=True)
+
+    def __str__(self) -> str:
+        """
+        Return a human-readable string representation of the outbox event.
+
+        Returns
+        -------
+        str
+            A string containing the event id, type, and time.
+        """
+        return (
+            f"<OutboxEvent(event_id={self.event_id}, event_type={self.event_type}, "
+            f"occurred_at={self.occurred_at})>"
+        )
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the outbox event.
+
+        Returns
+        -------
+        str
+            A string containing the class name and attribute values.
+        """
+        return (
+            f"OutboxEvent(event_id={self.event_id}, event_type={self.event_type}, "
+            f"payload={self.payload}, occurred_at={self.occurred_at})"
+        )
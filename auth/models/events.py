@@ -0,0 +1,152 @@
+"""Define the domain events published by the user service."""
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+class UserEvent:
+    """
+    Represents something that happened to a user, published to the event bus.
+
+    Events are plain records converted to and from a JSON-serializable payload, so they
+    can be written to the outbox and read back after a crash.
+    """
+
+    __slots__ = ("occurred_at", "username")
+
+    def __init__(self, username: str, occurred_at: Optional[datetime] = None) -> None:
+        """
+        Initialize the UserEvent.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+        occurred_at : Optional[datetime], optional
+            When the event happened. Defaults to now.
+        """
+        self.username = username
+        self.occurred_at = occurred_at or datetime.now(timezone.utc)
+
+    def to_payload(self) -> dict[str, Any]:
+        """
+        Convert the event to a JSON-serializable dictionary.
+
+        Returns
+        -------
+        dict[str, Any]
+            The arguments of the event, with its time in ISO 8601 format.
+        """
+        return {"username": self.username, "occurred_at": self.occurred_at.isoformat()}
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "UserEvent":
+        """
+        Convert a dictionary made by ``to_payload`` back to an event.
+
+        Parameters
+        ----------
+        payload : dict[str, Any]
+            The payload of the event.
+
+        Returns
+        -------
+        UserEvent
+            The event.
+        """
+        return cls(
+            **{**payload, "occurred_at": datetime.fromisoformat(payload["occurred_at"])}
+        )
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the event.
+
+        Returns
+        -------
+        str
+            A string containing the class name and the payload of the event.
+        """
+        arguments = ", ".join(
+            f"{key}={value}" for key, value in self.to_payload().items()
+        )
+        return f"{type(self).__name__}({arguments})"
+
+
+class UserRegistered(UserEvent):
+    """Represents the registration of a user."""
+
+    __slots__ = ("user_id",)
+
+    def __init__(
+        self, user_id: int, username: str, occurred_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Initialize the UserRegistered event.
+
+        Parameters
+        ----------
+        user_id : int
+            The primary key of the user.
+        username : str
+            The username of the user.
+        occurred_at : Optional[datetime], optional
+            When the user registered. Defaults to now.
+        """
+        super().__init__(username, occurred_at)
+        self.user_id = user_id
+
+    def to_payload(self) -> dict[str, Any]:
+        """
+        Convert the event to a JSON-serializable dictionary.
+
+        Returns
+        -------
+        dict[str, Any]
+            The arguments of the event, with its time in ISO 8601 format.
+        """
+        return {"user_id": self.user_id, **super().to_payload()}
+
+
+class UserLoggedIn(UserEvent):
+    """Represents a successful login of a user."""
+
+    __slots__ = ("source",)
+
+    def __init__(
+        self,
+        username: str,
+        occurred_at: Optional[datetime] = None,
+        source: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the UserLoggedIn event.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+        occurred_at : Optional[datetime], optional
+            When the user logged in. Defaults to now.
+        source : Optional[str], optional
+            Where the login came from, such as a client address.
+        """
+        super().__init__(username, occurred_at)
+        self.source = source
+
+    def to_payload(self) -> dict[str, Any]:
+        """
+        Convert the event to a JSON-serializable dictionary.
+
+        Returns
+        -------
+        dict[str, Any]
+            The arguments of the event, with its time in ISO 8601 format.
+        """
+        return {**super().to_payload(), "source": self.source}
+
+
+# The event classes by name, as recorded in the outbox.
+USER_EVENTS: dict[str, type[UserEvent]] = {
+    event_type.__name__: event_type for event_type in (UserRegistered, UserLoggedIn)
+}
@@ -0,0 +1,48 @@
+"""Define the LoginAttempt class for database ORM mapping."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from config.database.mixins import CommonMixin
+from config.database.orm import Base
+
+
+class LoginAttempt(Base, CommonMixin):
+    """Represents an audited login attempt in the authentication system."""
+
+    __tablename__ = "auth_login_attempt"
+
+    username: Mapped[str] = mapped_column(nullable=False, index=True)
+    success: Mapped[bool] = mapped_column(nullable=False)
+    attempted_at: Mapped[datetime] = mapped_column(nullable=False)
+    source: Mapped[Optional[str]] = mapped_column(nullable=True)
+
+    def __str__(self) -> str:
+        """
+        Return a human-readable string representation of the login attempt.
+
+        Returns
+        -------
+        str
+            A string containing username, success, attempt time, and source.
+        """
+        return (
+            f"<LoginAttempt(username={self.username}, success={self.success}, "
+            f"attempted_at={self.attempted_at}, source={self.source})>"
+        )
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the login attempt.
+
+        Returns
+        -------
+        str
+            A string containing the class name and attribute values.
+        """
+        return (
+            f"LoginAttempt(username={self.username}, success={self.success}, "
+            f"attempted_at={self.attempted_at}, source={self.source})"
+        )
@@ -1,23 +1,31 @@
 """Define the User class for database ORM mapping."""
 
-from datetime import datetime, timezone
+from datetime import datetime
 
+from sqlalchemy import Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 
-from config.database.mixins import CommonMixin
-from config.database.orm import Base
+from config.database.mixins import CommonMixin, utcnow
+from config.database.orm import Base, bytewise
 
 
 class User(Base, CommonMixin):
     """Represents a user entity in the authentication system."""
 
     __tablename__ = "auth_user"
+    __table_args__ = (
+        # Polled by the user directory to pick up new and changed users.
+        Index("ix_auth_user_created_at", "created_at"),
+        Index("ix_auth_user_modified_at", "modified_at"),
+        # Rows are placed on shards by username when sharding is configured.
+        {"info": {"shard_key": "username"}},
+    )
 
     username: Mapped[str] = mapped_column(nullable=False, unique=True)
     password: Mapped[str] = mapped_column(nullable=False)
 
     last_login: Mapped[datetime] = mapped_column(nullable=True)
-    date_joined: Mapped[datetime] = mapped_column(default=datetime.now(timezone.utc))
+    date_joined: Mapped[datetime] = mapped_column(default=utcnow)
 
     def __str__(self) -> str:
         """
@@ -46,3 +54,19 @@ class User(Base, CommonMixin):
             f"User(username={self.username}, last_login={self.last_login}, "
             f"date_joined={self.date_joined})"
         )
+
+
+# Serves case-insensitive prefix searches of usernames, in the order of their keyset
+# pagination. Comparing bytewise lets PostgreSQL answer ``LIKE 'prefix%'`` from the
+# index whatever the collation, and orders it as Python orders strings.
+Index(
+    "ix_auth_user_username_lower",
+    bytewise(func.lower(User.username)),
+    bytewise(User.username),
+)
+
+# Serves the keyset pagination of users by username. SQLite orders the unique index of
+# usernames bytewise already.
+Index("ix_auth_user_username_bytewise", bytewise(User.username)).ddl_if(
+    dialect="postgresql"
+)
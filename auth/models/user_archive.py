@@ -0,0 +1,74 @@
+"""Define the UserArchive class for database ORM mapping."""
+
+from datetime import datetime
+
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from config.database.mixins import CommonMixin, utcnow
+from config.database.orm import Base
+
+# The columns of a user kept in the archive, moved back and forth as they are. The id
+# is kept so the outbox events, caches and external references to a user still point to
+# it once restored.
+ARCHIVED_USER_COLUMNS = (
+    "id",
+    "username",
+    "password",
+    "last_login",
+    "date_joined",
+    "created_at",
+    "modified_at",
+)
+
+
+class UserArchive(Base, CommonMixin):
+    """
+    Represents an inactive user, moved out of the user table.
+
+    The ``id``, ``created_at`` and ``modified_at`` columns are those of the user, not of
+    the archived row, so a restored user keeps them.
+    """
+
+    __tablename__ = "auth_user_archive"
+    __table_args__ = (
+        # Polled by the user directory to drop the users archived since its last sync.
+        Index("ix_auth_user_archive_archived_at", "archived_at"),
+        # Rows are placed on shards by username when sharding is configured.
+        {"info": {"shard_key": "username"}},
+    )
+
+    username: Mapped[str] = mapped_column(nullable=False, unique=True)
+    password: Mapped[str] = mapped_column(nullable=False)
+
+    last_login: Mapped[datetime] = mapped_column(nullable=True)
+    date_joined: Mapped[datetime] = mapped_column(nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(default=utcnow)
+
+    def __str__(self) -> str:
+        """
+        Return a human-readable string representation of the archived user.
+
+        Returns
+        -------
+        str
+            A string containing username, last login, and archiving time.
+        """
+        return (
+            f"<UserArchive(username={self.username}, last_login={self.last_login}, "
+            f"archived_at={self.archived_at})>"
+        )
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the archived user.
+
+        Returns
+        -------
+        str
+            A string containing the class name and attribute values.
+        """
+        return (
+            f"UserArchive(username={self.username}, last_login={self.last_login}, "
+            f"date_joined={self.date_joined}, archived_at={self.archived_at})"
+        )
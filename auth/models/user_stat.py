@@ -0,0 +1,54 @@
+"""Define the UserStat class for database ORM mapping."""
+
+from datetime import date
+from enum import StrEnum
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from config.database.mixins import CommonMixin
+from config.database.orm import Base
+
+# The day of the counters that are not kept per day, such as the number of users.
+ALL_TIME = date(1970, 1, 1)
+
+
+class UserMetric(StrEnum):
+    """An enumeration class representing the counters kept about users."""
+
+    USERS = "users"
+    SIGNUPS = "signups"
+    ACTIVE_USERS = "active_users"
+
+
+class UserStat(Base, CommonMixin):
+    """Represents an aggregated counter about users, for a day or for all time."""
+
+    __tablename__ = "auth_user_stat"
+    __table_args__ = (UniqueConstraint("metric", "day"),)
+
+    metric: Mapped[str] = mapped_column(nullable=False)
+    day: Mapped[date] = mapped_column(nullable=False)
+    value: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __str__(self) -> str:
+        """
+        Return a human-readable string representation of the counter.
+
+        Returns
+        -------
+        str
+            A string containing the metric, day, and value.
+        """
+        return f"<UserStat(metric={self.metric}, day={self.day}, value={self.value})>"
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the counter.
+
+        Returns
+        -------
+        str
+            A string containing the class name and attribute values.
+        """
+        return f"UserStat(metric={self.metric}, day={self.day}, value={self.value})"
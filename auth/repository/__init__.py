@@ -1 +1,2 @@
+from .concurrent import ConcurrentUserService as ConcurrentUserService
 from .service import UserService as UserService
@@ -0,0 +1,157 @@
+"""
+Archival of inactive users.
+
+Most users of a long-lived service stopped logging in years ago, yet their rows fill
+the user table and the unique index of usernames every login walks. This module
+contains the archive_inactive_users job, which moves the users who have not logged in
+since a cutoff, or never logged in and joined before it, to the ``auth_user_archive``
+table, one short transaction per batch. Lookups by username fall back to the archive,
+and a user logging in again is moved back by
+``UserBusinessLogicLayer.restore_user``. The user directory drops archived users on its
+next sync, and the archived users are removed from a credential cache given to the job,
+which other processes only drop once their entries expire.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Engine, delete, func, insert, select
+
+from auth.models import ARCHIVED_USER_COLUMNS, User, UserArchive
+from config.base import db
+from config.database.base import PRIMARY_SHARD
+
+from .shared_cache import SharedCredentialCache
+
+logger = logging.getLogger(__name__)
+
+
+def archive_inactive_users(
+    inactive_before: datetime,
+    batch_size: int = 1000,
+    pause: float = 0.0,
+    dry_run: bool = False,
+    credential_cache: Optional[SharedCredentialCache] = None,
+) -> dict[str, int]:
+    """
+    Move the users inactive since a cutoff to the archive, on every shard.
+
+    Parameters
+    ----------
+    inactive_before : datetime
+        The cutoff, in UTC. Users whose last login, or date joined if they never
+        logged in, is older are archived.
+    batch_size : int, optional
+        The number of users moved per transaction. Defaults to 1000.
+    pause : float, optional
+        The number of seconds to sleep between batches. Defaults to 0.
+    dry_run : bool, optional
+        Whether to only count the users to archive. Defaults to False.
+    credential_cache : Optional[SharedCredentialCache], optional
+        The cache of credentials the archived users are removed from, if any, so
+        their next login finds them archived and restores them.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of users archived, or to be archived, on each shard.
+    """
+    sources = db.get_shards() or {PRIMARY_SHARD: db.get_engine()}
+    archived = {
+        name: _archive_source(
+            engine, inactive_before, batch_size, pause, dry_run, credential_cache
+        )
+        for name, engine in sources.items()
+    }
+    verb = "Found" if dry_run else "Archived"
+    logger.info(
+        f"{verb} {sum(archived.values())} users inactive since {inactive_before}."
+    )
+    return archived
+
+
+def _archive_source(
+    engine: Engine,
+    inactive_before: datetime,
+    batch_size: int,
+    pause: float,
+    dry_run: bool,
+    credential_cache: Optional[SharedCredentialCache],
+) -> int:
+    """
+    Move the inactive users of a database to its archive, batch by batch.
+
+    Each batch locks the next inactive users in the order of their ids, copies them to
+    the archive and deletes them in a single transaction, so a user is never in both
+    tables, nor lost if the job is interrupted.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine of the database, or of one shard.
+    inactive_before : datetime
+        The cutoff of the last activity, in UTC.
+    batch_size : int
+        The number of users moved per transaction.
+    pause : float
+        The number of seconds to sleep between batches.
+    dry_run : bool
+        Whether to only count the users to archive.
+    credential_cache : Optional[SharedCredentialCache]
+        The cache of credentials the archived users are removed from, if any.
+
+    Returns
+    -------
+    int
+        The number of users archived, or to be archived.
+    """
+    table = User.__table__
+    is_inactive = (
+        func.coalesce(table.c.last_login, table.c.date_joined) < inactive_before
+    )
+    if dry_run:
+        with engine.connect() as connection:
+            return connection.scalar(select(func.count()).where(is_inactive)) or 0
+
+    archived = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            rows = (
+                connection.execute(
+                    select(*(table.c[name] for name in ARCHIVED_USER_COLUMNS))
+                    .where(table.c.id > last_id, is_inactive)
+                    .order_by(table.c.id)
+                    .limit(batch_size)
+                    .with_for_update()
+                )
+                .mappings()
+                .all()
+            )
+            if not rows:
+                break
+            now = datetime.now(timezone.utc)
+            connection.execute(
+                insert(UserArchive.__table__),
+                [
+                    {
+                        **{name: row[name] for name in ARCHIVED_USER_COLUMNS},
+                        "archived_at": now,
+                    }
+                    for row in rows
+                ],
+            )
+            connection.execute(
+                delete(table).where(table.c.id.in_([row["id"] for row in rows]))
+            )
+        if credential_cache:
+            for row in rows:
+                credential_cache.invalidate(row["username"])
+        archived += len(rows)
+        last_id = rows[-1]["id"]
+        logger.debug(f"Archived {archived} users up to id {last_id}.")
+        if pause:
+            time.sleep(pause)
+    return archived
@@ -0,0 +1,139 @@
+"""
+Auditing of login attempts.
+
+This module contains the LoginAuditLog, which keeps an audit trail of every login
+attempt without adding an insert to every login. Attempts are collected in a bounded,
+thread-safe batch buffer and inserted in bulk through the Business Logic Layer. When the
+database is slow or unavailable, attempts that do not fit in memory are spilled to disk
+and inserted once the database catches up.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from toolkit.buffers import BatchBuffer
+
+from .bll import UserBusinessLogicLayer
+
+SPILL_PATH = "logs/login_attempts.spill"
+
+
+class LoginAuditLog:
+    """Buffered audit log of login attempts."""
+
+    def __init__(
+        self,
+        bll: Optional[UserBusinessLogicLayer] = None,
+        max_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        spill_path: Optional[str] = SPILL_PATH,
+    ) -> None:
+        """
+        Initialize the LoginAuditLog.
+
+        Parameters
+        ----------
+        bll : Optional[UserBusinessLogicLayer], optional
+            The Business Logic Layer used to insert the attempts. A new one is created
+            if not provided.
+        max_size : int, optional
+            Maximum number of attempts held in memory. Defaults to 10_000.
+        batch_size : int, optional
+            Maximum number of attempts inserted per statement. Defaults to 500.
+        flush_interval : float, optional
+            Seconds between periodic flushes. Defaults to 1.0.
+        spill_path : Optional[str], optional
+            Path of the file that overflowing attempts are spilled to. Defaults to
+            "logs/login_attempts.spill". Overflowing attempts are dropped if None.
+        """
+        self.bll = bll or UserBusinessLogicLayer()
+        self._buffer: BatchBuffer[dict[str, Any]] = BatchBuffer(
+            flush=self.bll.create_login_attempts,
+            max_size=max_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            spill_path=spill_path,
+            serializer=self._serialize,
+            deserializer=self._deserialize,
+            name="login-audit-log",
+        )
+
+    def record(
+        self,
+        username: str,
+        success: bool,
+        source: Optional[str] = None,
+        attempted_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Record a login attempt.
+
+        Parameters
+        ----------
+        username : str
+            The username used in the attempt.
+        success : bool
+            Whether the attempt was successful.
+        source : Optional[str], optional
+            Where the attempt came from, such as a client address.
+        attempted_at : Optional[datetime], optional
+            The time of the attempt. Defaults to now.
+        """
+        self._buffer.put(
+            {
+                "username": username,
+                "success": success,
+                "attempted_at": attempted_at or datetime.now(timezone.utc),
+                "source": source,
+            }
+        )
+
+    def flush(self) -> int:
+        """
+        Insert the buffered login attempts into the database.
+
+        Returns
+        -------
+        int
+            The number of inserted attempts.
+        """
+        return self._buffer.flush()
+
+    def close(self) -> None:
+        """Insert the buffered login attempts and stop the audit log."""
+        self._buffer.close()
+
+    @staticmethod
+    def _serialize(attempt: dict[str, Any]) -> dict[str, Any]:
+        """
+        Convert a login attempt to a JSON-serializable dictionary.
+
+        Parameters
+        ----------
+        attempt : dict[str, Any]
+            The login attempt.
+
+        Returns
+        -------
+        dict[str, Any]
+            The attempt with its timestamp in ISO 8601 format.
+        """
+        return {**attempt, "attempted_at": attempt["attempted_at"].isoformat()}
+
+    @staticmethod
+    def _deserialize(data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Convert a spilled dictionary back to a login attempt.
+
+        Parameters
+        ----------
+        data : dict[str, Any]
+            The spilled login attempt.
+
+        Returns
+        -------
+        dict[str, Any]
+            The attempt with its timestamp parsed back to a datetime.
+        """
+        return {**data, "attempted_at": datetime.fromisoformat(data["attempted_at"])}
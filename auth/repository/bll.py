@@ -12,13 +12,38 @@ SQLAlchemy for database interaction and integrates with the application's user m
 """
 
 import logging
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime
+from typing import Any, Optional
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import (
+    CursorResult,
+    Result,
+    bindparam,
+    delete,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
 
-from auth.models import User
+from auth.models import (
+    ARCHIVED_USER_COLUMNS,
+    LoginAttempt,
+    OutboxEvent,
+    User,
+    UserArchive,
+    UserMetric,
+    UserStat,
+)
 from config.base import db
+from config.database.mixins import utcnow
 
-from ..helpers.exceptions import UserAlreadyExistsError
+from ..helpers.exceptions import UserAlreadyExistsError, UsernameNotAllowedError
+from .usernames import UsernamePolicy
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +51,18 @@ logger = logging.getLogger(__name__)
 class UserBusinessLogicLayer:
     """Business Logic Layer for user operations."""
 
+    def __init__(self, username_policy: Optional[UsernamePolicy] = None) -> None:
+        """
+        Initialize the UserBusinessLogicLayer.
+
+        Parameters
+        ----------
+        username_policy : Optional[UsernamePolicy], optional
+            The policy of reserved and blocked usernames new users are checked
+            against. Usernames are not checked if not provided.
+        """
+        self.username_policy = username_policy
+
     def create_user(self, username: str, password: str) -> User:
         """
         Create a new user in the database.
@@ -45,20 +82,566 @@ class UserBusinessLogicLayer:
         Raises
         ------
         UserAlreadyExistsError
-            If the username already exists in the database.
+            If the username already exists in the database, or in the archive.
+        UsernameNotAllowedError
+            If the username is reserved or contains a blocked word.
         """
         logger.info(f"Creating user with username: {username}")
 
+        if self.username_policy:
+            self.username_policy.check(username)
         user = User(username=username, password=password)
-        session = db.get_session()
-        with session.begin():
-            try:
+        try:
+            with db.unit_of_work() as session:
                 session.add(user)
-                session.commit()
-                logger.info(f"User {username} created successfully.")
-            except IntegrityError as err:
-                session.rollback()
-                error_message = f"User {username} Already Registered."
-                logger.error(error_message)
-                raise UserAlreadyExistsError(error_message) from err
+                # Flushed first, so the write lock is held before reading the archive.
+                session.flush()
+                self._check_not_archived(session, username)
+        except (IntegrityError, UserAlreadyExistsError) as err:
+            error_message = f"User {username} Already Registered."
+            logger.error(error_message)
+            raise UserAlreadyExistsError(error_message) from err
+        logger.info(f"User {username} created successfully.")
         return user
+
+    def create_user_group(
+        self, users: Sequence[tuple[str, str]]
+    ) -> list[User | UserAlreadyExistsError | UsernameNotAllowedError]:
+        """
+        Create several users in a single transaction, each in its own savepoint.
+
+        A username already registered only rolls back the savepoint of its own user,
+        and a username the policy does not allow is skipped, so the other users of the
+        group are still committed.
+
+        Parameters
+        ----------
+        users : Sequence[tuple[str, str]]
+            The username and password of each user.
+
+        Returns
+        -------
+        list[User | UserAlreadyExistsError | UsernameNotAllowedError]
+            The newly created User object of each user, in order, or the error of the
+            users whose username is already registered or not allowed.
+        """
+        logger.info(f"Creating a group of {len(users)} users.")
+
+        results: list[User | UserAlreadyExistsError | UsernameNotAllowedError] = []
+        with db.unit_of_work() as session:
+            for username, password in users:
+                if self.username_policy:
+                    try:
+                        self.username_policy.check(username)
+                    except UsernameNotAllowedError as err:
+                        results.append(err)
+                        continue
+                user = User(username=username, password=password)
+                try:
+                    with session.begin_nested():
+                        session.add(user)
+                        session.flush()
+                        self._check_not_archived(session, username)
+                except (IntegrityError, UserAlreadyExistsError) as err:
+                    error_message = f"User {username} Already Registered."
+                    logger.error(error_message)
+                    error = UserAlreadyExistsError(error_message)
+                    error.__cause__ = err
+                    results.append(error)
+                else:
+                    results.append(user)
+        logger.info(f"Group of {len(users)} users committed.")
+        return results
+
+    def create_users(self, users: Sequence[Mapping[str, Any]]) -> int:
+        """
+        Insert several users in bulk, skipping the usernames already registered.
+
+        One SELECT and one executemany INSERT are issued per shard, or a single one of
+        each if sharding is not configured. Skipping registered usernames makes it safe
+        to insert the same users again, such as when resuming an interrupted import.
+        Users with an ``archived_at`` time are inserted into the archive of inactive
+        users instead.
+
+        Parameters
+        ----------
+        users : Sequence[Mapping[str, Any]]
+            The users, each mapping the User columns, and optionally ``archived_at``,
+            to their values.
+
+        Returns
+        -------
+        int
+            The number of inserted users.
+        """
+        logger.info(f"Inserting {len(users)} users.")
+
+        table = User.__table__
+        archive = UserArchive.__table__
+        users_by_username = {user["username"]: user for user in users}
+        inserted = 0
+        try:
+            with db.unit_of_work() as session:
+                partitions = db.partition_by_shard(users_by_username)
+                for shard_id, usernames in partitions.items():
+                    bind_arguments = {"shard_id": shard_id}
+                    existing = set(
+                        session.scalars(
+                            select(table.c.username)
+                            .where(table.c.username.in_(usernames))
+                            .union_all(
+                                select(archive.c.username).where(
+                                    archive.c.username.in_(usernames)
+                                )
+                            ),
+                            bind_arguments=bind_arguments,
+                        )
+                    )
+                    new_users = [
+                        users_by_username[username]
+                        for username in usernames
+                        if username not in existing
+                    ]
+                    active = [
+                        {
+                            name: value
+                            for name, value in user.items()
+                            if name != "archived_at"
+                        }
+                        for user in new_users
+                        if user.get("archived_at") is None
+                    ]
+                    archived = [user for user in new_users if user.get("archived_at")]
+                    for target, rows in ((table, active), (archive, archived)):
+                        if rows:
+                            session.execute(
+                                insert(target), rows, bind_arguments=bind_arguments
+                            )
+                    inserted += len(new_users)
+        except SQLAlchemyError:
+            logger.error("Failed to insert users.")
+            raise
+        return inserted
+
+    def restore_user(self, username: str) -> bool:
+        """
+        Move a user back from the archive of inactive users to the user table.
+
+        The user is copied back and removed from the archive in a single transaction,
+        with its original id. A new id is only given if the shard has since given the
+        original one to another user, such as for users archived before resharding or
+        importing, which do not keep their ids. Its modification time is updated, so the
+        user directory picks it up again.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+
+        Returns
+        -------
+        bool
+            True if the user was restored, False if it is not in the archive, such as
+            when restored concurrently.
+        """
+        archive = UserArchive.__table__
+        options = {"shard_key": username}
+        with db.unit_of_work() as session:
+            # Deleting first takes the row lock, so concurrent restores wait for each
+            # other instead of both copying the user back.
+            row = (
+                session.execute(
+                    delete(archive)
+                    .where(archive.c.username == username)
+                    .returning(*(archive.c[name] for name in ARCHIVED_USER_COLUMNS)),
+                    execution_options=options,
+                )
+                .mappings()
+                .one_or_none()
+            )
+            if row is None:
+                return False
+            values = {**row, "modified_at": utcnow()}
+            taken = session.execute(
+                select(User.id).where(User.id == row["id"]), execution_options=options
+            ).first()
+            if taken is not None:
+                logger.warning(f"User {username} restored with a new id.")
+                del values["id"]
+            session.execute(
+                insert(User.__table__).values(values), execution_options=options
+            )
+        logger.info(f"User {username} restored from the archive.")
+        return True
+
+    def update_last_logins(
+        self, last_logins: Mapping[str, datetime], count_active: bool = False
+    ) -> None:
+        """
+        Update the last login timestamp of several users in bulk.
+
+        One executemany UPDATE is issued per shard, or a single one if sharding is not
+        configured. When counting active users, the users logging in for the first
+        time on a day are counted towards the active users of that day, in the same
+        transaction.
+
+        Parameters
+        ----------
+        last_logins : Mapping[str, datetime]
+            The last login timestamp of each user, keyed by username.
+        count_active : bool, optional
+            Whether to count the daily active users. Defaults to False.
+        """
+        logger.info(f"Updating last login of {len(last_logins)} users.")
+
+        table = User.__table__
+        stmt = (
+            update(table)
+            .where(table.c.username == bindparam("b_username"))
+            .values(last_login=bindparam("b_last_login"))
+        )
+        try:
+            with db.unit_of_work() as session:
+                active_users: Counter[date] = Counter()
+                for shard_id, usernames in db.partition_by_shard(last_logins).items():
+                    bind_arguments = {"shard_id": shard_id}
+                    if count_active:
+                        active_users.update(
+                            self._first_login_days(
+                                session, usernames, last_logins, bind_arguments
+                            )
+                        )
+                    session.execute(
+                        stmt,
+                        [
+                            {
+                                "b_username": username,
+                                "b_last_login": last_logins[username],
+                            }
+                            for username in usernames
+                        ],
+                        bind_arguments=bind_arguments,
+                    )
+                self._increment_stats(
+                    session,
+                    {
+                        (UserMetric.ACTIVE_USERS, day): count
+                        for day, count in active_users.items()
+                    },
+                )
+        except SQLAlchemyError:
+            logger.error("Failed to update the last login of users.")
+            raise
+
+    def create_login_attempts(self, attempts: Sequence[Mapping[str, Any]]) -> None:
+        """
+        Insert several login attempts in one bulk statement.
+
+        Parameters
+        ----------
+        attempts : Sequence[Mapping[str, Any]]
+            The login attempts, each mapping the LoginAttempt columns to their values.
+        """
+        logger.info(f"Inserting {len(attempts)} login attempts.")
+
+        try:
+            with db.unit_of_work() as session:
+                session.execute(insert(LoginAttempt.__table__), attempts)
+        except SQLAlchemyError:
+            logger.error("Failed to insert login attempts.")
+            raise
+
+    def purge_login_attempts(self, before: datetime, batch_size: int = 1000) -> int:
+        """
+        Delete the login attempts older than a time, one batch per transaction.
+
+        Parameters
+        ----------
+        before : datetime
+            The time, in UTC, before which attempts are deleted.
+        batch_size : int, optional
+            The number of attempts deleted per transaction. Defaults to 1000.
+
+        Returns
+        -------
+        int
+            The number of deleted attempts.
+        """
+        logger.info(f"Purging login attempts older than {before}.")
+
+        table = LoginAttempt.__table__
+        batch = (
+            select(table.c.id)
+            .where(table.c.attempted_at < before)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        )
+        purged = 0
+        try:
+            while True:
+                with db.unit_of_work() as session:
+                    deleted = self._rowcount(
+                        session.execute(delete(table).where(table.c.id.in_(batch)))
+                    )
+                purged += deleted
+                if deleted < batch_size:
+                    return purged
+        except SQLAlchemyError:
+            logger.error("Failed to purge login attempts.")
+            raise
+
+    def create_outbox_events(self, events: Sequence[Mapping[str, Any]]) -> None:
+        """
+        Insert several events into the outbox in one bulk statement.
+
+        Parameters
+        ----------
+        events : Sequence[Mapping[str, Any]]
+            The events, each mapping the OutboxEvent columns to their values.
+        """
+        logger.info(f"Inserting {len(events)} events into the outbox.")
+
+        try:
+            with db.unit_of_work() as session:
+                session.execute(insert(OutboxEvent.__table__), events)
+        except SQLAlchemyError:
+            logger.error("Failed to insert events into the outbox.")
+            raise
+
+    def claim_outbox_events(
+        self, event_ids: Sequence[str], claimed_by: str, claimed_before: datetime
+    ) -> list[str]:
+        """
+        Claim several events of the outbox, unless another process claimed them since.
+
+        Parameters
+        ----------
+        event_ids : Sequence[str]
+            The ids of the events.
+        claimed_by : str
+            The name of the claiming process.
+        claimed_before : datetime
+            Only claim the events unclaimed or claimed before this time, in UTC.
+
+        Returns
+        -------
+        list[str]
+            The ids of the claimed events.
+        """
+        logger.info(f"Claiming {len(event_ids)} events of the outbox.")
+
+        table = OutboxEvent.__table__
+        try:
+            with db.unit_of_work() as session:
+                return list(
+                    session.scalars(
+                        update(table)
+                        .where(
+                            table.c.event_id.in_(event_ids),
+                            or_(
+                                table.c.claimed_at.is_(None),
+                                table.c.claimed_at < claimed_before,
+                            ),
+                        )
+                        .values(claimed_by=claimed_by, claimed_at=utcnow())
+                        .returning(table.c.event_id)
+                    )
+                )
+        except SQLAlchemyError:
+            logger.error("Failed to claim events of the outbox.")
+            raise
+
+    def delete_outbox_events(self, event_ids: Sequence[str]) -> int:
+        """
+        Delete several handled events from the outbox in one statement.
+
+        Parameters
+        ----------
+        event_ids : Sequence[str]
+            The ids of the events.
+
+        Returns
+        -------
+        int
+            The number of deleted events.
+        """
+        logger.info(f"Deleting {len(event_ids)} handled events from the outbox.")
+
+        table = OutboxEvent.__table__
+        try:
+            with db.unit_of_work() as session:
+                result = session.execute(
+                    delete(table).where(table.c.event_id.in_(event_ids))
+                )
+                return self._rowcount(result)
+        except SQLAlchemyError:
+            logger.error("Failed to delete events from the outbox.")
+            raise
+
+    def increment_stats(self, deltas: Mapping[tuple[str, date], int]) -> None:
+        """
+        Add to several user counters in one transaction, creating the missing ones.
+
+        Parameters
+        ----------
+        deltas : Mapping[tuple[str, date], int]
+            The amount added to each counter, keyed by metric and day.
+        """
+        logger.info(f"Incrementing {len(deltas)} user counters.")
+
+        try:
+            with db.unit_of_work() as session:
+                self._increment_stats(session, deltas)
+        except SQLAlchemyError:
+            logger.error("Failed to increment user counters.")
+            raise
+
+    def replace_stats(self, values: Mapping[tuple[str, date], int]) -> None:
+        """
+        Overwrite several user counters in one transaction, creating the missing ones.
+
+        Parameters
+        ----------
+        values : Mapping[tuple[str, date], int]
+            The value of each counter, keyed by metric and day.
+        """
+        logger.info(f"Replacing {len(values)} user counters.")
+
+        table = UserStat.__table__
+        try:
+            with db.unit_of_work() as session:
+                for (metric, day), value in values.items():
+                    condition = (table.c.metric == metric) & (table.c.day == day)
+                    result = session.execute(
+                        update(table).where(condition).values(value=value)
+                    )
+                    if not self._rowcount(result):
+                        session.execute(
+                            insert(table).values(metric=metric, day=day, value=value)
+                        )
+        except SQLAlchemyError:
+            logger.error("Failed to replace user counters.")
+            raise
+
+    @classmethod
+    def _increment_stats(
+        cls, session: Session, deltas: Mapping[tuple[str, date], int]
+    ) -> None:
+        """
+        Add to several user counters within a unit of work.
+
+        Each counter is updated in place, so concurrent increments never lose a count.
+        A missing counter is inserted in a savepoint, and updated instead if another
+        transaction inserted it first.
+
+        Parameters
+        ----------
+        session : Session
+            The session of the unit of work.
+        deltas : Mapping[tuple[str, date], int]
+            The amount added to each counter, keyed by metric and day.
+        """
+        table = UserStat.__table__
+        for (metric, day), delta in deltas.items():
+            if not delta:
+                continue
+            stmt = (
+                update(table)
+                .where((table.c.metric == metric) & (table.c.day == day))
+                .values(value=table.c.value + delta)
+            )
+            if cls._rowcount(session.execute(stmt)):
+                continue
+            try:
+                with session.begin_nested():
+                    session.execute(
+                        insert(table).values(metric=metric, day=day, value=delta)
+                    )
+            except IntegrityError:
+                session.execute(stmt)
+
+    @staticmethod
+    def _check_not_archived(session: Session, username: str) -> None:
+        """
+        Check a username does not belong to an archived user.
+
+        Parameters
+        ----------
+        session : Session
+            The session of the unit of work.
+        username : str
+            The username.
+
+        Raises
+        ------
+        UserAlreadyExistsError
+            If the archive of inactive users holds the username.
+        """
+        archive = UserArchive.__table__
+        archived = session.execute(
+            select(archive.c.id).where(archive.c.username == username),
+            execution_options={"shard_key": username},
+        ).first()
+        if archived is not None:
+            raise UserAlreadyExistsError(f"User {username} is archived.")
+
+    @staticmethod
+    def _first_login_days(
+        session: Session,
+        usernames: Sequence[str],
+        last_logins: Mapping[str, datetime],
+        bind_arguments: Mapping[str, Optional[str]],
+    ) -> Counter[date]:
+        """
+        Count the users whose new login is their first on its day, by day.
+
+        Parameters
+        ----------
+        session : Session
+            The session of the unit of work.
+        usernames : Sequence[str]
+            The usernames of the users of one shard.
+        last_logins : Mapping[str, datetime]
+            The new last login timestamp of each user, keyed by username.
+        bind_arguments : Mapping[str, Optional[str]]
+            The bind arguments selecting the shard of the users.
+
+        Returns
+        -------
+        Counter[date]
+            The number of users logging in for the first time on each day.
+        """
+        table = User.__table__
+        previous_logins = dict(
+            session.execute(
+                select(table.c.username, table.c.last_login).where(
+                    table.c.username.in_(usernames)
+                ),
+                bind_arguments=dict(bind_arguments),
+            )
+            .tuples()
+            .all()
+        )
+        first_login_days: Counter[date] = Counter()
+        for username, previous_login in previous_logins.items():
+            day = last_logins[username].date()
+            if previous_login is None or previous_login.date() < day:
+                first_login_days[day] += 1
+        return first_login_days
+
+    @staticmethod
+    def _rowcount(result: Result[Any]) -> int:
+        """
+        Get the number of rows matched by an UPDATE.
+
+        Parameters
+        ----------
+        result : Result[Any]
+            The result of the UPDATE.
+
+        Returns
+        -------
+        int
+            The number of matched rows.
+        """
+        return result.rowcount if isinstance(result, CursorResult) else 0
@@ -0,0 +1,162 @@
+"""
+Checking of passwords against a corpus of breached passwords.
+
+This module contains the BreachedPasswordChecker, which tells whether a password
+appears in a breach corpus without any network lookup and without loading the corpus
+into memory. The corpus, a text file of hexadecimal password hashes such as the SHA-1
+lists of Have I Been Pwned, is compiled once into a hash index file, which the checker
+memory-maps. Every worker process mapping the same file shares its pages through the
+page cache.
+"""
+
+import hashlib
+import logging
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Optional
+
+from toolkit.hashindex import HashIndex, build_hash_index
+
+logger = logging.getLogger(__name__)
+
+BREACHED_PASSWORDS_ALGORITHM = "sha1"
+
+
+def parse_corpus(lines: Iterable[str], width: int) -> Iterator[bytes]:
+    """
+    Parse the hashes of a breach corpus.
+
+    Each line holds a hexadecimal hash in either case, optionally followed by a colon
+    and a number of occurrences. Blank lines are skipped.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines of the corpus.
+    width : int
+        The number of bytes of each hash.
+
+    Yields
+    ------
+    bytes
+        The hash of each line.
+
+    Raises
+    ------
+    ValueError
+        If a line does not hold a hash of the given width.
+    """
+    for number, line in enumerate(lines, start=1):
+        hex_digest = line.partition(":")[0].strip()
+        if not hex_digest:
+            continue
+        try:
+            digest = bytes.fromhex(hex_digest)
+        except ValueError as err:
+            raise ValueError(f"Line {number} does not hold a hash.") from err
+        if len(digest) != width:
+            raise ValueError(f"Line {number} holds a hash of {len(digest)} bytes.")
+        yield digest
+
+
+def compile_breach_corpus(
+    source: str | Path,
+    path: str | Path,
+    algorithm: str = BREACHED_PASSWORDS_ALGORITHM,
+) -> int:
+    """
+    Compile a breach corpus into a hash index file.
+
+    Parameters
+    ----------
+    source : str | Path
+        The path of the corpus, one hexadecimal hash per line.
+    path : str | Path
+        The path of the index file.
+    algorithm : str, optional
+        The hashlib algorithm of the hashes of the corpus. Defaults to "sha1".
+
+    Returns
+    -------
+    int
+        The number of distinct hashes of the index.
+    """
+    width = hashlib.new(algorithm).digest_size
+    with open(source, encoding="ascii") as corpus:
+        count = build_hash_index(parse_corpus(corpus, width), path, width)
+    logger.info(f"Compiled {count} breached password hashes into {path}.")
+    return count
+
+
+class BreachedPasswordChecker:
+    """Check passwords against a memory-mapped index of breached password hashes."""
+
+    def __init__(
+        self, path: str | Path, algorithm: str = BREACHED_PASSWORDS_ALGORITHM
+    ) -> None:
+        """
+        Initialize the BreachedPasswordChecker.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path of the index file, as compiled by ``compile_breach_corpus``.
+        algorithm : str, optional
+            The hashlib algorithm of the hashes of the index. Defaults to "sha1".
+
+        Raises
+        ------
+        HashIndexError
+            If the file is not a valid hash index.
+        ValueError
+            If the hashes of the index are not as wide as the digests of the algorithm.
+        """
+        self.algorithm = algorithm
+        self.index = HashIndex(path)
+        if self.index.width != hashlib.new(algorithm).digest_size:
+            self.index.close()
+            raise ValueError(f"{path} does not hold {algorithm} hashes.")
+
+    @classmethod
+    def open(
+        cls, path: str | Path, algorithm: str = BREACHED_PASSWORDS_ALGORITHM
+    ) -> Optional["BreachedPasswordChecker"]:
+        """
+        Open the index of breached passwords if it exists.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path of the index file.
+        algorithm : str, optional
+            The hashlib algorithm of the hashes of the index. Defaults to "sha1".
+
+        Returns
+        -------
+        Optional[BreachedPasswordChecker]
+            The checker, or None if there is no index file.
+        """
+        if not Path(path).exists():
+            logger.warning(f"No breached password index at {path}, skipping checks.")
+            return None
+        return cls(path, algorithm)
+
+    def is_breached(self, password: str) -> bool:
+        """
+        Check whether a password appears in the breach corpus.
+
+        Parameters
+        ----------
+        password : str
+            The password.
+
+        Returns
+        -------
+        bool
+            True if the hash of the password is in the index.
+        """
+        return hashlib.new(self.algorithm, password.encode()).digest() in self.index
+
+    def close(self) -> None:
+        """Unmap the index file."""
+        self.index.close()
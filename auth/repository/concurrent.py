@@ -0,0 +1,175 @@
+"""
+Module for sharing the user operations between threads.
+
+This module contains the ConcurrentUserService class, a facade running the operations
+of a single UserService on a thread pool. The service holds no session and no mapped
+object between calls: each operation runs in its own unit of work on the worker thread
+executing it, so sessions never cross threads.
+"""
+
+import contextvars
+import logging
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from auth.models import User, UserCredentials
+from config.base import db
+
+from .service import UserService
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ConcurrentUserService:
+    """
+    Thread-safe facade running user operations on a thread pool.
+
+    The calling context is copied into each task, so the operations follow the
+    read routing of the caller, such as ``db.use_primary``.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        service_factory: Callable[[], UserService] = UserService,
+    ) -> None:
+        """
+        Initialize the ConcurrentUserService and its thread pool.
+
+        Parameters
+        ----------
+        max_workers : Optional[int], optional
+            The number of worker threads. Defaults to the size of the connection pool
+            of the primary, as more threads would only wait for a connection.
+        service_factory : Callable[[], UserService], optional
+            Factory creating the shared UserService, such as one giving it a
+            ``directory`` or an ``event_bus``. Defaults to a UserService with its
+            default options.
+        """
+        self.service = service_factory()
+        self.max_workers = max_workers or get_pool_size()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="user-service"
+        )
+
+    def __enter__(self) -> "ConcurrentUserService":
+        """
+        Enter the runtime context of the service.
+
+        Returns
+        -------
+        ConcurrentUserService
+            The service itself.
+        """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """
+        Close the service when leaving its runtime context.
+
+        Parameters
+        ----------
+        *args : Any
+            The exception details, if any.
+        """
+        self.close()
+
+    def register(self, username: str, password: str) -> "Future[User]":
+        """
+        Register a new user on the thread pool.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+        password : str
+            The password of the user.
+
+        Returns
+        -------
+        Future[User]
+            The future of the newly registered, detached User object.
+        """
+        return self._submit(self.service.register, username, password)
+
+    def login(
+        self, username: str, password: str, source: Optional[str] = None
+    ) -> "Future[tuple[Optional[UserCredentials], bool]]":
+        """
+        Log in a user on the thread pool.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+        password : str
+            The password of the user.
+        source : Optional[str], optional
+            Where the login attempt came from, recorded in the audit trail.
+
+        Returns
+        -------
+        Future[tuple[Optional[UserCredentials], bool]]
+            The future of the credentials of the user if found, otherwise None, and
+            whether the user is authenticated.
+        """
+        return self._submit(self.service.login, username, password, source)
+
+    def login_many(
+        self, credentials: Iterable[tuple[str, str]]
+    ) -> Iterator[tuple[Optional[UserCredentials], bool]]:
+        """
+        Log in many users concurrently.
+
+        Parameters
+        ----------
+        credentials : Iterable[tuple[str, str]]
+            The username and password of each login.
+
+        Returns
+        -------
+        Iterator[tuple[Optional[UserCredentials], bool]]
+            The result of each login, in the order of the credentials.
+        """
+        futures = [self.login(username, password) for username, password in credentials]
+        return (future.result() for future in futures)
+
+    def close(self) -> None:
+        """Wait for the submitted operations, then flush pending work of the service."""
+        self._executor.shutdown(wait=True)
+        self.service.close()
+
+    def _submit(self, function: Callable[..., T], *args: Any) -> "Future[T]":
+        """
+        Run a function on the thread pool in a copy of the calling context.
+
+        Parameters
+        ----------
+        function : Callable[..., T]
+            The function to run.
+        *args : Any
+            The arguments of the function.
+
+        Returns
+        -------
+        Future[T]
+            The future of the result of the function.
+        """
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, function, *args)
+
+
+def get_pool_size() -> int:
+    """
+    Get the number of connections kept in the pool of the primary.
+
+    Returns
+    -------
+    int
+        The size of the connection pool, or 5 if the pool is not size-bounded.
+    """
+    size = getattr(db.get_engine().pool, "size", None)
+    return size() if callable(size) else 5
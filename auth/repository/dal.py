@@ -12,25 +12,97 @@ application's user model to ensure consistency and data integrity.
 """
 
 import logging
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Callable, Optional, TypeVar
+
+from sqlalchemy import SQLColumnExpression, bindparam, func, or_, select, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 
 from config.base import db
+from config.database.orm import bytewise
 
-from ..models import User
+from ..models import (
+    ALL_TIME,
+    ARCHIVED_USER_COLUMNS,
+    OutboxEvent,
+    User,
+    UserArchive,
+    UserCredentials,
+    UserStat,
+)
+from .directory import UserDirectory
+from .pagination import (
+    UserOrder,
+    UserPage,
+    decode_cursor,
+    encode_cursor,
+    escape_like,
+    prefix_range,
+)
+from .shared_cache import SharedCredentialCache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Built once, so logins skip building the statement and hit the compiled cache.
+CREDENTIALS_QUERY = select(User.id, User.username, User.password).where(
+    User.username == bindparam("username")
+)
+
+ARCHIVED_CREDENTIALS_QUERY = select(
+    UserArchive.id, UserArchive.username, UserArchive.password
+).where(UserArchive.username == bindparam("username"))
+
+STAT_QUERY = select(UserStat.value).where(
+    UserStat.metric == bindparam("metric"), UserStat.day == bindparam("day")
+)
+
+MAX_PAGE_SIZE = 1000
+
+# Keys of the orders of user listings, compared bytewise so that the pages of several
+# shards are merged in Python in the order of the database.
+ORDER_KEYS: dict[UserOrder, tuple[SQLColumnExpression[Any], ...]] = {
+    UserOrder.ID: (User.id,),
+    UserOrder.USERNAME: (bytewise(User.username),),
+    UserOrder.LOWER_USERNAME: (
+        bytewise(func.lower(User.username)),
+        bytewise(User.username),
+    ),
+}
+
 
 class UserDataAccessLayer:
     """Data Access Layer for user operations."""
 
-    def __init__(self) -> None:
-        """Initialize the UserDataAccessLayer."""
-        self.session = db.get_session()
+    def __init__(
+        self,
+        directory: Optional[UserDirectory] = None,
+        cache: Optional[SharedCredentialCache] = None,
+    ) -> None:
+        """
+        Initialize the UserDataAccessLayer.
+
+        Parameters
+        ----------
+        directory : Optional[UserDirectory], optional
+            The in-memory directory credentials are looked up in before querying the
+            database.
+        cache : Optional[SharedCredentialCache], optional
+            The cache shared with other processes credentials are looked up in before
+            querying the database, and stored in after.
+        """
+        self.directory = directory
+        self.cache = cache
 
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Retrieve a user by their username.
 
+        Users missing from the user table are looked up in the archive of inactive
+        users. An archived user is returned as a transient User, not added to any
+        session, and stays archived until it logs in.
+
         Parameters
         ----------
         username : str
@@ -42,8 +114,302 @@ class UserDataAccessLayer:
             The user object if found, otherwise ``None``.
         """
         logger.info(f"Retrieving user by username: {username}")
+        return self._read(
+            lambda session: self._query_user_by_username(session, username)
+        )
+
+    def get_credentials_by_username(self, username: str) -> Optional[UserCredentials]:
+        """Retrieve the credentials of a user by their username.
+
+        Only the id, username and password hash are selected, and no User is loaded
+        into the session, which makes it the cheapest way to authenticate a user. With
+        a directory, the database is only queried for users missing from it, such as
+        users registered since its last sync. With a cache, it is checked next, and
+        filled with the credentials read from the database. Users missing from the
+        user table are looked up in the archive of inactive users, and their
+        credentials are marked as archived.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user to retrieve.
+
+        Returns
+        -------
+        Optional[UserCredentials]
+            The credentials of the user if found, otherwise ``None``.
+        """
+        logger.info(f"Retrieving credentials by username: {username}")
+        if self.directory is not None:
+            credentials = self.directory.get(username)
+            if credentials is not None:
+                return credentials
+        if self.cache is not None:
+            credentials = self.cache.get(username)
+            if credentials is not None:
+                return credentials
+        credentials = self._read(
+            lambda session: self._query_credentials_by_username(session, username)
+        )
+        if credentials is not None and self.cache is not None:
+            self.cache.put(credentials)
+        return credentials
+
+    def get_stat(self, metric: str, day: date = ALL_TIME) -> int:
+        """Retrieve the value of a user counter.
+
+        Counters are maintained incrementally, so reading one costs a single lookup
+        by its unique key however many users there are.
+
+        Parameters
+        ----------
+        metric : str
+            The metric of the counter, one of ``UserMetric``.
+        day : date, optional
+            The day of the counter. Defaults to ``ALL_TIME`` for the counters that are
+            not kept per day.
+
+        Returns
+        -------
+        int
+            The value of the counter, or 0 if nothing was counted yet.
+        """
+        logger.info(f"Retrieving the {metric} counter of {day}")
+        value: Optional[int] = self._read(
+            lambda session: session.scalar(STAT_QUERY, {"metric": metric, "day": day})
+        )
+        return value or 0
+
+    def get_outbox_events(
+        self, claimed_before: datetime, after_id: int = 0, limit: int = 1000
+    ) -> list[OutboxEvent]:
+        """Retrieve the events of the outbox no running process is publishing.
+
+        These are the events never claimed, or whose claim has expired, such as those
+        of a crashed process and those a subscriber failed to handle. The outbox is
+        read from the primary, as a replica may still hold events that were handled
+        and deleted since.
+
+        Parameters
+        ----------
+        claimed_before : datetime
+            Only retrieve the events unclaimed or claimed before this time, in UTC.
+        after_id : int, optional
+            Only retrieve the events whose id is greater, to read the outbox a batch
+            at a time. Defaults to 0.
+        limit : int, optional
+            The maximum number of events retrieved. Defaults to 1000.
+
+        Returns
+        -------
+        list[OutboxEvent]
+            The events, in the order they were stored.
+        """
+        logger.info(f"Retrieving outbox events after id {after_id}")
+        query = (
+            select(OutboxEvent)
+            .where(
+                OutboxEvent.id > after_id,
+                or_(
+                    OutboxEvent.claimed_at.is_(None),
+                    OutboxEvent.claimed_at < claimed_before,
+                ),
+            )
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+        )
+        with db.use_primary():
+            return self._read(lambda session: list(session.scalars(query)))
+
+    def list_users(
+        self,
+        limit: int = 50,
+        after: Optional[str] = None,
+        order: Optional[UserOrder] = None,
+        prefix: Optional[str] = None,
+    ) -> UserPage:
+        """List users a page at a time, optionally those whose username has a prefix.
+
+        Pages are fetched by seeking past the key of the previous page in the index of
+        the order rather than by offset, so deep pages are as fast as the first one.
+        Usernames are compared bytewise whatever the collation of the database, so
+        the pages of several shards, each returning its own next page, are merged in
+        the same order. The prefix is matched case-insensitively, on the lowercase
+        username the listing is then ordered by.
 
+        Parameters
+        ----------
+        limit : int, optional
+            The maximum number of users of the page, at most ``MAX_PAGE_SIZE``.
+            Defaults to 50.
+        after : Optional[str], optional
+            The cursor of the page to fetch, as returned with the previous page. The
+            first page is fetched if not provided.
+        order : Optional[UserOrder], optional
+            The order of the users. Defaults to id, or to lowercase username with a
+            prefix, the only order prefix listings support.
+        prefix : Optional[str], optional
+            Only list users whose username starts with this prefix, ignoring case.
+
+        Returns
+        -------
+        UserPage
+            The users of the page and the cursor of the next page.
+
+        Raises
+        ------
+        ValueError
+            If the limit is not between 1 and ``MAX_PAGE_SIZE``, or a prefix is
+            listed in another order than by lowercase username.
+        InvalidCursorError
+            If the cursor is malformed or comes from a listing in another order.
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"The limit must be between 1 and {MAX_PAGE_SIZE}.")
+        if order is None:
+            order = UserOrder.LOWER_USERNAME if prefix else UserOrder.ID
+        elif prefix and order != UserOrder.LOWER_USERNAME:
+            raise ValueError(
+                "Users with a prefix are only listed by lowercase username."
+            )
+        logger.info(f"Listing users by {order} after {after}, with prefix {prefix}")
+        keys = ORDER_KEYS[order]
+        query = select(User, *keys).order_by(*keys).limit(limit + 1)
+        if after is not None:
+            cursor = decode_cursor(after, order)
+            if isinstance(cursor, list):
+                # SQLite only seeks an index by a bound of its first column.
+                query = query.where(keys[0] >= cursor[0], tuple_(*keys) > tuple(cursor))
+            else:
+                query = query.where(keys[0] > cursor)
+        if prefix:
+            pattern = f"{escape_like(prefix.lower())}%"
+            query = query.where(
+                keys[0].like(pattern, escape="\\"), *prefix_range(keys[0], prefix)
+            )
+
+        def fetch(session: Session) -> list[tuple[Any, ...]]:
+            return [tuple(row) for row in session.execute(query)]
+
+        # Merging the pages of several shards needs sorting them by the keys the
+        # database returned, fetching one more user than the page tells whether
+        # another page follows.
+        rows = sorted(self._read(fetch), key=lambda row: row[1:])
+        if len(rows) <= limit:
+            return UserPage([row[0] for row in rows], None)
+        rows = rows[:limit]
+        last = rows[-1][1:]
+        key = list(last) if len(last) > 1 else last[0]
+        return UserPage([row[0] for row in rows], encode_cursor(order, key))
+
+    def _read(self, query: Callable[[Session], T]) -> T:
+        """Run a read query, retrying it after transient failures.
+
+        Parameters
+        ----------
+        query : Callable[[Session], T]
+            The query, taking the session.
+
+        Returns
+        -------
+        T
+            The result of the query.
+        """
+        return db.retry_read(lambda: self._read_once(query))
+
+    def _read_once(self, query: Callable[[Session], T]) -> T:
+        """Run a read query in its own unit of work, retrying on the primary if needed.
+
+        The query is retried on the primary if reading from a replica fails.
+
+        Parameters
+        ----------
+        query : Callable[[Session], T]
+            The query, taking the session.
+
+        Returns
+        -------
+        T
+            The result of the query.
+        """
+        try:
+            with db.unit_of_work() as session:
+                return query(session)
+        except OperationalError:
+            if not db.get_replicas():
+                raise
+            logger.warning("Reading from a replica failed, retrying on the primary.")
+            with db.use_primary(), db.unit_of_work() as session:
+                return query(session)
+
+    @staticmethod
+    def _query_user_by_username(session: Session, username: str) -> Optional[User]:
+        """Query a user by their username.
+
+        Parameters
+        ----------
+        session : Session
+            The session of the unit of work.
+        username : str
+            The username of the user to query.
+
+        Returns
+        -------
+        Optional[User]
+            The user object if found, otherwise ``None``.
+        """
         user: Optional[User] = (
-            self.session.query(User).filter_by(username=username).scalar()
+            session.query(User)
+            .execution_options(shard_key=username)
+            .filter_by(username=username)
+            .scalar()
         )
+        if user is None:
+            archive = UserArchive.__table__
+            row = (
+                session.execute(
+                    select(*(archive.c[name] for name in ARCHIVED_USER_COLUMNS)).where(
+                        archive.c.username == username
+                    ),
+                    execution_options={"shard_key": username},
+                )
+                .mappings()
+                .one_or_none()
+            )
+            user = User(**row) if row else None
         return user
+
+    @staticmethod
+    def _query_credentials_by_username(
+        session: Session, username: str
+    ) -> Optional[UserCredentials]:
+        """Query the credentials of a user by their username.
+
+        Parameters
+        ----------
+        session : Session
+            The session of the unit of work.
+        username : str
+            The username of the user to query.
+
+        Returns
+        -------
+        Optional[UserCredentials]
+            The credentials of the user if found, otherwise ``None``.
+        """
+        options = {"shard_key": username}
+        row = session.execute(
+            CREDENTIALS_QUERY, {"username": username}, execution_options=options
+        ).one_or_none()
+        if row:
+            return UserCredentials(*row)
+        row = session.execute(
+            ARCHIVED_CREDENTIALS_QUERY,
+            {"username": username},
+            execution_options=options,
+        ).one_or_none()
+        return (
+            UserCredentials(row.id, row.username, row.password, archived=True)
+            if row
+            else None
+        )
@@ -0,0 +1,644 @@
+"""
+Batched, resumable data migrations.
+
+Alembic revisions change the schema, and their DDL is quick. Rewriting the rows of a
+large table, such as backfilling a new column or normalizing values, would lock the
+table for the length of a single UPDATE, so it is done by a data migration instead:
+the DataMigrationRunner walks the table in primary key order, one short transaction
+per batch, and lets the application run between batches.
+
+Each batch reads the next rows after the checkpoint, locking them, computes their new
+values with the ``transform`` of the migration and writes the changed rows together
+with the new checkpoint, so an interrupted migration resumes after the last committed
+batch. Waiting for a lock is bounded by a lock timeout, after which the batch is
+retried smaller. The batch size is tuned towards a target latency from the duration of
+the previous batches, and a pause between batches leaves room for the application. A
+dry run computes the changes without writing them.
+
+Data migrations are registered with ``register_data_migration`` to be run by name with
+the ``migrate-data`` command.
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any, Optional, TypeVar
+
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    Engine,
+    Table,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import OperationalError
+
+from auth.models import DataMigrationCheckpoint, User, UserArchive
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE of PostgreSQL when the lock timeout expires.
+_LOCK_NOT_AVAILABLE = "55P03"
+
+M = TypeVar("M", bound="type[DataMigration]")
+
+# Data migrations runnable by name from the command line.
+DATA_MIGRATIONS: dict[str, type["DataMigration"]] = {}
+
+
+def register_data_migration(migration: M) -> M:
+    """
+    Register a data migration, to be run by name from the command line.
+
+    Parameters
+    ----------
+    migration : M
+        The class of the data migration.
+
+    Returns
+    -------
+    M
+        The class, unchanged, so this can be used as a class decorator.
+
+    Raises
+    ------
+    ValueError
+        If another data migration has the same name.
+    """
+    registered = DATA_MIGRATIONS.setdefault(migration.name, migration)
+    if registered is not migration:
+        raise ValueError(f"Data migration {migration.name} is already registered.")
+    return migration
+
+
+class DataMigration(ABC):
+    """
+    Base class of data migrations, rewriting the rows of a table one at a time.
+
+    Subclasses name the migration and its table, which must have a single integer
+    primary key, and implement ``transform``. They may restrict the columns read and
+    filter the rows, which is cheaper than skipping them in ``transform``. A migration
+    must be idempotent, as the batch in progress is redone after an interruption.
+    """
+
+    name: str
+    table: Table
+    # The columns read besides the primary key, or all of them if empty.
+    columns: Sequence[str] = ()
+
+    def where(self) -> Optional[ColumnElement[bool]]:
+        """
+        Filter the rows to migrate.
+
+        Returns
+        -------
+        Optional[ColumnElement[bool]]
+            The condition on the rows to migrate, or None to read every row.
+        """
+        return None
+
+    @abstractmethod
+    def transform(self, row: RowMapping) -> Optional[dict[str, Any]]:
+        """
+        Compute the new values of a row.
+
+        Parameters
+        ----------
+        row : RowMapping
+            The primary key and the columns read of the row.
+
+        Returns
+        -------
+        Optional[dict[str, Any]]
+            The new values by column name, or None to leave the row unchanged.
+        """
+
+
+class BatchSizeTuner:
+    """
+    Tune the size of batches so each takes about a target latency.
+
+    After each batch, the size is scaled by the ratio of the target to the observed
+    latency, by a factor between 0.5 and 2 so a single outlier does not swing it, and
+    kept within bounds. A lock timeout halves it.
+    """
+
+    __slots__ = ("max_size", "min_size", "size", "target_latency")
+
+    def __init__(
+        self,
+        size: int,
+        target_latency: float,
+        min_size: int = 10,
+        max_size: int = 10_000,
+    ) -> None:
+        """
+        Initialize the BatchSizeTuner.
+
+        Parameters
+        ----------
+        size : int
+            The size of the first batch.
+        target_latency : float
+            The duration of a batch aimed at, in seconds.
+        min_size : int, optional
+            The smallest batch size. Defaults to 10.
+        max_size : int, optional
+            The largest batch size. Defaults to 10000.
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency = target_latency
+        self.size = self._bound(size)
+
+    def observe(self, latency: float) -> int:
+        """
+        Scale the batch size after a batch.
+
+        Parameters
+        ----------
+        latency : float
+            The duration of the batch, in seconds.
+
+        Returns
+        -------
+        int
+            The size of the next batch.
+        """
+        ratio = self.target_latency / latency if latency > 0 else 2.0
+        self.size = self._bound(round(self.size * min(2.0, max(0.5, ratio))))
+        return self.size
+
+    def back_off(self) -> int:
+        """
+        Halve the batch size after a lock timeout.
+
+        Returns
+        -------
+        int
+            The size of the next batch.
+        """
+        self.size = self._bound(self.size // 2)
+        return self.size
+
+    def _bound(self, size: int) -> int:
+        """
+        Keep a batch size within the bounds.
+
+        Parameters
+        ----------
+        size : int
+            The batch size.
+
+        Returns
+        -------
+        int
+            The batch size, no smaller than the minimum and no larger than the maximum.
+        """
+        return max(self.min_size, min(self.max_size, size))
+
+
+class DataMigrationReport:
+    """Progress of a data migration on a database."""
+
+    __slots__ = (
+        "batch_size",
+        "batches",
+        "completed",
+        "dry_run",
+        "lock_timeouts",
+        "rows_changed",
+        "rows_scanned",
+    )
+
+    def __init__(
+        self, rows_scanned: int = 0, rows_changed: int = 0, dry_run: bool = False
+    ) -> None:
+        """
+        Initialize the DataMigrationReport.
+
+        Parameters
+        ----------
+        rows_scanned : int, optional
+            The number of rows read, including by previous runs. Defaults to 0.
+        rows_changed : int, optional
+            The number of rows changed, or to be changed by a dry run, including by
+            previous runs. Defaults to 0.
+        dry_run : bool, optional
+            Whether nothing was written. Defaults to False.
+        """
+        self.rows_scanned = rows_scanned
+        self.rows_changed = rows_changed
+        self.dry_run = dry_run
+        self.batches = 0
+        self.lock_timeouts = 0
+        self.batch_size = 0
+        self.completed = False
+
+
+class DataMigrationRunner:
+    """Run data migrations in throttled, checkpointed batches."""
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        target_latency: float = 0.2,
+        min_batch_size: int = 10,
+        max_batch_size: int = 10_000,
+        pause: float = 0.0,
+        lock_timeout: float = 2.0,
+        max_lock_timeouts: int = 10,
+        dry_run: bool = False,
+    ) -> None:
+        """
+        Initialize the DataMigrationRunner.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            The number of rows of the first batch. Defaults to 1000.
+        target_latency : float, optional
+            The duration of a batch the batch size is tuned towards, in seconds.
+            Defaults to 0.2.
+        min_batch_size : int, optional
+            The smallest batch size. Defaults to 10.
+        max_batch_size : int, optional
+            The largest batch size. Defaults to 10000.
+        pause : float, optional
+            The number of seconds to sleep between batches. Defaults to 0.
+        lock_timeout : float, optional
+            The number of seconds a batch waits for a row lock before it is retried
+            smaller. Defaults to 2. Only applied on PostgreSQL, SQLite waiting for its
+            database lock as long as its busy timeout.
+        max_lock_timeouts : int, optional
+            The number of consecutive lock timeouts after which the migration stops.
+            Defaults to 10.
+        dry_run : bool, optional
+            Whether to only count the rows to change. Defaults to False.
+        """
+        self.batch_size = batch_size
+        self.target_latency = target_latency
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.pause = pause
+        self.lock_timeout = lock_timeout
+        self.max_lock_timeouts = max_lock_timeouts
+        self.dry_run = dry_run
+
+    def run(self, migration: DataMigration, engine: Engine) -> DataMigrationReport:
+        """
+        Run a data migration on a database, from its checkpoint to the end.
+
+        Parameters
+        ----------
+        migration : DataMigration
+            The data migration.
+        engine : Engine
+            The engine of the database, or of one shard.
+
+        Returns
+        -------
+        DataMigrationReport
+            The progress of the migration.
+
+        Raises
+        ------
+        OperationalError
+            If a batch keeps timing out waiting for locks, or fails otherwise.
+        """
+        checkpoint = self._read_checkpoint(engine, migration.name)
+        last_key: Optional[int] = None
+        report = DataMigrationReport(dry_run=self.dry_run)
+        if checkpoint is not None:
+            last_key = checkpoint["last_key"]
+            report.rows_scanned = checkpoint["rows_scanned"]
+            report.rows_changed = checkpoint["rows_changed"]
+            if checkpoint["completed_at"] is not None:
+                logger.info(f"Data migration {migration.name} is already completed.")
+                report.completed = True
+                return report
+
+        tuner = BatchSizeTuner(
+            self.batch_size,
+            self.target_latency,
+            min_size=self.min_batch_size,
+            max_size=self.max_batch_size,
+        )
+        lock_timeouts = 0
+        while not report.completed:
+            start = time.perf_counter()
+            try:
+                last_key = self._run_batch(
+                    migration, engine, last_key, tuner.size, report
+                )
+            except OperationalError as err:
+                if not self._is_lock_timeout(err):
+                    raise
+                lock_timeouts += 1
+                report.lock_timeouts += 1
+                if lock_timeouts > self.max_lock_timeouts:
+                    logger.error(
+                        f"Data migration {migration.name} stopped after "
+                        f"{lock_timeouts} lock timeouts in a row."
+                    )
+                    raise
+                logger.warning(
+                    f"Batch of data migration {migration.name} timed out waiting for "
+                    f"locks, retrying {tuner.back_off()} rows."
+                )
+                time.sleep(self.pause)
+                continue
+            lock_timeouts = 0
+            tuner.observe(time.perf_counter() - start)
+            if not report.completed and self.pause:
+                time.sleep(self.pause)
+
+        report.batch_size = tuner.size
+        verb = "Counted" if self.dry_run else "Completed"
+        logger.info(
+            f"{verb} data migration {migration.name}: {report.rows_scanned} rows "
+            f"scanned, {report.rows_changed} changed in {report.batches} batches."
+        )
+        return report
+
+    def reset(self, migration: DataMigration, engine: Engine) -> None:
+        """
+        Forget the checkpoint of a data migration, so it runs again from the start.
+
+        Parameters
+        ----------
+        migration : DataMigration
+            The data migration.
+        engine : Engine
+            The engine of the database, or of one shard.
+        """
+        table = DataMigrationCheckpoint.__table__
+        with engine.begin() as connection:
+            connection.execute(delete(table).where(table.c.name == migration.name))
+
+    def _run_batch(
+        self,
+        migration: DataMigration,
+        engine: Engine,
+        last_key: Optional[int],
+        size: int,
+        report: DataMigrationReport,
+    ) -> Optional[int]:
+        """
+        Migrate the next batch of rows and save the checkpoint, in one transaction.
+
+        Parameters
+        ----------
+        migration : DataMigration
+            The data migration.
+        engine : Engine
+            The engine of the database.
+        last_key : Optional[int]
+            The primary key of the last row migrated, or None to start from the first.
+        size : int
+            The number of rows of the batch.
+        report : DataMigrationReport
+            The progress of the migration, updated once the batch is committed.
+
+        Returns
+        -------
+        Optional[int]
+            The primary key of the last row of the batch.
+        """
+        table = migration.table
+        (primary_key,) = table.primary_key.columns
+        columns = [table.c[name] for name in migration.columns] or list(table.c)
+        stmt = (
+            select(primary_key, *(c for c in columns if c is not primary_key))
+            .order_by(primary_key)
+            .limit(size)
+        )
+        if not self.dry_run:
+            stmt = stmt.with_for_update()
+        if last_key is not None:
+            stmt = stmt.where(primary_key > last_key)
+        condition = migration.where()
+        if condition is not None:
+            stmt = stmt.where(condition)
+
+        with engine.connect() as connection, connection.begin() as transaction:
+            self._set_lock_timeout(connection)
+            rows = connection.execute(stmt).mappings().all()
+            changes = self._transform(migration, rows, primary_key.key)
+            if rows:
+                last_key = rows[-1][primary_key.key]
+            if not self.dry_run:
+                for batch in changes.values():
+                    connection.execute(
+                        update(table).where(primary_key == bindparam("b_key")), batch
+                    )
+                self._write_checkpoint(
+                    connection,
+                    migration.name,
+                    last_key,
+                    report.rows_scanned + len(rows),
+                    report.rows_changed + sum(map(len, changes.values())),
+                    completed=not rows,
+                )
+                transaction.commit()
+            else:
+                transaction.rollback()
+
+        report.batches += bool(rows)
+        report.rows_scanned += len(rows)
+        report.rows_changed += sum(map(len, changes.values()))
+        report.completed = not rows
+        logger.debug(
+            f"Data migration {migration.name}: {report.rows_scanned} rows scanned, "
+            f"{report.rows_changed} changed, up to key {last_key}."
+        )
+        return last_key
+
+    @staticmethod
+    def _transform(
+        migration: DataMigration, rows: Sequence[RowMapping], key: str
+    ) -> dict[frozenset[str], list[dict[str, Any]]]:
+        """
+        Compute the new values of rows, grouped by the columns they change.
+
+        Parameters
+        ----------
+        migration : DataMigration
+            The data migration.
+        rows : Sequence[RowMapping]
+            The rows of the batch.
+        key : str
+            The name of the primary key column.
+
+        Returns
+        -------
+        dict[frozenset[str], list[dict[str, Any]]]
+            The parameters of an executemany UPDATE per set of changed columns.
+        """
+        changes: dict[frozenset[str], list[dict[str, Any]]] = {}
+        for row in rows:
+            values = migration.transform(row)
+            if values:
+                changes.setdefault(frozenset(values), []).append(
+                    {**values, "b_key": row[key]}
+                )
+        return changes
+
+    def _set_lock_timeout(self, connection: Connection) -> None:
+        """
+        Bound the wait for row locks in the transaction of a batch.
+
+        Parameters
+        ----------
+        connection : Connection
+            The connection running the batch.
+        """
+        if connection.dialect.name == "postgresql":
+            milliseconds = max(1, int(self.lock_timeout * 1000))
+            connection.exec_driver_sql(f"SET LOCAL lock_timeout = {milliseconds}")
+
+    @staticmethod
+    def _is_lock_timeout(error: OperationalError) -> bool:
+        """
+        Check whether an error comes from waiting too long for a lock.
+
+        Parameters
+        ----------
+        error : OperationalError
+            The error raised by a batch.
+
+        Returns
+        -------
+        bool
+            True if the lock timeout of PostgreSQL or the busy timeout of SQLite
+            expired.
+        """
+        if getattr(error.orig, "pgcode", None) == _LOCK_NOT_AVAILABLE:
+            return True
+        return "database is locked" in str(error.orig)
+
+    @staticmethod
+    def _read_checkpoint(engine: Engine, name: str) -> Optional[RowMapping]:
+        """
+        Read the checkpoint of a data migration.
+
+        Parameters
+        ----------
+        engine : Engine
+            The engine of the database.
+        name : str
+            The name of the data migration.
+
+        Returns
+        -------
+        Optional[RowMapping]
+            The checkpoint, or None if the migration never ran.
+        """
+        table = DataMigrationCheckpoint.__table__
+        with engine.connect() as connection:
+            return (
+                connection.execute(select(table).where(table.c.name == name))
+                .mappings()
+                .first()
+            )
+
+    @staticmethod
+    def _write_checkpoint(
+        connection: Connection,
+        name: str,
+        last_key: Optional[int],
+        rows_scanned: int,
+        rows_changed: int,
+        completed: bool,
+    ) -> None:
+        """
+        Save the checkpoint of a data migration in the transaction of a batch.
+
+        Parameters
+        ----------
+        connection : Connection
+            The connection running the batch.
+        name : str
+            The name of the data migration.
+        last_key : Optional[int]
+            The primary key of the last row migrated.
+        rows_scanned : int
+            The number of rows read so far.
+        rows_changed : int
+            The number of rows changed so far.
+        completed : bool
+            Whether the whole table was migrated.
+        """
+        table = DataMigrationCheckpoint.__table__
+        now = datetime.now(timezone.utc)
+        values = {
+            "last_key": last_key,
+            "rows_scanned": rows_scanned,
+            "rows_changed": rows_changed,
+            "completed_at": now if completed else None,
+            "modified_at": now,
+        }
+        result = connection.execute(
+            update(table).where(table.c.name == name).values(values)
+        )
+        if not result.rowcount:
+            connection.execute(
+                insert(table).values(name=name, created_at=now, **values)
+            )
+
+
+@register_data_migration
+class LowercasePasswordHashes(DataMigration):
+    """
+    Lowercase the hexadecimal password hashes of users.
+
+    Passwords are checked by comparing their hash to the stored one as strings, so a
+    hash imported in uppercase, such as from another system, never matches.
+    """
+
+    name = "lowercase_password_hashes"
+    table = User.__table__
+    columns = ("password",)
+
+    def where(self) -> Optional[ColumnElement[bool]]:
+        """
+        Filter the users whose password hash has uppercase letters.
+
+        Returns
+        -------
+        Optional[ColumnElement[bool]]
+            The condition on the rows to migrate.
+        """
+        return self.table.c.password != func.lower(self.table.c.password)
+
+    def transform(self, row: RowMapping) -> Optional[dict[str, Any]]:
+        """
+        Lowercase the password hash of a user.
+
+        Parameters
+        ----------
+        row : RowMapping
+            The primary key and the password hash of the user.
+
+        Returns
+        -------
+        Optional[dict[str, Any]]
+            The lowercase password hash.
+        """
+        return {"password": row["password"].lower()}
+
+
+@register_data_migration
+class LowercaseArchivedPasswordHashes(LowercasePasswordHashes):
+    """Lowercase the hexadecimal password hashes of archived users."""
+
+    name = "lowercase_archived_password_hashes"
+    table = UserArchive.__table__
@@ -0,0 +1,457 @@
+"""
+In-memory directory of user credentials.
+
+This module contains the UserDirectory, which holds the credentials of every user in
+memory so that read-mostly nodes can authenticate without querying the database. Users
+are stored column by column: an interned username to index hash, and arrays of ids,
+password hashes and timestamps, so each user costs a few hundred bytes instead of a
+mapped User object.
+
+The directory is loaded once and then kept up to date by polling the ``created_at`` and
+``modified_at`` watermarks of the user table, either on demand or from a background
+thread. The application only deletes users by moving them to the archive of inactive
+users, so the ``archived_at`` watermark of the archive is polled too, and the users
+archived since the last sync are dropped from the directory, for their logins to find
+them in the archive and restore them.
+"""
+
+import logging
+import sys
+import threading
+from array import array
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Engine, RowMapping, func, or_, select
+
+from auth.models import User, UserArchive, UserCredentials
+from config.base import db
+from config.database.base import PRIMARY_SHARD
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 32
+NO_TIMESTAMP = -(2**63)
+EPOCH = datetime(1970, 1, 1)
+
+
+class UserDirectory:
+    """
+    Compact in-memory directory of user credentials, synced from the database.
+
+    Password hashes are kept as raw SHA-256 digests. Any other hash is kept aside as is.
+    Lookups are lock-free and may run while the directory is being synced.
+    """
+
+    def __init__(self, overlap: float = 5.0, batch_size: int = 10_000) -> None:
+        """
+        Initialize an empty UserDirectory.
+
+        Parameters
+        ----------
+        overlap : float, optional
+            Seconds each sync looks back before the last seen change, so that users
+            committed late with an earlier timestamp are not missed. Defaults to 5.0.
+        batch_size : int, optional
+            The number of users fetched from the database at a time. Defaults to
+            10_000.
+        """
+        self._overlap = timedelta(seconds=overlap)
+        self._batch_size = batch_size
+
+        self._indexes: dict[str, int] = {}
+        self._ids = array("q")
+        self._hashes = bytearray()
+        self._other_hashes: dict[int, str] = {}
+        self._last_logins = array("q")
+        self._dates_joined = array("q")
+
+        self._watermarks: dict[str, datetime] = {}
+        self._archive_watermarks: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        """
+        Return the number of users in the directory.
+
+        Returns
+        -------
+        int
+            The number of users.
+        """
+        return len(self._indexes)
+
+    def __contains__(self, username: object) -> bool:
+        """
+        Check whether a user is in the directory.
+
+        Parameters
+        ----------
+        username : object
+            The username of the user.
+
+        Returns
+        -------
+        bool
+            True if the user is in the directory, False otherwise.
+        """
+        return username in self._indexes
+
+    def get(self, username: str) -> Optional[UserCredentials]:
+        """
+        Get the credentials of a user.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+
+        Returns
+        -------
+        Optional[UserCredentials]
+            The credentials of the user, or None if the user is not in the directory.
+        """
+        index = self._indexes.get(username)
+        if index is None:
+            return None
+        password = self._other_hashes.get(index)
+        if password is None:
+            start = index * HASH_SIZE
+            password = self._hashes[start : start + HASH_SIZE].hex()
+        return UserCredentials(self._ids[index], username, password)
+
+    def get_last_login(self, username: str) -> Optional[datetime]:
+        """
+        Get the last login of a user, as of the last sync.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+
+        Returns
+        -------
+        Optional[datetime]
+            The last login in UTC, or None if the user never logged in or is not in the
+            directory.
+        """
+        index = self._indexes.get(username)
+        return None if index is None else _from_micros(self._last_logins[index])
+
+    def get_date_joined(self, username: str) -> Optional[datetime]:
+        """
+        Get the date a user joined.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+
+        Returns
+        -------
+        Optional[datetime]
+            The date joined in UTC, or None if the user is not in the directory.
+        """
+        index = self._indexes.get(username)
+        return None if index is None else _from_micros(self._dates_joined[index])
+
+    def memory_usage(self) -> int:
+        """
+        Estimate the memory held by the directory.
+
+        Returns
+        -------
+        int
+            The size in bytes of the hash, its keys and the columns.
+        """
+        columns = (self._ids, self._hashes, self._last_logins, self._dates_joined)
+        return (
+            sys.getsizeof(self._indexes)
+            + sum(sys.getsizeof(username) for username in self._indexes)
+            + sum(sys.getsizeof(index) for index in self._indexes.values())
+            + sum(sys.getsizeof(column) for column in columns)
+            + sys.getsizeof(self._other_hashes)
+        )
+
+    def sync(self) -> int:
+        """
+        Load the users created or changed since the previous sync.
+
+        The first sync loads every user, and the next ones also drop the users
+        archived since the previous sync. Every shard is synced when sharding is
+        configured. Users are read from the primary, as a lagging replica could apply
+        changes after their timestamps have been passed.
+
+        Returns
+        -------
+        int
+            The number of users loaded or updated.
+        """
+        synced = 0
+        dropped = 0
+        with self._lock:
+            for source, engine in self._get_sources().items():
+                # Archived users are dropped first, so a user archived and restored
+                # since the last sync is added back by its restored row.
+                dropped += self._drop_archived(source, engine)
+                synced += self._sync_source(source, engine)
+        if synced or dropped:
+            logger.info(
+                f"Synced {synced} users into the user directory, dropped {dropped}."
+            )
+        return synced
+
+    def start(self, interval: float = 5.0) -> None:
+        """
+        Sync the directory now and then every ``interval`` seconds in the background.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Seconds between syncs. Defaults to 5.0.
+        """
+        self.sync()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="user-directory", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop syncing the directory in the background."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _get_sources(self) -> dict[str, Engine]:
+        """
+        Get the engines holding users.
+
+        Returns
+        -------
+        dict[str, Engine]
+            The shard engines by name, or the primary engine if sharding is not
+            configured.
+        """
+        return db.get_shards() or {PRIMARY_SHARD: db.get_engine()}
+
+    def _sync_source(self, source: str, engine: Engine) -> int:
+        """
+        Load the users of one engine created or changed since its watermark.
+
+        Parameters
+        ----------
+        source : str
+            The name of the engine.
+        engine : Engine
+            The engine holding users.
+
+        Returns
+        -------
+        int
+            The number of users loaded or updated.
+        """
+        table = User.__table__
+        stmt = select(
+            table.c.id,
+            table.c.username,
+            table.c.password,
+            table.c.last_login,
+            table.c.date_joined,
+            table.c.created_at,
+            table.c.modified_at,
+        )
+        watermark = self._watermarks.get(source)
+        if watermark is not None:
+            since = watermark - self._overlap
+            stmt = stmt.where(
+                or_(table.c.created_at >= since, table.c.modified_at >= since)
+            )
+
+        with engine.connect() as connection:
+            result = connection.execution_options(yield_per=self._batch_size).execute(
+                stmt
+            )
+            synced = 0
+            for rows in result.mappings().partitions():
+                watermark = max(watermark or EPOCH, self._apply(rows))
+                synced += len(rows)
+        if watermark is not None:
+            self._watermarks[source] = watermark
+        return synced
+
+    def _drop_archived(self, source: str, engine: Engine) -> int:
+        """
+        Drop the users of one engine archived since its archive watermark.
+
+        The first sync only records the watermark, as the users archived before are
+        not loaded. The slots of dropped users are not reused, since a concurrent
+        lookup may still be reading them.
+
+        Parameters
+        ----------
+        source : str
+            The name of the engine.
+        engine : Engine
+            The engine holding users.
+
+        Returns
+        -------
+        int
+            The number of users dropped.
+        """
+        archive = UserArchive.__table__
+        watermark = self._archive_watermarks.get(source)
+        with engine.connect() as connection:
+            if watermark is None:
+                latest = connection.scalar(select(func.max(archive.c.archived_at)))
+                self._archive_watermarks[source] = _to_naive_utc(latest or EPOCH)
+                return 0
+            rows = connection.execute(
+                select(archive.c.username, archive.c.archived_at).where(
+                    archive.c.archived_at >= watermark - self._overlap
+                )
+            ).all()
+        dropped = 0
+        for username, archived_at in rows:
+            dropped += self._indexes.pop(username, None) is not None
+            watermark = max(watermark, _to_naive_utc(archived_at))
+        self._archive_watermarks[source] = watermark
+        return dropped
+
+    def _apply(self, rows: Iterable[RowMapping]) -> datetime:
+        """
+        Store users in the directory, replacing the ones already stored.
+
+        A new user is written to the columns before being added to the hash, so
+        concurrent lookups never see a partly stored user.
+
+        Parameters
+        ----------
+        rows : Iterable[RowMapping]
+            The users, with their credentials and timestamps.
+
+        Returns
+        -------
+        datetime
+            The latest creation or modification time of the users, in naive UTC.
+        """
+        latest = EPOCH
+        for row in rows:
+            index = self._indexes.get(row["username"])
+            if index is None:
+                index = len(self._ids)
+                self._ids.append(row["id"])
+                self._hashes.extend(bytes(HASH_SIZE))
+                self._last_logins.append(NO_TIMESTAMP)
+                self._dates_joined.append(NO_TIMESTAMP)
+            else:
+                self._ids[index] = row["id"]
+
+            self._store_hash(index, row["password"])
+            self._last_logins[index] = _to_micros(row["last_login"])
+            self._dates_joined[index] = _to_micros(row["date_joined"])
+            self._indexes.setdefault(sys.intern(row["username"]), index)
+
+            for changed_at in (row["created_at"], row["modified_at"]):
+                if changed_at is not None:
+                    latest = max(latest, _to_naive_utc(changed_at))
+        return latest
+
+    def _store_hash(self, index: int, password: str) -> None:
+        """
+        Store the password hash of a user, compactly if it is a SHA-256 hex digest.
+
+        Parameters
+        ----------
+        index : int
+            The index of the user.
+        password : str
+            The password hash.
+        """
+        try:
+            digest = bytes.fromhex(password)
+        except ValueError:
+            digest = b""
+        if len(digest) == HASH_SIZE and digest.hex() == password:
+            start = index * HASH_SIZE
+            self._hashes[start : start + HASH_SIZE] = digest
+            self._other_hashes.pop(index, None)
+        else:
+            self._other_hashes[index] = password
+
+    def _run(self, interval: float) -> None:
+        """
+        Sync the directory periodically until it is closed.
+
+        Parameters
+        ----------
+        interval : float
+            Seconds between syncs.
+        """
+        while not self._stopped.wait(interval):
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Failed to sync the user directory.")
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    """
+    Convert a timestamp to naive UTC, assuming naive timestamps are already in UTC.
+
+    Parameters
+    ----------
+    value : datetime
+        The timestamp.
+
+    Returns
+    -------
+    datetime
+        The timestamp in naive UTC.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _to_micros(value: Optional[datetime]) -> int:
+    """
+    Convert a timestamp to microseconds since the epoch.
+
+    Parameters
+    ----------
+    value : Optional[datetime]
+        The timestamp, or None.
+
+    Returns
+    -------
+    int
+        The microseconds since the epoch, or NO_TIMESTAMP for None.
+    """
+    if value is None:
+        return NO_TIMESTAMP
+    return (_to_naive_utc(value) - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> Optional[datetime]:
+    """
+    Convert microseconds since the epoch back to a timestamp.
+
+    Parameters
+    ----------
+    value : int
+        The microseconds since the epoch, or NO_TIMESTAMP.
+
+    Returns
+    -------
+    Optional[datetime]
+        The timestamp in UTC, or None for NO_TIMESTAMP.
+    """
+    if value == NO_TIMESTAMP:
+        return None
+    return (EPOCH + timedelta(microseconds=value)).replace(tzinfo=timezone.utc)
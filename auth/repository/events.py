@@ -0,0 +1,287 @@
+"""
+Durable publishing of user events.
+
+This module contains the EventOutbox, which records the events of the user service in
+the outbox table before publishing them to the event bus, and deletes them once every
+subscriber handled them, so the events of a crashed process, and those a subscriber
+failed to handle or dropped, are published again by ``recover``. Each event is claimed
+by the process storing it, and ``recover`` only claims and publishes the events whose
+claim has outlived a lease, so processes recovering at the same time, or while others
+are still publishing, do not publish an event twice. Events are collected
+in a bounded batch buffer and inserted in bulk by its flusher thread rather than in the
+transaction of the registration or login, which keeps the outbox off the path of the
+request at the price of losing the events of the last ``flush_interval`` seconds on a
+crash. When the database is slow or unavailable,
+events that do not fit in memory are spilled to disk and inserted once it catches up.
+"""
+
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Optional
+
+from toolkit.buffers import BatchBuffer
+from toolkit.events import EventBus
+
+from ..models import USER_EVENTS, UserEvent
+from .bll import UserBusinessLogicLayer
+from .dal import UserDataAccessLayer
+
+logger = logging.getLogger(__name__)
+
+SPILL_PATH = "logs/event_outbox.spill"
+
+
+class EventOutbox:
+    """Outbox of user events, published to the event bus once stored."""
+
+    def __init__(
+        self,
+        bus: EventBus,
+        bll: Optional[UserBusinessLogicLayer] = None,
+        dal: Optional[UserDataAccessLayer] = None,
+        max_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.1,
+        spill_path: Optional[str] = SPILL_PATH,
+        lease: float = 300.0,
+    ) -> None:
+        """
+        Initialize the EventOutbox.
+
+        Parameters
+        ----------
+        bus : EventBus
+            The event bus the stored events are published to.
+        bll : Optional[UserBusinessLogicLayer], optional
+            The Business Logic Layer used to insert and delete the events. A new one is
+            created if not provided.
+        dal : Optional[UserDataAccessLayer], optional
+            The Data Access Layer used to read the events to recover. A new one is
+            created if not provided.
+        max_size : int, optional
+            Maximum number of events held in memory. Defaults to 10_000.
+        batch_size : int, optional
+            Maximum number of events inserted or deleted per statement. Defaults to
+            500.
+        flush_interval : float, optional
+            Seconds between periodic inserts, which is also the longest delay before
+            an event is published. Defaults to 0.1.
+        spill_path : Optional[str], optional
+            Path of the file that overflowing events are spilled to. Defaults to
+            "logs/event_outbox.spill". Overflowing events are dropped if None.
+        lease : float, optional
+            Seconds an event stays claimed by the process publishing it before another
+            process may recover it. Defaults to 300.
+        """
+        self.bus = bus
+        self.lease = lease
+        # Names this process in the claims of the events it publishes.
+        self.owner = uuid.uuid4().hex
+        self.bll = bll or UserBusinessLogicLayer()
+        self.dal = dal or UserDataAccessLayer()
+        self._buffer: BatchBuffer[UserEvent] = BatchBuffer(
+            flush=self._store,
+            max_size=max_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            spill_path=spill_path,
+            serializer=self._serialize,
+            deserializer=self._deserialize,
+            name="event-outbox",
+        )
+        # Losing a deletion only publishes the event again after a crash, so the ids of
+        # the handled events are not spilled.
+        self._handled: BatchBuffer[str] = BatchBuffer(
+            flush=self._delete,
+            max_size=max_size,
+            batch_size=batch_size,
+            flush_interval=1.0,
+            spill_path=None,
+            name="event-outbox-handled",
+        )
+
+    def publish(self, event: UserEvent) -> None:
+        """
+        Record an event, to be stored in the outbox and published.
+
+        Parameters
+        ----------
+        event : UserEvent
+            The event.
+        """
+        self._buffer.put(event)
+
+    def recover(self, batch_size: int = 1000) -> int:
+        """
+        Publish again the events left in the outbox, such as by a crashed process.
+
+        Only the events never claimed, or whose claim is older than the lease, are
+        published, each once claimed by this process, so the events still being
+        handled by other running processes, or recovered by them, are not published
+        twice.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            The number of events read per query. Defaults to 1000.
+
+        Returns
+        -------
+        int
+            The number of events published again.
+        """
+        claimed_before = datetime.now(timezone.utc) - timedelta(seconds=self.lease)
+        recovered = 0
+        after_id = 0
+        while True:
+            rows = self.dal.get_outbox_events(claimed_before, after_id, batch_size)
+            if not rows:
+                break
+            after_id = rows[-1].id
+            claimed = set(
+                self.bll.claim_outbox_events(
+                    [row.event_id for row in rows], self.owner, claimed_before
+                )
+            )
+            for row in rows:
+                if row.event_id not in claimed:
+                    continue
+                event_type = USER_EVENTS.get(row.event_type)
+                if event_type is None:
+                    logger.error(
+                        f"Skipping the outbox event {row.event_id} of unknown type "
+                        f"{row.event_type}."
+                    )
+                    continue
+                event = event_type.from_payload(json.loads(row.payload))
+                self.bus.publish(
+                    event, on_done=partial(self._mark_handled, row.event_id)
+                )
+                recovered += 1
+        logger.info(f"Recovered {recovered} events from the outbox.")
+        return recovered
+
+    def flush(self) -> int:
+        """
+        Store the buffered events in the outbox and publish them.
+
+        Returns
+        -------
+        int
+            The number of stored events.
+        """
+        return self._buffer.flush()
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Store and publish the buffered events, then stop the outbox.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximum number of seconds to wait for the subscribers to handle the
+            events, which are left in the outbox afterwards. Defaults to 5.
+        """
+        self._buffer.close()
+        self.bus.join(timeout)
+        self._handled.close()
+
+    def _store(self, events: list[UserEvent]) -> None:
+        """
+        Insert a batch of events into the outbox, then publish them.
+
+        Parameters
+        ----------
+        events : list[UserEvent]
+            The events.
+        """
+        claimed_at = datetime.now(timezone.utc)
+        rows: list[dict[str, Any]] = [
+            {
+                "event_id": uuid.uuid4().hex,
+                "event_type": type(event).__name__,
+                "payload": json.dumps(event.to_payload()),
+                "occurred_at": event.occurred_at,
+                "claimed_by": self.owner,
+                "claimed_at": claimed_at,
+            }
+            for event in events
+        ]
+        self.bll.create_outbox_events(rows)
+        for event, row in zip(events, rows):
+            try:
+                self.bus.publish(
+                    event, on_done=partial(self._mark_handled, row["event_id"])
+                )
+            except RuntimeError:
+                logger.warning(f"Event bus closed, {event!r} left in the outbox.")
+
+    def _delete(self, event_ids: list[str]) -> None:
+        """
+        Delete a batch of handled events from the outbox.
+
+        Parameters
+        ----------
+        event_ids : list[str]
+            The ids of the events.
+        """
+        self.bll.delete_outbox_events(event_ids)
+
+    def _mark_handled(self, event_id: str, handled: bool) -> None:
+        """
+        Queue the deletion of an event once every subscriber handled it.
+
+        An event a subscriber failed to handle or dropped is left in the outbox, to be
+        published again by ``recover``.
+
+        Parameters
+        ----------
+        event_id : str
+            The id of the event.
+        handled : bool
+            True if every subscriber handled the event.
+        """
+        if not handled:
+            logger.warning(f"Event {event_id} left in the outbox to be recovered.")
+            return
+        try:
+            self._handled.put(event_id)
+        except RuntimeError:
+            logger.debug(f"Outbox closed, event {event_id} left in the outbox.")
+
+    @staticmethod
+    def _serialize(event: UserEvent) -> dict[str, Any]:
+        """
+        Convert an event to a JSON-serializable dictionary.
+
+        Parameters
+        ----------
+        event : UserEvent
+            The event.
+
+        Returns
+        -------
+        dict[str, Any]
+            The type and the payload of the event.
+        """
+        return {"type": type(event).__name__, "payload": event.to_payload()}
+
+    @staticmethod
+    def _deserialize(data: dict[str, Any]) -> UserEvent:
+        """
+        Convert a spilled dictionary back to an event.
+
+        Parameters
+        ----------
+        data : dict[str, Any]
+            The spilled event.
+
+        Returns
+        -------
+        UserEvent
+            The event.
+        """
+        return USER_EVENTS[data["type"]].from_payload(data["payload"])
@@ -0,0 +1,114 @@
+"""
+Periodic maintenance of the user tables.
+
+This module contains analyze_user_tables, which refreshes the statistics the query
+planner keeps about the user tables, and build_maintenance_scheduler, which schedules
+it along with the housekeeping of a UserService, such as purging the old login
+attempts, and the checks of a memory monitor, for long-running processes. The jobs run
+on a single background worker by default, so maintenance holds at most one connection
+of the pool serving requests.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from auth.models import User, UserArchive
+from config.base import (
+    LOGIN_ATTEMPT_RETENTION_DAYS,
+    MAINTENANCE_MAX_CONNECTIONS,
+    MEMORY_CHECK_INTERVAL,
+    db,
+)
+from config.database.base import PRIMARY_SHARD
+from toolkit.diagnostics import MemoryMonitor
+from toolkit.scheduling import CronTrigger, IntervalTrigger, Scheduler
+
+from .service import UserService
+
+logger = logging.getLogger(__name__)
+
+
+def analyze_user_tables() -> None:
+    """Refresh the planner statistics of the user table and archive, on every shard."""
+    sources = db.get_shards() or {PRIMARY_SHARD: db.get_engine()}
+    for name, engine in sources.items():
+        with engine.begin() as connection:
+            for table in (User.__table__, UserArchive.__table__):
+                connection.execute(text(f"ANALYZE {table.name}"))
+        logger.info(f"Analyzed the user tables of {name}.")
+
+
+def build_maintenance_scheduler(
+    service: UserService,
+    max_connections: int = MAINTENANCE_MAX_CONNECTIONS,
+    login_attempt_retention: timedelta = timedelta(days=LOGIN_ATTEMPT_RETENTION_DAYS),
+    memory_monitor: Optional[MemoryMonitor] = None,
+    memory_check_interval: float = MEMORY_CHECK_INTERVAL,
+) -> Scheduler:
+    """
+    Build a scheduler of the maintenance jobs of a user service, not yet started.
+
+    Login attempts past their retention are purged and the user tables analyzed every
+    night, the counters of the statistics are reconciled every week if collected, and
+    the events left in the outbox are published again every five minutes if durable, by
+    the one process claiming each event once its claim has expired.
+    The memory monitor, if any, checks the memory of the process at its own interval.
+    Nightly jobs run at a random time within ten minutes of their schedule, in UTC, so
+    the processes of a deployment do not all run them at once.
+
+    Parameters
+    ----------
+    service : UserService
+        The user service.
+    max_connections : int, optional
+        The number of jobs run at once, each using one connection at a time. Defaults
+        to ``MAINTENANCE_MAX_CONNECTIONS``.
+    login_attempt_retention : timedelta, optional
+        How long login attempts are kept. Defaults to
+        ``LOGIN_ATTEMPT_RETENTION_DAYS``.
+    memory_monitor : Optional[MemoryMonitor], optional
+        The memory monitor, started by the caller, whose checks are scheduled.
+    memory_check_interval : float, optional
+        Seconds between checks of the memory monitor. Defaults to
+        ``MEMORY_CHECK_INTERVAL``.
+
+    Returns
+    -------
+    Scheduler
+        The scheduler, to be started and shut down by the caller.
+    """
+    scheduler = Scheduler(max_workers=max_connections, name="maintenance")
+    scheduler.add_job(
+        "purge-login-attempts",
+        lambda: service.bll.purge_login_attempts(
+            datetime.now(timezone.utc) - login_attempt_retention
+        ),
+        CronTrigger("15 3 * * *", jitter=600),
+    )
+    scheduler.add_job(
+        "analyze-user-tables",
+        analyze_user_tables,
+        CronTrigger("45 3 * * *", jitter=600),
+    )
+    if service.statistics:
+        scheduler.add_job(
+            "reconcile-statistics",
+            service.statistics.reconcile,
+            CronTrigger("15 4 * * 0", jitter=600),
+        )
+    if service.event_outbox:
+        scheduler.add_job(
+            "recover-events",
+            service.event_outbox.recover,
+            IntervalTrigger(300, jitter=30),
+        )
+    if memory_monitor:
+        scheduler.add_job(
+            "check-memory",
+            memory_monitor.check,
+            IntervalTrigger(memory_check_interval),
+        )
+    return scheduler
@@ -0,0 +1,194 @@
+"""
+Keyset pagination of users.
+
+This module contains the orders users can be listed in, the pages returned by the DAL
+and the opaque cursors pointing past the end of a page. Rather than skipping the rows
+of the previous pages with ``OFFSET``, which the database must still read, the next
+page seeks past the key of the last user of the page through the index of the order, so
+every page costs the same however deep it is.
+"""
+
+import base64
+import binascii
+import json
+import sys
+from enum import StrEnum
+from typing import Optional, TypeGuard
+
+from sqlalchemy import ColumnElement, SQLColumnExpression
+
+from ..helpers.exceptions import InvalidCursorError
+from ..models import User
+
+# The id, the username, or the lowercase username and the username of a user.
+CursorKey = int | str | list[str]
+
+
+class UserOrder(StrEnum):
+    """An enumeration class representing the orders of a user listing."""
+
+    ID = "id"
+    USERNAME = "username"
+    LOWER_USERNAME = "lower_username"
+
+
+class UserPage:
+    """A page of users, with the cursor of the next page if there is one."""
+
+    __slots__ = ("next_cursor", "users")
+
+    def __init__(self, users: list[User], next_cursor: Optional[str]) -> None:
+        """
+        Initialize the UserPage.
+
+        Parameters
+        ----------
+        users : list[User]
+            The users of the page, in the order of the listing.
+        next_cursor : Optional[str]
+            The cursor of the next page, or None on the last page.
+        """
+        self.users = users
+        self.next_cursor = next_cursor
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the page.
+
+        Returns
+        -------
+        str
+            A string containing the class name, the number of users and the cursor.
+        """
+        return f"UserPage(users={len(self.users)}, next_cursor={self.next_cursor})"
+
+
+def encode_cursor(order: UserOrder, key: CursorKey) -> str:
+    """
+    Encode the key of the last user of a page into an opaque cursor.
+
+    Parameters
+    ----------
+    order : UserOrder
+        The order of the listing.
+    key : CursorKey
+        The key of the last user of the page in the order of the listing.
+
+    Returns
+    -------
+    str
+        The URL-safe cursor.
+    """
+    payload = json.dumps([str(order), key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order: UserOrder) -> CursorKey:
+    """
+    Decode the key a cursor points past.
+
+    Parameters
+    ----------
+    cursor : str
+        The cursor, as returned with a page.
+    order : UserOrder
+        The order of the listing the cursor is used with.
+
+    Returns
+    -------
+    CursorKey
+        The key of the last user of the previous page in the order of the listing.
+
+    Raises
+    ------
+    InvalidCursorError
+        If the cursor is malformed or was returned by a listing in another order.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order, key = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as err:
+        raise InvalidCursorError(f"Malformed cursor: {cursor!r}") from err
+    if cursor_order == order and _is_key(key, order):
+        return key
+    raise InvalidCursorError(f"The cursor does not belong to a listing by {order}.")
+
+
+def escape_like(value: str, escape: str = "\\") -> str:
+    """
+    Escape the wildcards of a LIKE pattern.
+
+    Parameters
+    ----------
+    value : str
+        The literal text to match.
+    escape : str, optional
+        The escape character of the pattern. Defaults to a backslash.
+
+    Returns
+    -------
+    str
+        The text, matching itself in a LIKE pattern.
+    """
+    return (
+        value.replace(escape, escape * 2)
+        .replace("%", f"{escape}%")
+        .replace("_", f"{escape}_")
+    )
+
+
+def _is_key(key: object, order: UserOrder) -> TypeGuard[CursorKey]:
+    """
+    Check a decoded key has the type of the keys of an order.
+
+    Parameters
+    ----------
+    key : object
+        The decoded key.
+    order : UserOrder
+        The order of the listing.
+
+    Returns
+    -------
+    bool
+        Whether the key is an id, a username, or a lowercase username and a username.
+    """
+    if order == UserOrder.ID:
+        return type(key) is int
+    if order == UserOrder.USERNAME:
+        return type(key) is str
+    return (
+        type(key) is list and len(key) == 2 and all(type(part) is str for part in key)
+    )
+
+
+def prefix_range(
+    key: SQLColumnExpression[str], prefix: str
+) -> list[ColumnElement[bool]]:
+    """
+    Bound a lowercase key to the range of the strings starting with a prefix.
+
+    The range is equivalent to matching the prefix with ``LIKE``, which databases
+    comparing case-insensitively, such as SQLite, cannot turn into a range of the index
+    themselves.
+
+    Parameters
+    ----------
+    key : SQLColumnExpression[str]
+        The lowercase key, compared bytewise.
+    prefix : str
+        The prefix, in any case.
+
+    Returns
+    -------
+    list[ColumnElement[bool]]
+        The conditions on the key.
+    """
+    lowest = prefix.lower()
+    conditions = [key >= lowest]
+    last = ord(lowest[-1]) + 1
+    # Strings starting with the prefix sort before the prefix with its last character
+    # incremented, unless no character follows it.
+    if last <= sys.maxunicode and not 0xD800 <= last <= 0xDFFF:
+        conditions.append(key < lowest[:-1] + chr(last))
+    return conditions
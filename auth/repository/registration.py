@@ -0,0 +1,97 @@
+"""
+Group commit of user registrations.
+
+This module contains the GroupRegistrar, which lets concurrent registrations share a
+single transaction instead of paying a commit each. Registrations arriving within a
+short window are created together through the Business Logic Layer, each in its own
+savepoint, so a username already registered only fails its own registration.
+"""
+
+from typing import Optional
+
+from auth.models import User
+from config.base import db
+from config.database.deadlines import remaining
+from config.database.exceptions import DeadlineExceededError
+from toolkit.buffers import GroupCommit, GroupCommitTimeoutError
+
+from .bll import UserBusinessLogicLayer
+
+
+class GroupRegistrar:
+    """Registrar merging concurrent registrations into group commits."""
+
+    def __init__(
+        self,
+        bll: Optional[UserBusinessLogicLayer] = None,
+        window: float = 0.002,
+        max_size: int = 64,
+    ) -> None:
+        """
+        Initialize the GroupRegistrar.
+
+        Parameters
+        ----------
+        bll : Optional[UserBusinessLogicLayer], optional
+            The Business Logic Layer used to create the users. A new one is created if
+            not provided.
+        window : float, optional
+            Seconds a registration waits for others to join its commit. Defaults to
+            0.002.
+        max_size : int, optional
+            Maximum number of registrations committed together. Defaults to 64.
+        """
+        self.bll = bll or UserBusinessLogicLayer()
+        self._group_commit: GroupCommit[tuple[str, str], User] = GroupCommit(
+            commit=self.bll.create_user_group,
+            window=window,
+            max_size=max_size,
+            remaining=remaining,
+        )
+
+    @property
+    def commits(self) -> int:
+        """
+        Number of group commits so far.
+
+        Returns
+        -------
+        int
+            The number of committed groups.
+        """
+        return self._group_commit.groups
+
+    def register(self, username: str, password: str) -> User:
+        """
+        Create a user together with the registrations arriving concurrently.
+
+        The reads of the caller go to the primary for the sticky window once the user
+        is committed, even if another thread committed it.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+        password : str
+            The hashed password of the user.
+
+        Returns
+        -------
+        User
+            The newly created User object.
+
+        Raises
+        ------
+        UserAlreadyExistsError
+            If the username already exists in the database.
+        DeadlineExceededError
+            If the deadline of the operation passes while waiting for the commit.
+        """
+        try:
+            user = self._group_commit.submit((username, password))
+        except GroupCommitTimeoutError as err:
+            raise DeadlineExceededError(
+                "Operation exceeded its deadline waiting for a group commit."
+            ) from err
+        db.mark_written()
+        return user
@@ -7,22 +7,107 @@ service layer responsible for handling user registration, password hashing, and
 password verification.
 """
 
+from datetime import date
 from hashlib import sha256
 from typing import Optional
 
-from auth.models import User
+from auth.models import (
+    User,
+    UserCredentials,
+    UserEvent,
+    UserLoggedIn,
+    UserMetric,
+    UserRegistered,
+)
+from toolkit.events import EventBus
 
+from ..helpers.exceptions import BreachedPasswordError
+from .audit import LoginAuditLog
 from .bll import UserBusinessLogicLayer
+from .breaches import BreachedPasswordChecker
 from .dal import UserDataAccessLayer
+from .directory import UserDirectory
+from .events import EventOutbox
+from .registration import GroupRegistrar
+from .shared_cache import SharedCredentialCache
+from .stats import UserStatistics
+from .tracking import LastLoginTracker
+from .usernames import UsernamePolicy
+from .workload import Operation, WorkloadRecorder, login_outcome
 
 
 class UserService:
     """Service class for user operations."""
 
-    def __init__(self) -> None:
-        """Initialize the UserService."""
-        self.bll = UserBusinessLogicLayer()
-        self.dal = UserDataAccessLayer()
+    def __init__(
+        self,
+        track_last_login: bool = False,
+        audit_logins: bool = False,
+        directory: Optional[UserDirectory] = None,
+        registrar: Optional[GroupRegistrar] = None,
+        collect_statistics: bool = False,
+        breach_checker: Optional[BreachedPasswordChecker] = None,
+        username_policy: Optional[UsernamePolicy] = None,
+        event_bus: Optional[EventBus] = None,
+        durable_events: bool = False,
+        workload_recorder: Optional[WorkloadRecorder] = None,
+        credential_cache: Optional[SharedCredentialCache] = None,
+    ) -> None:
+        """
+        Initialize the UserService.
+
+        Parameters
+        ----------
+        track_last_login : bool, optional
+            Whether to record the last login of users. Defaults to False.
+        audit_logins : bool, optional
+            Whether to keep an audit trail of login attempts. Defaults to False.
+        directory : Optional[UserDirectory], optional
+            The in-memory directory logins are served from, if any.
+        registrar : Optional[GroupRegistrar], optional
+            The registrar merging concurrent registrations into group commits, if any.
+            Each registration is committed on its own if not provided.
+        collect_statistics : bool, optional
+            Whether to count the users, sign-ups and, when tracking the last login,
+            the daily active users. Defaults to False.
+        breach_checker : Optional[BreachedPasswordChecker], optional
+            The checker of breached passwords, which registrations are rejected for.
+            Passwords are not checked if not provided.
+        username_policy : Optional[UsernamePolicy], optional
+            The policy of reserved and blocked usernames, which registrations are
+            rejected for. Registrations through a registrar are checked by the layer
+            of the registrar.
+        event_bus : Optional[EventBus], optional
+            The event bus ``UserRegistered`` and ``UserLoggedIn`` events are published
+            to, if any.
+        durable_events : bool, optional
+            Whether to record the events in the outbox before publishing them, so they
+            survive a crash. Defaults to False.
+        workload_recorder : Optional[WorkloadRecorder], optional
+            The recorder of the registrations and logins, to be replayed later, if
+            any.
+        credential_cache : Optional[SharedCredentialCache], optional
+            The cache of credentials shared with other worker processes, which logins
+            are served from after the directory, if any.
+        """
+        self.bll = UserBusinessLogicLayer(username_policy=username_policy)
+        self.dal = UserDataAccessLayer(directory=directory, cache=credential_cache)
+        self.last_login_tracker = (
+            LastLoginTracker(bll=self.bll, count_active=collect_statistics)
+            if track_last_login
+            else None
+        )
+        self.statistics = UserStatistics(bll=self.bll) if collect_statistics else None
+        self.login_audit_log = LoginAuditLog(bll=self.bll) if audit_logins else None
+        self.registrar = registrar
+        self.breach_checker = breach_checker
+        self.event_bus = event_bus
+        self.event_outbox = (
+            EventOutbox(bus=event_bus, bll=self.bll, dal=self.dal)
+            if event_bus and durable_events
+            else None
+        )
+        self.workload_recorder = workload_recorder
 
     def register(self, username: str, password: str) -> User:
         """
@@ -39,12 +124,22 @@ class UserService:
         -------
         User
             The newly registered User object.
+
+        Raises
+        ------
+        BreachedPasswordError
+            If the password appears in the breach corpus.
+        UsernameNotAllowedError
+            If the username is reserved or contains a blocked word.
         """
-        hashed_password = self.hash_password(password)
-        user = self.bll.create_user(username=username, password=hashed_password)
-        return user
+        if not self.workload_recorder:
+            return self._register(username, password)
+        with self.workload_recorder.record(Operation.REGISTER, username):
+            return self._register(username, password)
 
-    def login(self, username: str, password: str) -> tuple[Optional[User], bool]:
+    def login(
+        self, username: str, password: str, source: Optional[str] = None
+    ) -> tuple[Optional[UserCredentials], bool]:
         """
         Log in a user with the provided username and password.
 
@@ -54,26 +149,90 @@ class UserService:
             The username of the user.
         password : str
             The password of the user.
+        source : Optional[str], optional
+            Where the login attempt came from, recorded in the audit trail.
 
         Returns
         -------
-        tuple[Optional[User], bool]
-            A tuple containing the User object if authentication is successful,
-            otherwise None, and a boolean indicating whether the user is authenticated.
+        tuple[Optional[UserCredentials], bool]
+            A tuple containing the credentials of the user if found, otherwise None,
+            and a boolean indicating whether the user is authenticated.
         """
-        hashed_password = self.hash_password(password)
-        user = self.dal.get_user_by_username(username=username)
-        is_authenticated = self.is_authenticated(user, hashed_password)
+        if not self.workload_recorder:
+            return self._login(username, password, source)
+        with self.workload_recorder.record(Operation.LOGIN, username) as entry:
+            user, is_authenticated = self._login(username, password, source)
+            entry.outcome = login_outcome(user, is_authenticated)
         return user, is_authenticated
 
-    def is_authenticated(self, user: Optional[User], hashed_password: str) -> bool:
+    def close(self) -> None:
+        """Flush pending work of the service before shutting down."""
+        if self.last_login_tracker:
+            self.last_login_tracker.close()
+        if self.login_audit_log:
+            self.login_audit_log.close()
+        if self.statistics:
+            self.statistics.close()
+        if self.event_outbox:
+            self.event_outbox.close()
+        if self.workload_recorder:
+            self.workload_recorder.close()
+        if self.dal.cache:
+            self.dal.cache.close()
+
+    def count_users(self) -> int:
+        """
+        Count the registered users.
+
+        Returns
+        -------
+        int
+            The number of users, as counted by the user statistics.
+        """
+        return self.dal.get_stat(UserMetric.USERS)
+
+    def count_signups(self, day: date) -> int:
+        """
+        Count the users who registered on a day.
+
+        Parameters
+        ----------
+        day : date
+            The day, in UTC.
+
+        Returns
+        -------
+        int
+            The number of sign-ups of the day, as counted by the user statistics.
+        """
+        return self.dal.get_stat(UserMetric.SIGNUPS, day)
+
+    def count_active_users(self, day: date) -> int:
+        """
+        Count the users who logged in on a day.
+
+        Parameters
+        ----------
+        day : date
+            The day, in UTC.
+
+        Returns
+        -------
+        int
+            The number of daily active users, as counted by the user statistics.
+        """
+        return self.dal.get_stat(UserMetric.ACTIVE_USERS, day)
+
+    def is_authenticated(
+        self, user: Optional[UserCredentials], hashed_password: str
+    ) -> bool:
         """
         Check if a user is authenticated based on their password hash.
 
         Parameters
         ----------
-        user : Optional[User]
-            The user object to authenticate.
+        user : Optional[UserCredentials]
+            The credentials of the user to authenticate.
         hashed_password : str
             The hashed password to compare with the user's password hash.
 
@@ -122,3 +281,83 @@ class UserService:
             True if the password matches the hashed password, False otherwise.
         """
         return hashed_password == self.hash_password(password)
+
+    def _register(self, username: str, password: str) -> User:
+        """
+        Register a new user, as described in ``register``.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+        password : str
+            The password of the user.
+
+        Returns
+        -------
+        User
+            The newly registered User object.
+        """
+        if self.breach_checker and self.breach_checker.is_breached(password):
+            raise BreachedPasswordError(
+                f"The password of {username} appears in a data breach."
+            )
+        hashed_password = self.hash_password(password)
+        if self.registrar:
+            user = self.registrar.register(username, hashed_password)
+        else:
+            user = self.bll.create_user(username=username, password=hashed_password)
+        if self.statistics:
+            self.statistics.record_signup(user.date_joined)
+        self._publish(UserRegistered(user.id, user.username, user.date_joined))
+        return user
+
+    def _login(
+        self, username: str, password: str, source: Optional[str]
+    ) -> tuple[Optional[UserCredentials], bool]:
+        """
+        Log in a user, as described in ``login``.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+        password : str
+            The password of the user.
+        source : Optional[str]
+            Where the login attempt came from.
+
+        Returns
+        -------
+        tuple[Optional[UserCredentials], bool]
+            The credentials of the user if found, and whether the user is
+            authenticated.
+        """
+        hashed_password = self.hash_password(password)
+        user = self.dal.get_credentials_by_username(username=username)
+        is_authenticated = self.is_authenticated(user, hashed_password)
+        if is_authenticated and user and user.archived:
+            self.bll.restore_user(user.username)
+        if is_authenticated and user and self.last_login_tracker:
+            self.last_login_tracker.record(user.username)
+        if is_authenticated and user:
+            self._publish(UserLoggedIn(user.username, source=source))
+        if self.login_audit_log:
+            self.login_audit_log.record(
+                username=username, success=is_authenticated, source=source
+            )
+        return user, is_authenticated
+
+    def _publish(self, event: UserEvent) -> None:
+        """
+        Publish an event to the event bus, through the outbox if durable.
+
+        Parameters
+        ----------
+        event : UserEvent
+            The event.
+        """
+        if self.event_outbox:
+            self.event_outbox.publish(event)
+        elif self.event_bus:
+            self.event_bus.publish(event)
@@ -0,0 +1,130 @@
+"""
+Credential cache shared by worker processes.
+
+This module contains the SharedCredentialCache, which caches the credentials looked up
+by the data access layer in a ``SharedHashTable``, so that the workers forked by a
+server share a single cache of fixed size instead of each warming a dictionary of its
+own. Each user costs a compact record of its id, an expiry time and its raw SHA-256
+password hash, and lookups take no lock.
+"""
+
+import logging
+import struct
+import time
+from typing import Optional
+
+from auth.models import UserCredentials
+from toolkit.sharedmem import SharedHashTable
+
+from .directory import HASH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Usernames longer than this, in UTF-8, are not cached.
+USERNAME_SIZE = 64
+
+# Id, expiry as a Unix timestamp, and raw SHA-256 digest of the password hash.
+_ENTRY = struct.Struct(f"<qd{HASH_SIZE}s")
+
+
+class SharedCredentialCache:
+    """
+    Cache of user credentials in shared memory, filled on database lookups.
+
+    The cache is made before forking the workers, which inherit it. Entries expire
+    after ``ttl`` seconds, which bounds how long a worker may authenticate against a
+    password changed by another process. Credentials whose hash is not a SHA-256 digest,
+    and those of archived users, are not cached.
+    """
+
+    __slots__ = ("hits", "misses", "table", "ttl")
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        ttl: float = 300.0,
+        table: Optional[SharedHashTable] = None,
+    ) -> None:
+        """
+        Initialize the SharedCredentialCache.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            The number of users the cache holds. Users are evicted from full buckets
+            before the cache is full, so it should be about twice the number of
+            active users. Defaults to 100_000.
+        ttl : float, optional
+            Seconds the credentials of a user stay cached. Defaults to 300.0.
+        table : Optional[SharedHashTable], optional
+            An existing table, such as one attached by name, to use instead of
+            creating one.
+        """
+        self.table = table or SharedHashTable(capacity, USERNAME_SIZE, _ENTRY.size)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str) -> Optional[UserCredentials]:
+        """
+        Get the cached credentials of a user.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+
+        Returns
+        -------
+        Optional[UserCredentials]
+            The credentials of the user, or None if they are not cached or expired.
+        """
+        entry = self.table.get(username.encode())
+        if entry is not None:
+            id, expires_at, digest = _ENTRY.unpack(entry)
+            if expires_at > time.time():
+                self.hits += 1
+                return UserCredentials(id, username, digest.hex())
+        self.misses += 1
+        return None
+
+    def put(self, credentials: UserCredentials) -> bool:
+        """
+        Cache the credentials of a user.
+
+        Parameters
+        ----------
+        credentials : UserCredentials
+            The credentials of the user.
+
+        Returns
+        -------
+        bool
+            True if the credentials were cached.
+        """
+        if credentials.archived:
+            return False
+        try:
+            digest = bytes.fromhex(credentials.password)
+        except ValueError:
+            return False
+        if len(digest) != HASH_SIZE:
+            return False
+        entry = _ENTRY.pack(credentials.id, time.time() + self.ttl, digest)
+        return self.table.put(credentials.username.encode(), entry)
+
+    def invalidate(self, username: str) -> None:
+        """
+        Remove the credentials of a user from the cache.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user.
+        """
+        if not self.table.delete(username.encode()):
+            logger.debug(f"{username} was not removed from the credential cache")
+
+    def close(self) -> None:
+        """Detach the cache, removing its shared memory if this process made it."""
+        self.table.close()
@@ -0,0 +1,187 @@
+"""
+Statistics about users.
+
+This module contains the UserStatistics, which keeps the counters of the user dashboard
+(total users, sign-ups per day and daily active users) in the small ``auth_user_stat``
+table, so that reading a counter never scans the user table. Sign-ups are collected in
+an in-memory write-behind buffer, where they are summed per counter, and folded into
+the table in bulk through the Business Logic Layer. Daily active users are counted
+when the last login of users is flushed, as that is when a first login of the day is
+known.
+
+Counters may drift, for instance when a process dies with sign-ups still buffered. The
+reconciliation job recomputes them from the user table, reading it in batches.
+"""
+
+import operator
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Engine, Table, select
+
+from auth.models import ALL_TIME, User, UserArchive, UserMetric
+from config.base import db
+from config.database.base import PRIMARY_SHARD
+from toolkit.buffers import WriteBehindBuffer
+
+from .bll import UserBusinessLogicLayer
+
+
+class UserStatistics:
+    """Write-behind collector and reconciliation job of the user counters."""
+
+    def __init__(
+        self,
+        bll: Optional[UserBusinessLogicLayer] = None,
+        max_size: int = 1000,
+        flush_interval: float = 5.0,
+    ) -> None:
+        """
+        Initialize the UserStatistics.
+
+        Parameters
+        ----------
+        bll : Optional[UserBusinessLogicLayer], optional
+            The Business Logic Layer used to write the counters. A new one is created
+            if not provided.
+        max_size : int, optional
+            Number of buffered counters that triggers an early flush. Defaults to 1000.
+        flush_interval : float, optional
+            Seconds between periodic flushes. Defaults to 5.0.
+        """
+        self.bll = bll or UserBusinessLogicLayer()
+        self._buffer: WriteBehindBuffer[tuple[str, date], int] = WriteBehindBuffer(
+            flush=self.bll.increment_stats,
+            merge=operator.add,
+            max_size=max_size,
+            flush_interval=flush_interval,
+            name="user-statistics",
+        )
+
+    def record_signup(self, joined_at: Optional[datetime] = None) -> None:
+        """
+        Record the registration of a user.
+
+        Parameters
+        ----------
+        joined_at : Optional[datetime], optional
+            The time the user joined. Defaults to now.
+        """
+        day = (joined_at or datetime.now(timezone.utc)).date()
+        self._buffer.put((UserMetric.USERS, ALL_TIME), 1)
+        self._buffer.put((UserMetric.SIGNUPS, day), 1)
+
+    def flush(self) -> int:
+        """
+        Add the buffered counts to the counters in the database.
+
+        Returns
+        -------
+        int
+            The number of updated counters.
+        """
+        return self._buffer.flush()
+
+    def close(self) -> None:
+        """Flush the buffered counts and stop the collector."""
+        self._buffer.close()
+
+    def reconcile(
+        self, batch_size: int = 10_000, today: Optional[date] = None
+    ) -> dict[tuple[str, date], int]:
+        """
+        Recompute the counters from the user table and overwrite the stored ones.
+
+        The users of each shard are read in batches of ``batch_size`` in the order of
+        their ids, so no statement holds the table for long. The total and the sign-ups
+        of every day are recomputed. Only the last login of users is stored, so the
+        active users can only be recomputed for today and are kept as counted for the
+        previous days. Counts recorded while the job runs may be counted twice, so it
+        is best run when traffic is low.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            The number of users read at a time. Defaults to 10_000.
+        today : Optional[date], optional
+            The current day, in UTC. Defaults to today.
+
+        Returns
+        -------
+        dict[tuple[str, date], int]
+            The recomputed counters, keyed by metric and day.
+        """
+        self.flush()
+        today = today or datetime.now(timezone.utc).date()
+        users = 0
+        signups: Counter[date] = Counter()
+        active_users = 0
+
+        sources = db.get_shards() or {PRIMARY_SHARD: db.get_engine()}
+        for engine in sources.values():
+            # Archived users are still registered users.
+            for table in (User.__table__, UserArchive.__table__):
+                table_users, table_active_users = self._count_table(
+                    engine, table, batch_size, today, signups
+                )
+                users += table_users
+                active_users += table_active_users
+
+        values: dict[tuple[str, date], int] = {
+            (UserMetric.SIGNUPS, day): count for day, count in signups.items()
+        }
+        values[(UserMetric.USERS, ALL_TIME)] = users
+        values[(UserMetric.ACTIVE_USERS, today)] = active_users
+        self.bll.replace_stats(values)
+        return values
+
+    @staticmethod
+    def _count_table(
+        engine: Engine,
+        table: Table,
+        batch_size: int,
+        today: date,
+        signups: Counter[date],
+    ) -> tuple[int, int]:
+        """
+        Count the users of a table in batches, and their sign-ups by day.
+
+        Parameters
+        ----------
+        engine : Engine
+            The engine of the database, or of one shard.
+        table : Table
+            The user table, or the archive of inactive users.
+        batch_size : int
+            The number of users read at a time.
+        today : date
+            The current day, in UTC.
+        signups : Counter[date]
+            The sign-ups by day, incremented with those of the table.
+
+        Returns
+        -------
+        tuple[int, int]
+            The number of users of the table and how many logged in today.
+        """
+        users = 0
+        active_users = 0
+        last_id = 0
+        with engine.connect() as connection:
+            while True:
+                rows = connection.execute(
+                    select(table.c.id, table.c.date_joined, table.c.last_login)
+                    .where(table.c.id > last_id)
+                    .order_by(table.c.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                for _, date_joined, last_login in rows:
+                    signups[date_joined.date()] += 1
+                    if last_login is not None and last_login.date() == today:
+                        active_users += 1
+                users += len(rows)
+                last_id = rows[-1].id
+        return users, active_users
@@ -0,0 +1,83 @@
+"""
+Tracking of user logins.
+
+This module contains the LastLoginTracker, which keeps the ``last_login`` column of
+users up to date without adding a write transaction to every login. Successful logins
+are recorded in an in-memory write-behind buffer, where repeated logins of the same
+user are merged, and the buffer is flushed as a single bulk UPDATE through the Business
+Logic Layer.
+"""
+
+from datetime import datetime, timezone
+from functools import partial
+from typing import Optional
+
+from toolkit.buffers import WriteBehindBuffer
+
+from .bll import UserBusinessLogicLayer
+
+
+class LastLoginTracker:
+    """Write-behind tracker for the last login timestamp of users."""
+
+    def __init__(
+        self,
+        bll: Optional[UserBusinessLogicLayer] = None,
+        max_size: int = 1000,
+        flush_interval: float = 5.0,
+        count_active: bool = False,
+    ) -> None:
+        """
+        Initialize the LastLoginTracker.
+
+        Parameters
+        ----------
+        bll : Optional[UserBusinessLogicLayer], optional
+            The Business Logic Layer used to write the timestamps. A new one is created
+            if not provided.
+        max_size : int, optional
+            Number of buffered users that triggers an early flush. Defaults to 1000.
+        flush_interval : float, optional
+            Seconds between periodic flushes. Defaults to 5.0.
+        count_active : bool, optional
+            Whether to count the daily active users when flushing. Defaults to False.
+        """
+        self.bll = bll or UserBusinessLogicLayer()
+        flush = self.bll.update_last_logins
+        if count_active:
+            flush = partial(flush, count_active=True)
+        self._buffer: WriteBehindBuffer[str, datetime] = WriteBehindBuffer(
+            flush=flush,
+            merge=max,
+            max_size=max_size,
+            flush_interval=flush_interval,
+            name="last-login-tracker",
+        )
+
+    def record(self, username: str, logged_in_at: Optional[datetime] = None) -> None:
+        """
+        Record a successful login of a user.
+
+        Parameters
+        ----------
+        username : str
+            The username of the user who logged in.
+        logged_in_at : Optional[datetime], optional
+            The time of the login. Defaults to now.
+        """
+        self._buffer.put(username, logged_in_at or datetime.now(timezone.utc))
+
+    def flush(self) -> int:
+        """
+        Write the buffered login timestamps to the database.
+
+        Returns
+        -------
+        int
+            The number of updated users.
+        """
+        return self._buffer.flush()
+
+    def close(self) -> None:
+        """Flush the buffered login timestamps and stop the tracker."""
+        self._buffer.close()
@@ -0,0 +1,260 @@
+"""
+Bulk export and import of users.
+
+This module dumps the user table and the archive of inactive users to a file and
+restores them, such as for disaster recovery drills and for seeding environments.
+Archived users are dumped after the active users of each database, with the time they
+were archived, and imported back into the archive. Both directions stream the users
+instead of loading them as User objects: the export reads them through a server-side
+cursor where the database supports it, and the import reads and inserts them one batch
+at a time, so memory use does not grow with the number of users.
+
+An import records the number of users it has committed in a checkpoint file next to the
+dump. An interrupted import started again skips those users and carries on, and the
+checkpoint is removed once the import completes.
+"""
+
+import logging
+import os
+from collections import deque
+from collections.abc import Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import RowMapping, null, select
+
+from auth.models import User, UserArchive
+from config.base import db
+from toolkit.records import (
+    Compression,
+    FieldType,
+    RecordFormat,
+    Schema,
+    open_records,
+    read_records,
+    write_records,
+)
+
+from .bll import UserBusinessLogicLayer
+
+logger = logging.getLogger(__name__)
+
+# Primary keys are not exported, as they are only unique within a database or shard.
+USER_SCHEMA: Schema = {
+    "username": FieldType.STRING,
+    "password": FieldType.STRING,
+    "last_login": FieldType.DATETIME,
+    "date_joined": FieldType.DATETIME,
+    "created_at": FieldType.DATETIME,
+    "modified_at": FieldType.DATETIME,
+    # Null for active users.
+    "archived_at": FieldType.DATETIME,
+}
+
+# The schema of the dumps written before users were archived.
+_UNARCHIVED_USER_SCHEMA: Schema = {
+    name: field_type
+    for name, field_type in USER_SCHEMA.items()
+    if name != "archived_at"
+}
+
+
+def export_users(
+    path: str | Path,
+    record_format: Optional[RecordFormat] = None,
+    compression: Optional[Compression] = None,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Export every user to a file.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path of the file to write.
+    record_format : Optional[RecordFormat], optional
+        The format of the file. Guessed from the path if not provided.
+    compression : Optional[Compression], optional
+        The compression of the file. Guessed from the path if not provided.
+    batch_size : int, optional
+        The number of users fetched from the database at a time. Defaults to 1000.
+
+    Returns
+    -------
+    int
+        The number of exported users.
+    """
+    record_format = record_format or RecordFormat.from_path(path)
+    compression = compression or Compression.from_path(path)
+    logger.info(f"Exporting users to {path}.")
+
+    with open_records(path, "wb", compression) as file:
+        exported = write_records(
+            file, record_format, USER_SCHEMA, _stream_users(batch_size)
+        )
+    logger.info(f"Exported {exported} users to {path}.")
+    return exported
+
+
+def import_users(
+    path: str | Path,
+    record_format: Optional[RecordFormat] = None,
+    compression: Optional[Compression] = None,
+    batch_size: int = 1000,
+    checkpoint_path: Optional[str | Path] = None,
+    bll: Optional[UserBusinessLogicLayer] = None,
+) -> int:
+    """
+    Import the users of a file, resuming an interrupted import of the same file.
+
+    Users whose username is already registered or archived are skipped. Dumps written
+    before users were archived are imported too.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path of the file to read.
+    record_format : Optional[RecordFormat], optional
+        The format of the file. Guessed from the path if not provided.
+    compression : Optional[Compression], optional
+        The compression of the file. Guessed from the path if not provided.
+    batch_size : int, optional
+        The number of users inserted per batch. Defaults to 1000.
+    checkpoint_path : Optional[str | Path], optional
+        The path of the checkpoint file. Defaults to the path of the file followed by
+        ".checkpoint".
+    bll : Optional[UserBusinessLogicLayer], optional
+        The Business Logic Layer used to insert the users. A new one is created if not
+        provided.
+
+    Returns
+    -------
+    int
+        The number of inserted users.
+    """
+    record_format = record_format or RecordFormat.from_path(path)
+    compression = compression or Compression.from_path(path)
+    checkpoint = Path(checkpoint_path or f"{path}.checkpoint")
+    bll = bll or UserBusinessLogicLayer()
+
+    done = _read_checkpoint(checkpoint)
+    if done:
+        logger.info(f"Resuming the import of {path} after {done} users.")
+    else:
+        logger.info(f"Importing users from {path}.")
+
+    schema = _read_schema(path, record_format, compression)
+    imported = 0
+    with open_records(path, "rb", compression) as file:
+        records = read_records(file, record_format, schema)
+        deque(islice(records, done), maxlen=0)
+        while batch := list(islice(records, batch_size)):
+            imported += bll.create_users(batch)
+            done += len(batch)
+            _write_checkpoint(checkpoint, done)
+    checkpoint.unlink(missing_ok=True)
+    logger.info(f"Imported {imported} users from {path}.")
+    return imported
+
+
+def _stream_users(batch_size: int) -> Iterator[RowMapping]:
+    """
+    Stream the exported columns of every user, then archived user, shard after shard.
+
+    Parameters
+    ----------
+    batch_size : int
+        The number of users fetched from the database at a time.
+
+    Yields
+    ------
+    Iterator[RowMapping]
+        The exported columns of each user.
+    """
+    table = User.__table__
+    archive = UserArchive.__table__
+    statements = [
+        select(
+            *(table.c[name] for name in _UNARCHIVED_USER_SCHEMA),
+            null().label("archived_at"),
+        ).order_by(table.c.id),
+        select(*(archive.c[name] for name in USER_SCHEMA)).order_by(archive.c.id),
+    ]
+    engines = list(db.get_shards().values()) or [db.route(is_write=False)]
+    for engine in engines:
+        with engine.connect() as connection:
+            for stmt in statements:
+                # yield_per streams the rows through a server-side cursor where
+                # supported.
+                result = connection.execution_options(yield_per=batch_size).execute(
+                    stmt
+                )
+                yield from result.mappings()
+
+
+def _read_schema(
+    path: str | Path, record_format: RecordFormat, compression: Compression
+) -> Schema:
+    """
+    Find the schema of a dump.
+
+    Dumps written before users were archived lack ``archived_at``.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path of the dump.
+    record_format : RecordFormat
+        The format of the dump.
+    compression : Compression
+        The compression of the dump.
+
+    Returns
+    -------
+    Schema
+        The schema to read the dump with.
+    """
+    with open_records(path, "rb", compression) as file:
+        try:
+            next(read_records(file, record_format, USER_SCHEMA), None)
+        except (KeyError, ValueError):
+            return _UNARCHIVED_USER_SCHEMA
+    return USER_SCHEMA
+
+
+def _read_checkpoint(checkpoint: Path) -> int:
+    """
+    Read the number of users already imported.
+
+    Parameters
+    ----------
+    checkpoint : Path
+        The path of the checkpoint file.
+
+    Returns
+    -------
+    int
+        The number of users imported before, or 0 if there is no checkpoint.
+    """
+    if not checkpoint.exists():
+        return 0
+    return int(checkpoint.read_text())
+
+
+def _write_checkpoint(checkpoint: Path, done: int) -> None:
+    """
+    Record the number of users imported so far.
+
+    The checkpoint is replaced atomically, so it is never left half-written.
+
+    Parameters
+    ----------
+    checkpoint : Path
+        The path of the checkpoint file.
+    done : int
+        The number of users imported so far.
+    """
+    temporary = checkpoint.with_name(f"{checkpoint.name}.tmp")
+    temporary.write_text(str(done))
+    os.replace(temporary, checkpoint)
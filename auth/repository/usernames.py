@@ -0,0 +1,325 @@
+"""
+Reserved and blocked usernames.
+
+This module contains the UsernamePolicy, which refuses registrations under reserved
+names, such as ``admin``, and names containing blocked words, such as impersonations
+of the staff. The lists are read from a TOML file, optionally pointing to text files of
+one pattern per line for lists of tens of thousands of patterns, and compiled into a
+set of reserved names and an Aho-Corasick automaton of blocked words, so checking a
+username takes time linear in its length however many patterns there are. The file is
+watched for changes, and the compiled rules are rebuilt and swapped in atomically.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from toolkit.matching import AhoCorasick
+from toolkit.parsers import TOMLParser
+
+from ..helpers.exceptions import UsernameNotAllowedError
+
+logger = logging.getLogger(__name__)
+
+_SEPARATORS = re.compile(r"[\s._-]+")
+
+
+def normalize_username(username: str) -> str:
+    """
+    Normalize a username for matching against reserved and blocked patterns.
+
+    Compatibility characters, such as full-width letters, are folded into their plain
+    form, the case is folded and separators are removed, so full-width ``admin``,
+    ``ADMIN`` and ``ad.min`` all match ``admin``.
+
+    Parameters
+    ----------
+    username : str
+        The username, or a pattern.
+
+    Returns
+    -------
+    str
+        The normalized username.
+    """
+    return _SEPARATORS.sub("", unicodedata.normalize("NFKC", username).casefold())
+
+
+def read_patterns(path: Path) -> Iterator[str]:
+    """
+    Read the patterns of a text file, one per line.
+
+    Blank lines and lines starting with ``#`` are skipped.
+
+    Parameters
+    ----------
+    path : Path
+        The path of the file.
+
+    Yields
+    ------
+    str
+        The patterns.
+    """
+    with open(path, encoding="utf-8") as patterns:
+        for line in patterns:
+            pattern = line.strip()
+            if pattern and not pattern.startswith("#"):
+                yield pattern
+
+
+class UsernameRules:
+    """Compiled, immutable reserved names and blocked words."""
+
+    __slots__ = ("blocked", "reserved")
+
+    def __init__(
+        self, reserved: Iterable[str] = (), blocked: Iterable[str] = ()
+    ) -> None:
+        """
+        Compile the reserved names and blocked words.
+
+        Parameters
+        ----------
+        reserved : Iterable[str], optional
+            The names refused as a whole username.
+        blocked : Iterable[str], optional
+            The words refused anywhere in a username.
+        """
+        self.reserved = frozenset(filter(None, map(normalize_username, reserved)))
+        self.blocked = AhoCorasick(filter(None, map(normalize_username, blocked)))
+
+    def violation(self, username: str) -> Optional[str]:
+        """
+        Tell why a username is not allowed.
+
+        Parameters
+        ----------
+        username : str
+            The username.
+
+        Returns
+        -------
+        Optional[str]
+            The reason the username is not allowed, or None if it is allowed.
+        """
+        normalized = normalize_username(username)
+        if normalized in self.reserved:
+            return f"Username {username} is reserved."
+        word = self.blocked.search(normalized)
+        if word is not None:
+            return f"Username {username} contains the blocked word {word!r}."
+        return None
+
+
+class UsernamePolicy:
+    """
+    Check usernames against the rules of a configuration file, reloaded on change.
+
+    The configuration holds a ``reserved`` and a ``blocked`` table, each with a list of
+    ``patterns`` and a list of ``files`` of further patterns, relative to the
+    configuration. At most once per ``check_interval``, a check looks at the
+    modification times of these files, and a change starts compiling the new rules in
+    a background thread while checks go on against the current ones. A configuration
+    that fails to load leaves the current rules in place.
+    """
+
+    def __init__(self, path: str | Path, check_interval: float = 1.0) -> None:
+        """
+        Initialize the UsernamePolicy and compile its rules.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path of the TOML configuration.
+        check_interval : float, optional
+            The minimum number of seconds between checks of the files for changes.
+            Defaults to 1.
+
+        Raises
+        ------
+        ValueError
+            If the configuration or a file of patterns cannot be loaded.
+        """
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next_check = time.monotonic() + check_interval
+        self.rules, self._sources, self._signature = self._load()
+
+    @classmethod
+    def open(
+        cls, path: str | Path, check_interval: float = 1.0
+    ) -> Optional["UsernamePolicy"]:
+        """
+        Load the username policy if its configuration exists.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path of the TOML configuration.
+        check_interval : float, optional
+            The minimum number of seconds between checks of the files for changes.
+            Defaults to 1.
+
+        Returns
+        -------
+        Optional[UsernamePolicy]
+            The policy, or None if there is no configuration.
+        """
+        if not Path(path).exists():
+            logger.warning(f"No username policy at {path}, skipping checks.")
+            return None
+        return cls(path, check_interval)
+
+    def check(self, username: str) -> None:
+        """
+        Check a username is allowed.
+
+        Parameters
+        ----------
+        username : str
+            The username.
+
+        Raises
+        ------
+        UsernameNotAllowedError
+            If the username is reserved or contains a blocked word.
+        """
+        self._reload_if_changed()
+        message = self.rules.violation(username)
+        if message is not None:
+            logger.warning(message)
+            raise UsernameNotAllowedError(message)
+
+    def reload(self) -> bool:
+        """
+        Compile the rules from the files and swap them in.
+
+        Returns
+        -------
+        bool
+            True if the rules were replaced, False if the files failed to load.
+        """
+        with self._lock:
+            return self._reload()
+
+    def _reload_if_changed(self) -> None:
+        """Start reloading the rules if the interval elapsed and a file changed."""
+        now = time.monotonic()
+        if now < self._next_check or not self._lock.acquire(blocking=False):
+            return
+        self._next_check = now + self.check_interval
+        if self._stat((self.path, *self._sources)) == self._signature:
+            self._lock.release()
+            return
+        # Compiling a large list takes seconds, so it is kept off the sign-up path,
+        # which checks against the current rules until the new ones are swapped in.
+        threading.Thread(
+            target=self._reload_and_release, name="username-policy-reload", daemon=True
+        ).start()
+
+    def _reload_and_release(self) -> None:
+        """Reload the rules, then release the lock taken by the change detection."""
+        try:
+            self._reload()
+        finally:
+            self._lock.release()
+
+    def _reload(self) -> bool:
+        """
+        Compile the rules from the files and swap them in, the lock being held.
+
+        Returns
+        -------
+        bool
+            True if the rules were replaced, False if the files failed to load.
+        """
+        try:
+            rules, sources, signature = self._load()
+        except ValueError as err:
+            logger.error(f"Keeping the current username policy: {err}")
+            return False
+        self.rules, self._sources, self._signature = rules, sources, signature
+        logger.info(
+            f"Username policy reloaded with {len(rules.reserved)} reserved names "
+            f"and {len(rules.blocked)} blocked word states."
+        )
+        return True
+
+    def _load(self) -> tuple[UsernameRules, tuple[Path, ...], tuple[Any, ...]]:
+        """
+        Read the configuration and the files of patterns and compile the rules.
+
+        Returns
+        -------
+        tuple[UsernameRules, tuple[Path, ...], tuple[Any, ...]]
+            The rules, the files of patterns and the signature of the files as read.
+
+        Raises
+        ------
+        ValueError
+            If the configuration or a file of patterns cannot be loaded.
+        """
+        config_signature = self._stat((self.path,))
+        config = TOMLParser(str(self.path)).read()
+        if config is None:
+            raise ValueError(f"Cannot read the username policy {self.path}.")
+
+        files = {
+            section: [
+                self.path.parent / str(file)
+                for file in config.get(section, {}).get("files", [])
+            ]
+            for section in ("reserved", "blocked")
+        }
+        sources = tuple(source for section in files.values() for source in section)
+        # Files are stat-ed before they are read, so a change during the read is seen
+        # at the next check rather than missed.
+        signature = config_signature + self._stat(sources)
+
+        patterns: dict[str, list[str]] = {}
+        for section, section_files in files.items():
+            table = config.get(section, {})
+            patterns[section] = [str(pattern) for pattern in table.get("patterns", [])]
+            for source in section_files:
+                try:
+                    patterns[section].extend(read_patterns(source))
+                except (OSError, UnicodeDecodeError) as err:
+                    raise ValueError(f"Cannot read the patterns {source}.") from err
+
+        rules = UsernameRules(
+            reserved=patterns["reserved"], blocked=patterns["blocked"]
+        )
+        return rules, sources, signature
+
+    @staticmethod
+    def _stat(paths: Iterable[Path]) -> tuple[Any, ...]:
+        """
+        Get the modification time and size of files.
+
+        Parameters
+        ----------
+        paths : Iterable[Path]
+            The paths of the files.
+
+        Returns
+        -------
+        tuple[Any, ...]
+            The modification time and size of each file, or None for missing files.
+        """
+        signature: list[Any] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
@@ -0,0 +1,556 @@
+"""
+Recording and replay of the workload of the user service.
+
+This module contains the WorkloadRecorder, which logs the operations of a UserService
+to a compact binary file, and the functions replaying such a log against a database
+and summarizing the latencies of a log, so the real traffic mix of production can be
+driven against a local stand-in and the latencies of two builds compared.
+
+Recorded operations are anonymized: usernames are replaced by a keyed hash, unique to
+the recording, and passwords are never recorded, only whether a login found the user
+and matched its password. Each operation is logged with its offset from the start of
+the recording, from which the inter-arrival times are replayed, its duration and its
+outcome. Entries are handed over to a batch buffer whose flusher thread writes them,
+so recording costs a hash and a queue append on the path of the request, and entries
+are dropped rather than slowing the service down when the disk cannot keep up.
+"""
+
+import hmac
+import logging
+import secrets
+import statistics
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from enum import StrEnum
+from hashlib import sha256
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from toolkit.buffers import BatchBuffer
+from toolkit.records import (
+    Compression,
+    FieldType,
+    RecordFormat,
+    Schema,
+    open_records,
+    read_records,
+    write_records,
+)
+
+from ..models import UserCredentials
+from .bll import UserBusinessLogicLayer
+
+if TYPE_CHECKING:
+    from .service import UserService
+
+logger = logging.getLogger(__name__)
+
+# Offsets and durations are in microseconds.
+WORKLOAD_SCHEMA: Schema = {
+    "operation": FieldType.STRING,
+    "user": FieldType.STRING,
+    "offset": FieldType.INTEGER,
+    "duration": FieldType.INTEGER,
+    "outcome": FieldType.STRING,
+}
+
+# The password of every user registered or seeded by a replay.
+REPLAY_PASSWORD = "replay-password"
+
+# The number of hexadecimal digits of the anonymized usernames.
+_USER_DIGITS = 16
+
+
+class Operation(StrEnum):
+    """An enumeration class representing the recorded operations."""
+
+    LOGIN = "login"
+    REGISTER = "register"
+
+
+class Outcome(StrEnum):
+    """An enumeration class representing the outcomes of recorded operations."""
+
+    OK = "ok"
+    UNKNOWN_USER = "unknown_user"
+    WRONG_PASSWORD = "wrong_password"
+    FAILED = "failed"
+
+
+def login_outcome(user: Optional[UserCredentials], is_authenticated: bool) -> Outcome:
+    """
+    Classify the result of a login.
+
+    Parameters
+    ----------
+    user : Optional[UserCredentials]
+        The credentials of the user found, if any.
+    is_authenticated : bool
+        Whether the password matched.
+
+    Returns
+    -------
+    Outcome
+        The outcome of the login.
+    """
+    if is_authenticated:
+        return Outcome.OK
+    return Outcome.WRONG_PASSWORD if user else Outcome.UNKNOWN_USER
+
+
+class WorkloadEntry:
+    """A recorded operation of the user service."""
+
+    __slots__ = ("duration", "offset", "operation", "outcome", "user")
+
+    def __init__(
+        self,
+        operation: Operation,
+        user: str,
+        offset: int,
+        duration: int = 0,
+        outcome: Outcome = Outcome.OK,
+    ) -> None:
+        """
+        Initialize the WorkloadEntry.
+
+        Parameters
+        ----------
+        operation : Operation
+            The operation.
+        user : str
+            The anonymized username.
+        offset : int
+            Microseconds from the start of the recording to the start of the operation.
+        duration : int, optional
+            Microseconds the operation took. Defaults to 0.
+        outcome : Outcome, optional
+            The outcome of the operation. Defaults to success.
+        """
+        self.operation = operation
+        self.user = user
+        self.offset = offset
+        self.duration = duration
+        self.outcome = outcome
+
+    def to_record(self) -> dict[str, Any]:
+        """
+        Convert the entry to a record of the workload schema.
+
+        Returns
+        -------
+        dict[str, Any]
+            The fields of the entry.
+        """
+        return {
+            "operation": self.operation,
+            "user": self.user,
+            "offset": self.offset,
+            "duration": self.duration,
+            "outcome": self.outcome,
+        }
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the entry.
+
+        Returns
+        -------
+        str
+            A string containing the class name and attribute values.
+        """
+        return (
+            f"WorkloadEntry(operation={self.operation}, user={self.user}, "
+            f"offset={self.offset}, duration={self.duration}, "
+            f"outcome={self.outcome})"
+        )
+
+
+class WorkloadRecorder:
+    """Recorder of the operations of a user service to a binary workload log."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        compression: Optional[Compression] = None,
+        key: Optional[bytes] = None,
+        max_size: int = 100_000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+    ) -> None:
+        """
+        Initialize the WorkloadRecorder, creating the log.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path of the log, replaced if it exists.
+        compression : Optional[Compression], optional
+            The compression of the log. Guessed from the path if not provided.
+        key : Optional[bytes], optional
+            The key of the hash anonymizing the usernames. Defaults to a random key,
+            so the usernames of two recordings cannot be matched.
+        max_size : int, optional
+            Maximum number of entries held in memory. Defaults to 100_000.
+        batch_size : int, optional
+            Maximum number of entries written at a time. Defaults to 1000.
+        flush_interval : float, optional
+            Seconds between periodic writes. Defaults to 1.0.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._key = key or secrets.token_bytes(32)
+        self._file = open_records(
+            self.path, "wb", compression or Compression.from_path(self.path)
+        )
+        write_records(self._file, RecordFormat.BINARY, WORKLOAD_SCHEMA, [])
+        self._started = time.perf_counter()
+        self.recorded = 0
+        self._buffer: BatchBuffer[WorkloadEntry] = BatchBuffer(
+            flush=self._write,
+            max_size=max_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            name="workload-recorder",
+        )
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of entries dropped because the log could not keep up.
+
+        Returns
+        -------
+        int
+            The number of dropped entries.
+        """
+        return self._buffer.dropped
+
+    def anonymize(self, username: str) -> str:
+        """
+        Replace a username by its keyed hash.
+
+        Parameters
+        ----------
+        username : str
+            The username.
+
+        Returns
+        -------
+        str
+            The first hexadecimal digits of the HMAC-SHA256 of the username.
+        """
+        digest = hmac.new(self._key, username.encode(), sha256).hexdigest()
+        return digest[:_USER_DIGITS]
+
+    @contextmanager
+    def record(self, operation: Operation, username: str) -> Iterator[WorkloadEntry]:
+        """
+        Record the operation run in the block.
+
+        The operation succeeds unless the block sets another outcome on the entry, or
+        raises, which records it as failed.
+
+        Parameters
+        ----------
+        operation : Operation
+            The operation.
+        username : str
+            The username the operation is run for.
+
+        Yields
+        ------
+        Iterator[WorkloadEntry]
+            The entry of the operation.
+        """
+        started = time.perf_counter()
+        entry = WorkloadEntry(
+            operation,
+            self.anonymize(username),
+            round((started - self._started) * 1_000_000),
+        )
+        try:
+            yield entry
+        except BaseException:
+            entry.outcome = Outcome.FAILED
+            raise
+        finally:
+            entry.duration = round((time.perf_counter() - started) * 1_000_000)
+            try:
+                self._buffer.put(entry)
+            except RuntimeError:
+                logger.debug(f"Workload recorder closed, {entry!r} not recorded.")
+
+    def close(self) -> None:
+        """Write the buffered entries and close the log."""
+        self._buffer.close()
+        self._file.close()
+        logger.info(
+            f"Recorded {self.recorded} operations to {self.path}, dropped "
+            f"{self.dropped}."
+        )
+
+    def _write(self, entries: list[WorkloadEntry]) -> None:
+        """
+        Append a batch of entries to the log.
+
+        Parameters
+        ----------
+        entries : list[WorkloadEntry]
+            The entries.
+        """
+        self.recorded += write_records(
+            self._file,
+            RecordFormat.BINARY,
+            WORKLOAD_SCHEMA,
+            (entry.to_record() for entry in entries),
+            header=False,
+        )
+        self._file.flush()
+
+
+def read_workload(
+    path: str | Path, compression: Optional[Compression] = None
+) -> Iterator[WorkloadEntry]:
+    """
+    Read the entries of a workload log.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path of the log.
+    compression : Optional[Compression], optional
+        The compression of the log. Guessed from the path if not provided.
+
+    Yields
+    ------
+    Iterator[WorkloadEntry]
+        The entries, in the order they were written.
+    """
+    with open_records(path, "rb", compression or Compression.from_path(path)) as file:
+        for record in read_records(file, RecordFormat.BINARY, WORKLOAD_SCHEMA):
+            yield WorkloadEntry(
+                Operation(record["operation"]),
+                record["user"],
+                record["offset"],
+                record["duration"],
+                Outcome(record["outcome"]),
+            )
+
+
+def seed_users(
+    path: str | Path,
+    bll: Optional[UserBusinessLogicLayer] = None,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Register the users a workload log expects to exist before it is replayed.
+
+    A user is expected to exist if its first operation is a login that found it, or a
+    registration that failed, such as for a taken username.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path of the log.
+    bll : Optional[UserBusinessLogicLayer], optional
+        The Business Logic Layer used to insert the users. A new one is created if not
+        provided.
+    batch_size : int, optional
+        The number of users inserted per batch. Defaults to 1000.
+
+    Returns
+    -------
+    int
+        The number of inserted users, leaving out those already registered.
+    """
+    bll = bll or UserBusinessLogicLayer()
+    password = sha256(REPLAY_PASSWORD.encode()).hexdigest()
+    seen: set[str] = set()
+    existing = []
+    for entry in read_workload(path):
+        if entry.user in seen:
+            continue
+        seen.add(entry.user)
+        if entry.operation == Operation.LOGIN:
+            found = entry.outcome in (Outcome.OK, Outcome.WRONG_PASSWORD)
+        else:
+            found = entry.outcome == Outcome.FAILED
+        if found:
+            existing.append(entry.user)
+
+    users = iter(existing)
+    inserted = 0
+    while batch := list(islice(users, batch_size)):
+        inserted += bll.create_users(
+            [{"username": user, "password": password} for user in batch]
+        )
+    logger.info(f"Seeded {inserted} users expected by {path}.")
+    return inserted
+
+
+class ReplayReport:
+    """Summary of the replay of a workload log."""
+
+    __slots__ = ("max_lag", "mismatches", "replayed")
+
+    def __init__(self) -> None:
+        """Initialize the ReplayReport."""
+        self.replayed = 0
+        self.mismatches = 0
+        self.max_lag = 0.0
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the report.
+
+        Returns
+        -------
+        str
+            A string containing the class name and attribute values.
+        """
+        return (
+            f"ReplayReport(replayed={self.replayed}, mismatches={self.mismatches}, "
+            f"max_lag={self.max_lag:.3f})"
+        )
+
+
+def replay_workload(
+    path: str | Path,
+    service: "UserService",
+    speed: float = 1.0,
+    max_workers: int = 8,
+) -> ReplayReport:
+    """
+    Run the operations of a workload log on a user service, at their recorded pace.
+
+    Each operation starts at its recorded offset divided by ``speed`` on one of the
+    worker threads, so the concurrency of production is replayed along with the mix
+    of operations. Anonymized usernames are used as usernames and every user has the
+    same password, so logins that did not match are replayed with another one, and
+    ``seed_users`` should be run first. When the service cannot keep up, the replay
+    falls behind its schedule rather than queueing operations without bound, and the
+    largest delay is reported. Record the latencies of the replay by giving the
+    service a WorkloadRecorder.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path of the log.
+    service : UserService
+        The service the operations are run on.
+    speed : float, optional
+        How many times faster than recorded the operations are started. Defaults to 1.
+        Operations are started as fast as the workers take them if 0.
+    max_workers : int, optional
+        The number of operations run at once. Defaults to 8.
+
+    Returns
+    -------
+    ReplayReport
+        The number of operations replayed, of those whose outcome differs from the
+        recorded one, and the largest delay behind the schedule in seconds.
+    """
+    report = ReplayReport()
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(max_workers * 2)
+
+    def run(entry: WorkloadEntry) -> None:
+        try:
+            outcome = _replay_entry(service, entry)
+        finally:
+            slots.release()
+        with lock:
+            report.replayed += 1
+            report.mismatches += outcome != entry.outcome
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="workload-replay"
+    ) as executor:
+        for entry in read_workload(path):
+            slots.acquire()
+            if speed:
+                delay = entry.offset / 1_000_000 / speed - (
+                    time.perf_counter() - started
+                )
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    report.max_lag = max(report.max_lag, -delay)
+            executor.submit(run, entry)
+    logger.info(f"Replayed {path}: {report!r}.")
+    return report
+
+
+def _replay_entry(service: "UserService", entry: WorkloadEntry) -> Outcome:
+    """
+    Run a recorded operation on a user service.
+
+    Parameters
+    ----------
+    service : UserService
+        The service.
+    entry : WorkloadEntry
+        The recorded operation.
+
+    Returns
+    -------
+    Outcome
+        The outcome of the replayed operation.
+    """
+    try:
+        if entry.operation == Operation.REGISTER:
+            service.register(entry.user, REPLAY_PASSWORD)
+            return Outcome.OK
+        password = (
+            f"not-{REPLAY_PASSWORD}"
+            if entry.outcome == Outcome.WRONG_PASSWORD
+            else REPLAY_PASSWORD
+        )
+        return login_outcome(*service.login(entry.user, password))
+    except Exception:
+        logger.debug(f"Replayed {entry!r} failed.", exc_info=True)
+        return Outcome.FAILED
+
+
+def summarize_latencies(
+    path: str | Path, percentiles: tuple[int, ...] = (50, 90, 99)
+) -> dict[Operation, dict[str, float]]:
+    """
+    Summarize the durations of the operations of a workload log, by operation.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path of the log.
+    percentiles : tuple[int, ...], optional
+        The percentiles computed. Defaults to the 50th, 90th and 99th.
+
+    Returns
+    -------
+    dict[Operation, dict[str, float]]
+        The ``count``, ``mean``, ``max`` and percentiles, such as ``p99``, of each
+        operation, in microseconds.
+    """
+    durations: dict[Operation, list[int]] = {}
+    for entry in read_workload(path):
+        durations.setdefault(entry.operation, []).append(entry.duration)
+
+    summaries = {}
+    for operation, values in durations.items():
+        values.sort()
+        summary: dict[str, float] = {
+            "count": len(values),
+            "mean": statistics.fmean(values),
+            "max": values[-1],
+        }
+        for percentile in percentiles:
+            index = min(len(values) - 1, len(values) * percentile // 100)
+            summary[f"p{percentile}"] = values[index]
+        summaries[operation] = summary
+    return summaries
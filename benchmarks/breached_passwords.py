@@ -0,0 +1,145 @@
+"""
+Benchmark lookups in a memory-mapped index of breached password hashes.
+
+Run with ``python -m benchmarks.breached_passwords``. An index of random SHA-1 hashes
+is built in a temporary directory, then worker processes, each receiving the index
+pickled as a spawned process would, look up random passwords and breached hashes.
+Each worker prints the latency of its lookups and its resident memory: the pages of
+the mapping it touched are shared through the page cache, so the workers stay small
+however large the index, unlike a Python set of the same hashes, whose estimated size
+is printed for comparison. Pass ``--entries 500000000`` to reproduce a full breach
+corpus, which needs about 10 GB of disk and some time to build.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from toolkit.hashindex import HashIndex, build_hash_index
+
+from .common import Timer
+
+WIDTH = 20
+
+
+def random_hashes(entries: int, seed: int) -> Iterator[bytes]:
+    """
+    Generate random hashes.
+
+    Parameters
+    ----------
+    entries : int
+        The number of hashes.
+    seed : int
+        The seed of the generator.
+
+    Yields
+    ------
+    bytes
+        The hashes.
+    """
+    generator = random.Random(seed)
+    for _ in range(entries):
+        yield generator.randbytes(WIDTH)
+
+
+def resident_memory() -> dict[str, int]:
+    """
+    Read the resident memory of the process from ``/proc``.
+
+    Returns
+    -------
+    dict[str, int]
+        The resident memory in KiB, in total and backed by files, or nothing if
+        ``/proc`` is not available.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            lines = [line.split() for line in status]
+    except OSError:
+        return {}
+    return {
+        fields[0].rstrip(":"): int(fields[1])
+        for fields in lines
+        if fields[0] in ("VmRSS:", "RssFile:")
+    }
+
+
+def look_up(index: HashIndex, lookups: int, entries: int, worker: int) -> str:
+    """
+    Look up random hashes, half of them indexed, and summarize the latencies.
+
+    Parameters
+    ----------
+    index : HashIndex
+        The index, reopened from its pickle.
+    lookups : int
+        The number of lookups.
+    entries : int
+        The number of hashes of the index.
+    worker : int
+        The number of the worker.
+
+    Returns
+    -------
+    str
+        The summary line of the worker.
+    """
+    generator = random.Random(worker + 1)
+    # Replaying the seed of the index draws hashes it holds.
+    indexed = random_hashes(min(entries, lookups // 2), seed=0)
+    timer = Timer()
+    hits = 0
+    for position in range(lookups):
+        digest = next(indexed, None) if position % 2 else None
+        digest = digest or generator.randbytes(WIDTH)
+        with timer.measure():
+            hits += digest in index
+    memory = resident_memory()
+    return (
+        f"{timer.summary(f'worker {worker}')} hits={hits} "
+        f"rss={memory.get('VmRSS', 0) / 1024:.1f}MiB "
+        f"file_backed={memory.get('RssFile', 0) / 1024:.1f}MiB"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=10_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "breached.idx"
+        start = time.perf_counter()
+        build_hash_index(random_hashes(args.entries, seed=0), path, WIDTH)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+        set_size = args.entries * (sys.getsizeof(bytes(WIDTH)) + 2 * 8 * 2)
+        print(
+            f"entries={args.entries} build={elapsed:.1f}s file={size / 2**20:.0f}MiB "
+            f"python_set_estimate={set_size / 2**20:.0f}MiB"
+        )
+
+        with HashIndex(path) as index:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(args.workers, mp_context=context) as executor:
+                futures = [
+                    executor.submit(look_up, index, args.lookups, args.entries, worker)
+                    for worker in range(args.workers)
+                ]
+                for future in futures:
+                    print(future.result())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Shared helpers for the benchmark scripts."""
+
+import statistics
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import Engine, create_engine
+
+from config.base import db
+from config.database.orm import Base
+
+
+@contextmanager
+def sqlite_database(path: Path) -> Iterator[Engine]:
+    """
+    Point the application database at a fresh SQLite file.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the SQLite database file. Any existing file is replaced.
+
+    Yields
+    ------
+    Iterator[Engine]
+        The engine connected to the SQLite database.
+    """
+    path.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    try:
+        with patch.object(db, "get_engine", return_value=engine):
+            yield engine
+    finally:
+        engine.dispose()
+        path.unlink(missing_ok=True)
+
+
+class Timer:
+    """Collect the latency of repeated operations."""
+
+    def __init__(self) -> None:
+        """Initialize the Timer."""
+        self.latencies: list[float] = []
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """
+        Measure the latency of the wrapped block.
+
+        Yields
+        ------
+        Iterator[None]
+        """
+        start = time.perf_counter()
+        yield
+        self.latencies.append(time.perf_counter() - start)
+
+    def summary(self, label: str) -> str:
+        """
+        Summarize the collected latencies in microseconds.
+
+        Parameters
+        ----------
+        label : str
+            The label of the summary line.
+
+        Returns
+        -------
+        str
+            A line containing the mean, p50 and p99 latencies and the throughput.
+        """
+        latencies = sorted(self.latencies)
+        mean = statistics.fmean(latencies)
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        return (
+            f"{label:<28} n={len(latencies):<8} mean={mean * 1e6:9.1f}us "
+            f"p50={p50 * 1e6:9.1f}us p99={p99 * 1e6:9.1f}us "
+            f"ops/s={len(latencies) / sum(latencies):10.0f}"
+        )
@@ -0,0 +1,74 @@
+"""
+Benchmark the login throughput of the concurrent user service by number of threads.
+
+Run with ``python -m benchmarks.concurrent_logins``. Random users log in on a temporary
+SQLite database through a ConcurrentUserService with an increasing number of workers.
+SQLite answers in microseconds, so each statement sleeps for ``--latency-ms`` to stand
+in for the round trip to a database server, during which the worker releases the GIL.
+Throughput grows about linearly with the workers up to the size of the connection pool,
+then flattens as the Python side of the logins saturates the GIL and, past the overflow
+of the pool, workers wait for a connection.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event, insert
+
+from auth.models import User
+from auth.repository.concurrent import ConcurrentUserService, get_pool_size
+from auth.repository.service import UserService
+
+from .common import sqlite_database
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--logins", type=int, default=2_000)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 5, 8, 16])
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_concurrent_logins.db"
+    with sqlite_database(path) as engine:
+        password = UserService().hash_password("password")
+        usernames = [f"user_{index}" for index in range(args.users)]
+        with engine.begin() as connection:
+            connection.execute(
+                insert(User),
+                [
+                    {"username": username, "password": password}
+                    for username in usernames
+                ],
+            )
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def add_latency(*_: Any) -> None:
+            time.sleep(args.latency_ms / 1000)
+
+        print(f"pool_size={get_pool_size()} latency={args.latency_ms}ms")
+        baseline = None
+        for threads in args.threads:
+            credentials = [
+                (random.choice(usernames), "password") for _ in range(args.logins)
+            ]
+            with ConcurrentUserService(max_workers=threads) as service:
+                start = time.perf_counter()
+                assert all(ok for _, ok in service.login_many(credentials))
+                elapsed = time.perf_counter() - start
+            throughput = args.logins / elapsed
+            baseline = baseline or throughput
+            print(
+                f"threads={threads:<4} logins/s={throughput:8.0f} "
+                f"speedup={throughput / baseline:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
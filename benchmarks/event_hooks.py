@@ -0,0 +1,103 @@
+"""
+Benchmark the login latency with post-login hooks inline and on the event bus.
+
+Run with ``python -m benchmarks.event_hooks``. Logins are served from a temporary
+SQLite database with a hook standing for a welcome notification or a cache warm-up,
+which sleeps for ``--hook-latency`` milliseconds. The hook is first called inline after
+each login, then subscribed to the event bus, and then to the bus through the durable
+outbox, and the number of events the hook handled is printed once the bus is drained.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from auth.models import UserLoggedIn
+from auth.repository import UserService
+from toolkit.events import EventBus, OverflowPolicy
+
+from .common import Timer, sqlite_database
+
+
+def run_logins(
+    service: UserService, usernames: list[str], logins: int, hook_latency: float = 0.0
+) -> Timer:
+    """
+    Log in random users and time each login, with the hook inline if it has a latency.
+
+    Parameters
+    ----------
+    service : UserService
+        The service used to log in.
+    usernames : list[str]
+        The registered usernames.
+    logins : int
+        The number of logins.
+    hook_latency : float, optional
+        The seconds the inline hook sleeps after each login. Defaults to no hook.
+
+    Returns
+    -------
+    Timer
+        The timer holding the latency of each login.
+    """
+    timer = Timer()
+    for _ in range(logins):
+        username = random.choice(usernames)
+        with timer.measure():
+            service.login(username=username, password="password")
+            if hook_latency:
+                time.sleep(hook_latency)
+    return timer
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--logins", type=int, default=2_000)
+    parser.add_argument("--hook-latency", type=float, default=2.0)
+    args = parser.parse_args()
+    hook_latency = args.hook_latency / 1000
+
+    path = Path(tempfile.gettempdir()) / "bench_event_hooks.db"
+    with sqlite_database(path):
+        service = UserService()
+        usernames = [f"user_{index}" for index in range(args.users)]
+        for username in usernames:
+            service.register(username=username, password="password")
+
+        timer = run_logins(service, usernames, args.logins, hook_latency)
+        print(timer.summary("hook inline"))
+
+        for durable in (False, True):
+            bus = EventBus(max_workers=2)
+            handled = 0
+
+            def hook(event: UserLoggedIn) -> None:
+                nonlocal handled
+                time.sleep(hook_latency)
+                handled += 1
+
+            bus.subscribe(
+                UserLoggedIn,
+                hook,
+                max_pending=args.logins,
+                overflow=OverflowPolicy.BLOCK,
+            )
+            service = UserService(event_bus=bus, durable_events=durable)
+            label = "hook on bus, outbox" if durable else "hook on bus"
+            print(run_logins(service, usernames, args.logins).summary(label))
+            start = time.perf_counter()
+            service.close()
+            bus.close()
+            print(
+                f"handled={handled} drained in {time.perf_counter() - start:.2f}s "
+                f"after the last login"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark group commits of concurrent registrations against a commit per registration.
+
+Run with ``python -m benchmarks.group_commit``. Threads register new users on a
+temporary SQLite database, first each in its own transaction, then through a
+GroupRegistrar with several windows. For each mode the registrations and commits per
+second are printed along with the latency of a registration, since a wider window
+saves commits at the cost of waiting for the group.
+"""
+
+import argparse
+import itertools
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from auth.repository.registration import GroupRegistrar
+from auth.repository.service import UserService
+
+from .common import Timer, sqlite_database
+
+
+def run(
+    registrar: Optional[GroupRegistrar], registrations: int, threads: int, label: str
+) -> None:
+    """
+    Register new users concurrently and print the throughput and latencies.
+
+    Parameters
+    ----------
+    registrar : Optional[GroupRegistrar]
+        The registrar merging the registrations, or None to commit each on its own.
+    registrations : int
+        The number of registrations.
+    threads : int
+        The number of registering threads.
+    label : str
+        The label of the mode.
+    """
+    service = UserService(registrar=registrar)
+    counter = itertools.count()
+    timer = Timer()
+
+    def register(_: int) -> None:
+        with timer.measure():
+            service.register(f"{label}_{next(counter)}", "password")
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(register, range(registrations)))
+        elapsed = time.perf_counter() - start
+
+    commits = registrar.commits if registrar else registrations
+    print(
+        f"{timer.summary(label)} registrations/s={registrations / elapsed:7.0f} "
+        f"commits/s={commits / elapsed:7.0f}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--registrations", type=int, default=2_000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument(
+        "--windows", type=float, nargs="+", default=[0.0005, 0.002, 0.005]
+    )
+    parser.add_argument("--max-size", type=int, default=64)
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_group_commit.db"
+    with sqlite_database(path):
+        run(None, args.registrations, args.threads, "commit per registration")
+        for window in args.windows:
+            registrar = GroupRegistrar(window=window, max_size=args.max_size)
+            label = f"group commit {window * 1000:g}ms"
+            run(registrar, args.registrations, args.threads, label)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark the login latency with and without last login tracking.
+
+Run with ``python -m benchmarks.last_login``. Logins are served from a temporary SQLite
+database, once with the tracker disabled and once with it enabled, and the pending
+timestamps are flushed when the service is closed.
+"""
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import Engine, func, select
+
+from auth.models import User
+from auth.repository import UserService
+
+from .common import Timer, sqlite_database
+
+
+def run_logins(service: UserService, usernames: list[str], logins: int) -> Timer:
+    """
+    Log in random users and time each login.
+
+    Parameters
+    ----------
+    service : UserService
+        The service used to log in.
+    usernames : list[str]
+        The registered usernames.
+    logins : int
+        The number of logins.
+
+    Returns
+    -------
+    Timer
+        The timer holding the latency of each login.
+    """
+    timer = Timer()
+    for _ in range(logins):
+        username = random.choice(usernames)
+        with timer.measure():
+            service.login(username=username, password="password")
+    return timer
+
+
+def count_tracked(engine: Engine) -> int:
+    """
+    Count the users with a recorded last login.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine connected to the benchmark database.
+
+    Returns
+    -------
+    int
+        The number of users whose last login is set.
+    """
+    with engine.connect() as connection:
+        stmt = select(func.count()).where(User.last_login.is_not(None))
+        return int(connection.execute(stmt).scalar_one())
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--logins", type=int, default=20_000)
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_last_login.db"
+    with sqlite_database(path) as engine:
+        service = UserService()
+        usernames = [f"user_{index}" for index in range(args.users)]
+        for username in usernames:
+            service.register(username=username, password="password")
+
+        print(run_logins(service, usernames, args.logins).summary("tracking off"))
+
+        service = UserService(track_last_login=True)
+        print(run_logins(service, usernames, args.logins).summary("tracking on"))
+        service.close()
+        print(f"users with last_login after shutdown: {count_tracked(engine)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark the throughput of auditing login attempts on SQLite.
+
+Run with ``python -m benchmarks.login_audit``. The same number of attempts is written
+once with one INSERT and commit per attempt, and once through the buffered
+LoginAuditLog, which inserts them in batches.
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import Engine, delete, func, select
+from sqlalchemy.orm import Session
+
+from auth.models import LoginAttempt
+from auth.repository.audit import LoginAuditLog
+
+from .common import Timer, sqlite_database
+
+
+def count_attempts(engine: Engine) -> int:
+    """
+    Count the stored login attempts.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine connected to the benchmark database.
+
+    Returns
+    -------
+    int
+        The number of rows in the login attempt table.
+    """
+    with engine.connect() as connection:
+        return int(connection.execute(select(func.count(LoginAttempt.id))).scalar_one())
+
+
+def insert_per_attempt(engine: Engine, attempts: int) -> float:
+    """
+    Insert and commit each login attempt on its own.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine connected to the benchmark database.
+    attempts : int
+        The number of attempts to insert.
+
+    Returns
+    -------
+    float
+        The elapsed time in seconds.
+    """
+    start = time.perf_counter()
+    with Session(engine) as session:
+        for index in range(attempts):
+            session.add(
+                LoginAttempt(
+                    username=f"user_{index}",
+                    success=index % 2 == 0,
+                    attempted_at=datetime.now(timezone.utc),
+                    source="bench",
+                )
+            )
+            session.commit()
+    return time.perf_counter() - start
+
+
+def insert_buffered(attempts: int, batch_size: int) -> tuple[float, Timer]:
+    """
+    Record login attempts through the buffered audit log.
+
+    Parameters
+    ----------
+    attempts : int
+        The number of attempts to record.
+    batch_size : int
+        The number of attempts inserted per statement.
+
+    Returns
+    -------
+    tuple[float, Timer]
+        The elapsed time in seconds until all attempts are stored, and the latency of
+        each ``record`` call.
+    """
+    timer = Timer()
+    start = time.perf_counter()
+    audit_log = LoginAuditLog(max_size=attempts, batch_size=batch_size, spill_path=None)
+    for index in range(attempts):
+        with timer.measure():
+            audit_log.record(f"user_{index}", index % 2 == 0, source="bench")
+    audit_log.close()
+    return time.perf_counter() - start, timer
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attempts", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_login_audit.db"
+    with sqlite_database(path) as engine:
+        elapsed = insert_per_attempt(engine, args.attempts)
+        print(
+            f"{'insert per attempt':<28} stored={count_attempts(engine):<8} "
+            f"attempts/s={args.attempts / elapsed:10.0f}"
+        )
+
+        with engine.begin() as connection:
+            connection.execute(delete(LoginAttempt))
+
+        elapsed, timer = insert_buffered(args.attempts, args.batch_size)
+        print(
+            f"{'buffered executemany':<28} stored={count_attempts(engine):<8} "
+            f"attempts/s={args.attempts / elapsed:10.0f}"
+        )
+        print(timer.summary("record() latency"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark the credential lookup of a login against loading the full user.
+
+Run with ``python -m benchmarks.login_query``. Random users are looked up on a
+temporary SQLite database, once by loading the mapped User and once by selecting only
+their credentials. Each lookup is timed, then repeated while tracing the memory it
+allocates.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import insert
+
+from auth.models import User
+from auth.repository.dal import UserDataAccessLayer
+
+from .common import Timer, sqlite_database
+
+
+def time_lookups(
+    lookup: Callable[[str], Any], usernames: list[str], lookups: int
+) -> Timer:
+    """
+    Look up random users and time each lookup.
+
+    Parameters
+    ----------
+    lookup : Callable[[str], Any]
+        The lookup, taking a username.
+    usernames : list[str]
+        The registered usernames.
+    lookups : int
+        The number of lookups.
+
+    Returns
+    -------
+    Timer
+        The timer holding the latency of each lookup.
+    """
+    timer = Timer()
+    for _ in range(lookups):
+        username = random.choice(usernames)
+        with timer.measure():
+            lookup(username)
+    return timer
+
+
+def trace_lookups(
+    lookup: Callable[[str], Any], usernames: list[str], lookups: int
+) -> float:
+    """
+    Look up random users and trace the peak memory each lookup allocates.
+
+    Parameters
+    ----------
+    lookup : Callable[[str], Any]
+        The lookup, taking a username.
+    usernames : list[str]
+        The registered usernames.
+    lookups : int
+        The number of lookups.
+
+    Returns
+    -------
+    float
+        The mean number of bytes allocated at the peak of a lookup.
+    """
+    peaks = []
+    tracemalloc.start()
+    for _ in range(lookups):
+        username = random.choice(usernames)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        lookup(username)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+    return statistics.fmean(peaks)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_login_query.db"
+    with sqlite_database(path) as engine:
+        usernames = [f"user_{index}" for index in range(args.users)]
+        with engine.begin() as connection:
+            connection.execute(
+                insert(User),
+                [
+                    {"username": username, "password": "x" * 64}
+                    for username in usernames
+                ],
+            )
+
+        dal = UserDataAccessLayer()
+        lookups: dict[str, Callable[[str], Any]] = {
+            "full User": dal.get_user_by_username,
+            "credentials": dal.get_credentials_by_username,
+        }
+        for label, lookup in lookups.items():
+            time_lookups(lookup, usernames, min(args.lookups, 1_000))  # Warm up.
+            timer = time_lookups(lookup, usernames, args.lookups)
+            allocated = trace_lookups(lookup, usernames, min(args.lookups, 2_000))
+            print(f"{timer.summary(label)} peak_alloc={allocated / 1024:6.1f}KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Soak test the memory of the user service over a long run of logins.
+
+Run with ``python -m benchmarks.memory_soak``. Random users log in on a temporary
+SQLite database, a million times by default, while a MemoryMonitor traces the
+allocations. The monitor starts after ``--warmup`` logins, once the caches and pools
+are filled, and checks every ``--check-every`` logins, printing the memory traced and
+the sessions, identity map objects and connections in use. The run fails if the memory
+grew by more than ``--threshold`` MiB or objects are left in identity maps. With
+``--tracking``, the last logins, the audit trail and the statistics are recorded too,
+so their buffers are soaked as well. Tracing slows logins down, so the default run
+takes about half an hour.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from auth.repository import UserService
+from config.base import db
+from toolkit.diagnostics import MemoryMonitor
+from toolkit.diagnostics.memory import MIB
+
+from .common import sqlite_database
+
+
+def main() -> None:
+    """Run the soak test."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--logins", type=int, default=1_000_000)
+    parser.add_argument("--warmup", type=int, default=10_000)
+    parser.add_argument("--check-every", type=int, default=100_000)
+    parser.add_argument("--threshold", type=float, default=4.0)
+    parser.add_argument("--tracking", action="store_true")
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_memory_soak.db"
+    with sqlite_database(path):
+        service = UserService(
+            track_last_login=args.tracking,
+            audit_logins=args.tracking,
+            collect_statistics=args.tracking,
+        )
+        usernames = [f"user_{index}" for index in range(args.users)]
+        for username in usernames:
+            service.register(username=username, password="password")
+        for _ in range(args.warmup):
+            service.login(username=random.choice(usernames), password="password")
+
+        monitor = MemoryMonitor(
+            growth_threshold=int(args.threshold * MIB), gauges=db.get_memory_stats
+        )
+        monitor.start()
+        start = time.perf_counter()
+        try:
+            for login in range(1, args.logins + 1):
+                service.login(username=random.choice(usernames), password="password")
+                if login % args.check_every == 0 or login == args.logins:
+                    report = monitor.check()
+                    gauges = " ".join(
+                        f"{name}={value}" for name, value in report.gauges.items()
+                    )
+                    print(
+                        f"logins={login:<9} traced={report.size / MIB:7.2f}MiB "
+                        f"growth={report.growth / MIB:+7.2f}MiB {gauges} "
+                        f"elapsed={time.perf_counter() - start:.0f}s"
+                    )
+        finally:
+            monitor.stop()
+            service.close()
+
+    if report.growth > args.threshold * MIB or report.gauges["identity_map"]:
+        raise SystemExit(f"Memory did not stay flat:\n{report.format()}")
+    print("Memory stayed flat.")
+
+
+if __name__ == "__main__":
+    main()
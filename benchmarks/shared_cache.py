@@ -0,0 +1,162 @@
+"""
+Benchmark the credential cache shared by forked workers against per-process dicts.
+
+Run with ``python -m benchmarks.shared_cache --users 1000000 --workers 8``. The parent
+fills a SharedCredentialCache with the credentials of every user, then forks workers
+that look up random users in it. For comparison, other forked workers each fill a dict
+of their own with the same credentials, as a per-process cache warms up, and look up
+the same users. Each worker prints the latency of its lookups and its memory read from
+``/proc``: the private memory of a worker is what it costs on top of the others, so
+the workers of the shared cache stay small however many users it holds, while each
+dict costs its full size again.
+"""
+
+import argparse
+import multiprocessing
+import random
+import time
+from collections.abc import Callable
+from hashlib import sha256
+from multiprocessing.queues import Queue
+from typing import Optional
+
+from auth.models import UserCredentials
+from auth.repository.shared_cache import SharedCredentialCache
+
+from .common import Timer
+
+PASSWORD = sha256(b"password").hexdigest()
+
+
+def process_memory() -> dict[str, int]:
+    """
+    Read the memory of the process from ``/proc``.
+
+    Returns
+    -------
+    dict[str, int]
+        The resident, proportional and private memory in KiB, or nothing if ``/proc``
+        is not available.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as rollup:
+            lines = [line.split() for line in rollup]
+    except OSError:
+        return {}
+    fields = {line[0].rstrip(":"): int(line[1]) for line in lines if len(line) == 3}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def look_up(
+    label: str,
+    users: int,
+    lookups: int,
+    worker: int,
+    results: "Queue[str]",
+    cache: Optional[SharedCredentialCache],
+) -> None:
+    """
+    Look up random users in a forked worker and report the latencies and memory.
+
+    Parameters
+    ----------
+    label : str
+        The label of the cache.
+    users : int
+        The number of users.
+    lookups : int
+        The number of lookups.
+    worker : int
+        The number of the worker.
+    results : Queue[str]
+        The queue the summary line of the worker is put on.
+    cache : Optional[SharedCredentialCache]
+        The shared cache inherited from the parent, or None to fill a dict.
+    """
+    get: Callable[[str], Optional[UserCredentials]]
+    if cache is None:
+        credentials = {
+            f"user_{index}": UserCredentials(index, f"user_{index}", PASSWORD)
+            for index in range(users)
+        }
+        get = credentials.get
+    else:
+        get = cache.get
+    generator = random.Random(worker + 1)
+    usernames = [f"user_{generator.randrange(users)}" for _ in range(lookups)]
+    timer = Timer()
+    hits = 0
+    for username in usernames:
+        with timer.measure():
+            found = get(username)
+        hits += found is not None
+    memory = process_memory()
+    results.put(
+        f"{timer.summary(f'{label} worker {worker}')} hits={hits} "
+        f"rss={memory.get('rss', 0) / 1024:.1f}MiB "
+        f"pss={memory.get('pss', 0) / 1024:.1f}MiB "
+        f"private={memory.get('private', 0) / 1024:.1f}MiB"
+    )
+
+
+def run_workers(
+    label: str, args: argparse.Namespace, cache: Optional[SharedCredentialCache]
+) -> None:
+    """
+    Fork the workers looking up users in a cache and print their summaries.
+
+    Parameters
+    ----------
+    label : str
+        The label of the cache.
+    args : argparse.Namespace
+        The arguments of the benchmark.
+    cache : Optional[SharedCredentialCache]
+        The shared cache, or None for a dict per worker.
+    """
+    context = multiprocessing.get_context("fork")
+    results: Queue[str] = context.Queue()
+    processes = [
+        context.Process(
+            target=look_up,
+            args=(label, args.users, args.lookups, worker, results, cache),
+        )
+        for worker in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        print(results.get())
+    for process in processes:
+        process.join()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    cache = SharedCredentialCache(capacity=2 * args.users, ttl=3600)
+    start = time.perf_counter()
+    stored = sum(
+        cache.put(UserCredentials(index, f"user_{index}", PASSWORD))
+        for index in range(args.users)
+    )
+    print(
+        f"shared cache users={stored} fill={time.perf_counter() - start:.1f}s "
+        f"size={cache.table.nbytes / 2**20:.1f}MiB"
+    )
+    run_workers("shared", args, cache)
+    cache.close()
+    run_workers("dict", args, None)
+
+
+if __name__ == "__main__":
+    main()
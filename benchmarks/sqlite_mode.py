@@ -0,0 +1,127 @@
+"""
+Benchmark the embedded SQLite mode against a default SQLite engine under threads.
+
+Run with ``python -m benchmarks.sqlite_mode``. Threads register new users and log in
+existing ones on a temporary SQLite file, first through a default engine, which keeps
+the rollback journal and lets every pooled connection write, then through a
+DatabaseConnection in embedded mode, with WAL, tuned pragmas, a single writer and
+read-only readers. For each mode and number of threads the operations per second and
+the operations failing with "database is locked" are printed.
+"""
+
+import argparse
+import itertools
+import random
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from auth.repository.service import UserService
+from config.database.base import DatabaseConnection
+from config.database.orm import Base
+
+from .common import sqlite_database
+
+
+@contextmanager
+def embedded_database(path: Path) -> Iterator[None]:
+    """
+    Point the application database at a fresh SQLite file in embedded mode.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the SQLite database file. Any existing file is replaced.
+
+    Yields
+    ------
+    Iterator[None]
+    """
+    path.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    database = DatabaseConnection(url=f"sqlite:///{path}", shards={})
+    try:
+        with (
+            patch("auth.repository.bll.db", database),
+            patch("auth.repository.dal.db", database),
+        ):
+            yield
+    finally:
+        database.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def run(operations: int, threads: int, write_ratio: float, label: str) -> None:
+    """
+    Register and log in users concurrently and print the throughput and lock errors.
+
+    Parameters
+    ----------
+    operations : int
+        The number of registrations and logins.
+    threads : int
+        The number of threads.
+    write_ratio : float
+        The share of registrations among the operations.
+    label : str
+        The label of the mode.
+    """
+    service = UserService()
+    usernames = [f"{label}_{threads}_seed_{index}" for index in range(100)]
+    for username in usernames:
+        service.register(username, "password")
+    counter = itertools.count()
+    locked = 0
+
+    def operate(_: int) -> None:
+        nonlocal locked
+        try:
+            if random.random() < write_ratio:
+                service.register(f"{label}_{threads}_{next(counter)}", "password")
+            else:
+                service.login(random.choice(usernames), "password")
+        except OperationalError as err:
+            if "locked" not in str(err):
+                raise
+            locked += 1
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(operate, range(operations)))
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{label:<9} threads={threads:<3} ops/s={operations / elapsed:7.0f} "
+        f"locked={locked}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--operations", type=int, default=2_000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_sqlite_mode.db"
+    with sqlite_database(path):
+        for threads in args.threads:
+            run(args.operations, threads, args.write_ratio, "default")
+    with embedded_database(path):
+        for threads in args.threads:
+            run(args.operations, threads, args.write_ratio, "embedded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark the memory use of exporting and importing users on SQLite.
+
+Run with ``python -m benchmarks.transfer``. Users are exported and imported again at
+several table sizes, tracing the peak memory allocated by Python. The streaming export
+and import should peak at about the same memory whatever the number of users, unlike
+loading every user through the ORM.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, delete, insert
+from sqlalchemy.orm import Session
+
+from auth.models import User
+from auth.repository.transfer import export_users, import_users
+
+from .common import sqlite_database
+
+
+def seed_users(engine: Engine, count: int) -> None:
+    """
+    Insert users directly into the benchmark database.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine connected to the benchmark database.
+    count : int
+        The number of users to insert.
+    """
+    with engine.begin() as connection:
+        for start in range(0, count, 10_000):
+            connection.execute(
+                insert(User),
+                [
+                    {"username": f"user_{index}", "password": "x" * 60}
+                    for index in range(start, min(start + 10_000, count))
+                ],
+            )
+
+
+def trace(label: str, count: int, operation: Callable[[], Any]) -> None:
+    """
+    Print the elapsed time and the peak memory of an operation.
+
+    Parameters
+    ----------
+    label : str
+        The label of the summary line.
+    count : int
+        The number of users handled by the operation.
+    operation : Callable[[], Any]
+        The operation to trace.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    operation()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<28} users={count:<8} peak={peak / 2**20:8.1f}MiB "
+        f"users/s={count / elapsed:10.0f}"
+    )
+
+
+def load_with_orm(engine: Engine) -> None:
+    """
+    Load every user through the ORM, as a naive export would.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine connected to the benchmark database.
+    """
+    with Session(engine) as session:
+        session.query(User).all()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--file-name", default="users.bin.gz")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.gettempdir())
+    path = directory / f"bench_transfer_{args.file_name}"
+    with sqlite_database(directory / "bench_transfer.db") as engine:
+        for size in args.sizes:
+            with engine.begin() as connection:
+                connection.execute(delete(User))
+            seed_users(engine, size)
+
+            trace("orm load", size, lambda: load_with_orm(engine))
+            trace(
+                f"export {args.file_name}",
+                size,
+                lambda: export_users(path, batch_size=args.batch_size),
+            )
+            with engine.begin() as connection:
+                connection.execute(delete(User))
+            trace(
+                f"import {args.file_name}",
+                size,
+                lambda: import_users(path, batch_size=args.batch_size),
+            )
+    path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
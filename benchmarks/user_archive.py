@@ -0,0 +1,172 @@
+"""
+Benchmark username lookups before and after archiving inactive users.
+
+Run with ``python -m benchmarks.user_archive``. Users are inserted into a temporary
+SQLite database, most of them without a login for years, then credentials of active
+users are looked up by username through ``UserDataAccessLayer``. The inactive users
+are then moved to the archive by ``archive_inactive_users``, the user table is
+reindexed and the database vacuumed, as PostgreSQL would need ``REINDEX CONCURRENTLY``
+to give back the pages of the deleted entries, and the lookups are measured again,
+along with the size of the unique index of usernames and the lookups of archived
+users, which fall back to the archive.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import Engine, insert, text
+
+from auth.models import User
+from auth.repository.archive import archive_inactive_users
+from auth.repository.dal import UserDataAccessLayer
+
+from .common import Timer, sqlite_database
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+CUTOFF = NOW - timedelta(days=730)
+
+
+def insert_users(
+    engine: Engine, users: int, inactive: float, batch_size: int = 50_000
+) -> None:
+    """
+    Insert users in batches, a share of them inactive since before the cutoff.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine of the database.
+    users : int
+        The number of users.
+    inactive : float
+        The share of inactive users.
+    batch_size : int, optional
+        The number of users inserted per statement. Defaults to 50_000.
+    """
+    generator = random.Random(0)
+    for start in range(0, users, batch_size):
+        with engine.begin() as connection:
+            connection.execute(
+                insert(User),
+                [
+                    {
+                        "username": f"user_{index:08}",
+                        "password": "x" * 64,
+                        "date_joined": CUTOFF - timedelta(days=365),
+                        "last_login": CUTOFF
+                        - timedelta(days=1 + generator.random() * 1000)
+                        if is_inactive(index, inactive)
+                        else NOW - timedelta(days=generator.random() * 30),
+                    }
+                    for index in range(start, min(start + batch_size, users))
+                ],
+            )
+
+
+def is_inactive(index: int, inactive: float) -> bool:
+    """
+    Tell whether a user is inactive, spreading inactive users over the usernames.
+
+    Parameters
+    ----------
+    index : int
+        The number of the user.
+    inactive : float
+        The share of inactive users.
+
+    Returns
+    -------
+    bool
+        True if the user is inactive.
+    """
+    return (index * 7919 % 1000) < inactive * 1000
+
+
+def index_size(engine: Engine) -> int:
+    """
+    Measure the size of the unique index of usernames of the user table.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine of the database.
+
+    Returns
+    -------
+    int
+        The size of the index in bytes.
+    """
+    with engine.connect() as connection:
+        size = connection.scalar(
+            text(
+                "SELECT SUM(pgsize) FROM dbstat "
+                "WHERE name = 'sqlite_autoindex_auth_user_1'"
+            )
+        )
+    return int(size or 0)
+
+
+def look_up(usernames: list[str], label: str) -> None:
+    """
+    Look up the credentials of users and print the latencies.
+
+    Parameters
+    ----------
+    usernames : list[str]
+        The usernames to look up.
+    label : str
+        The label of the summary line.
+    """
+    dal = UserDataAccessLayer()
+    timer = Timer()
+    for username in usernames:
+        with timer.measure():
+            credentials = dal.get_credentials_by_username(username)
+        assert credentials is not None
+    print(timer.summary(label))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2_000_000)
+    parser.add_argument("--inactive", type=float, default=0.9)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    generator = random.Random(1)
+    indexes = [generator.randrange(args.users) for _ in range(args.lookups * 20)]
+    active = [
+        f"user_{index:08}" for index in indexes if not is_inactive(index, args.inactive)
+    ][: args.lookups]
+    archived = [
+        f"user_{index:08}" for index in indexes if is_inactive(index, args.inactive)
+    ][: args.lookups]
+
+    path = Path(tempfile.gettempdir()) / "bench_user_archive.db"
+    with sqlite_database(path) as engine:
+        insert_users(engine, args.users, args.inactive)
+        print(f"users={args.users} index={index_size(engine) / 2**20:.1f}MiB")
+        look_up(active, "active before archiving")
+
+        start = time.perf_counter()
+        moved = sum(archive_inactive_users(CUTOFF, batch_size=10_000).values())
+        elapsed = time.perf_counter() - start
+        with engine.begin() as connection:
+            connection.execute(text("REINDEX auth_user"))
+        with engine.connect() as connection:
+            connection.execute(text("VACUUM"))
+        print(
+            f"archived={moved} in {elapsed:.1f}s "
+            f"index={index_size(engine) / 2**20:.1f}MiB"
+        )
+        look_up(active, "active after archiving")
+        look_up(archived, "archived, from the archive")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark the memory and lookup latency of the in-memory user directory on SQLite.
+
+Run with ``python -m benchmarks.user_directory --users 10000000``. Users are inserted
+into a temporary SQLite database and loaded into a UserDirectory. The memory held per
+user is reported with the time taken by the initial load and by an incremental sync,
+and credential lookups from the directory are compared with lookups on the database.
+"""
+
+import argparse
+import random
+import resource
+import tempfile
+import time
+from datetime import datetime, timedelta
+from hashlib import sha256
+from pathlib import Path
+
+from sqlalchemy import Engine, insert
+
+from auth.models import User
+from auth.repository.dal import UserDataAccessLayer
+from auth.repository.directory import UserDirectory
+
+from .common import Timer, sqlite_database
+
+
+def seed_users(engine: Engine, count: int) -> None:
+    """
+    Insert users directly into the benchmark database, created a second apart.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine connected to the benchmark database.
+    count : int
+        The number of users to insert.
+    """
+    password = sha256(b"password").hexdigest()
+    created_at = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        for start in range(0, count, 50_000):
+            connection.execute(
+                insert(User),
+                [
+                    {
+                        "username": f"user_{index}",
+                        "password": password,
+                        "created_at": created_at + timedelta(seconds=index),
+                    }
+                    for index in range(start, min(start + 50_000, count))
+                ],
+            )
+
+
+def max_rss() -> int:
+    """
+    Get the peak resident memory of the process.
+
+    Returns
+    -------
+    int
+        The peak resident memory in bytes.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_user_directory.db"
+    with sqlite_database(path) as engine:
+        start = time.perf_counter()
+        seed_users(engine, args.users)
+        print(f"seeded {args.users} users in {time.perf_counter() - start:.1f}s")
+
+        directory = UserDirectory()
+        rss_before = max_rss()
+        start = time.perf_counter()
+        directory.sync()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'initial load':<28} users={len(directory):<9} time={elapsed:7.1f}s "
+            f"estimate={directory.memory_usage() / len(directory):6.1f}B/user "
+            f"rss_growth={(max_rss() - rss_before) / len(directory):6.1f}B/user"
+        )
+
+        with engine.begin() as connection:
+            connection.execute(
+                insert(User),
+                [
+                    {"username": f"new_user_{index}", "password": "password"}
+                    for index in range(1_000)
+                ],
+            )
+        start = time.perf_counter()
+        synced = directory.sync()
+        print(
+            f"{'incremental sync':<28} users={synced:<9} "
+            f"time={(time.perf_counter() - start) * 1e3:7.1f}ms "
+            f"total={len(directory)}"
+        )
+
+        usernames = [
+            f"user_{random.randrange(args.users)}" for _ in range(args.lookups)
+        ]
+        lookups = {
+            "database lookup": UserDataAccessLayer(),
+            "directory lookup": UserDataAccessLayer(directory=directory),
+        }
+        for label, dal in lookups.items():
+            timer = Timer()
+            for username in usernames:
+                with timer.measure():
+                    dal.get_credentials_by_username(username)
+            print(timer.summary(label))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark keyset pagination of users against offset pagination by depth.
+
+Run with ``python -m benchmarks.user_listing``. Users are inserted into a temporary
+SQLite database, then pages are fetched at increasing depths, once through
+``UserDataAccessLayer.list_users``, seeking past a cursor, and once with ``OFFSET``.
+The latency of an offset page grows with its depth, as the skipped rows are still
+read, while a keyset page costs the same at any depth, by id, by username, and by
+lowercase username among the users matching a prefix, ``--prefix`` in any case.
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import ColumnElement, Engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from auth.models import User
+from auth.repository.dal import ORDER_KEYS, UserDataAccessLayer
+from auth.repository.pagination import (
+    UserOrder,
+    encode_cursor,
+    escape_like,
+    prefix_range,
+)
+
+from .common import Timer, sqlite_database
+
+
+def insert_users(engine: Engine, users: int, batch_size: int = 50_000) -> None:
+    """
+    Insert users in batches, with usernames in another order than their ids.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine of the database.
+    users : int
+        The number of users.
+    batch_size : int, optional
+        The number of users inserted per statement. Defaults to 50_000.
+    """
+    for start in range(0, users, batch_size):
+        with engine.begin() as connection:
+            connection.execute(
+                insert(User),
+                [
+                    {"username": f"user_{index * 7919 % users:08}", "password": "x"}
+                    for index in range(start, min(start + batch_size, users))
+                ],
+            )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument(
+        "--depths", type=float, nargs="+", default=[0.0, 0.01, 0.1, 0.5, 0.99]
+    )
+    parser.add_argument("--prefix", default="USER_0")
+    args = parser.parse_args()
+
+    path = Path(tempfile.gettempdir()) / "bench_user_listing.db"
+    with sqlite_database(path) as engine:
+        insert_users(engine, args.users)
+        dal = UserDataAccessLayer()
+        listings = [(order, None) for order in (UserOrder.ID, UserOrder.USERNAME)]
+        listings.append((UserOrder.LOWER_USERNAME, args.prefix))
+        for order, prefix in listings:
+            keys = ORDER_KEYS[order]
+            filters: list[ColumnElement[bool]] = []
+            if prefix:
+                pattern = f"{escape_like(prefix.lower())}%"
+                filters.append(keys[0].like(pattern, escape="\\"))
+                filters.extend(prefix_range(keys[0], prefix))
+            with Session(engine) as session:
+                matching = session.scalar(
+                    select(func.count()).select_from(User).where(*filters)
+                )
+            assert isinstance(matching, int)
+            label = f"{order} with prefix {prefix}" if prefix else order
+            for depth in args.depths:
+                offset = int(matching * depth)
+                with Session(engine) as session:
+                    row = session.execute(
+                        select(*keys).where(*filters).order_by(*keys).offset(offset)
+                    ).first()
+                assert row is not None
+                key = list(row) if len(row) > 1 else row[0]
+                cursor = encode_cursor(order, key) if offset else None
+
+                keyset = Timer()
+                for _ in range(args.pages):
+                    with keyset.measure():
+                        dal.list_users(args.page_size, cursor, order, prefix)
+                print(keyset.summary(f"keyset by {label} at {depth:.0%}"))
+
+                offset_timer = Timer()
+                query = select(User).where(*filters).order_by(*keys)
+                query = query.offset(offset).limit(args.page_size)
+                for _ in range(min(args.pages, 5)):
+                    with offset_timer.measure(), Session(engine) as session:
+                        session.scalars(query).all()
+                print(offset_timer.summary(f"offset by {label} at {depth:.0%}"))
+
+
+if __name__ == "__main__":
+    main()
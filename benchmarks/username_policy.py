@@ -0,0 +1,84 @@
+"""
+Benchmark checking usernames against a large list of blocked words.
+
+Run with ``python -m benchmarks.username_policy``. Random blocked words are compiled
+into the rules of a username policy, then random usernames, some embedding a blocked
+word, are checked against the Aho-Corasick automaton and against a loop testing every
+word in turn. The automaton scans each username once, so its latency does not depend
+on the number of words, while the loop grows with it.
+"""
+
+import argparse
+import random
+import string
+import time
+
+from auth.repository.usernames import UsernameRules, normalize_username
+
+from .common import Timer
+
+
+def random_word(generator: random.Random, low: int, high: int) -> str:
+    """
+    Generate a random lowercase word.
+
+    Parameters
+    ----------
+    generator : random.Random
+        The random generator.
+    low : int
+        The minimum length of the word.
+    high : int
+        The maximum length of the word.
+
+    Returns
+    -------
+    str
+        The word.
+    """
+    return "".join(
+        generator.choices(string.ascii_lowercase, k=generator.randint(low, high))
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patterns", type=int, default=100_000)
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--loop-checks", type=int, default=200)
+    args = parser.parse_args()
+
+    generator = random.Random(0)
+    words = [random_word(generator, 5, 10) for _ in range(args.patterns)]
+    usernames = [
+        random_word(generator, 3, 6) + generator.choice(words)
+        if index % 10 == 0
+        else random_word(generator, 6, 16)
+        for index in range(args.checks)
+    ]
+
+    start = time.perf_counter()
+    rules = UsernameRules(blocked=words)
+    elapsed = time.perf_counter() - start
+    print(f"patterns={args.patterns} states={len(rules.blocked)} build={elapsed:.2f}s")
+
+    timer = Timer()
+    refused = 0
+    for username in usernames:
+        with timer.measure():
+            refused += rules.violation(username) is not None
+    print(f"{timer.summary('automaton')} refused={refused}")
+
+    normalized_words = [normalize_username(word) for word in words]
+    timer = Timer()
+    refused = 0
+    for username in usernames[: args.loop_checks]:
+        with timer.measure():
+            normalized = normalize_username(username)
+            refused += any(word in normalized for word in normalized_words)
+    print(f"{timer.summary('per-pattern loop')} refused={refused}")
+
+
+if __name__ == "__main__":
+    main()
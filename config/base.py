@@ -8,6 +8,26 @@ from .logging.base import LoggingConfigurator
 # Database
 db = DatabaseConnection()
 
+# Breached passwords, checked at registration if the index file exists
+BREACHED_PASSWORDS_PATH = "breached_passwords.idx"
+
+# Reserved and blocked usernames, checked at registration if the policy file exists
+USERNAME_POLICY_PATH = "usernames.toml"
+
+# Maintenance jobs, run in the background by the scheduler of long-running processes
+MAINTENANCE_MAX_CONNECTIONS = 1
+LOGIN_ATTEMPT_RETENTION_DAYS = 90
+
+# Profiling, written when run with --profile
+PROFILE_OUTPUT_DIR = "logs/profiles"
+
+# Memory tracking, checked by the maintenance scheduler when run with --track-memory
+MEMORY_CHECK_INTERVAL = 300
+MEMORY_GROWTH_THRESHOLD_MIB = 64
+
+# Workload logs, recorded when run with --record-workload and replayed by commands
+WORKLOAD_LOG_PATH = "logs/workload.bin.gz"
+
 # Logging
 LOGGING_CONFIG_PATH = "logging.toml"
 toml_parser = TOMLParser(LOGGING_CONFIG_PATH)
@@ -0,0 +1,32 @@
+"""Index lowercase username
+
+Revision ID: 5b7e0a3c9d14
+Revises: 8c1d5e2f9a73
+Create Date: 2024-05-14 11:27:36.540219
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e0a3c9d14"
+down_revision: Union[str, None] = "8c1d5e2f9a73"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_auth_user_username_lower",
+        "auth_user",
+        [sa.text("lower(username)")],
+        unique=False,
+        postgresql_ops={"lower(username)": "text_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_auth_user_username_lower", table_name="auth_user")
@@ -0,0 +1,51 @@
+"""Index usernames bytewise
+
+Revision ID: d3a8f5c61e92
+Revises: 5b9e2d7a4c18
+Create Date: 2024-06-03 09:12:44.871305
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a8f5c61e92"
+down_revision: Union[str, None] = "5b9e2d7a4c18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination compares usernames bytewise, which SQLite does by default.
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    collate = ' COLLATE "C"' if postgresql else ""
+    op.drop_index("ix_auth_user_username_lower", table_name="auth_user")
+    op.create_index(
+        "ix_auth_user_username_lower",
+        "auth_user",
+        [sa.text(f"(lower(username)){collate}"), sa.text(f"(username){collate}")],
+        unique=False,
+    )
+    if postgresql:
+        op.create_index(
+            "ix_auth_user_username_bytewise",
+            "auth_user",
+            [sa.text(f"(username){collate}")],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_auth_user_username_bytewise", table_name="auth_user")
+    op.drop_index("ix_auth_user_username_lower", table_name="auth_user")
+    op.create_index(
+        "ix_auth_user_username_lower",
+        "auth_user",
+        [sa.text("lower(username)")],
+        unique=False,
+        postgresql_ops={"lower(username)": "text_pattern_ops"},
+    )
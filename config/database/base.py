@@ -1,15 +1,101 @@
 """Module for defining base database configurations."""
 
+import logging
+import threading
+import time
+import weakref
+from collections.abc import Iterable, Iterator, Mapping
 from configparser import ConfigParser
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, TypeVar
 
-from sqlalchemy import Engine, create_engine
-from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy import Delete, Engine, Insert, Update, event
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import (
+    Mapper,
+    ORMExecuteState,
+    Session,
+    scoped_session,
+    sessionmaker,
+)
+from sqlalchemy.sql import ClauseElement
+
+from .breaker import CircuitBreaker, is_transient
+from .deadlines import check_deadline, create_deadline_engine, deadline
+from .exceptions import DeadlineExceededError
+from .leaks import SessionLeakDetector
+from .replicas import ReplicaSet, ReplicaStrategy
+from .retries import RetryPolicy
+from .sharding import HashRing
+from .sqlite import SQLiteRole, create_sqlite_engine, is_sqlite_file, load_pragmas
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_SHARD = "primary"
+
+T = TypeVar("T")
+
+
+class RoutingSession(Session):
+    """Session routing writes to the primary engine and reads to the replicas."""
+
+    def __init__(self, database: "DatabaseConnection", **kwargs: Any) -> None:
+        """
+        Initialize the RoutingSession.
+
+        Parameters
+        ----------
+        database : DatabaseConnection
+            The database connection owning the primary and replica engines.
+        **kwargs : Any
+            Keyword arguments passed to the Session.
+        """
+        super().__init__(**kwargs)
+        self.database = database
+
+    def get_bind(  # type: ignore[override]
+        self,
+        mapper: Optional[Mapper[Any]] = None,
+        clause: Optional[ClauseElement] = None,
+        **kwargs: Any,
+    ) -> Engine:
+        """
+        Return the engine a statement should be executed on.
+
+        Parameters
+        ----------
+        mapper : Optional[Mapper[Any]], optional
+            The mapper the statement targets.
+        clause : Optional[ClauseElement], optional
+            The statement being executed.
+        **kwargs : Any
+            Other keyword arguments passed by the Session.
+
+        Returns
+        -------
+        sqlalchemy.engine.Engine
+            The primary engine for writes, otherwise a read engine.
+        """
+        is_write = self._flushing or isinstance(clause, (Insert, Update, Delete))
+        return self.database.route(is_write=is_write)
 
 
 class DatabaseConnection:
     """Class for managing database connections."""
 
-    def __init__(self, config_path: str = "alembic.ini") -> None:
+    def __init__(
+        self,
+        config_path: str = "alembic.ini",
+        url: Optional[str] = None,
+        replicas: Optional[ReplicaSet] = None,
+        sticky_window: Optional[float] = None,
+        shards: Optional[Mapping[str, Engine]] = None,
+        leak_threshold: Optional[float] = None,
+        operation_timeout: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
         """
         Initialize DatabaseConnection with the specified configuration path.
 
@@ -17,9 +103,56 @@ class DatabaseConnection:
         ----------
         config_path : str, optional
             Path to the configuration file. Defaults to "alembic.ini".
+        url : Optional[str], optional
+            URL of the primary database. Read from the configuration file if not
+            provided.
+        replicas : Optional[ReplicaSet], optional
+            The read replicas. Built from the ``replica_urls`` of the ``database``
+            section of the configuration file if not provided.
+        sticky_window : Optional[float], optional
+            Seconds reads stay on the primary after a write in the same context. Read
+            from the configuration file if not provided, defaulting to 5, or to 0 for
+            the readers of a SQLite file.
+        shards : Optional[Mapping[str, Engine]], optional
+            The engines of the shards by name. Built from the ``shards`` section of the
+            configuration file if not provided. When there are shards, replicas are
+            not used.
+        leak_threshold : Optional[float], optional
+            Seconds a unit of work may hold its session before it is reported as
+            leaked. Read from the configuration file if not provided, defaulting to 30.
+            Leaks are not detected if 0.
+        operation_timeout : Optional[float], optional
+            Default time budget in seconds of an operation run inside ``deadline``.
+            Read from the configuration file if not provided, defaulting to 10.
+            Operations have no deadline if 0.
+        breaker : Optional[CircuitBreaker], optional
+            The circuit breaker of the units of work. Built from the ``breaker_*``
+            options of the configuration file if not provided.
+        retry_policy : Optional[RetryPolicy], optional
+            The policy retrying idempotent reads. Built from the ``read_retry_*``
+            options of the configuration file if not provided.
         """
         self._config_path = config_path
+        self._url = url
         self._engine: Engine | None = None
+        self._replicas = replicas
+        self._use_sqlite_readers: Optional[bool] = None if replicas is None else False
+        self._sticky_window = sticky_window
+        self._shards = dict(shards) if shards is not None else None
+        self._hash_ring: Optional[HashRing] = None
+        self._leak_threshold = leak_threshold
+        self._leak_detector: Optional[SessionLeakDetector] = None
+        self._operation_timeout = operation_timeout
+        self._breaker = breaker
+        self._has_breaker = breaker is not None
+        self._retry_policy = retry_policy
+        self._session_factory: Optional[sessionmaker[Session]] = None
+        self._sessions: weakref.WeakSet[Session] = weakref.WeakSet()
+        self._sessions_lock = threading.Lock()
+        # Guards the lazy setup, so threads sharing the connection build it once.
+        self._lock = threading.RLock()
+        self._sticky_until = ContextVar(f"sticky_until_{id(self)}", default=0.0)
+        self._use_primary = ContextVar(f"use_primary_{id(self)}", default=False)
 
     def get_engine(self) -> Engine:
         """
@@ -31,11 +164,217 @@ class DatabaseConnection:
             The database engine object.
         """
         if not self._engine:
-            config = self._load_alembic_config()
-            db_url = config.get("alembic", "sqlalchemy.url")
-            self._engine = create_engine(db_url)
+            with self._lock:
+                if not self._engine:
+                    self._engine = self._create_engine(
+                        self._get_url(),
+                        SQLiteRole.WRITER
+                        if self._uses_sqlite_readers()
+                        else SQLiteRole.SHARED,
+                    )
         return self._engine
 
+    def _get_url(self) -> str:
+        """
+        Get the URL of the primary database.
+
+        Returns
+        -------
+        str
+            The URL given to the connection, or else the one of the configuration file.
+        """
+        if self._url is None:
+            config = self._load_alembic_config()
+            self._url = config.get("alembic", "sqlalchemy.url")
+        return self._url
+
+    def _create_engine(
+        self, url: str, sqlite_role: SQLiteRole = SQLiteRole.SHARED
+    ) -> Engine:
+        """
+        Create an engine, tuned for embedded use if it connects to a SQLite file.
+
+        Parameters
+        ----------
+        url : str
+            The database URL.
+        sqlite_role : SQLiteRole, optional
+            The role of the engine if it connects to a SQLite file. Defaults to shared.
+
+        Returns
+        -------
+        sqlalchemy.engine.Engine
+            The engine.
+        """
+        if not is_sqlite_file(url):
+            return create_deadline_engine(url)
+        config = self._load_alembic_config()
+        return create_sqlite_engine(
+            url,
+            pragmas=load_pragmas(config),
+            role=sqlite_role,
+            readers=config.getint("database", "sqlite_readers", fallback=4),
+        )
+
+    def _uses_sqlite_readers(self) -> bool:
+        """
+        Check whether reads go to dedicated reader connections of a SQLite file.
+
+        This is the case when the primary is a SQLite file, no replicas are given or
+        configured, and ``sqlite_readers`` is not 0. A single writer connection then
+        serializes the writes, while the reader connections run the reads.
+
+        Returns
+        -------
+        bool
+            True if reads and writes use separate SQLite engines.
+        """
+        if self._use_sqlite_readers is None:
+            config = self._load_alembic_config()
+            self._use_sqlite_readers = (
+                not config.get("database", "replica_urls", fallback="").strip()
+                and config.getint("database", "sqlite_readers", fallback=4) > 0
+                and is_sqlite_file(self._get_url())
+            )
+        return self._use_sqlite_readers
+
+    def get_replicas(self) -> ReplicaSet:
+        """
+        Get the read replicas.
+
+        Returns
+        -------
+        ReplicaSet
+            The read replicas, which is empty if none are configured.
+        """
+        if self._replicas is None:
+            with self._lock:
+                if self._replicas is None:
+                    self._replicas = self._build_replicas()
+        return self._replicas
+
+    def _build_replicas(self) -> ReplicaSet:
+        """
+        Build the read replicas from the configuration file.
+
+        Returns
+        -------
+        ReplicaSet
+            The configured read replicas, or the reader connections of a SQLite file.
+        """
+        config = self._load_alembic_config()
+        replica_urls = config.get("database", "replica_urls", fallback="")
+        if self._uses_sqlite_readers():
+            # Readers of a SQLite file see every committed write at once.
+            if self._sticky_window is None:
+                self._sticky_window = 0.0
+            engines = [self._create_engine(self._get_url(), SQLiteRole.READER)]
+        else:
+            engines = [
+                self._create_engine(replica_url.strip())
+                for replica_url in replica_urls.split(",")
+                if replica_url.strip()
+            ]
+        return ReplicaSet(
+            engines=engines,
+            strategy=ReplicaStrategy(
+                config.get("database", "replica_strategy", fallback="round_robin")
+            ),
+            retry_interval=config.getfloat(
+                "database", "replica_retry_interval", fallback=30.0
+            ),
+        )
+
+    def get_shards(self) -> dict[str, Engine]:
+        """
+        Get the shards of the sharded tables.
+
+        Returns
+        -------
+        dict[str, Engine]
+            The shard engines by name, which is empty if sharding is not configured.
+        """
+        if self._shards is None:
+            with self._lock:
+                if self._shards is None:
+                    config = self._load_alembic_config()
+                    shard_urls = (
+                        config["shards"] if config.has_section("shards") else {}
+                    )
+                    self._shards = {
+                        name: self._create_engine(shard_url)
+                        for name, shard_url in shard_urls.items()
+                    }
+        return self._shards
+
+    def get_hash_ring(self) -> Optional[HashRing]:
+        """
+        Get the hash ring placing rows of sharded tables on the shards.
+
+        Returns
+        -------
+        Optional[HashRing]
+            The hash ring, or None if sharding is not configured.
+        """
+        if self._hash_ring is None and self.get_shards():
+            with self._lock:
+                if self._hash_ring is None:
+                    self._hash_ring = HashRing(list(self.get_shards()))
+        return self._hash_ring
+
+    def shard_for(self, key: str) -> Optional[str]:
+        """
+        Get the shard owning a shard key.
+
+        Parameters
+        ----------
+        key : str
+            The shard key, such as a username.
+
+        Returns
+        -------
+        Optional[str]
+            The name of the owning shard, or None if sharding is not configured.
+        """
+        ring = self.get_hash_ring()
+        return ring.get_shard(key) if ring else None
+
+    def partition_by_shard(self, keys: Iterable[str]) -> dict[Optional[str], list[str]]:
+        """
+        Group shard keys by their owning shard.
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            The shard keys.
+
+        Returns
+        -------
+        dict[Optional[str], list[str]]
+            The keys of each shard, or all keys under None if sharding is not
+            configured.
+        """
+        partitions: dict[Optional[str], list[str]] = {}
+        for key in keys:
+            partitions.setdefault(self.shard_for(key), []).append(key)
+        return partitions
+
+    def _get_sticky_window(self) -> float:
+        """
+        Get the number of seconds reads stay on the primary after a write.
+
+        Returns
+        -------
+        float
+            The read-your-writes window in seconds.
+        """
+        if self._sticky_window is None:
+            config = self._load_alembic_config()
+            self._sticky_window = config.getfloat(
+                "database", "sticky_window", fallback=5.0
+            )
+        return self._sticky_window
+
     def _load_alembic_config(self) -> ConfigParser:
         """
         Load the Alembic configuration file.
@@ -49,15 +388,441 @@ class DatabaseConnection:
         parser.read(self._config_path)
         return parser
 
+    def route(self, is_write: bool) -> Engine:
+        """
+        Choose the engine a statement should be executed on.
+
+        Writes always go to the primary, and so do reads shortly after a write in the
+        same context, reads inside ``use_primary``, and reads while no replica is
+        healthy. Other reads go to a replica.
+
+        Parameters
+        ----------
+        is_write : bool
+            Whether the statement writes to the database.
+
+        Returns
+        -------
+        sqlalchemy.engine.Engine
+            The engine to execute the statement on.
+        """
+        primary = self.get_engine()
+        if is_write:
+            self.mark_written()
+            return primary
+        if self._use_primary.get() or self._sticky_until.get() > time.monotonic():
+            return primary
+        return self.get_replicas().choose() or primary
+
+    def mark_written(self) -> None:
+        """
+        Route the reads of the current context to the primary for the sticky window.
+
+        Writes mark their own context, while a context whose writes were committed by
+        another thread, such as in a group commit, has to be marked once they are.
+        """
+        self._sticky_until.set(time.monotonic() + self._get_sticky_window())
+
+    @contextmanager
+    def use_primary(self) -> Iterator[None]:
+        """
+        Route every statement in the block to the primary.
+
+        Yields
+        ------
+        Iterator[None]
+        """
+        token = self._use_primary.set(True)
+        try:
+            yield
+        finally:
+            self._use_primary.reset(token)
+
+    def get_session_factory(self) -> sessionmaker[Session]:
+        """
+        Get the factory of database sessions.
+
+        Sessions place rows of sharded tables on their shards when sharding is
+        configured, and route reads to the read replicas when any are configured.
+        Objects stay readable once their session is closed, as they are not expired on
+        commit.
+
+        Returns
+        -------
+        sqlalchemy.orm.sessionmaker[Session]
+            The session factory, built once.
+        """
+        if self._session_factory is None:
+            with self._lock:
+                if self._session_factory is None:
+                    self._session_factory = self._build_session_factory()
+        return self._session_factory
+
+    def _build_session_factory(self) -> sessionmaker[Session]:
+        """
+        Build the factory of database sessions for the configured topology.
+
+        Returns
+        -------
+        sqlalchemy.orm.sessionmaker[Session]
+            A sharded, routing or plain session factory.
+        """
+        engine = self.get_engine()
+        factory: sessionmaker[Session]
+        if self.get_shards():
+            factory = sessionmaker(
+                class_=ShardedSession,
+                shards={PRIMARY_SHARD: engine, **self.get_shards()},
+                shard_chooser=self._choose_shard,
+                identity_chooser=self._choose_identity_shards,
+                execute_chooser=self._choose_execute_shards,
+                expire_on_commit=False,
+            )
+        elif self.get_replicas():
+            factory = sessionmaker(
+                class_=RoutingSession, database=self, expire_on_commit=False
+            )
+        else:
+            factory = sessionmaker(bind=engine, expire_on_commit=False)
+        event.listen(factory, "after_begin", self._track_session)
+        return factory
+
+    def _track_session(self, session: Session, *args: Any) -> None:
+        """
+        Count a session beginning a transaction among the live sessions.
+
+        Parameters
+        ----------
+        session : Session
+            The session.
+        *args : Any
+            The transaction and connection begun, unused.
+        """
+        with self._sessions_lock:
+            self._sessions.add(session)
+
+    def get_memory_stats(self) -> dict[str, int]:
+        """
+        Count the live sessions, the objects they hold and the connections in use.
+
+        Sessions are counted from their first transaction until they are garbage
+        collected, so sessions that are never released and objects piling up in
+        identity maps show up as counts growing over time.
+
+        Returns
+        -------
+        dict[str, int]
+            The number of live ``sessions``, of objects in their identity maps as
+            ``identity_map``, and of connections ``checked_out`` of the pools of the
+            primary, the replicas and the shards.
+        """
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+        engines = [
+            self.get_engine(),
+            *self.get_replicas().engines,
+            *self.get_shards().values(),
+        ]
+        return {
+            "sessions": len(sessions),
+            "identity_map": sum(len(session.identity_map) for session in sessions),
+            "checked_out": sum(
+                getattr(engine.pool, "checkedout", lambda: 0)() for engine in engines
+            ),
+        }
+
     def get_session(self) -> scoped_session[Session]:
         """
         Get a scoped database session.
 
+        Prefer ``unit_of_work``, which always releases the connection of its session.
+
         Returns
         -------
         sqlalchemy.orm.scoped_session[Session]
             A scoped session object.
         """
-        engine = self.get_engine()
-        Session = sessionmaker(bind=engine)
-        return scoped_session(Session)
+        return scoped_session(self.get_session_factory())
+
+    def get_leak_detector(self) -> Optional[SessionLeakDetector]:
+        """
+        Get the detector of sessions held for too long by units of work.
+
+        Returns
+        -------
+        Optional[SessionLeakDetector]
+            The leak detector, or None if leaks are not detected.
+        """
+        if self._leak_threshold is None:
+            config = self._load_alembic_config()
+            self._leak_threshold = config.getfloat(
+                "database", "session_leak_threshold", fallback=30.0
+            )
+        if self._leak_detector is None and self._leak_threshold > 0:
+            with self._lock:
+                if self._leak_detector is None:
+                    self._leak_detector = SessionLeakDetector(self._leak_threshold)
+        return self._leak_detector
+
+    def get_breaker(self) -> Optional[CircuitBreaker]:
+        """
+        Get the circuit breaker of the units of work.
+
+        Returns
+        -------
+        Optional[CircuitBreaker]
+            The circuit breaker, or None if its failure threshold is configured as 0.
+        """
+        if not self._has_breaker:
+            with self._lock:
+                if not self._has_breaker:
+                    config = self._load_alembic_config()
+                    failure_threshold = config.getint(
+                        "database", "breaker_failure_threshold", fallback=5
+                    )
+                    if failure_threshold > 0:
+                        self._breaker = CircuitBreaker(
+                            failure_threshold=failure_threshold,
+                            reset_timeout=config.getfloat(
+                                "database", "breaker_reset_timeout", fallback=30.0
+                            ),
+                            half_open_max_calls=config.getint(
+                                "database", "breaker_half_open_calls", fallback=1
+                            ),
+                        )
+                    self._has_breaker = True
+        return self._breaker
+
+    def get_retry_policy(self) -> RetryPolicy:
+        """
+        Get the policy retrying idempotent reads.
+
+        Returns
+        -------
+        RetryPolicy
+            The retry policy.
+        """
+        if self._retry_policy is None:
+            config = self._load_alembic_config()
+            self._retry_policy = RetryPolicy(
+                attempts=config.getint("database", "read_retry_attempts", fallback=3),
+                base_delay=config.getfloat(
+                    "database", "read_retry_base_delay", fallback=0.05
+                ),
+                max_delay=config.getfloat(
+                    "database", "read_retry_max_delay", fallback=1.0
+                ),
+            )
+        return self._retry_policy
+
+    def retry_read(self, read: Callable[[], T]) -> T:
+        """
+        Run an idempotent read, retrying it after transient failures.
+
+        Writes must not be run this way, as a write whose commit was lost with its
+        connection may have been applied anyway.
+
+        Parameters
+        ----------
+        read : Callable[[], T]
+            The read, running its own units of work.
+
+        Returns
+        -------
+        T
+            The result of the read.
+        """
+        return self.get_retry_policy().run(read)
+
+    @contextmanager
+    def deadline(self, seconds: Optional[float] = None) -> Iterator[None]:
+        """
+        Give the database work of the block a time budget.
+
+        Connection checkouts and statements of the block are cut short once the budget
+        is spent, raising DeadlineExceededError, so a slow database fails operations
+        fast instead of piling them up.
+
+        Parameters
+        ----------
+        seconds : Optional[float], optional
+            The time budget of the block. Defaults to the configured operation timeout.
+
+        Yields
+        ------
+        Iterator[None]
+        """
+        if seconds is None:
+            if self._operation_timeout is None:
+                config = self._load_alembic_config()
+                self._operation_timeout = config.getfloat(
+                    "database", "operation_timeout", fallback=10.0
+                )
+            seconds = self._operation_timeout
+        if not seconds:
+            yield
+            return
+        with deadline(seconds):
+            yield
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Session]:
+        """
+        Run one operation in its own session.
+
+        The session is committed if the block succeeds and rolled back otherwise, and
+        is always closed, returning its connection to the pool. Units of work are
+        rejected with CircuitOpenError while the circuit breaker is open, and their
+        transient failures count towards opening it, unlike their missed deadlines.
+
+        Yields
+        ------
+        Iterator[Session]
+            The session of the operation.
+        """
+        check_deadline()
+        breaker = self.get_breaker()
+        if breaker is not None:
+            breaker.before_call()
+        session = self.get_session_factory()()
+        leak_detector = self.get_leak_detector()
+        # Leave this generator and the context manager out of the stack.
+        lease = leak_detector.acquire(skip=2) if leak_detector is not None else None
+        try:
+            yield session
+            session.commit()
+        except BaseException as err:
+            session.rollback()
+            if breaker is not None:
+                if is_transient(err):
+                    breaker.record_failure()
+                elif isinstance(err, DeadlineExceededError):
+                    # Missing the deadline of one caller says nothing about the
+                    # database, which may simply be given too little time.
+                    breaker.release()
+                else:
+                    # The database answered, such as with a constraint violation.
+                    breaker.record_success()
+            raise
+        else:
+            if breaker is not None:
+                breaker.record_success()
+        finally:
+            session.close()
+            if leak_detector is not None and lease is not None:
+                leak_detector.release(lease)
+
+    def dispose(self) -> None:
+        """Close the connection pools of the primary, the replicas and the shards."""
+        if self._leak_detector is not None:
+            self._leak_detector.close()
+        if self._engine:
+            self._engine.dispose()
+        if self._replicas:
+            self._replicas.dispose()
+        for shard in (self._shards or {}).values():
+            shard.dispose()
+
+    def _choose_shard(
+        self, mapper: Optional[Mapper[Any]], instance: Any, clause: Any = None
+    ) -> str:
+        """
+        Choose the shard an instance is written to.
+
+        Parameters
+        ----------
+        mapper : Optional[Mapper[Any]]
+            The mapper of the instance.
+        instance : Any
+            The instance being written, if any.
+        clause : Any, optional
+            The statement being executed, if any.
+
+        Returns
+        -------
+        str
+            The shard owning the instance for sharded tables, otherwise the primary.
+        """
+        shard_key = self._get_shard_key_column(mapper)
+        if shard_key and instance is not None:
+            return self.shard_for(getattr(instance, shard_key)) or PRIMARY_SHARD
+        return PRIMARY_SHARD
+
+    def _choose_identity_shards(
+        self,
+        mapper: Mapper[Any],
+        primary_key: Any,
+        *,
+        lazy_loaded_from: Any,
+        **kwargs: Any,
+    ) -> list[str]:
+        """
+        Choose the shards to search for a primary key.
+
+        Parameters
+        ----------
+        mapper : Mapper[Any]
+            The mapper of the entity.
+        primary_key : Any
+            The primary key being looked up.
+        lazy_loaded_from : Any
+            The state the entity is lazily loaded from, if any.
+        **kwargs : Any
+            Other keyword arguments passed by the ShardedSession.
+
+        Returns
+        -------
+        list[str]
+            Every shard for sharded tables, as primary keys are local to a shard,
+            otherwise the primary.
+        """
+        if lazy_loaded_from is not None:
+            return [lazy_loaded_from.identity_token]
+        if self._get_shard_key_column(mapper):
+            return list(self.get_shards())
+        return [PRIMARY_SHARD]
+
+    def _choose_execute_shards(self, orm_context: ORMExecuteState) -> list[str]:
+        """
+        Choose the shards a statement is executed on.
+
+        Statements carrying a ``shard_key`` execution option run on the shard owning
+        that key. Other statements on sharded tables run on every shard.
+
+        Parameters
+        ----------
+        orm_context : ORMExecuteState
+            The statement being executed.
+
+        Returns
+        -------
+        list[str]
+            The shards to execute the statement on.
+        """
+        shard_key = orm_context.execution_options.get("shard_key")
+        if shard_key is not None:
+            return [self.shard_for(shard_key) or PRIMARY_SHARD]
+        if self._get_shard_key_column(orm_context.bind_mapper):
+            return list(self.get_shards())
+        return [PRIMARY_SHARD]
+
+    @staticmethod
+    def _get_shard_key_column(mapper: Optional[Mapper[Any]]) -> Optional[str]:
+        """
+        Get the shard key column declared by the table of a mapper.
+
+        Parameters
+        ----------
+        mapper : Optional[Mapper[Any]]
+            The mapper of the entity.
+
+        Returns
+        -------
+        Optional[str]
+            The ``shard_key`` of the table info, or None for non-sharded tables.
+        """
+        if mapper is None:
+            return None
+        info = getattr(mapper.local_table, "info", {})
+        shard_key: Optional[str] = info.get("shard_key")
+        return shard_key
@@ -0,0 +1,230 @@
+"""Module for failing fast while the database is unreachable."""
+
+import logging
+import threading
+import time
+from enum import StrEnum
+from typing import Callable, Optional
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+StateListener = Callable[["CircuitState", "CircuitState"], None]
+
+
+class CircuitState(StrEnum):
+    """An enumeration class representing the states of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Check whether an error comes from a database that is unreachable or restarting.
+
+    Parameters
+    ----------
+    error : BaseException
+        The error raised by a database operation.
+
+    Returns
+    -------
+    bool
+        True for lost connections, failed connection attempts, and errors of the
+        connection exception (08) and operator intervention (57P0) SQLSTATE classes,
+        such as a server shutting down. False for the other errors, such as constraint
+        violations, lock timeouts or cancelled statements, which the database answered.
+    """
+    if not isinstance(error, DBAPIError):
+        return False
+    if error.connection_invalidated:
+        return True
+    if (
+        isinstance(error, (OperationalError, InterfaceError))
+        and error.statement is None
+    ):
+        # Raised while connecting, before any statement was sent.
+        return True
+    orig = error.orig
+    sqlstate = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return isinstance(sqlstate, str) and sqlstate.startswith(("08", "57P0"))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker rejecting database operations after repeated transient failures.
+
+    The circuit is closed while operations succeed. It opens after
+    ``failure_threshold`` consecutive transient failures, and operations are then
+    rejected without touching the database. After ``reset_timeout`` seconds it is half
+    open and lets ``half_open_max_calls`` trial operations through: it closes again if
+    they succeed, and opens again as soon as one fails.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        """
+        Initialize the CircuitBreaker, closed.
+
+        Parameters
+        ----------
+        failure_threshold : int, optional
+            Consecutive transient failures opening the circuit. Defaults to 5.
+        reset_timeout : float, optional
+            Seconds the circuit stays open before trial operations. Defaults to 30.0.
+        half_open_max_calls : int, optional
+            Trial operations let through at once while half open. Defaults to 1.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._listeners: list[StateListener] = []
+
+    @property
+    def state(self) -> CircuitState:
+        """
+        Current state of the circuit.
+
+        Returns
+        -------
+        CircuitState
+            The state, which turns half open once the reset timeout has elapsed.
+        """
+        with self._lock:
+            if self._is_reset_due():
+                return CircuitState.HALF_OPEN
+            return self._state
+
+    def listen(self, listener: StateListener) -> None:
+        """
+        Call a function on every state change of the circuit.
+
+        Parameters
+        ----------
+        listener : StateListener
+            Function taking the previous and the new state. It is called without the
+            lock of the breaker held.
+        """
+        self._listeners.append(listener)
+
+    def before_call(self) -> None:
+        """
+        Let an operation through, or reject it while the circuit is open.
+
+        Raises
+        ------
+        CircuitOpenError
+            If the circuit is open, or half open with all trials already running.
+        """
+        with self._lock:
+            transition = None
+            if self._is_reset_due():
+                transition = self._set_state(CircuitState.HALF_OPEN)
+            if self._state == CircuitState.OPEN:
+                retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+                raise CircuitOpenError(
+                    f"Database circuit is open, retrying in {retry_in:.1f} seconds."
+                )
+            if self._state == CircuitState.HALF_OPEN:
+                if self._trials >= self.half_open_max_calls:
+                    raise CircuitOpenError("Database circuit is half open and busy.")
+                self._trials += 1
+        self._notify(transition)
+
+    def record_success(self) -> None:
+        """Record an operation reaching the database, closing a half open circuit."""
+        with self._lock:
+            self._failures = 0
+            transition = None
+            if self._state == CircuitState.HALF_OPEN:
+                transition = self._set_state(CircuitState.CLOSED)
+        self._notify(transition)
+
+    def release(self) -> None:
+        """Record an operation telling nothing about the database, freeing its trial."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record_failure(self) -> None:
+        """Record a transient failure, opening the circuit past the threshold."""
+        with self._lock:
+            self._failures += 1
+            transition = None
+            if self._state == CircuitState.HALF_OPEN or (
+                self._state == CircuitState.CLOSED
+                and self._failures >= self.failure_threshold
+            ):
+                transition = self._set_state(CircuitState.OPEN)
+        self._notify(transition)
+
+    def _is_reset_due(self) -> bool:
+        """
+        Check whether an open circuit should let trial operations through.
+
+        Returns
+        -------
+        bool
+            True if the circuit is open and its reset timeout has elapsed.
+        """
+        return (
+            self._state == CircuitState.OPEN
+            and time.monotonic() >= self._opened_at + self.reset_timeout
+        )
+
+    def _set_state(self, state: CircuitState) -> tuple[CircuitState, CircuitState]:
+        """
+        Change the state of the circuit, with the lock held.
+
+        Parameters
+        ----------
+        state : CircuitState
+            The new state.
+
+        Returns
+        -------
+        tuple[CircuitState, CircuitState]
+            The previous and the new state.
+        """
+        previous, self._state = self._state, state
+        self._trials = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CircuitState.CLOSED:
+            self._failures = 0
+        return previous, state
+
+    def _notify(self, transition: Optional[tuple[CircuitState, CircuitState]]) -> None:
+        """
+        Log a state change and call the listeners.
+
+        Parameters
+        ----------
+        transition : Optional[tuple[CircuitState, CircuitState]]
+            The previous and the new state, or None if the state did not change.
+        """
+        if transition is None:
+            return
+        previous, state = transition
+        log = logger.warning if state == CircuitState.OPEN else logger.info
+        log(f"Database circuit changed from {previous} to {state}.")
+        for listener in self._listeners:
+            try:
+                listener(previous, state)
+            except Exception:
+                logger.exception("Circuit breaker listener failed.")
@@ -0,0 +1,284 @@
+"""Module for enforcing per-operation deadlines on database work."""
+
+import logging
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional, cast
+
+from sqlalchemy import Engine, create_engine, event, exc
+from sqlalchemy.engine import URL, ExceptionContext, make_url
+from sqlalchemy.engine.default import DefaultDialect
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
+
+from .exceptions import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+# SQLite virtual machine instructions between two checks of the deadline.
+SQLITE_PROGRESS_INTERVAL = 1000
+
+# Seconds a PostgreSQL statement may overrun the deadline before the statement timeout
+# of its transaction is shortened.
+STATEMENT_TIMEOUT_SLACK = 0.1
+
+# Key of the statement timeout set in the transaction of a connection, in its info.
+_STATEMENT_TIMEOUT = "deadline_statement_timeout"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Give the database work of the block at most a number of seconds.
+
+    The deadline is carried by the context, so it follows the operation through the
+    service, the Business Logic Layer and the Data Access Layer, and into thread pool
+    tasks submitted with a copy of the context. A nested deadline never extends the
+    enclosing one.
+
+    Parameters
+    ----------
+    seconds : float
+        The time budget of the block.
+
+    Yields
+    ------
+    Iterator[None]
+    """
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires_at if current is None else min(current, expires_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Get the time left before the deadline of the current operation.
+
+    Returns
+    -------
+    Optional[float]
+        The seconds left, which are negative once the deadline has passed, or None if
+        the operation has no deadline.
+    """
+    expires_at = _deadline.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def check_deadline() -> None:
+    """
+    Fail if the deadline of the current operation has passed.
+
+    Raises
+    ------
+    DeadlineExceededError
+        If the operation has run out of time.
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(
+            f"Operation exceeded its deadline by {-left:.3f} seconds."
+        )
+
+
+class DeadlineQueuePool(QueuePool):
+    """Queue pool waiting for a connection no longer than the current deadline."""
+
+    @property
+    def _timeout(self) -> float:
+        """
+        Seconds to wait for a connection to be returned to the pool.
+
+        Returns
+        -------
+        float
+            The configured timeout, shortened to the time left before the deadline.
+        """
+        left = remaining()
+        if left is None:
+            return self._checkout_timeout
+        return max(0.0, min(self._checkout_timeout, left))
+
+    @_timeout.setter
+    def _timeout(self, value: float) -> None:
+        """
+        Set the configured timeout of the pool.
+
+        Parameters
+        ----------
+        value : float
+            Seconds to wait for a connection without a deadline.
+        """
+        self._checkout_timeout = value
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        """
+        Check a connection out, failing fast once the deadline has passed.
+
+        Returns
+        -------
+        ConnectionPoolEntry
+            The checked out connection.
+
+        Raises
+        ------
+        DeadlineExceededError
+            If the deadline passes before a connection is available.
+        """
+        check_deadline()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError as err:
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceededError(
+                    "Operation exceeded its deadline waiting for a connection."
+                ) from err
+            raise
+
+
+def create_deadline_engine(url: str | URL, **kwargs: Any) -> Engine:
+    """
+    Create an engine enforcing the deadline of the current operation.
+
+    Connection checkouts wait no longer than the deadline, when the dialect pools its
+    connections in a queue. Statements are given the time left as their timeout on
+    PostgreSQL, and are interrupted by a progress handler on SQLite.
+
+    Parameters
+    ----------
+    url : str | URL
+        The database URL.
+    **kwargs : Any
+        Keyword arguments passed to ``create_engine``.
+
+    Returns
+    -------
+    sqlalchemy.engine.Engine
+        The engine.
+    """
+    database_url = make_url(url)
+    dialect = cast(type[DefaultDialect], database_url.get_dialect())
+    pool_class = dialect.get_pool_class(database_url)
+    if "poolclass" not in kwargs and issubclass(pool_class, QueuePool):
+        kwargs["poolclass"] = DeadlineQueuePool
+    engine = create_engine(database_url, **kwargs)
+    enforce_deadlines(engine)
+    return engine
+
+
+def enforce_deadlines(engine: Engine) -> None:
+    """
+    Listen to the statements of an engine to enforce the deadline of each.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine whose statements are limited.
+    """
+    dialect = engine.dialect.name
+
+    def before_cursor_execute(
+        connection: Any, cursor: Any, *args: Any, **kwargs: Any
+    ) -> None:
+        left = remaining()
+        if dialect == "sqlite":
+            _set_sqlite_progress_handler(cursor.connection, left)
+        if left is None:
+            return
+        check_deadline()
+        if dialect == "postgresql":
+            _set_statement_timeout(connection.info, cursor, left)
+
+    def on_error(context: ExceptionContext) -> Optional[BaseException]:
+        if isinstance(context.original_exception, DeadlineExceededError):
+            return None
+        left = remaining()
+        if left is None or left > 0:
+            return None
+        error = DeadlineExceededError(
+            f"Statement interrupted as the operation exceeded its deadline by "
+            f"{-left:.3f} seconds."
+        )
+        error.__cause__ = context.original_exception
+        return error
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "handle_error", on_error)
+    if dialect == "postgresql":
+        _forget_statement_timeouts(engine)
+
+
+def _forget_statement_timeouts(engine: Engine) -> None:
+    """
+    Forget the statement timeout of a connection when its transaction ends.
+
+    A timeout set with ``SET LOCAL`` ends with its transaction, or with the savepoint
+    rolled back, and must be set again in the next one.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine of the connections.
+    """
+
+    def forget(connection: Any, *args: Any) -> None:
+        connection.info.pop(_STATEMENT_TIMEOUT, None)
+
+    for name in ("begin", "commit", "rollback", "rollback_savepoint"):
+        event.listen(engine, name, forget)
+
+
+def _set_statement_timeout(info: dict[Any, Any], cursor: Any, left: float) -> None:
+    """
+    Give the statements of a PostgreSQL transaction the time left as their timeout.
+
+    The timeout is set once per transaction, and only set again once the time left
+    falls below it by more than ``STATEMENT_TIMEOUT_SLACK``, so most statements cost
+    no extra round trip.
+
+    Parameters
+    ----------
+    info : dict[Any, Any]
+        The info of the connection, holding the timeout set in its transaction.
+    cursor : Any
+        The DBAPI cursor about to execute a statement.
+    left : float
+        Seconds left before the deadline.
+    """
+    timeout = info.get(_STATEMENT_TIMEOUT)
+    if timeout is not None and timeout - left <= STATEMENT_TIMEOUT_SLACK:
+        return
+    milliseconds = max(1, int(left * 1000))
+    # Local to the transaction, so it never outlives the operation.
+    cursor.execute(f"SET LOCAL statement_timeout = {milliseconds}")
+    info[_STATEMENT_TIMEOUT] = milliseconds / 1000
+
+
+def _set_sqlite_progress_handler(
+    connection: sqlite3.Connection, left: Optional[float]
+) -> None:
+    """
+    Interrupt the statements of a SQLite connection once a deadline passes.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        The DBAPI connection about to execute a statement.
+    left : Optional[float]
+        Seconds left before the deadline, or None to remove the handler.
+    """
+    if left is None:
+        connection.set_progress_handler(None, 0)
+        return
+    expires_at = time.monotonic() + left
+    connection.set_progress_handler(
+        lambda: time.monotonic() >= expires_at, SQLITE_PROGRESS_INTERVAL
+    )
@@ -0,0 +1,9 @@
+"""Module containing custom exceptions for database operations."""
+
+
+class DeadlineExceededError(Exception):
+    """Exception raised when an operation runs out of its time budget."""
+
+
+class CircuitOpenError(Exception):
+    """Exception raised when the database is skipped after repeated failures."""
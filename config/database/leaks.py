@@ -0,0 +1,189 @@
+"""Module for detecting database sessions held for too long."""
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from itertools import count
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionLease:
+    """Record of a session acquired by a unit of work."""
+
+    __slots__ = ("acquired_at", "id", "reported", "stack", "thread_name")
+
+    def __init__(self, lease_id: int, stack: list[tuple[str, int, str, None]]) -> None:
+        """
+        Initialize the SessionLease.
+
+        Parameters
+        ----------
+        lease_id : int
+            The unique id of the lease.
+        stack : list[tuple[str, int, str, None]]
+            The file, line and function of each frame that acquired the session,
+            outermost first.
+        """
+        self.id = lease_id
+        self.stack = stack
+        self.acquired_at = time.monotonic()
+        self.thread_name = threading.current_thread().name
+        self.reported = False
+
+    @property
+    def age(self) -> float:
+        """
+        Seconds the session has been held for.
+
+        Returns
+        -------
+        float
+            The seconds since the session was acquired.
+        """
+        return time.monotonic() - self.acquired_at
+
+    def format_stack(self) -> str:
+        """
+        Format the stack that acquired the session, like a traceback.
+
+        Returns
+        -------
+        str
+            The formatted frames, with their source lines.
+        """
+        return "".join(traceback.StackSummary.from_list(self.stack).format())
+
+
+class SessionLeakDetector:
+    """
+    Report sessions held longer than a threshold, with the stack that acquired them.
+
+    The stack is captured as bare file, line and function triples when a session is
+    acquired, and its source lines are only looked up when a leak is reported. A
+    daemon thread checks the sessions still held every ``check_interval`` seconds, and
+    each leaked session is reported once.
+    """
+
+    def __init__(
+        self, threshold: float, check_interval: Optional[float] = None
+    ) -> None:
+        """
+        Initialize the SessionLeakDetector.
+
+        Parameters
+        ----------
+        threshold : float
+            Seconds a session may be held before it is reported.
+        check_interval : Optional[float], optional
+            Seconds between checks of the sessions still held. Defaults to half the
+            threshold.
+        """
+        self.threshold = threshold
+        self._check_interval = check_interval or threshold / 2
+        self._ids = count()
+        self._leases: dict[int, SessionLease] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        """
+        Return the number of sessions currently held.
+
+        Returns
+        -------
+        int
+            The number of leases not released yet.
+        """
+        return len(self._leases)
+
+    def acquire(self, skip: int = 1) -> SessionLease:
+        """
+        Record that a session was acquired, starting the checks if needed.
+
+        Parameters
+        ----------
+        skip : int, optional
+            The number of innermost frames left out of the stack. Defaults to 1, which
+            leaves out the caller of ``acquire``.
+
+        Returns
+        -------
+        SessionLease
+            The lease to release once the session is closed.
+        """
+        stack = []
+        frame = sys._getframe(skip + 1)
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, frame.f_lineno, code.co_name, None))
+            frame = frame.f_back  # type: ignore[assignment]
+        stack.reverse()
+
+        lease = SessionLease(next(self._ids), stack)
+        with self._lock:
+            self._leases[lease.id] = lease
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="session-leak-detector", daemon=True
+                )
+                self._thread.start()
+        return lease
+
+    def release(self, lease: SessionLease) -> None:
+        """
+        Record that a session was closed.
+
+        Parameters
+        ----------
+        lease : SessionLease
+            The lease returned when the session was acquired.
+        """
+        with self._lock:
+            self._leases.pop(lease.id, None)
+        if lease.reported:
+            logger.warning(
+                f"Session reported as leaked was released after {lease.age:.1f} "
+                "seconds."
+            )
+
+    def check(self) -> list[SessionLease]:
+        """
+        Report the sessions held longer than the threshold and not reported yet.
+
+        Returns
+        -------
+        list[SessionLease]
+            The newly reported leases.
+        """
+        with self._lock:
+            leaked = [
+                lease
+                for lease in self._leases.values()
+                if not lease.reported and lease.age > self.threshold
+            ]
+        for lease in leaked:
+            lease.reported = True
+            logger.warning(
+                f"Session held for {lease.age:.1f} seconds by thread "
+                f"{lease.thread_name}, acquired at:\n{lease.format_stack()}"
+            )
+        return leaked
+
+    def close(self) -> None:
+        """Stop checking the sessions still held."""
+        self._stopped.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            thread.join()
+
+    def _run(self) -> None:
+        """Check the sessions still held periodically until closed."""
+        while not self._stopped.wait(self._check_interval):
+            self.check()
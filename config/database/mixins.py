@@ -6,6 +6,18 @@ from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column
 
 
+def utcnow() -> datetime:
+    """
+    Return the current time in UTC, evaluated on every insert or update.
+
+    Returns
+    -------
+    datetime
+        The current time in UTC.
+    """
+    return datetime.now(timezone.utc)
+
+
 class IdMixin:
     """Mixin class providing an auto-incrementing integer primary key attribute."""
 
@@ -17,9 +29,9 @@ class IdMixin:
 class TimestampMixin:
     """A mixin class to add created_at and modified_at timestamp fields."""
 
-    created_at: Mapped[datetime] = mapped_column(default=datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(default=utcnow)
     modified_at: Mapped[Optional[datetime]] = mapped_column(
-        default=None, nullable=True, onupdate=datetime.now(timezone.utc)
+        default=None, nullable=True, onupdate=utcnow
     )
 
 
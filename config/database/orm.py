@@ -1,7 +1,76 @@
 """Module provides ORM functionality for database interaction."""
 
+from typing import Any, ClassVar
+
+from sqlalchemy import String, Table
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.functions import FunctionElement
 
 
 class Base(DeclarativeBase):
     """Base class for declarative ORM models."""
+
+    # Every model is mapped to a table, which Core statements can target directly.
+    __table__: ClassVar[Table]
+
+
+class bytewise(FunctionElement[str]):
+    """
+    A text expression compared by code point, whatever the collation of the database.
+
+    Ordering and seeking on it gives the order of Python strings, so keys read from
+    several databases can be merged in Python, and a cursor taken from the last row of
+    a page points exactly past it. SQLite compares text bytewise already, and
+    PostgreSQL does with the ``C`` collation.
+    """
+
+    type = String()
+    inherit_cache = True
+
+
+@compiles(bytewise)  # type: ignore[no-untyped-call,untyped-decorator]
+def _compile_bytewise(element: bytewise, compiler: SQLCompiler, **kw: Any) -> str:
+    """
+    Compile a bytewise expression for databases comparing text bytewise by default.
+
+    Parameters
+    ----------
+    element : bytewise
+        The expression.
+    compiler : SQLCompiler
+        The compiler of the statement.
+    **kw : Any
+        The options of the compiler.
+
+    Returns
+    -------
+    str
+        The wrapped expression, unchanged.
+    """
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(bytewise, "postgresql")  # type: ignore[no-untyped-call,untyped-decorator]
+def _compile_bytewise_postgresql(
+    element: bytewise, compiler: SQLCompiler, **kw: Any
+) -> str:
+    """
+    Compile a bytewise expression for PostgreSQL, in the ``C`` collation.
+
+    Parameters
+    ----------
+    element : bytewise
+        The expression.
+    compiler : SQLCompiler
+        The compiler of the statement.
+    **kw : Any
+        The options of the compiler.
+
+    Returns
+    -------
+    str
+        The wrapped expression, collated bytewise.
+    """
+    return f'({compiler.process(element.clauses, **kw)}) COLLATE "C"'
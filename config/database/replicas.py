@@ -0,0 +1,183 @@
+"""Module for selecting read replica engines."""
+
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from enum import StrEnum
+from typing import Any, Optional
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaStrategy(StrEnum):
+    """An enumeration class representing replica selection strategies."""
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_LOADED = "least_loaded"
+
+
+class ReplicaSet:
+    """
+    Class for selecting a healthy read replica engine.
+
+    The load of each replica is the number of connections currently checked out of its
+    pool. A replica is considered unhealthy for ``retry_interval`` seconds after it
+    fails to connect or loses its connection, and is skipped during that time.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[Engine],
+        strategy: ReplicaStrategy = ReplicaStrategy.ROUND_ROBIN,
+        retry_interval: float = 30.0,
+    ) -> None:
+        """
+        Initialize the ReplicaSet and start tracking its engines.
+
+        Parameters
+        ----------
+        engines : Sequence[Engine]
+            The engines connected to the read replicas.
+        strategy : ReplicaStrategy, optional
+            How to select a replica. Defaults to round robin.
+        retry_interval : float, optional
+            Seconds an unhealthy replica is skipped for. Defaults to 30.0.
+        """
+        self.engines = list(engines)
+        self.strategy = ReplicaStrategy(strategy)
+        self._retry_interval = retry_interval
+
+        self._lock = threading.Lock()
+        self._cycle = itertools.cycle(range(len(self.engines)))
+        self._loads = [0] * len(self.engines)
+        self._unhealthy_until = [0.0] * len(self.engines)
+
+        for index, engine in enumerate(self.engines):
+            self._track(index, engine)
+
+    def __len__(self) -> int:
+        """
+        Return the number of replicas.
+
+        Returns
+        -------
+        int
+            The number of replica engines.
+        """
+        return len(self.engines)
+
+    def choose(self) -> Optional[Engine]:
+        """
+        Choose a healthy replica according to the selection strategy.
+
+        Returns
+        -------
+        Optional[Engine]
+            The chosen replica engine, or None if no replica is healthy.
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [
+                index
+                for index, until in enumerate(self._unhealthy_until)
+                if until <= now
+            ]
+            if not healthy:
+                return None
+
+            if self.strategy == ReplicaStrategy.LEAST_LOADED:
+                index = min(healthy, key=lambda index: self._loads[index])
+            else:
+                index = next(self._cycle)
+                while index not in healthy:
+                    index = next(self._cycle)
+        return self.engines[index]
+
+    def is_healthy(self, engine: Engine) -> bool:
+        """
+        Check whether a replica is currently considered healthy.
+
+        Parameters
+        ----------
+        engine : Engine
+            The replica engine.
+
+        Returns
+        -------
+        bool
+            True if the replica is not being skipped, False otherwise.
+        """
+        index = self.engines.index(engine)
+        return self._unhealthy_until[index] <= time.monotonic()
+
+    def load(self, engine: Engine) -> int:
+        """
+        Get the number of connections checked out of a replica.
+
+        Parameters
+        ----------
+        engine : Engine
+            The replica engine.
+
+        Returns
+        -------
+        int
+            The number of checked out connections.
+        """
+        return self._loads[self.engines.index(engine)]
+
+    def mark_unhealthy(self, engine: Engine) -> None:
+        """
+        Skip a replica for the retry interval.
+
+        Parameters
+        ----------
+        engine : Engine
+            The replica engine that failed.
+        """
+        index = self.engines.index(engine)
+        with self._lock:
+            self._unhealthy_until[index] = time.monotonic() + self._retry_interval
+        logger.warning(
+            f"Replica {engine.url!r} is unhealthy, skipping it for "
+            f"{self._retry_interval} seconds."
+        )
+
+    def dispose(self) -> None:
+        """Close the connection pools of all replicas."""
+        for engine in self.engines:
+            engine.dispose()
+
+    def _track(self, index: int, engine: Engine) -> None:
+        """
+        Listen to pool and error events of a replica engine.
+
+        Parameters
+        ----------
+        index : int
+            The position of the engine in the set.
+        engine : Engine
+            The replica engine.
+        """
+
+        def on_checkout(*args: Any) -> None:
+            with self._lock:
+                self._loads[index] += 1
+
+        def on_checkin(*args: Any) -> None:
+            with self._lock:
+                self._loads[index] -= 1
+
+        def on_error(context: ExceptionContext) -> None:
+            # Errors raised without a connection happened while connecting.
+            if context.is_disconnect or context.connection is None:
+                self.mark_unhealthy(engine)
+
+        event.listen(engine.pool, "checkout", on_checkout)
+        event.listen(engine.pool, "checkin", on_checkin)
+        event.listen(engine, "handle_error", on_error)
@@ -0,0 +1,98 @@
+"""Module for retrying idempotent database reads after transient failures."""
+
+import logging
+import random
+import time
+from typing import Callable, TypeVar
+
+from .breaker import is_transient
+from .deadlines import remaining
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RetryPolicy:
+    """
+    Bounded retries with jittered exponential backoff.
+
+    Only transient failures, such as lost connections, are retried, and only up to
+    ``attempts`` attempts in total. Before retry ``n``, the policy sleeps for a random
+    delay between 0 and ``min(max_delay, base_delay * 2 ** n)``, so clients failing
+    together do not retry together. A retry that would outlive the deadline of the
+    operation is not attempted. Only idempotent operations, such as reads, may be
+    retried.
+    """
+
+    def __init__(
+        self, attempts: int = 3, base_delay: float = 0.05, max_delay: float = 1.0
+    ) -> None:
+        """
+        Initialize the RetryPolicy.
+
+        Parameters
+        ----------
+        attempts : int, optional
+            Maximum number of attempts, including the first one. Defaults to 3.
+        base_delay : float, optional
+            Seconds of the backoff before jitter, doubled on each retry. Defaults to
+            0.05.
+        max_delay : float, optional
+            Upper bound in seconds of a single backoff. Defaults to 1.0.
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, retry: int) -> float:
+        """
+        Draw the delay before a retry.
+
+        Parameters
+        ----------
+        retry : int
+            The number of the retry, starting at 0.
+
+        Returns
+        -------
+        float
+            The delay in seconds.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+    def run(self, operation: Callable[[], T]) -> T:
+        """
+        Run an idempotent operation, retrying it after transient failures.
+
+        Parameters
+        ----------
+        operation : Callable[[], T]
+            The operation.
+
+        Returns
+        -------
+        T
+            The result of the first successful attempt.
+
+        Raises
+        ------
+        Exception
+            The error of the last attempt, or any error that is not transient.
+        """
+        for retry in range(self.attempts):
+            try:
+                return operation()
+            except Exception as err:
+                if not is_transient(err) or retry + 1 >= self.attempts:
+                    raise
+                delay = self.backoff(retry)
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise
+                logger.warning(
+                    f"Transient database failure, retrying in {delay:.3f} seconds: "
+                    f"{err}"
+                )
+                time.sleep(delay)
+        raise ValueError("A retry policy needs at least one attempt.")
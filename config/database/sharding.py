@@ -0,0 +1,284 @@
+"""Module for placing rows on database shards by consistent hashing."""
+
+import bisect
+import logging
+from collections.abc import Mapping, Sequence
+from hashlib import blake2b
+from typing import Any, Optional
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Engine,
+    RowMapping,
+    Table,
+    delete,
+    insert,
+    select,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_shard_key(key: str) -> str:
+    """
+    Normalize a shard key, so that equivalent keys are placed on the same shard.
+
+    Parameters
+    ----------
+    key : str
+        The shard key, such as a username.
+
+    Returns
+    -------
+    str
+        The key without surrounding whitespace and in case-folded form.
+    """
+    return key.strip().casefold()
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to shard names.
+
+    Each shard is placed on the ring at ``replicas`` points, so keys spread evenly and
+    adding a shard only moves about ``1 / len(shards)`` of the keys.
+    """
+
+    def __init__(self, shards: Sequence[str], replicas: int = 128) -> None:
+        """
+        Initialize the HashRing.
+
+        Parameters
+        ----------
+        shards : Sequence[str]
+            The names of the shards.
+        replicas : int, optional
+            The number of points of each shard on the ring. Defaults to 128.
+
+        Raises
+        ------
+        ValueError
+            If no shard is given.
+        """
+        if not shards:
+            raise ValueError("A hash ring needs at least one shard.")
+        self.shards = list(shards)
+        points = sorted(
+            (self._hash(f"{shard}#{replica}"), shard)
+            for shard in self.shards
+            for replica in range(replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def get_shard(self, key: str) -> str:
+        """
+        Get the shard owning a key.
+
+        Parameters
+        ----------
+        key : str
+            The shard key. It is normalized before being hashed.
+
+        Returns
+        -------
+        str
+            The name of the owning shard.
+        """
+        point = self._hash(normalize_shard_key(key))
+        index = bisect.bisect(self._points, point) % len(self._points)
+        return self._owners[index]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        """
+        Hash a value to a point on the ring.
+
+        Parameters
+        ----------
+        value : str
+            The value to hash.
+
+        Returns
+        -------
+        int
+            A 64-bit point on the ring.
+        """
+        return int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def reshard(
+    shards: Mapping[str, Engine],
+    ring: HashRing,
+    table: Table,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+    sources: Optional[Mapping[str, Engine]] = None,
+) -> dict[str, int]:
+    """
+    Move the rows of a sharded table to the shards owning them on a hash ring.
+
+    Each source is walked in primary key order, one batch at a time, in a transaction
+    locking the rows of the batch. Misplaced rows are copied to their owners, then
+    deleted from the source before its transaction commits, so they cannot change
+    between the copy and the deletion. A row whose key is already present on the owner
+    is only deleted if the owner holds the same values, as left by an interrupted run,
+    which can simply be started again. Rows conflicting with a different row on the
+    owner are logged and left in place. The primary key is not copied, as it is only
+    unique within a shard.
+
+    Parameters
+    ----------
+    shards : Mapping[str, Engine]
+        The engines of all shards, including newly added ones, by name.
+    ring : HashRing
+        The hash ring placing the rows.
+    table : Table
+        The sharded table, naming its unique shard key column in
+        ``table.info["shard_key"]`` and having a single-column primary key.
+    batch_size : int, optional
+        The number of rows read per batch. Defaults to 1000.
+    dry_run : bool, optional
+        Whether to only count the misplaced rows. Defaults to False.
+    sources : Optional[Mapping[str, Engine]], optional
+        The engines to move rows away from, by name. Sources off the ring, such as the
+        primary holding the rows written before sharding was configured, have all
+        their rows moved. Defaults to the shards.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of rows moved, or to be moved, away from each source.
+    """
+    (primary_key,) = table.primary_key.columns
+    moved: dict[str, int] = {}
+
+    for name, engine in (shards if sources is None else sources).items():
+        moved[name] = 0
+        last_id = None
+        while True:
+            stmt = select(table).order_by(primary_key).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(primary_key > last_id)
+            if not dry_run:
+                stmt = stmt.with_for_update()
+            with engine.begin() as connection:
+                rows = connection.execute(stmt).mappings().all()
+                if not rows:
+                    break
+                last_id = rows[-1][primary_key]
+                moved[name] += _move_batch(
+                    connection, name, rows, shards, ring, table, dry_run
+                )
+        logger.info(f"Moved {moved[name]} rows away from {name}.")
+    return moved
+
+
+def _move_batch(
+    connection: Connection,
+    name: str,
+    rows: Sequence[RowMapping],
+    shards: Mapping[str, Engine],
+    ring: HashRing,
+    table: Table,
+    dry_run: bool,
+) -> int:
+    """
+    Copy the misplaced rows of a batch to their owners and delete them from the source.
+
+    Parameters
+    ----------
+    connection : Connection
+        The connection of the source, in the transaction that read the batch.
+    name : str
+        The name of the source.
+    rows : Sequence[RowMapping]
+        The rows of the batch.
+    shards : Mapping[str, Engine]
+        The engines of all shards, by name.
+    ring : HashRing
+        The hash ring placing the rows.
+    table : Table
+        The sharded table.
+    dry_run : bool
+        Whether to only count the misplaced rows.
+
+    Returns
+    -------
+    int
+        The number of rows moved, or to be moved, away from the source.
+    """
+    (primary_key,) = table.primary_key.columns
+    key_column = table.columns[table.info["shard_key"]]
+    misplaced: dict[str, list[RowMapping]] = {}
+    for row in rows:
+        owner = ring.get_shard(row[key_column])
+        if owner != name:
+            misplaced.setdefault(owner, []).append(row)
+    if dry_run:
+        return sum(len(batch) for batch in misplaced.values())
+
+    copied = [
+        row
+        for owner, batch in misplaced.items()
+        for row in _copy_rows(shards[owner], table, key_column, batch)
+    ]
+    if copied:
+        connection.execute(
+            delete(table).where(primary_key.in_([row[primary_key] for row in copied]))
+        )
+    return len(copied)
+
+
+def _copy_rows(
+    engine: Engine, table: Table, key_column: Column[Any], rows: list[RowMapping]
+) -> list[RowMapping]:
+    """
+    Insert rows into a shard, skipping the rows it already holds.
+
+    Parameters
+    ----------
+    engine : Engine
+        The engine of the target shard.
+    table : Table
+        The sharded table.
+    key_column : Column[Any]
+        The unique shard key column.
+    rows : list[RowMapping]
+        The rows to copy.
+
+    Returns
+    -------
+    list[RowMapping]
+        The rows now held by the shard, leaving out those whose key it holds with
+        other values.
+    """
+    (primary_key,) = table.primary_key.columns
+    columns = [column for column in table.columns if column is not primary_key]
+    with engine.begin() as connection:
+        existing = {
+            row[key_column]: row
+            for row in connection.execute(
+                select(table).where(key_column.in_([row[key_column] for row in rows]))
+            ).mappings()
+        }
+        new_rows: list[RowMapping] = []
+        copied: list[RowMapping] = []
+        for row in rows:
+            held = existing.get(row[key_column])
+            if held is None:
+                new_rows.append(row)
+            elif any(held[column] != row[column] for column in columns):
+                logger.warning(
+                    f"Left {row[key_column]} in place, as its owner holds another "
+                    "row with the same key."
+                )
+                continue
+            copied.append(row)
+        if new_rows:
+            connection.execute(
+                insert(table),
+                [{column.name: row[column] for column in columns} for row in new_rows],
+            )
+    return copied
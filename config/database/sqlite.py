@@ -0,0 +1,141 @@
+"""Module for running the application on an embedded SQLite database."""
+
+import logging
+from collections.abc import Mapping
+from configparser import ConfigParser
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import URL, Connection, make_url
+
+from .deadlines import create_deadline_engine
+
+logger = logging.getLogger(__name__)
+
+# Pragmas of every connection, overridden by the ``sqlite_*`` options of the
+# ``database`` section of the configuration file.
+DEFAULT_PRAGMAS = {
+    # Readers never block the writer, nor the writer the readers.
+    "journal_mode": "wal",
+    # Commits only wait for the log, which is enough for WAL to be durable on crashes.
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative sizes are in KiB rather than pages.
+    "cache_size": -64 * 1024,
+    # Milliseconds to wait for a lock held by another process before failing.
+    "busy_timeout": 5000,
+}
+
+
+class SQLiteRole(StrEnum):
+    """An enumeration class representing the roles of SQLite engines."""
+
+    WRITER = "writer"
+    READER = "reader"
+    SHARED = "shared"
+
+
+def is_sqlite_file(url: str | URL) -> bool:
+    """
+    Check whether a URL points to a SQLite database file.
+
+    Parameters
+    ----------
+    url : str | URL
+        The database URL.
+
+    Returns
+    -------
+    bool
+        True for SQLite files, False for other databases and in-memory SQLite.
+    """
+    database_url = make_url(url)
+    return (
+        database_url.get_backend_name() == "sqlite"
+        and database_url.database not in (None, "", ":memory:")
+        and database_url.query.get("mode") != "memory"
+    )
+
+
+def load_pragmas(config: ConfigParser) -> dict[str, Any]:
+    """
+    Load the pragmas of SQLite connections from the configuration file.
+
+    Parameters
+    ----------
+    config : ConfigParser
+        The configuration, whose ``database`` section may hold ``sqlite_<pragma>``
+        options.
+
+    Returns
+    -------
+    dict[str, Any]
+        The default pragmas, updated with the configured ones.
+    """
+    return {
+        name: config.get("database", f"sqlite_{name}", fallback=str(default))
+        for name, default in DEFAULT_PRAGMAS.items()
+    }
+
+
+def create_sqlite_engine(
+    url: str | URL,
+    pragmas: Mapping[str, Any],
+    role: SQLiteRole = SQLiteRole.SHARED,
+    readers: int = 4,
+) -> Engine:
+    """
+    Create an engine connected to a SQLite database file.
+
+    Used together, a writer engine and a reader engine let a single connection
+    write while several connections read, so writers queue in the pool of the writer
+    instead of failing with "database is locked".
+
+    Parameters
+    ----------
+    url : str | URL
+        The URL of the SQLite database file.
+    pragmas : Mapping[str, Any]
+        The pragmas set on each new connection.
+    role : SQLiteRole, optional
+        Writer for a single connection starting its transactions with the write lock,
+        reader for ``readers`` read-only connections, or shared for a default pool.
+        Defaults to shared.
+    readers : int, optional
+        The number of connections of a reader engine. Defaults to 4.
+
+    Returns
+    -------
+    sqlalchemy.engine.Engine
+        The engine.
+    """
+    if role == SQLiteRole.WRITER:
+        engine = create_deadline_engine(url, pool_size=1, max_overflow=0)
+    elif role == SQLiteRole.READER:
+        engine = create_deadline_engine(url, pool_size=readers, max_overflow=0)
+    else:
+        engine = create_deadline_engine(url)
+
+    statements = [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
+    if role == SQLiteRole.READER:
+        statements.append("PRAGMA query_only = ON")
+    # Taking the write lock when the transaction starts, rather than on its first
+    # write, avoids lock upgrades that busy_timeout cannot wait out.
+    begin = "BEGIN IMMEDIATE" if role == SQLiteRole.WRITER else "BEGIN"
+
+    def on_connect(dbapi_connection: Any, *args: Any) -> None:
+        # Let SQLAlchemy emit BEGIN, so savepoints and the lock mode work as intended.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+    def on_begin(connection: Connection) -> None:
+        connection.connection.driver_connection.execute(begin)  # type: ignore[union-attr]
+
+    event.listen(engine, "connect", on_connect)
+    event.listen(engine, "begin", on_begin)
+    logger.debug(f"Created a {role} SQLite engine for {engine.url!r}.")
+    return engine
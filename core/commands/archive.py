@@ -0,0 +1,67 @@
+"""Command for moving inactive users to the archive."""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from auth.repository.archive import archive_inactive_users
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    """
+    Add the parser of the archive-users command.
+
+    Parameters
+    ----------
+    subparsers : argparse._SubParsersAction[argparse.ArgumentParser]
+        The subparsers of the application parser.
+    """
+    parser = subparsers.add_parser(
+        "archive-users",
+        help="Move the users who have not logged in for long to the archive.",
+    )
+    parser.add_argument(
+        "--inactive-days",
+        type=int,
+        default=730,
+        help="Days without a login after which a user is archived (default: 730).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of users moved per transaction (default: 1000).",
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=0.0,
+        help="Seconds to sleep between batches (default: 0).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only count the users to be archived.",
+    )
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Archive the inactive users of the database, or of each shard.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    """
+    archived = archive_inactive_users(
+        inactive_before=datetime.now(timezone.utc) - timedelta(days=args.inactive_days),
+        batch_size=args.batch_size,
+        pause=args.pause,
+        dry_run=args.dry_run,
+    )
+    verb = "To archive" if args.dry_run else "Archived"
+    for shard, count in archived.items():
+        print(f"{verb} {count} users on {shard}.")
@@ -0,0 +1,53 @@
+"""Command for compiling a breach corpus into the index checked at registration."""
+
+import argparse
+
+from auth.repository.breaches import (
+    BREACHED_PASSWORDS_ALGORITHM,
+    compile_breach_corpus,
+)
+from config.base import BREACHED_PASSWORDS_PATH
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    """
+    Add the parser of the breach-index command.
+
+    Parameters
+    ----------
+    subparsers : argparse._SubParsersAction[argparse.ArgumentParser]
+        The subparsers of the application parser.
+    """
+    parser = subparsers.add_parser(
+        "breach-index",
+        help="Compile a list of breached password hashes into a lookup index.",
+    )
+    parser.add_argument(
+        "source", help="Path of the corpus, one hexadecimal hash per line."
+    )
+    parser.add_argument(
+        "--output",
+        default=BREACHED_PASSWORDS_PATH,
+        help=f"Path of the index file (default: {BREACHED_PASSWORDS_PATH}).",
+    )
+    parser.add_argument(
+        "--algorithm",
+        default=BREACHED_PASSWORDS_ALGORITHM,
+        help=f"Hash algorithm of the corpus (default: {BREACHED_PASSWORDS_ALGORITHM}).",
+    )
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Compile a breach corpus into an index file.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    """
+    count = compile_breach_corpus(args.source, args.output, args.algorithm)
+    print(f"Indexed {count} breached password hashes into {args.output}.")
@@ -0,0 +1,41 @@
+"""Module defining the command line interface of the application."""
+
+import argparse
+
+from . import (
+    archive,
+    breaches,
+    diagnostics,
+    migrate_data,
+    profiling,
+    reshard,
+    transfer,
+    workload,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the parser of the command line arguments.
+
+    Running without a command starts the interactive menu.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        The parser with a subparser for each command.
+    """
+    parser = argparse.ArgumentParser(
+        description="Simple authentication using SQLAlchemy as ORM."
+    )
+    profiling.add_arguments(parser)
+    diagnostics.add_arguments(parser)
+    workload.add_arguments(parser)
+    subparsers = parser.add_subparsers(dest="command", title="commands")
+    archive.add_parser(subparsers)
+    breaches.add_parser(subparsers)
+    migrate_data.add_parser(subparsers)
+    reshard.add_parser(subparsers)
+    transfer.add_parsers(subparsers)
+    workload.add_parsers(subparsers)
+    return parser
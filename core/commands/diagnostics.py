@@ -0,0 +1,55 @@
+"""Options for tracking the memory of the application."""
+
+import argparse
+from typing import Optional
+
+from config.base import MEMORY_GROWTH_THRESHOLD_MIB, db
+from toolkit.diagnostics import MemoryMonitor
+from toolkit.diagnostics.memory import MIB
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the memory tracking options to the application parser.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The application parser.
+    """
+    group = parser.add_argument_group("diagnostics")
+    group.add_argument(
+        "--track-memory",
+        action="store_true",
+        help="Trace allocations and log the growth of memory, sessions and "
+        "connections periodically, which slows down the application.",
+    )
+    group.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=MEMORY_GROWTH_THRESHOLD_MIB,
+        help="MiB of memory growth between warnings "
+        f"(default: {MEMORY_GROWTH_THRESHOLD_MIB}).",
+    )
+
+
+def build_memory_monitor(args: argparse.Namespace) -> Optional[MemoryMonitor]:
+    """
+    Build the memory monitor requested on the command line.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    Optional[MemoryMonitor]
+        The memory monitor, reporting the sessions and connections of the database,
+        or None if memory is not tracked.
+    """
+    if not args.track_memory:
+        return None
+    return MemoryMonitor(
+        growth_threshold=int(args.memory_threshold * MIB), gauges=db.get_memory_stats
+    )
@@ -0,0 +1,90 @@
+"""Command for running a batched data migration."""
+
+import argparse
+
+from auth.repository.data_migrations import DATA_MIGRATIONS, DataMigrationRunner
+from config.base import db
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    """
+    Add the parser of the migrate-data command.
+
+    Parameters
+    ----------
+    subparsers : argparse._SubParsersAction[argparse.ArgumentParser]
+        The subparsers of the application parser.
+    """
+    parser = subparsers.add_parser(
+        "migrate-data",
+        help="Rewrite the rows of a table in batches, resuming where it stopped.",
+    )
+    parser.add_argument(
+        "name", choices=sorted(DATA_MIGRATIONS), help="Name of the data migration."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of rows of the first batch (default: 1000).",
+    )
+    parser.add_argument(
+        "--target-latency",
+        type=float,
+        default=0.2,
+        help="Seconds per batch the batch size is tuned towards (default: 0.2).",
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=0.0,
+        help="Seconds to sleep between batches (default: 0).",
+    )
+    parser.add_argument(
+        "--lock-timeout",
+        type=float,
+        default=2.0,
+        help="Seconds a batch waits for row locks before shrinking (default: 2).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only count the rows to be changed.",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Forget the checkpoint and start again from the first row.",
+    )
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Run a data migration on the database, or on each shard if sharding is configured.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    """
+    migration = DATA_MIGRATIONS[args.name]()
+    runner = DataMigrationRunner(
+        batch_size=args.batch_size,
+        target_latency=args.target_latency,
+        pause=args.pause,
+        lock_timeout=args.lock_timeout,
+        dry_run=args.dry_run,
+    )
+    engines = db.get_shards() or {"primary": db.get_engine()}
+    for name, engine in engines.items():
+        if args.restart and not args.dry_run:
+            runner.reset(migration, engine)
+        report = runner.run(migration, engine)
+        verb = "To change" if args.dry_run else "Changed"
+        print(
+            f"{verb} {report.rows_changed} of {report.rows_scanned} rows on {name} "
+            f"in {report.batches} batches."
+        )
@@ -0,0 +1,67 @@
+"""Options for profiling the operations of the application."""
+
+import argparse
+from typing import Optional
+
+from config.base import PROFILE_OUTPUT_DIR
+from toolkit.profiling import OperationProfiler, ProfileMode
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the profiling options to the application parser.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The application parser.
+    """
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        type=ProfileMode,
+        choices=list(ProfileMode),
+        help="Profile logins and registrations, or the command, with cProfile or a "
+        "sampling profiler, writing a report per profiled call.",
+    )
+    group.add_argument(
+        "--profile-every",
+        type=int,
+        default=1,
+        help="Profile one call of each operation in this many (default: 1).",
+    )
+    group.add_argument(
+        "--profile-interval",
+        type=float,
+        default=0.005,
+        help="Seconds between samples of the sampling profiler (default: 0.005).",
+    )
+    group.add_argument(
+        "--profile-dir",
+        default=PROFILE_OUTPUT_DIR,
+        help=f"Directory the reports are written to (default: {PROFILE_OUTPUT_DIR}).",
+    )
+
+
+def build_profiler(args: argparse.Namespace) -> Optional[OperationProfiler]:
+    """
+    Build the profiler requested on the command line.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    Optional[OperationProfiler]
+        The profiler, or None if profiling is off.
+    """
+    if args.profile is None:
+        return None
+    return OperationProfiler(
+        output_dir=args.profile_dir,
+        mode=args.profile,
+        every=args.profile_every,
+        interval=args.profile_interval,
+    )
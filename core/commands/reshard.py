@@ -0,0 +1,72 @@
+"""Command for moving users to their owning shards after shards are added."""
+
+import argparse
+
+from auth.models import User, UserArchive
+from config.base import db
+from config.database.base import PRIMARY_SHARD
+from config.database.sharding import reshard
+
+
+def add_parser(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    """
+    Add the parser of the reshard command.
+
+    Parameters
+    ----------
+    subparsers : argparse._SubParsersAction[argparse.ArgumentParser]
+        The subparsers of the application parser.
+    """
+    parser = subparsers.add_parser(
+        "reshard",
+        help="Move users to the shards owning them, after shards are added.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of users read per batch (default: 1000).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only count the users to be moved.",
+    )
+    parser.set_defaults(handler=run)
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Move users to the shards configured in the ``shards`` section.
+
+    Users and archived users are moved away from every shard, and from the primary,
+    which holds the users registered before sharding was configured.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    """
+    ring = db.get_hash_ring()
+    if ring is None:
+        print("Sharding is not configured, there is nothing to move.")
+        return
+
+    shards = db.get_shards()
+    verb = "To move" if args.dry_run else "Moved"
+    for table, noun in (
+        (User.__table__, "users"),
+        (UserArchive.__table__, "archived users"),
+    ):
+        moved = reshard(
+            shards=shards,
+            ring=ring,
+            table=table,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+            sources={PRIMARY_SHARD: db.get_engine(), **shards},
+        )
+        for shard, count in moved.items():
+            print(f"{verb} {count} {noun} away from {shard}.")
@@ -0,0 +1,100 @@
+"""Commands for exporting users to a file and importing them back."""
+
+import argparse
+
+from auth.repository.transfer import export_users, import_users
+from toolkit.records import Compression, RecordFormat
+
+
+def add_parsers(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    """
+    Add the parsers of the export and import commands.
+
+    Parameters
+    ----------
+    subparsers : argparse._SubParsersAction[argparse.ArgumentParser]
+        The subparsers of the application parser.
+    """
+    export_parser = subparsers.add_parser("export", help="Export every user to a file.")
+    _add_file_arguments(export_parser)
+    export_parser.set_defaults(handler=run_export)
+
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Import the users of a file, resuming an interrupted import.",
+    )
+    _add_file_arguments(import_parser)
+    import_parser.add_argument(
+        "--checkpoint",
+        help="Path of the checkpoint file (default: PATH.checkpoint).",
+    )
+    import_parser.set_defaults(handler=run_import)
+
+
+def _add_file_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments describing the file and its batches.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The parser of the export or import command.
+    """
+    parser.add_argument("path", help="Path of the file, such as users.csv.gz.")
+    parser.add_argument(
+        "--format",
+        type=RecordFormat,
+        choices=list(RecordFormat),
+        help="Format of the file (default: guessed from the path).",
+    )
+    parser.add_argument(
+        "--compression",
+        type=Compression,
+        choices=list(Compression),
+        help="Compression of the file (default: guessed from the path).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of users handled per batch (default: 1000).",
+    )
+
+
+def run_export(args: argparse.Namespace) -> None:
+    """
+    Export every user to a file.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    """
+    exported = export_users(
+        path=args.path,
+        record_format=args.format,
+        compression=args.compression,
+        batch_size=args.batch_size,
+    )
+    print(f"Exported {exported} users to {args.path}.")
+
+
+def run_import(args: argparse.Namespace) -> None:
+    """
+    Import the users of a file.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    """
+    imported = import_users(
+        path=args.path,
+        record_format=args.format,
+        compression=args.compression,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+    )
+    print(f"Imported {imported} users from {args.path}.")
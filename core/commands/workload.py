@@ -0,0 +1,150 @@
+"""Options recording the workload of the application, and commands replaying it."""
+
+import argparse
+from typing import Optional
+
+from auth.repository import UserService
+from auth.repository.workload import (
+    Operation,
+    WorkloadRecorder,
+    replay_workload,
+    seed_users,
+    summarize_latencies,
+)
+from config.base import WORKLOAD_LOG_PATH
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the workload recording options to the application parser.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The application parser.
+    """
+    group = parser.add_argument_group("workload")
+    group.add_argument(
+        "--record-workload",
+        nargs="?",
+        const=WORKLOAD_LOG_PATH,
+        metavar="PATH",
+        help="Record anonymized logins and registrations to a workload log "
+        f"(default path: {WORKLOAD_LOG_PATH}).",
+    )
+
+
+def build_recorder(args: argparse.Namespace) -> Optional[WorkloadRecorder]:
+    """
+    Build the workload recorder requested on the command line.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+
+    Returns
+    -------
+    Optional[WorkloadRecorder]
+        The recorder, or None if the workload is not recorded.
+    """
+    if args.record_workload is None:
+        return None
+    return WorkloadRecorder(args.record_workload)
+
+
+def add_parsers(
+    subparsers: "argparse._SubParsersAction[argparse.ArgumentParser]",
+) -> None:
+    """
+    Add the parsers of the replay-workload and compare-workloads commands.
+
+    Parameters
+    ----------
+    subparsers : argparse._SubParsersAction[argparse.ArgumentParser]
+        The subparsers of the application parser.
+    """
+    replay_parser = subparsers.add_parser(
+        "replay-workload",
+        help="Replay a workload log on the database, recording the latencies.",
+    )
+    replay_parser.add_argument("path", help="Path of the workload log.")
+    replay_parser.add_argument(
+        "--output",
+        required=True,
+        help="Path of the log of the replayed operations, such as replay.bin.gz.",
+    )
+    replay_parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="How many times faster than recorded to replay, or 0 for as fast as "
+        "possible (default: 1).",
+    )
+    replay_parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of operations run at once (default: 8).",
+    )
+    replay_parser.add_argument(
+        "--no-seed",
+        action="store_true",
+        help="Do not register the users the log expects to exist first.",
+    )
+    replay_parser.set_defaults(handler=run_replay)
+
+    compare_parser = subparsers.add_parser(
+        "compare-workloads",
+        help="Compare the latencies of the operations of two workload logs.",
+    )
+    compare_parser.add_argument("baseline", help="Path of the baseline log.")
+    compare_parser.add_argument("candidate", help="Path of the candidate log.")
+    compare_parser.set_defaults(handler=run_compare)
+
+
+def run_replay(args: argparse.Namespace) -> None:
+    """
+    Replay a workload log on the database.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    """
+    if not args.no_seed:
+        seeded = seed_users(args.path)
+        print(f"Seeded {seeded} users.")
+    service = UserService(workload_recorder=WorkloadRecorder(args.output))
+    try:
+        report = replay_workload(
+            args.path, service, speed=args.speed, max_workers=args.workers
+        )
+    finally:
+        service.close()
+    print(
+        f"Replayed {report.replayed} operations to {args.output}, "
+        f"{report.mismatches} with another outcome, at most "
+        f"{report.max_lag:.3f}s behind schedule."
+    )
+
+
+def run_compare(args: argparse.Namespace) -> None:
+    """
+    Print the latencies of each operation of two workload logs side by side.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line arguments.
+    """
+    baseline = summarize_latencies(args.baseline)
+    candidate = summarize_latencies(args.candidate)
+    print(f"{'operation':<10} {'stat':<6} {'baseline':>12} {'candidate':>12} change")
+    for operation in Operation:
+        if operation not in baseline or operation not in candidate:
+            continue
+        for stat, value in baseline[operation].items():
+            other = candidate[operation][stat]
+            change = f"{(other / value - 1) * 100:+.1f}%" if value else "n/a"
+            print(f"{operation:<10} {stat:<6} {value:>12.0f} {other:>12.0f} {change}")
@@ -1,8 +1,12 @@
 """Main module for handling user interactions with the application."""
 
 import logging
+from typing import Optional
 
 from auth.controllers import UserController
+from auth.repository.maintenance import build_maintenance_scheduler
+from auth.repository.workload import WorkloadRecorder
+from toolkit.diagnostics import MemoryMonitor
 
 from .commands.enums import Menu
 from .views import MenuView
@@ -13,10 +17,27 @@ logger = logging.getLogger(__name__)
 class Main:
     """Main class for controlling the flow of the application."""
 
-    def __init__(self) -> None:
-        """Initialize the Main class."""
+    def __init__(
+        self,
+        memory_monitor: Optional[MemoryMonitor] = None,
+        workload_recorder: Optional[WorkloadRecorder] = None,
+    ) -> None:
+        """
+        Initialize the Main class.
+
+        Parameters
+        ----------
+        memory_monitor : Optional[MemoryMonitor], optional
+            The monitor checking the memory of the process periodically, if any.
+        workload_recorder : Optional[WorkloadRecorder], optional
+            The recorder of the registrations and logins, if any.
+        """
         self.menu_view = MenuView()
-        self.user_controller = UserController()
+        self.user_controller = UserController(workload_recorder=workload_recorder)
+        self.memory_monitor = memory_monitor
+        self.scheduler = build_maintenance_scheduler(
+            self.user_controller.service, memory_monitor=memory_monitor
+        )
 
     def run(self) -> None:
         """
@@ -25,18 +46,27 @@ class Main:
         Displays a welcome message, gets user input, and executes corresponding actions.
         """
         logger.info("Starting the application.")
+        if self.memory_monitor:
+            self.memory_monitor.start()
+        self.scheduler.start()
         self.user_controller.show_welcome_msg()
 
-        while True:
-            command = self.menu_view.get_command()
-            logger.info("User selected %s option.", command)
-
-            if command == Menu.LOGIN:
-                self.user_controller.login()
-            elif command == Menu.REGISTER:
-                self.user_controller.register()
-            elif command == Menu.QUIT:
-                print("Bye Bye!" + "\U0001f44b\U0001f60a")  # Bye Bye! 👋😊
-                break
-            else:
-                print("Invalid Options")
+        try:
+            while True:
+                command = self.menu_view.get_command()
+                logger.info("User selected %s option.", command)
+
+                if command == Menu.LOGIN:
+                    self.user_controller.login()
+                elif command == Menu.REGISTER:
+                    self.user_controller.register()
+                elif command == Menu.QUIT:
+                    print("Bye Bye!" + "\U0001f44b\U0001f60a")  # Bye Bye! 👋😊
+                    break
+                else:
+                    print("Invalid Options")
+        finally:
+            self.scheduler.shutdown(timeout=5)
+            self.user_controller.close()
+            if self.memory_monitor:
+                self.memory_monitor.stop()
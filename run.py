@@ -2,8 +2,25 @@
 
 from config.base import logging_configurator
 from core import Main
+from core.commands.cli import build_parser
+from core.commands.diagnostics import build_memory_monitor
+from core.commands.profiling import build_profiler
+from core.commands.workload import build_recorder
 
 if __name__ == "__main__":
     logging_configurator.setup()
-    main = Main()
-    main.run()
+    args = build_parser().parse_args()
+    profiler = build_profiler(args)
+    if args.command:
+        handler = (
+            profiler.wrap(args.handler, args.command) if profiler else args.handler
+        )
+        handler(args)
+    else:
+        main = Main(
+            memory_monitor=build_memory_monitor(args),
+            workload_recorder=build_recorder(args),
+        )
+        if profiler:
+            profiler.instrument(main.user_controller, ("login", "register"))
+        main.run()
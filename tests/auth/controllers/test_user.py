@@ -6,7 +6,12 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from auth.controllers.user import UserController
-from auth.helpers.exceptions import UserAlreadyExistsError
+from auth.helpers.exceptions import (
+    BreachedPasswordError,
+    UserAlreadyExistsError,
+    UsernameNotAllowedError,
+)
+from config.database.exceptions import DeadlineExceededError
 
 
 @pytest.fixture(autouse=True)
@@ -66,6 +71,34 @@ def test_register_failure(
     mock_view.return_value.show_message.assert_called_once()
 
 
+@pytest.mark.exception
+def test_register_breached_password(
+    user_controller: UserController, mock_service: MagicMock, mock_view: MagicMock
+) -> None:
+    """Test case for a registration rejected for a breached password."""
+    mock_view.return_value.get_credentials.return_value = ("test_username", "123456")
+    mock_service.return_value.register.side_effect = BreachedPasswordError
+
+    assert user_controller.register() is None
+
+    message = mock_view.return_value.show_message.call_args.args[0]
+    assert "data breach" in message
+
+
+@pytest.mark.exception
+def test_register_username_not_allowed(
+    user_controller: UserController, mock_service: MagicMock, mock_view: MagicMock
+) -> None:
+    """Test case for a registration rejected for a reserved username."""
+    mock_view.return_value.get_credentials.return_value = ("admin", "test_password")
+    mock_service.return_value.register.side_effect = UsernameNotAllowedError
+
+    assert user_controller.register() is None
+
+    message = mock_view.return_value.show_message.call_args.args[0]
+    assert "admin is not allowed" in message
+
+
 def test_login_success(
     user_controller: UserController, mock_service: MagicMock, mock_view: MagicMock
 ) -> None:
@@ -110,6 +143,22 @@ def test_login_failure(
     mock_view.return_value.show_message.assert_called_once()
 
 
+def test_login_deadline_exceeded(
+    user_controller: UserController, mock_service: MagicMock, mock_view: MagicMock
+) -> None:
+    """Test case for a login running out of time."""
+    mock_view.return_value.get_credentials.return_value = (
+        "test_username",
+        "test_password",
+    )
+    mock_service.return_value.login.side_effect = DeadlineExceededError
+
+    assert user_controller.login() == (None, False)
+
+    mock_view.return_value.clear_screen.assert_called_once()
+    mock_view.return_value.show_message.assert_called_once()
+
+
 def test_show_welcome_msg(
     user_controller: UserController, mock_view: MagicMock
 ) -> None:
@@ -118,3 +167,10 @@ def test_show_welcome_msg(
 
     mock_view.return_value.clear_screen.assert_called_once()
     mock_view.return_value.show_message.assert_called_once()
+
+
+def test_close(user_controller: UserController, mock_service: MagicMock) -> None:
+    """Test case for closing the controller."""
+    user_controller.close()
+
+    mock_service.return_value.close.assert_called_once()
@@ -0,0 +1,74 @@
+"""Unit tests for the LoginAttempt model class."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from auth.models import LoginAttempt
+
+
+@pytest.fixture
+def login_attempt(db_session: Session) -> LoginAttempt:
+    """Fixture for creating a login attempt instance."""
+    login_attempt = LoginAttempt(
+        username="test_user",
+        success=True,
+        attempted_at=datetime(2024, 1, 1),
+        source="cli",
+    )
+    db_session.add(login_attempt)
+    db_session.commit()
+    return login_attempt
+
+
+@pytest.mark.smoke
+def test_login_attempt_model(db_session: Session, login_attempt: LoginAttempt) -> None:
+    """
+    Test the creation and retrieval of the LoginAttempt model.
+
+    Parameters
+    ----------
+    db_session : Session
+        The SQLAlchemy database session.
+    login_attempt : LoginAttempt
+        The stored login attempt.
+    """
+    retrieved = db_session.query(LoginAttempt).filter_by(username="test_user").first()
+
+    assert retrieved is not None
+    assert retrieved.success is True
+    assert retrieved.attempted_at == datetime(2024, 1, 1)
+    assert retrieved.source == "cli"
+
+
+def test_login_attempt_str(login_attempt: LoginAttempt) -> None:
+    """
+    Test the string representation of the LoginAttempt model.
+
+    Parameters
+    ----------
+    login_attempt : LoginAttempt
+        The stored login attempt.
+    """
+    expected_str = (
+        "<LoginAttempt(username=test_user, success=True, "
+        "attempted_at=2024-01-01 00:00:00, source=cli)>"
+    )
+    assert str(login_attempt) == expected_str
+
+
+def test_login_attempt_repr(login_attempt: LoginAttempt) -> None:
+    """
+    Test the representation of the LoginAttempt model.
+
+    Parameters
+    ----------
+    login_attempt : LoginAttempt
+        The stored login attempt.
+    """
+    expected_repr = (
+        "LoginAttempt(username=test_user, success=True, "
+        "attempted_at=2024-01-01 00:00:00, source=cli)"
+    )
+    assert repr(login_attempt) == expected_repr
@@ -0,0 +1,238 @@
+"""Unit tests for the archival of inactive users."""
+
+import argparse
+from datetime import datetime, timezone
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from auth.helpers.exceptions import UserAlreadyExistsError
+from auth.models import User, UserArchive
+from auth.repository.archive import archive_inactive_users
+from auth.repository.bll import UserBusinessLogicLayer
+from auth.repository.dal import UserDataAccessLayer
+from auth.repository.directory import UserDirectory
+from auth.repository.service import UserService
+from auth.repository.shared_cache import SharedCredentialCache
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+from core.commands.reshard import run
+
+CUTOFF = datetime(2024, 1, 1, tzinfo=timezone.utc)
+LONG_AGO = datetime(2020, 6, 1, tzinfo=timezone.utc)
+RECENTLY = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a SQLite database of active, inactive and dormant users."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    password = UserService().hash_password("password")
+    with database.unit_of_work() as session:
+        session.add_all(
+            [
+                User(username="active", password=password, last_login=RECENTLY),
+                User(username="newcomer", password=password, date_joined=RECENTLY),
+                User(username="inactive", password=password, last_login=LONG_AGO),
+                User(username="dormant", password=password, date_joined=LONG_AGO),
+                User(
+                    username="returning",
+                    password=password,
+                    date_joined=LONG_AGO,
+                    last_login=RECENTLY,
+                ),
+            ]
+        )
+    with (
+        patch("auth.repository.archive.db", database),
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.dal.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+def usernames(
+    database: DatabaseConnection, model: type[User | UserArchive]
+) -> set[str]:
+    """Read the usernames of the user table or of the archive."""
+    with database.get_engine().connect() as connection:
+        return set(connection.scalars(select(model.username)))
+
+
+@pytest.mark.smoke
+def test_archive_inactive_users(database: DatabaseConnection) -> None:
+    """Test only the users inactive since the cutoff are moved, in batches."""
+    archived = archive_inactive_users(CUTOFF, batch_size=1)
+
+    assert archived == {"primary": 2}
+    assert usernames(database, User) == {"active", "newcomer", "returning"}
+    assert usernames(database, UserArchive) == {"inactive", "dormant"}
+    assert archive_inactive_users(CUTOFF) == {"primary": 0}
+
+
+def test_dry_run(database: DatabaseConnection) -> None:
+    """Test a dry run counts the inactive users without moving them."""
+    assert archive_inactive_users(CUTOFF, dry_run=True) == {"primary": 2}
+    assert usernames(database, UserArchive) == set()
+
+
+def test_lookups_fall_back_to_archive(database: DatabaseConnection) -> None:
+    """Test archived users are still found by username."""
+    archive_inactive_users(CUTOFF)
+    dal = UserDataAccessLayer()
+
+    credentials = dal.get_credentials_by_username("inactive")
+    assert credentials is not None and credentials.archived
+    active_credentials = dal.get_credentials_by_username("active")
+    assert active_credentials is not None and not active_credentials.archived
+    assert dal.get_credentials_by_username("missing") is None
+
+    user = dal.get_user_by_username("dormant")
+    assert user is not None
+    assert user.username == "dormant"
+    assert user.date_joined.replace(tzinfo=timezone.utc) == LONG_AGO
+
+
+def test_login_restores_user(database: DatabaseConnection) -> None:
+    """Test an archived user logging in is moved back, and only with its password."""
+    with database.get_engine().connect() as connection:
+        user_id = connection.scalar(select(User.id).where(User.username == "inactive"))
+    archive_inactive_users(CUTOFF)
+    service = UserService()
+
+    assert service.login("inactive", "wrong password")[1] is False
+    assert "inactive" in usernames(database, UserArchive)
+
+    credentials, is_authenticated = service.login("inactive", "password")
+
+    assert is_authenticated
+    assert credentials is not None and credentials.archived
+    assert "inactive" in usernames(database, User)
+    assert "inactive" not in usernames(database, UserArchive)
+    credentials, _ = service.login("inactive", "password")
+    assert credentials is not None and not credentials.archived
+    assert credentials.id == user_id
+    assert service.bll.restore_user("inactive") is False
+
+
+def test_restore_user_with_taken_id(database: DatabaseConnection) -> None:
+    """Test a user whose id was given to another user is restored with a new one."""
+    archive_inactive_users(CUTOFF)
+    with database.unit_of_work() as session:
+        archived = session.scalars(
+            select(UserArchive).where(UserArchive.username == "dormant")
+        ).one()
+        user_id = archived.id
+        session.add(User(id=user_id, username="successor", password="password"))
+
+    assert UserBusinessLogicLayer().restore_user("dormant") is True
+
+    with database.get_engine().connect() as connection:
+        restored_id = connection.scalar(
+            select(User.id).where(User.username == "dormant")
+        )
+    assert restored_id is not None and restored_id != user_id
+
+
+def test_login_restores_user_from_directory(database: DatabaseConnection) -> None:
+    """Test a user archived after the directory was loaded is restored on login."""
+    directory = UserDirectory(overlap=0)
+    with patch("auth.repository.directory.db", database):
+        directory.sync()
+        archive_inactive_users(CUTOFF)
+        directory.sync()
+    service = UserService(directory=directory)
+
+    assert "inactive" not in directory
+    assert "active" in directory
+    credentials, is_authenticated = service.login("inactive", "password")
+
+    assert is_authenticated
+    assert credentials is not None and credentials.archived
+    assert "inactive" in usernames(database, User)
+    with patch("auth.repository.directory.db", database):
+        directory.sync()
+    assert "inactive" in directory
+
+
+def test_archive_invalidates_cache(database: DatabaseConnection) -> None:
+    """Test archiving removes the users from the credential cache it is given."""
+    cache = SharedCredentialCache(capacity=16)
+    service = UserService(credential_cache=cache)
+    service.login("inactive", "password")
+    assert cache.get("inactive") is not None
+
+    archive_inactive_users(CUTOFF, credential_cache=cache)
+
+    assert cache.get("inactive") is None
+    credentials, is_authenticated = service.login("inactive", "password")
+    assert is_authenticated
+    assert credentials is not None and credentials.archived
+    assert "inactive" in usernames(database, User)
+    service.close()
+
+
+@pytest.mark.exception
+def test_archived_username_cannot_register(database: DatabaseConnection) -> None:
+    """Test the username of an archived user is not registered again."""
+    archive_inactive_users(CUTOFF)
+    bll = UserBusinessLogicLayer()
+
+    with pytest.raises(UserAlreadyExistsError):
+        bll.create_user(username="dormant", password="password")
+    results = bll.create_user_group([("dormant", "password"), ("fresh", "password")])
+    assert isinstance(results[0], UserAlreadyExistsError)
+    assert bll.create_users([{"username": "inactive", "password": "password"}]) == 0
+
+    with database.get_engine().connect() as connection:
+        assert connection.scalar(select(func.count()).select_from(User)) == 4
+
+
+def test_archived_users_are_resharded(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test archived users are moved with the users when a shard is added."""
+    shards = {
+        f"shard_{index}": create_engine(sqlite_url_factory(f"shard_{index}"))
+        for index in range(3)
+    }
+    old_database = DatabaseConnection(
+        url=sqlite_url_factory("primary"),
+        shards={name: shards[name] for name in ("shard_0", "shard_1")},
+    )
+    new_database = DatabaseConnection(url=sqlite_url_factory("primary"), shards=shards)
+    ring = new_database.get_hash_ring()
+    assert ring is not None
+    names = [f"user_{index}" for index in range(30)]
+    moving = [name for name in names if ring.get_shard(name) == "shard_2"]
+    password = UserService().hash_password("password")
+    with old_database.unit_of_work() as session:
+        session.add_all(
+            User(username=name, password=password, last_login=LONG_AGO)
+            for name in names
+        )
+    with patch("auth.repository.archive.db", old_database):
+        archive_inactive_users(CUTOFF)
+
+    with patch("core.commands.reshard.db", new_database):
+        run(argparse.Namespace(batch_size=7, dry_run=False))
+
+    with Session(shards["shard_2"]) as session:
+        assert (
+            set(session.scalars(select(UserArchive.username))) == set(moving) != set()
+        )
+    with (
+        patch("auth.repository.bll.db", new_database),
+        patch("auth.repository.dal.db", new_database),
+    ):
+        with pytest.raises(UserAlreadyExistsError):
+            UserBusinessLogicLayer().create_user(username=moving[0], password="other")
+        assert UserService().login(moving[0], "password")[1] is True
+    old_database.dispose()
+    new_database.dispose()
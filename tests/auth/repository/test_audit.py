@@ -0,0 +1,98 @@
+"""Unit tests for the LoginAuditLog class."""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Generator
+from unittest.mock import MagicMock
+
+import pytest
+
+from auth.repository.audit import LoginAuditLog
+
+
+@pytest.fixture
+def mock_bll() -> MagicMock:
+    """Fixture for a mocked UserBusinessLogicLayer."""
+    return MagicMock()
+
+
+@pytest.fixture
+def spill_path(tmp_path: Path) -> Path:
+    """Fixture for the path of the spill file."""
+    return tmp_path / "login_attempts.spill"
+
+
+@pytest.fixture
+def audit_log(
+    mock_bll: MagicMock, spill_path: Path
+) -> Generator[LoginAuditLog, None, None]:
+    """Fixture for instantiating a LoginAuditLog."""
+    audit_log = LoginAuditLog(
+        bll=mock_bll, flush_interval=3600, spill_path=str(spill_path)
+    )
+    yield audit_log
+    mock_bll.create_login_attempts.side_effect = None
+    audit_log.close()
+
+
+@pytest.mark.smoke
+def test_record(audit_log: LoginAuditLog, mock_bll: MagicMock) -> None:
+    """Test recording login attempts and inserting them in bulk."""
+    attempted_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    audit_log.record("first_user", True, source="cli", attempted_at=attempted_at)
+    audit_log.record("second_user", False, attempted_at=attempted_at)
+
+    assert audit_log.flush() == 2
+    mock_bll.create_login_attempts.assert_called_once_with(
+        [
+            {
+                "username": "first_user",
+                "success": True,
+                "attempted_at": attempted_at,
+                "source": "cli",
+            },
+            {
+                "username": "second_user",
+                "success": False,
+                "attempted_at": attempted_at,
+                "source": None,
+            },
+        ]
+    )
+
+
+@pytest.mark.exception
+def test_spilled_attempts_are_restored(
+    audit_log: LoginAuditLog, mock_bll: MagicMock, spill_path: Path
+) -> None:
+    """Test attempts spilled to disk are inserted with their original values."""
+    attempted_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    mock_bll.create_login_attempts.side_effect = ConnectionError
+    audit_log.record("test_user", True, attempted_at=attempted_at)
+
+    with pytest.raises(ConnectionError):
+        audit_log.flush()
+    assert spill_path.exists()
+
+    mock_bll.create_login_attempts.side_effect = None
+    mock_bll.create_login_attempts.reset_mock()
+    audit_log.flush()
+
+    mock_bll.create_login_attempts.assert_called_once_with(
+        [
+            {
+                "username": "test_user",
+                "success": True,
+                "attempted_at": attempted_at,
+                "source": None,
+            }
+        ]
+    )
+
+
+def test_close_flushes(audit_log: LoginAuditLog, mock_bll: MagicMock) -> None:
+    """Test closing the audit log inserts the pending attempts."""
+    audit_log.record("test_user", True)
+    audit_log.close()
+
+    mock_bll.create_login_attempts.assert_called_once()
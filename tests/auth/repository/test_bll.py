@@ -1,5 +1,6 @@
 """Unit tests for the User BLL class."""
 
+from datetime import datetime
 from typing import Generator
 from unittest.mock import patch
 
@@ -7,7 +8,7 @@ import pytest
 from sqlalchemy.orm import Session
 
 from auth.helpers.exceptions import UserAlreadyExistsError
-from auth.models import User
+from auth.models import LoginAttempt, User
 from auth.repository.bll import UserBusinessLogicLayer
 from config.base import db
 
@@ -30,8 +31,8 @@ def mock_session(db_session: Session) -> Generator[None, None, None]:
     ------
     None
     """
-    with patch.object(db, "get_session") as actual_session:
-        actual_session.return_value = db_session
+    with patch.object(db, "get_session_factory") as session_factory:
+        session_factory.return_value = lambda: db_session
         yield
 
 
@@ -104,3 +105,127 @@ def test_create_duplicate_user(user_bll: UserBusinessLogicLayer) -> None:
         UserAlreadyExistsError, match="User test_username Already Registered."
     ):
         user_bll.create_user(username="test_username", password="another_password")
+
+
+def test_create_users(user_bll: UserBusinessLogicLayer, db_session: Session) -> None:
+    """
+    Test case for inserting several users at once, skipping registered usernames.
+
+    Parameters
+    ----------
+    user_bll : UserBusinessLogicLayer
+        The instance of UserBusinessLogicLayer.
+    db_session : Session
+        The database session.
+    """
+    user_bll.create_user(username="first_user", password="password")
+
+    inserted = user_bll.create_users(
+        [
+            {"username": "first_user", "password": "other_password"},
+            {"username": "second_user", "password": "password"},
+            {"username": "third_user", "password": "password"},
+        ]
+    )
+
+    assert inserted == 2
+    passwords = {user.username: user.password for user in db_session.query(User).all()}
+    assert passwords == {
+        "first_user": "password",
+        "second_user": "password",
+        "third_user": "password",
+    }
+
+
+def test_create_user_group(
+    user_bll: UserBusinessLogicLayer, db_session: Session
+) -> None:
+    """
+    Test case for creating a group of users, where duplicates only fail their own row.
+
+    Parameters
+    ----------
+    user_bll : UserBusinessLogicLayer
+        The instance of UserBusinessLogicLayer.
+    db_session : Session
+        The database session.
+    """
+    user_bll.create_user(username="first_user", password="password")
+
+    results = user_bll.create_user_group(
+        [
+            ("second_user", "password"),
+            ("first_user", "other_password"),
+            ("third_user", "password"),
+            ("second_user", "other_password"),
+        ]
+    )
+
+    assert isinstance(results[0], User)
+    assert isinstance(results[1], UserAlreadyExistsError)
+    assert isinstance(results[2], User)
+    assert isinstance(results[3], UserAlreadyExistsError)
+    passwords = {user.username: user.password for user in db_session.query(User).all()}
+    assert passwords == {
+        "first_user": "password",
+        "second_user": "password",
+        "third_user": "password",
+    }
+
+
+def test_update_last_logins(
+    user_bll: UserBusinessLogicLayer, db_session: Session
+) -> None:
+    """
+    Test case for updating the last login of several users at once.
+
+    Parameters
+    ----------
+    user_bll : UserBusinessLogicLayer
+        The instance of UserBusinessLogicLayer.
+    db_session : Session
+        The database session.
+    """
+    for username in ("first_user", "second_user", "third_user"):
+        user_bll.create_user(username=username, password="password")
+    last_login = datetime(2024, 1, 1)
+
+    user_bll.update_last_logins({"first_user": last_login, "second_user": last_login})
+
+    db_session.expire_all()
+    last_logins = {
+        user.username: user.last_login for user in db_session.query(User).all()
+    }
+    assert last_logins == {
+        "first_user": last_login,
+        "second_user": last_login,
+        "third_user": None,
+    }
+
+
+def test_create_login_attempts(
+    user_bll: UserBusinessLogicLayer, db_session: Session
+) -> None:
+    """
+    Test case for inserting several login attempts at once.
+
+    Parameters
+    ----------
+    user_bll : UserBusinessLogicLayer
+        The instance of UserBusinessLogicLayer.
+    db_session : Session
+        The database session.
+    """
+    attempted_at = datetime(2024, 1, 1)
+    user_bll.create_login_attempts(
+        [
+            {"username": "first_user", "success": True, "attempted_at": attempted_at},
+            {"username": "second_user", "success": False, "attempted_at": attempted_at},
+        ]
+    )
+
+    attempts = db_session.query(LoginAttempt).order_by(LoginAttempt.username).all()
+    assert [(attempt.username, attempt.success) for attempt in attempts] == [
+        ("first_user", True),
+        ("second_user", False),
+    ]
@@ -0,0 +1,80 @@
+"""Unit tests for the breached password checker."""
+
+import hashlib
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from auth.helpers.exceptions import BreachedPasswordError
+from auth.repository.breaches import (
+    BreachedPasswordChecker,
+    compile_breach_corpus,
+    parse_corpus,
+)
+from auth.repository.service import UserService
+
+BREACHED_PASSWORDS = ["123456", "password", "qwerty", "letmein"]
+
+
+@pytest.fixture
+def checker(tmp_path: Path) -> BreachedPasswordChecker:
+    """Fixture for a checker of a synthetic corpus in the format of breach lists."""
+    corpus = tmp_path / "corpus.txt"
+    lines = [
+        f"{hashlib.sha1(f'synthetic_{index}'.encode()).hexdigest()}:{index}"
+        for index in range(5_000)
+    ]
+    lines += [
+        hashlib.sha1(password.encode()).hexdigest().upper() + ":1000"
+        for password in BREACHED_PASSWORDS
+    ]
+    corpus.write_text("\n".join(lines) + "\n\n")
+    compile_breach_corpus(corpus, tmp_path / "breached.idx")
+    return BreachedPasswordChecker(tmp_path / "breached.idx")
+
+
+@pytest.mark.smoke
+def test_is_breached(checker: BreachedPasswordChecker) -> None:
+    """Test breached passwords are recognized, and others are not."""
+    assert all(checker.is_breached(password) for password in BREACHED_PASSWORDS)
+    assert checker.is_breached("synthetic_4999")
+    assert not checker.is_breached("correct horse battery staple")
+    assert len(checker.index) == 5_000 + len(BREACHED_PASSWORDS)
+
+
+@pytest.mark.exception
+def test_register_rejects_breached_password(
+    checker: BreachedPasswordChecker,
+) -> None:
+    """Test registrations with a breached password are rejected before any write."""
+    service = UserService(breach_checker=checker)
+    service.bll = MagicMock()
+
+    with pytest.raises(BreachedPasswordError):
+        service.register("test_user", "password")
+    service.bll.create_user.assert_not_called()
+
+    service.register("test_user", "correct horse battery staple")
+    service.bll.create_user.assert_called_once()
+
+
+@pytest.mark.exception
+def test_parse_corpus_rejects_other_hashes() -> None:
+    """Test lines that do not hold a hash of the expected width are rejected."""
+    with pytest.raises(ValueError, match="Line 2"):
+        list(parse_corpus(["00" * 20, "00" * 32], width=20))
+    with pytest.raises(ValueError, match="Line 1"):
+        list(parse_corpus(["not a hash"], width=20))
+
+
+@pytest.mark.exception
+def test_algorithm_mismatch(checker: BreachedPasswordChecker) -> None:
+    """Test an index cannot be checked with an algorithm of another width."""
+    with pytest.raises(ValueError):
+        BreachedPasswordChecker(checker.index.path, algorithm="sha256")
+
+
+def test_open_missing_index(tmp_path: Path) -> None:
+    """Test no checker is opened without an index file."""
+    assert BreachedPasswordChecker.open(tmp_path / "missing.idx") is None
@@ -0,0 +1,113 @@
+"""Stress tests for the ConcurrentUserService class."""
+
+import random
+import threading
+from concurrent.futures import as_completed
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+
+from auth.helpers.exceptions import UserAlreadyExistsError
+from auth.repository.concurrent import ConcurrentUserService
+from auth.repository.service import UserService
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+from toolkit.events import EventBus
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a SQLite database used by the BLL, the DAL and the service."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.dal.db", database),
+        patch("auth.repository.concurrent.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+@pytest.fixture
+def service(
+    database: DatabaseConnection,
+) -> Generator[ConcurrentUserService, None, None]:
+    """Fixture for a concurrent user service with eight workers."""
+    with ConcurrentUserService(max_workers=8) as service:
+        yield service
+
+
+@pytest.mark.smoke
+def test_default_workers(database: DatabaseConnection) -> None:
+    """Test the number of workers defaults to the size of the connection pool."""
+    with ConcurrentUserService() as service:
+        assert service.max_workers == database.get_engine().pool.size()  # type: ignore[attr-defined]
+
+
+def test_service_options(database: DatabaseConnection) -> None:
+    """Test the user service is created by the given factory."""
+    bus = EventBus(max_workers=1)
+    with ConcurrentUserService(
+        max_workers=2, service_factory=lambda: UserService(event_bus=bus)
+    ) as service:
+        assert service.service.event_bus is bus
+    bus.close()
+
+
+def test_concurrent_registrations_and_logins(
+    service: ConcurrentUserService, database: DatabaseConnection
+) -> None:
+    """Test many threads registering and logging in get their own results."""
+    users = {f"user_{index}": f"password_{index}" for index in range(40)}
+    registrations = [
+        service.register(username, password) for username, password in users.items()
+    ]
+    assert {future.result().username for future in registrations} == set(users)
+
+    attempts = []
+    for _ in range(400):
+        username = random.choice(list(users))
+        password = users[username] if random.random() < 0.5 else "wrong"
+        attempts.append((username, password))
+    results = list(service.login_many(attempts))
+
+    for (username, password), (user, is_authenticated) in zip(attempts, results):
+        assert user is not None
+        assert user.username == username
+        assert is_authenticated == (password == users[username])
+    assert database.get_engine().pool.checkedout() == 0  # type: ignore[attr-defined]
+
+
+@pytest.mark.exception
+def test_concurrent_duplicate_registrations(service: ConcurrentUserService) -> None:
+    """Test only one of many threads registering the same username succeeds."""
+    futures = [service.register("test_user", "password") for _ in range(16)]
+
+    registered, rejected = 0, 0
+    for future in as_completed(futures):
+        if future.exception() is None:
+            registered += 1
+        else:
+            assert isinstance(future.exception(), UserAlreadyExistsError)
+            rejected += 1
+    assert (registered, rejected) == (1, 15)
+
+
+def test_operations_run_on_worker_threads(service: ConcurrentUserService) -> None:
+    """Test operations run on the thread pool rather than the calling thread."""
+    threads = set()
+
+    def record_thread(*args: str) -> tuple[None, bool]:
+        threads.add(threading.current_thread().name)
+        return None, False
+
+    with patch.object(service.service, "login", side_effect=record_thread):
+        list(service.login_many([("test_user", "password")] * 32))
+
+    assert threads
+    assert all(name.startswith("user-service") for name in threads)
@@ -1,14 +1,19 @@
 """Unit tests for the User DAL class."""
 
-from typing import Generator
+from typing import Callable, Generator, Optional
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
-from auth.models import User
+from auth.helpers.exceptions import InvalidCursorError
+from auth.models import User, UserCredentials
 from auth.repository.dal import UserDataAccessLayer
+from auth.repository.pagination import UserOrder, encode_cursor
 from config.base import db
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
 
 
 @pytest.fixture(autouse=True)
@@ -29,8 +34,8 @@ def mock_session(db_session: Session) -> Generator[None, None, None]:
     ------
     None
     """
-    with patch.object(db, "get_session") as actual_session:
-        actual_session.return_value = db_session
+    with patch.object(db, "get_session_factory") as session_factory:
+        session_factory.return_value = lambda: db_session
         yield
 
 
@@ -61,3 +66,199 @@ def test_get_non_existing_user(user_dal: UserDataAccessLayer) -> None:
     retrieved_user = user_dal.get_user_by_username(username="I am not existed")
 
     assert retrieved_user is None
+
+
+def test_get_existing_credentials(
+    user_dal: UserDataAccessLayer, user: User, db_session: Session
+) -> None:
+    """Test retrieving the credentials of an existing user by username."""
+    db_session.expunge_all()
+
+    credentials = user_dal.get_credentials_by_username(username=user.username)
+
+    assert isinstance(credentials, UserCredentials)
+    assert (credentials.id, credentials.username, credentials.password) == (
+        user.id,
+        user.username,
+        user.password,
+    )
+    assert not db_session.identity_map
+
+
+def test_get_non_existing_credentials(user_dal: UserDataAccessLayer) -> None:
+    """Test retrieving the credentials of a non-existing user by username."""
+    credentials = user_dal.get_credentials_by_username(username="I am not existed")
+
+    assert credentials is None
+
+
+def test_get_credentials_from_shard(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test retrieving credentials from the shard owning the username."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"),
+        shards={
+            f"shard_{index}": create_engine(sqlite_url_factory(f"shard_{index}"))
+            for index in range(2)
+        },
+    )
+    session = database.get_session()
+    session.add_all(
+        User(username=f"user_{index}", password=f"password_{index}")
+        for index in range(10)
+    )
+    session.commit()
+
+    with patch("auth.repository.dal.db", database):
+        credentials = UserDataAccessLayer().get_credentials_by_username("user_7")
+
+    assert credentials is not None
+    assert credentials.password == "password_7"
+    database.dispose()
+
+
+@pytest.mark.exception
+def test_replica_failure_falls_back_to_primary(
+    sqlite_url_factory: Callable[[str], str],
+) -> None:
+    """Test retrying a read on the primary when the replica cannot be reached."""
+    broken_replica = create_engine("sqlite:////nonexistent/directory/replica.db")
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([broken_replica])
+    )
+    with Session(database.get_engine()) as session:
+        session.add(User(username="test_username", password="test_password"))
+        session.commit()
+
+    with patch("auth.repository.dal.db", database):
+        retrieved_user = UserDataAccessLayer().get_user_by_username("test_username")
+
+    assert retrieved_user is not None
+    assert retrieved_user.username == "test_username"
+    database.dispose()
+
+
+@pytest.fixture
+def users(db_session: Session) -> list[User]:
+    """Fixture for creating users in an order differing from their usernames."""
+    users = [
+        User(username=username, password="password")
+        for username in ["carol", "Alice", "bob", "alfred", "al_x", "alpha", "dave"]
+    ]
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+
+def test_list_users_by_id(user_dal: UserDataAccessLayer, users: list[User]) -> None:
+    """Test listing every user page by page in the order of their ids."""
+    pages = [user_dal.list_users(limit=3)]
+    while pages[-1].next_cursor:
+        pages.append(user_dal.list_users(limit=3, after=pages[-1].next_cursor))
+
+    assert [len(page.users) for page in pages] == [3, 3, 1]
+    assert [user.id for page in pages for user in page.users] == [
+        user.id for user in users
+    ]
+
+
+def test_list_users_by_username(
+    user_dal: UserDataAccessLayer, users: list[User]
+) -> None:
+    """Test listing users page by page in the order of their usernames."""
+    first = user_dal.list_users(limit=4, order=UserOrder.USERNAME)
+    second = user_dal.list_users(
+        limit=4, after=first.next_cursor, order=UserOrder.USERNAME
+    )
+
+    assert [user.username for user in first.users + second.users] == sorted(
+        user.username for user in users
+    )
+    assert second.next_cursor is None
+
+
+def test_list_users_by_prefix(user_dal: UserDataAccessLayer, users: list[User]) -> None:
+    """Test the prefix is matched ignoring case, and its wildcards literally."""
+    page = user_dal.list_users(prefix="AL")
+    escaped_page = user_dal.list_users(prefix="al_")
+
+    assert [user.username for user in page.users] == [
+        "al_x",
+        "alfred",
+        "Alice",
+        "alpha",
+    ]
+    assert [user.username for user in escaped_page.users] == ["al_x"]
+
+
+@pytest.mark.parametrize("order", list(UserOrder))
+@pytest.mark.parametrize("prefix", [None, "a"])
+def test_list_users_pages_every_user_once(
+    user_dal: UserDataAccessLayer,
+    db_session: Session,
+    order: UserOrder,
+    prefix: Optional[str],
+) -> None:
+    """Test paging through usernames collations disagree on lists each user once."""
+    if prefix and order != UserOrder.LOWER_USERNAME:
+        pytest.skip("Prefixes are only listed by lowercase username.")
+    usernames = ["a.b", "a_b", "ab", "A.b", "AB", "Ab", "a-b", "aB", "b", "B", "_a"]
+    db_session.add_all(User(username=username, password="x") for username in usernames)
+    db_session.commit()
+
+    pages = [user_dal.list_users(limit=2, order=order, prefix=prefix)]
+    while pages[-1].next_cursor:
+        pages.append(
+            user_dal.list_users(
+                limit=2, after=pages[-1].next_cursor, order=order, prefix=prefix
+            )
+        )
+    listed = [user.username for page in pages for user in page.users]
+
+    expected = [name for name in usernames if not prefix or name.startswith(prefix)]
+    if prefix:
+        expected += [name for name in usernames if name.startswith(prefix.upper())]
+    assert sorted(listed) == sorted(expected)
+    assert len(set(listed)) == len(listed)
+
+
+@pytest.mark.exception
+def test_list_users_invalid_cursor(user_dal: UserDataAccessLayer) -> None:
+    """Test cursors that are malformed or come from another order are rejected."""
+    cursor = encode_cursor(UserOrder.ID, 10)
+
+    with pytest.raises(InvalidCursorError):
+        user_dal.list_users(after=cursor, order=UserOrder.USERNAME)
+    with pytest.raises(InvalidCursorError):
+        user_dal.list_users(after="not a cursor")
+    with pytest.raises(ValueError):
+        user_dal.list_users(limit=0)
+    with pytest.raises(ValueError, match="lowercase username"):
+        user_dal.list_users(order=UserOrder.ID, prefix="al")
+
+
+def test_list_users_across_shards(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test the pages of the shards are merged into a single ordered page."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"),
+        shards={
+            f"shard_{index}": create_engine(sqlite_url_factory(f"shard_{index}"))
+            for index in range(2)
+        },
+    )
+    session = database.get_session()
+    session.add_all(
+        User(username=f"user_{index:02}", password="x") for index in range(20)
+    )
+    session.commit()
+
+    with patch("auth.repository.dal.db", database):
+        dal = UserDataAccessLayer()
+        first = dal.list_users(limit=8, order=UserOrder.USERNAME)
+        second = dal.list_users(
+            limit=8, after=first.next_cursor, order=UserOrder.USERNAME
+        )
+
+    assert [user.username for user in first.users + second.users] == [
+        f"user_{index:02}" for index in range(16)
+    ]
+    database.dispose()
@@ -0,0 +1,226 @@
+"""Unit tests for the batched data migrations."""
+
+import sqlite3
+from typing import Any, Callable, Generator, Optional
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import ColumnElement, Engine, func, select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.exc import OperationalError
+
+from auth.models import DataMigrationCheckpoint, User
+from auth.repository.data_migrations import (
+    DATA_MIGRATIONS,
+    BatchSizeTuner,
+    DataMigration,
+    DataMigrationRunner,
+    register_data_migration,
+)
+from auth.repository.service import UserService
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+from core.commands.cli import build_parser
+
+USERS = 25
+
+
+def lock_timeout() -> OperationalError:
+    """Return the error of SQLite when its busy timeout expires."""
+    return OperationalError(
+        "SELECT", {}, sqlite3.OperationalError("database is locked")
+    )
+
+
+class LowercaseUsernames(DataMigration):
+    """Data migration folding the case of usernames."""
+
+    name = "lowercase_usernames"
+    table = User.__table__
+    columns = ("username",)
+
+    def __init__(self, errors: Optional[list[Exception]] = None) -> None:
+        """Raise the given errors, one per transformed row, before migrating rows."""
+        self.errors = errors or []
+        self.transformed: list[str] = []
+
+    def where(self) -> Optional[ColumnElement[bool]]:
+        """Skip the usernames that are already lowercase."""
+        return User.username != func.lower(User.username)
+
+    def transform(self, row: RowMapping) -> Optional[dict[str, Any]]:
+        """Fold the case of a username."""
+        if self.errors:
+            raise self.errors.pop(0)
+        self.transformed.append(row["username"])
+        return {"username": row["username"].lower()}
+
+
+class InterruptedLowercaseUsernames(LowercaseUsernames):
+    """Data migration folding the case of usernames, interrupted after ten rows."""
+
+    def transform(self, row: RowMapping) -> Optional[dict[str, Any]]:
+        """Fold the case of a username, unless ten were already folded."""
+        if len(self.transformed) == 10:
+            raise RuntimeError("interrupted")
+        return super().transform(row)
+
+
+@pytest.fixture
+def engine(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[Engine, None, None]:
+    """Fixture for a SQLite database of users, every fifth of them lowercase."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with database.unit_of_work() as session:
+        session.add_all(
+            User(
+                username=f"user_{index}" if index % 5 == 0 else f"User_{index}",
+                password="password",
+            )
+            for index in range(USERS)
+        )
+    yield database.get_engine()
+    database.dispose()
+
+
+def usernames(engine: Engine) -> list[str]:
+    """Read the usernames in primary key order."""
+    with engine.connect() as connection:
+        return list(connection.scalars(select(User.username).order_by(User.id)))
+
+
+@pytest.mark.smoke
+def test_run(engine: Engine) -> None:
+    """Test every row is migrated in batches and the completion is recorded."""
+    runner = DataMigrationRunner(batch_size=4, min_batch_size=4, max_batch_size=4)
+
+    report = runner.run(LowercaseUsernames(), engine)
+
+    assert usernames(engine) == [f"user_{index}" for index in range(USERS)]
+    assert report.completed
+    assert report.rows_scanned == report.rows_changed == 20
+    assert report.batches == 5
+
+    migration = LowercaseUsernames()
+    again = runner.run(migration, engine)
+    assert again.completed and again.batches == 0
+    assert migration.transformed == []
+
+
+def test_resume_after_failure(engine: Engine) -> None:
+    """Test an interrupted migration resumes after the last committed batch."""
+    runner = DataMigrationRunner(batch_size=4, min_batch_size=4, max_batch_size=4)
+    with pytest.raises(RuntimeError):
+        runner.run(InterruptedLowercaseUsernames(), engine)
+    # The batch in progress when failing was rolled back.
+    assert sum(name.islower() for name in usernames(engine)) == USERS // 5 + 8
+
+    migration = LowercaseUsernames()
+    report = runner.run(migration, engine)
+
+    assert report.completed
+    assert report.rows_changed == 20
+    assert len(migration.transformed) == 12
+    assert all(name.islower() for name in usernames(engine))
+
+
+def test_dry_run(engine: Engine) -> None:
+    """Test a dry run counts the rows to change without writing anything."""
+    before = usernames(engine)
+
+    report = DataMigrationRunner(batch_size=3, dry_run=True).run(
+        LowercaseUsernames(), engine
+    )
+
+    assert report.rows_changed == 20
+    assert report.completed
+    assert usernames(engine) == before
+    with engine.connect() as connection:
+        assert connection.scalar(select(func.count(DataMigrationCheckpoint.id))) == 0
+
+
+@pytest.mark.exception
+def test_lock_timeout_shrinks_batch(engine: Engine) -> None:
+    """Test a batch timing out on locks is retried with half as many rows."""
+    runner = DataMigrationRunner(batch_size=8, min_batch_size=2, target_latency=60)
+
+    report = runner.run(LowercaseUsernames(errors=[lock_timeout()]), engine)
+
+    assert report.lock_timeouts == 1
+    assert report.completed
+    assert all(name.islower() for name in usernames(engine))
+
+
+@pytest.mark.exception
+def test_repeated_lock_timeouts_stop(engine: Engine) -> None:
+    """Test the migration stops once batches keep timing out on locks."""
+    migration = LowercaseUsernames(errors=[lock_timeout() for _ in range(3)])
+
+    with pytest.raises(OperationalError):
+        DataMigrationRunner(max_lock_timeouts=2).run(migration, engine)
+
+
+def test_batch_size_tuner() -> None:
+    """Test the batch size follows the latency within bounds and halves on locks."""
+    tuner = BatchSizeTuner(100, target_latency=0.1, min_size=10, max_size=1000)
+
+    assert tuner.observe(0.05) == 200
+    assert tuner.observe(0.001) == 400
+    assert tuner.observe(0.2) == 200
+    assert tuner.observe(10.0) == 100
+    assert tuner.back_off() == 50
+    for _ in range(10):
+        tuner.observe(0.0)
+    assert tuner.size == 1000
+    for _ in range(20):
+        tuner.back_off()
+    assert tuner.size == 10
+
+
+@pytest.mark.exception
+def test_register_data_migration() -> None:
+    """Test migrations are abstract until they transform rows and are named uniquely."""
+    with pytest.raises(TypeError):
+        DataMigration()  # type: ignore[abstract]
+
+    with pytest.raises(ValueError, match="already registered"):
+
+        @register_data_migration
+        class Duplicate(LowercaseUsernames):
+            name = "lowercase_password_hashes"
+
+    assert not issubclass(
+        DATA_MIGRATIONS["lowercase_password_hashes"], LowercaseUsernames
+    )
+
+
+@pytest.mark.smoke
+def test_migrate_data_command(
+    sqlite_url_factory: Callable[[str], str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test running a registered data migration from the command line."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    password = UserService().hash_password("password")
+    with database.unit_of_work() as session:
+        session.add_all(
+            [
+                User(username="imported", password=password.upper()),
+                User(username="registered", password=password),
+            ]
+        )
+    args = build_parser().parse_args(
+        ["migrate-data", "lowercase_password_hashes", "--batch-size", "1"]
+    )
+
+    with patch("core.commands.migrate_data.db", database):
+        args.handler(args)
+
+    assert capsys.readouterr().out == ("Changed 1 of 1 rows on primary in 1 batches.\n")
+    with database.unit_of_work() as session:
+        assert set(session.scalars(select(User.password))) == {password}
+    database.dispose()
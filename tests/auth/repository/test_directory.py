@@ -0,0 +1,189 @@
+"""Unit tests for the UserDirectory class."""
+
+import time
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, insert, update
+
+from auth.models import User, UserCredentials
+from auth.repository.dal import UserDataAccessLayer
+from auth.repository.directory import UserDirectory
+from config.database.base import DatabaseConnection
+
+SINCE = datetime(2024, 1, 1)
+
+
+def password_hash(username: str) -> str:
+    """Return the password hash of a user."""
+    return sha256(username.encode()).hexdigest()
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a SQLite database the directory is synced from."""
+    database = DatabaseConnection(url=sqlite_url_factory("primary"), shards={})
+    with patch("auth.repository.directory.db", database):
+        yield database
+    database.dispose()
+
+
+@pytest.fixture
+def directory() -> Generator[UserDirectory, None, None]:
+    """Fixture for a directory looking back no further than its last sync."""
+    directory = UserDirectory(overlap=0, batch_size=4)
+    yield directory
+    directory.close()
+
+
+def add_users(
+    database: DatabaseConnection, usernames: list[str], **values: object
+) -> None:
+    """Insert users with the given column values."""
+    with database.get_engine().begin() as connection:
+        connection.execute(
+            insert(User),
+            [
+                {"username": username, "password": password_hash(username), **values}
+                for username in usernames
+            ],
+        )
+
+
+@pytest.mark.smoke
+def test_load(database: DatabaseConnection, directory: UserDirectory) -> None:
+    """Test loading every user on the first sync."""
+    usernames = [f"user_{index}" for index in range(10)]
+    add_users(database, usernames, created_at=SINCE, date_joined=SINCE)
+
+    assert directory.sync() == 10
+
+    assert len(directory) == 10
+    credentials = directory.get("user_3")
+    assert isinstance(credentials, UserCredentials)
+    assert credentials.password == password_hash("user_3")
+    assert "user_3" in directory
+    assert directory.get("user_10") is None
+    assert directory.get_date_joined("user_3") == SINCE.replace(tzinfo=timezone.utc)
+    assert directory.get_last_login("user_3") is None
+    assert directory.memory_usage() > 0
+
+
+def test_keep_other_hashes(
+    database: DatabaseConnection, directory: UserDirectory
+) -> None:
+    """Test keeping password hashes which are not SHA-256 hex digests as they are."""
+    with database.get_engine().begin() as connection:
+        connection.execute(
+            insert(User), [{"username": "legacy", "password": "$2b$12$not-sha256"}]
+        )
+    directory.sync()
+
+    credentials = directory.get("legacy")
+    assert credentials is not None
+    assert credentials.password == "$2b$12$not-sha256"
+
+
+def test_sync_new_and_changed_users(
+    database: DatabaseConnection, directory: UserDirectory
+) -> None:
+    """Test picking up users created or changed since the previous sync."""
+    add_users(database, ["old_user", "other_user"], created_at=SINCE)
+    directory.sync()
+
+    add_users(database, ["new_user"])
+    last_login = datetime(2024, 6, 1, 12, 0)
+    with database.get_engine().begin() as connection:
+        connection.execute(
+            update(User)
+            .where(User.username == "old_user")
+            .values(last_login=last_login)
+        )
+
+    # Both old users were created at the watermark itself, so they are read again.
+    assert directory.sync() == 3
+    assert len(directory) == 3
+    assert directory.get("new_user") is not None
+    assert directory.get_last_login("old_user") == last_login.replace(
+        tzinfo=timezone.utc
+    )
+
+
+def test_sync_looks_back(database: DatabaseConnection) -> None:
+    """Test picking up users committed late with an earlier timestamp."""
+    directory = UserDirectory(overlap=60)
+    now = datetime.now(timezone.utc)
+    add_users(database, ["first_user"], created_at=now)
+    directory.sync()
+
+    add_users(database, ["late_user"], created_at=now - timedelta(seconds=30))
+
+    directory.sync()
+    assert "late_user" in directory
+
+
+def test_sync_shards(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test loading the users of every shard."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"),
+        shards={
+            f"shard_{index}": create_engine(sqlite_url_factory(f"shard_{index}"))
+            for index in range(3)
+        },
+    )
+    session = database.get_session()
+    session.add_all(
+        User(username=f"user_{index}", password=password_hash(f"user_{index}"))
+        for index in range(20)
+    )
+    session.commit()
+
+    directory = UserDirectory()
+    with patch("auth.repository.directory.db", database):
+        assert directory.sync() == 20
+    assert len(directory) == 20
+    database.dispose()
+
+
+def test_background_sync(
+    database: DatabaseConnection, directory: UserDirectory
+) -> None:
+    """Test syncing the directory periodically in the background."""
+    directory.start(interval=0.01)
+    add_users(database, ["new_user"])
+
+    deadline = time.monotonic() + 5
+    while "new_user" not in directory and time.monotonic() < deadline:
+        time.sleep(0.01)
+    directory.close()
+
+    assert "new_user" in directory
+
+
+def test_dal_serves_from_directory(
+    database: DatabaseConnection, directory: UserDirectory
+) -> None:
+    """Test the DAL only queries the database for users missing from the directory."""
+    add_users(database, ["known_user"])
+    directory.sync()
+    add_users(database, ["new_user"])
+
+    with patch("auth.repository.dal.db", database):
+        user_dal = UserDataAccessLayer(directory=directory)
+        with patch.object(
+            user_dal,
+            "_query_credentials_by_username",
+            wraps=user_dal._query_credentials_by_username,
+        ) as mock_query:
+            known_user = user_dal.get_credentials_by_username("known_user")
+            new_user = user_dal.get_credentials_by_username("new_user")
+
+    assert known_user is not None
+    assert new_user is not None
+    mock_query.assert_called_once()
+    assert mock_query.call_args.args[1] == "new_user"
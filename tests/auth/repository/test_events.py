@@ -0,0 +1,202 @@
+"""Unit tests for the publishing of user events through the outbox."""
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+
+from auth.models import OutboxEvent, UserEvent, UserLoggedIn, UserRegistered
+from auth.repository.bll import UserBusinessLogicLayer
+from auth.repository.events import EventOutbox
+from auth.repository.service import UserService
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+from toolkit.events import EventBus
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for an empty SQLite database."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.dal.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+@pytest.fixture
+def bus() -> Generator[EventBus, None, None]:
+    """Fixture for instantiating an EventBus."""
+    bus = EventBus(max_workers=2)
+    yield bus
+    bus.close(timeout=5)
+
+
+def count_outbox(database: DatabaseConnection) -> int:
+    """Count the events left in the outbox."""
+    with database.unit_of_work() as session:
+        return session.scalar(select(func.count()).select_from(OutboxEvent)) or 0
+
+
+@pytest.mark.smoke
+def test_event_payload_round_trip() -> None:
+    """Test events are rebuilt from their payload."""
+    occurred_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    event = UserLoggedIn("test_user", occurred_at=occurred_at, source="cli")
+
+    restored = UserLoggedIn.from_payload(event.to_payload())
+
+    assert isinstance(restored, UserLoggedIn)
+    assert restored.to_payload() == event.to_payload()
+    assert repr(restored) == repr(event)
+
+
+@pytest.mark.smoke
+def test_service_publishes_events(database: DatabaseConnection, bus: EventBus) -> None:
+    """Test registrations and successful logins are published to the bus."""
+    events: list[UserEvent] = []
+    bus.subscribe(UserEvent, events.append)
+    service = UserService(event_bus=bus)
+
+    user = service.register("test_user", "password")
+    service.login("test_user", "password", source="cli")
+    service.login("test_user", "wrong")
+
+    assert bus.join(timeout=5)
+    assert [type(event) for event in events] == [UserRegistered, UserLoggedIn]
+    assert isinstance(events[0], UserRegistered)
+    assert events[0].user_id == user.id
+    assert isinstance(events[1], UserLoggedIn)
+    assert events[1].source == "cli"
+    service.close()
+
+
+@pytest.mark.smoke
+def test_outbox_deletes_handled_events(
+    database: DatabaseConnection, bus: EventBus
+) -> None:
+    """Test events are stored before being published and deleted once handled."""
+    release = threading.Event()
+    events: list[UserEvent] = []
+
+    def handle(event: UserEvent) -> None:
+        release.wait(timeout=5)
+        events.append(event)
+
+    bus.subscribe(UserRegistered, handle)
+    service = UserService(event_bus=bus, durable_events=True)
+    assert service.event_outbox is not None
+
+    service.register("test_user", "password")
+    assert service.event_outbox.flush() == 1
+    assert count_outbox(database) == 1
+
+    release.set()
+    service.close()
+    assert [event.username for event in events] == ["test_user"]
+    assert count_outbox(database) == 0
+
+
+@pytest.mark.exception
+def test_recover_left_events(database: DatabaseConnection, bus: EventBus) -> None:
+    """Test events left in the outbox by a crash are published again."""
+    occurred_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    events: list[UserEvent] = []
+    bus.subscribe(UserEvent, events.append)
+    UserBusinessLogicLayer().create_outbox_events(
+        [
+            {
+                "event_id": f"event_{index}",
+                "event_type": "UserLoggedIn",
+                "payload": json.dumps(
+                    UserLoggedIn(f"user_{index}", occurred_at=occurred_at).to_payload()
+                ),
+                "occurred_at": occurred_at,
+            }
+            for index in range(3)
+        ]
+    )
+    outbox = EventOutbox(bus=bus, spill_path=None)
+
+    assert outbox.recover(batch_size=2) == 3
+    outbox.close()
+
+    assert sorted(event.username for event in events) == ["user_0", "user_1", "user_2"]
+    assert count_outbox(database) == 0
+
+
+@pytest.mark.exception
+def test_recover_claims_events(database: DatabaseConnection, bus: EventBus) -> None:
+    """Test only unclaimed and expired events are recovered, by one process each."""
+    now = datetime.now(timezone.utc)
+    events: list[UserEvent] = []
+    bus.subscribe(UserEvent, events.append)
+    claims = {
+        "unclaimed": (None, None),
+        "publishing": ("live", now - timedelta(seconds=10)),
+        "crashed": ("dead", now - timedelta(hours=1)),
+    }
+    UserBusinessLogicLayer().create_outbox_events(
+        [
+            {
+                "event_id": username,
+                "event_type": "UserLoggedIn",
+                "payload": json.dumps(UserLoggedIn(username).to_payload()),
+                "occurred_at": now - timedelta(hours=1),
+                "claimed_by": claimed_by,
+                "claimed_at": claimed_at,
+            }
+            for username, (claimed_by, claimed_at) in claims.items()
+        ]
+    )
+    first = EventOutbox(bus=bus, spill_path=None, lease=60)
+    second = EventOutbox(bus=bus, spill_path=None, lease=60)
+
+    assert first.recover() == 2
+    assert second.recover() == 0
+    first.close()
+    second.close()
+
+    assert sorted(event.username for event in events) == ["crashed", "unclaimed"]
+    assert count_outbox(database) == 1
+
+
+@pytest.mark.exception
+@pytest.mark.parametrize("failure", ["raise", "drop"])
+def test_outbox_keeps_undelivered_events(
+    database: DatabaseConnection, bus: EventBus, failure: str
+) -> None:
+    """Test events a subscriber failed to handle or dropped stay in the outbox."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def handle(event: UserEvent) -> None:
+        if failure == "raise":
+            raise ValueError(event.username)
+        started.set()
+        release.wait(timeout=5)
+
+    bus.subscribe(UserRegistered, handle, max_pending=1)
+    outbox = EventOutbox(bus=bus, spill_path=None)
+
+    outbox.publish(UserRegistered(1, "first"))
+    outbox.flush()
+    if failure == "drop":
+        assert started.wait(timeout=5)
+        outbox.publish(UserRegistered(2, "second"))
+        outbox.publish(UserRegistered(3, "third"))
+        outbox.flush()
+    release.set()
+    outbox.close()
+
+    assert count_outbox(database) == 1
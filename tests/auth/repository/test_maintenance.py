@@ -0,0 +1,113 @@
+"""Unit tests for the maintenance of the user tables."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select, text
+
+from auth.models import LoginAttempt, User
+from auth.repository.bll import UserBusinessLogicLayer
+from auth.repository.maintenance import (
+    analyze_user_tables,
+    build_maintenance_scheduler,
+)
+from auth.repository.service import UserService
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+from toolkit.diagnostics import MemoryMonitor
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a SQLite database with old and recent login attempts."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with database.unit_of_work() as session:
+        session.add_all(
+            LoginAttempt(
+                username=f"user_{index}",
+                success=True,
+                attempted_at=NOW - timedelta(days=100 if index % 2 else 1),
+            )
+            for index in range(25)
+        )
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.maintenance.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+@pytest.mark.smoke
+def test_purge_login_attempts(database: DatabaseConnection) -> None:
+    """Test login attempts older than the cutoff are purged in batches."""
+    purged = UserBusinessLogicLayer().purge_login_attempts(
+        NOW - timedelta(days=90), batch_size=5
+    )
+
+    assert purged == 12
+    with database.unit_of_work() as session:
+        assert session.scalar(select(func.count()).select_from(LoginAttempt)) == 13
+
+
+@pytest.mark.smoke
+def test_analyze_user_tables(database: DatabaseConnection) -> None:
+    """Test the statistics of the user tables are refreshed."""
+    with database.unit_of_work() as session:
+        session.add(User(username="test_user", password="password"))
+
+    analyze_user_tables()
+
+    with database.get_engine().connect() as connection:
+        tables = connection.scalars(text("SELECT tbl FROM sqlite_stat1")).all()
+    assert "auth_user" in tables
+
+
+def test_build_maintenance_scheduler(database: DatabaseConnection) -> None:
+    """Test the jobs scheduled depend on the features of the service."""
+    scheduler = build_maintenance_scheduler(UserService())
+    assert set(scheduler.jobs) == {"purge-login-attempts", "analyze-user-tables"}
+    assert scheduler.max_workers == 1
+
+    service = UserService(collect_statistics=True)
+    scheduler = build_maintenance_scheduler(service, max_connections=2)
+    assert "reconcile-statistics" in scheduler.jobs
+    assert scheduler.max_workers == 2
+    service.close()
+
+    scheduler = build_maintenance_scheduler(
+        UserService(), memory_monitor=MemoryMonitor()
+    )
+    assert "check-memory" in scheduler.jobs
+
+
+def test_logins_keep_memory_flat(database: DatabaseConnection) -> None:
+    """Test repeated logins leave no sessions, objects or memory behind."""
+    service = UserService()
+    for index in range(20):
+        service.register(f"soak_user_{index}", "password")
+    monitor = MemoryMonitor(
+        growth_threshold=256 * 1024, gauges=database.get_memory_stats
+    )
+    with patch("auth.repository.dal.db", database):
+        for index in range(200):
+            service.login(f"soak_user_{index % 20}", "password")
+        monitor.start()
+        try:
+            for index in range(1_000):
+                assert service.login(f"soak_user_{index % 20}", "password")[1]
+            report = monitor.check()
+        finally:
+            monitor.stop()
+
+    assert report.growth < 256 * 1024
+    assert report.gauges["identity_map"] == 0
+    assert report.gauges["checked_out"] == 0
@@ -0,0 +1,66 @@
+"""Unit tests for the cursors of the user pagination."""
+
+import pytest
+from sqlalchemy import column
+
+from auth.helpers.exceptions import InvalidCursorError
+from auth.repository.pagination import (
+    CursorKey,
+    UserOrder,
+    decode_cursor,
+    encode_cursor,
+    escape_like,
+    prefix_range,
+)
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize(
+    "order, key",
+    [
+        (UserOrder.ID, 42),
+        (UserOrder.USERNAME, "Zoë/=+?"),
+        (UserOrder.LOWER_USERNAME, ["zoë", "Zoë"]),
+    ],
+)
+def test_cursor_round_trip(order: UserOrder, key: CursorKey) -> None:
+    """Test a cursor decodes to the key it was encoded from, and is URL-safe."""
+    cursor = encode_cursor(order, key)
+
+    assert decode_cursor(cursor, order) == key
+    assert cursor.replace("-", "").replace("_", "").isalnum()
+
+
+@pytest.mark.exception
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "%%%",
+        encode_cursor(UserOrder.USERNAME, "alice")[:-2],
+        encode_cursor(UserOrder.ID, 1),
+        encode_cursor(UserOrder.USERNAME, 1),
+        encode_cursor(UserOrder.LOWER_USERNAME, ["alice", "Alice"]),
+        encode_cursor(UserOrder.USERNAME, ["alice"]),
+    ],
+)
+def test_invalid_cursor(cursor: str) -> None:
+    """Test malformed cursors and cursors of another order are rejected."""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, UserOrder.USERNAME)
+
+
+def test_escape_like() -> None:
+    """Test the wildcards and the escape character are escaped."""
+    assert escape_like("a_b%c\\d") == "a\\_b\\%c\\\\d"
+
+
+@pytest.mark.parametrize(
+    "prefix, bounds",
+    [("AL", ("al", "am")), ("a_", ("a_", "a`")), ("\U0010ffff", ("\U0010ffff",))],
+)
+def test_prefix_range(prefix: str, bounds: tuple[str, ...]) -> None:
+    """Test the range of a prefix ends past the strings starting with it, if any."""
+    conditions = prefix_range(column("key"), prefix)
+
+    assert [condition.right.effective_value for condition in conditions] == list(bounds)
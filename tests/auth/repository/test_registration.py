@@ -0,0 +1,110 @@
+"""Unit tests for the GroupRegistrar class."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from auth.helpers.exceptions import UserAlreadyExistsError
+from auth.models import User
+from auth.repository.registration import GroupRegistrar
+from auth.repository.service import UserService
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a SQLite database used by the BLL."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.registration.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+def count_users(database: DatabaseConnection) -> int:
+    """Return the number of registered users."""
+    with database.unit_of_work() as session:
+        return session.scalar(select(func.count()).select_from(User)) or 0
+
+
+@pytest.mark.smoke
+def test_register(database: DatabaseConnection) -> None:
+    """Test a registration through the registrar creates the user."""
+    registrar = GroupRegistrar(window=0.001)
+
+    user = registrar.register("test_user", "password")
+
+    assert user.id is not None
+    assert user.username == "test_user"
+    assert count_users(database) == 1
+
+
+def test_concurrent_registrations(database: DatabaseConnection) -> None:
+    """Test concurrent registrations share commits, duplicates failing on their own."""
+    registrar = GroupRegistrar(window=0.05, max_size=16)
+    usernames = [f"user_{index % 24}" for index in range(32)]
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        futures = [
+            executor.submit(registrar.register, username, "password")
+            for username in usernames
+        ]
+
+    created = [future.result() for future in futures if future.exception() is None]
+    rejected = [future.exception() for future in futures if future.exception()]
+    assert sorted(user.username for user in created) == sorted(set(usernames))
+    assert len(rejected) == 8
+    assert all(isinstance(error, UserAlreadyExistsError) for error in rejected)
+    assert registrar.commits < len(usernames)
+    assert count_users(database) == 24
+
+
+def test_service_uses_registrar(database: DatabaseConnection) -> None:
+    """Test the service registers through its registrar, hashing the password."""
+    registrar = GroupRegistrar(window=0.001)
+    service = UserService(registrar=registrar)
+
+    user = service.register("test_user", "password")
+
+    assert user.password == service.hash_password("password")
+    assert registrar.commits == 1
+
+
+def test_followers_read_their_writes(
+    sqlite_url_factory: Callable[[str], str],
+) -> None:
+    """Test every caller of a group reads from the primary once it is committed."""
+    replica = create_engine(sqlite_url_factory("replica"))
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"),
+        replicas=ReplicaSet([replica]),
+        shards={},
+        sticky_window=60,
+    )
+    registrar = GroupRegistrar(window=10, max_size=4)
+
+    def register(username: str) -> bool:
+        registrar.register(username, "password")
+        return database.route(is_write=False) is database.get_engine()
+
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.registration.db", database),
+        ThreadPoolExecutor(max_workers=4) as executor,
+    ):
+        on_primary = list(executor.map(register, [f"user_{i}" for i in range(4)]))
+
+    assert registrar.commits == 1
+    assert on_primary == [True] * 4
+    database.dispose()
+    replica.dispose()
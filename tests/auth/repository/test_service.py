@@ -1,14 +1,18 @@
 """Unit tests for the UserService class."""
 
+import time
 from datetime import datetime
 from typing import Generator
-from unittest.mock import patch
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 from sqlalchemy.orm import Session
 
+from auth.models import UserCredentials
 from auth.repository.service import UserService
 from config.base import db
+from config.database.base import DatabaseConnection
+from config.database.exceptions import DeadlineExceededError
 
 
 @pytest.fixture(autouse=True)
@@ -29,8 +33,8 @@ def mock_session(db_session: Session) -> Generator[None, None, None]:
     ------
     None
     """
-    with patch.object(db, "get_session") as actual_session:
-        actual_session.return_value = db_session
+    with patch.object(db, "get_session_factory") as session_factory:
+        session_factory.return_value = lambda: db_session
         yield
 
 
@@ -58,15 +62,16 @@ def test_valid_login(user_service: UserService) -> None:
     """Test valid login functionality."""
     username = "test_user"
     password = "test_password"
-    user_service.register(username, password)
+    registered_user = user_service.register(username, password)
 
     user, is_authenticated = user_service.login(username, password)
     assert is_authenticated
+    assert isinstance(user, UserCredentials)
+    assert user.id == registered_user.id
     assert user.username == username
 
     hashed_password = user_service.hash_password(password)
     assert user.password == hashed_password
-    assert isinstance(user.date_joined, datetime)
 
 
 def test_invalid_login(user_service: UserService) -> None:
@@ -92,3 +97,52 @@ def test_verify_password(user_service: UserService) -> None:
     assert not user_service.verify_password(password, password)
     assert not user_service.verify_password("invalid password", hashed_password)
     assert not user_service.verify_password("invalid password", "invalid password")
+
+
+def test_login_tracks_last_login(user_service: UserService) -> None:
+    """Test successful logins are recorded by the last login tracker."""
+    user_service.last_login_tracker = MagicMock()
+    user = user_service.register("test_user", "test_password")
+
+    user_service.login("test_user", "invalid password")
+    user_service.last_login_tracker.record.assert_not_called()
+
+    user_service.login("test_user", "test_password")
+    user_service.last_login_tracker.record.assert_called_once_with(user.username)
+
+    user_service.close()
+    user_service.last_login_tracker.close.assert_called_once()
+
+
+def test_login_audits_attempts(user_service: UserService) -> None:
+    """Test every login attempt is recorded by the audit log."""
+    user_service.login_audit_log = MagicMock()
+    user_service.register("test_user", "test_password")
+
+    user_service.login("test_user", "invalid password", source="cli")
+    user_service.login("test_user", "test_password")
+
+    user_service.login_audit_log.record.assert_has_calls(
+        [
+            call(username="test_user", success=False, source="cli"),
+            call(username="test_user", success=True, source=None),
+        ]
+    )
+
+    user_service.close()
+    user_service.login_audit_log.close.assert_called_once()
+
+
+def test_login_deadline(
+    user_service: UserService, slow_database: DatabaseConnection
+) -> None:
+    """Test a login against a slow database fails once its deadline passes."""
+    start = time.monotonic()
+    with (
+        patch("auth.repository.dal.db", slow_database),
+        pytest.raises(DeadlineExceededError),
+        slow_database.deadline(0.05),
+    ):
+        user_service.login("test_user", "test_password")
+
+    assert time.monotonic() - start < 0.25
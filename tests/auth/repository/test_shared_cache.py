@@ -0,0 +1,94 @@
+"""Unit tests for the credential cache shared by worker processes."""
+
+import time
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+
+from auth.models import UserCredentials
+from auth.repository.dal import UserDataAccessLayer
+from auth.repository.service import UserService
+from auth.repository.shared_cache import SharedCredentialCache
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+
+DIGEST = "ab" * 32
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for an empty SQLite database."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.dal.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+@pytest.fixture
+def cache() -> Generator[SharedCredentialCache, None, None]:
+    """Fixture for an empty cache."""
+    cache = SharedCredentialCache(capacity=100)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.smoke
+def test_put_get(cache: SharedCredentialCache) -> None:
+    """Test cached credentials are read back, and invalidated."""
+    assert cache.put(UserCredentials(42, "test_user", DIGEST))
+
+    credentials = cache.get("test_user")
+    assert credentials is not None
+    assert (credentials.id, credentials.username) == (42, "test_user")
+    assert credentials.password == DIGEST
+    assert cache.get("other_user") is None
+    cache.invalidate("test_user")
+    assert cache.get("test_user") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.parametrize(
+    "credentials",
+    [
+        UserCredentials(1, "archived_user", DIGEST, archived=True),
+        UserCredentials(2, "bcrypt_user", "$2b$12$notasha256digest"),
+        UserCredentials(3, "u" * 100, DIGEST),
+    ],
+)
+def test_not_cached(cache: SharedCredentialCache, credentials: UserCredentials) -> None:
+    """Test archived users, other hashes and long usernames are not cached."""
+    assert not cache.put(credentials)
+    assert cache.get(credentials.username) is None
+
+
+def test_expiry(cache: SharedCredentialCache) -> None:
+    """Test credentials expire after the time to live of the cache."""
+    cache.ttl = 0.01
+    cache.put(UserCredentials(42, "test_user", DIGEST))
+    time.sleep(0.02)
+
+    assert cache.get("test_user") is None
+
+
+@pytest.mark.usefixtures("database")
+def test_dal_fills_cache(cache: SharedCredentialCache) -> None:
+    """Test logins fill the cache and are then served from it."""
+    UserService().register("test_user", "password")
+    service = UserService(credential_cache=cache)
+
+    assert service.login("test_user", "password")[1]
+    assert cache.misses == 1
+    with patch.object(UserDataAccessLayer, "_read") as read:
+        user, is_authenticated = service.login("test_user", "password")
+    read.assert_not_called()
+    assert is_authenticated
+    assert user is not None and user.username == "test_user"
+    assert cache.hits == 1
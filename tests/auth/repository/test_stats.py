@@ -0,0 +1,136 @@
+"""Unit tests for the user statistics."""
+
+import threading
+from datetime import date, datetime, timezone
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+
+from auth.models import ALL_TIME, User, UserMetric
+from auth.repository.bll import UserBusinessLogicLayer
+from auth.repository.service import UserService
+from auth.repository.stats import UserStatistics
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+
+DAY = date(2024, 5, 1)
+NEXT_DAY = date(2024, 5, 2)
+
+
+def at(day: date, hour: int) -> datetime:
+    """Return a time of a day, in UTC."""
+    return datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a SQLite database used by the layers and the statistics."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.dal.db", database),
+        patch("auth.repository.stats.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+@pytest.fixture
+def service(database: DatabaseConnection) -> Generator[UserService, None, None]:
+    """Fixture for a user service collecting statistics."""
+    service = UserService(track_last_login=True, collect_statistics=True)
+    yield service
+    service.close()
+
+
+@pytest.mark.smoke
+def test_count_signups(service: UserService) -> None:
+    """Test registrations are counted once the statistics are flushed."""
+    for index in range(3):
+        service.register(f"user_{index}", "password")
+    assert service.count_users() == 0
+
+    assert service.statistics is not None
+    service.statistics.flush()
+
+    today = datetime.now(timezone.utc).date()
+    assert service.count_users() == 3
+    assert service.count_signups(today) == 3
+    assert service.count_signups(DAY) == 0
+
+
+def test_count_active_users(database: DatabaseConnection) -> None:
+    """Test only the first login of a user on a day counts as active."""
+    bll = UserBusinessLogicLayer()
+    for username in ["first_user", "second_user"]:
+        bll.create_user(username=username, password="password")
+
+    bll.update_last_logins(
+        {"first_user": at(DAY, 8), "second_user": at(DAY, 9)}, count_active=True
+    )
+    bll.update_last_logins({"first_user": at(DAY, 18)}, count_active=True)
+    bll.update_last_logins({"first_user": at(NEXT_DAY, 7)}, count_active=True)
+
+    service = UserService()
+    assert service.count_active_users(DAY) == 2
+    assert service.count_active_users(NEXT_DAY) == 1
+
+
+def test_concurrent_increments(database: DatabaseConnection) -> None:
+    """Test concurrent increments of a new counter never lose a count."""
+    bll = UserBusinessLogicLayer()
+    errors: list[Exception] = []
+
+    def increment() -> None:
+        try:
+            for _ in range(10):
+                bll.increment_stats({(UserMetric.SIGNUPS, DAY): 1})
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert UserService().count_signups(DAY) == 80
+
+
+def test_reconcile(database: DatabaseConnection) -> None:
+    """Test reconciling recomputes the counters in batches and keeps past activity."""
+    with database.unit_of_work() as session:
+        session.add_all(
+            User(
+                username=f"user_{index}",
+                password="password",
+                date_joined=at(DAY if index < 3 else NEXT_DAY, 12),
+                last_login=at(NEXT_DAY, 13) if index % 2 else None,
+            )
+            for index in range(5)
+        )
+    bll = UserBusinessLogicLayer()
+    bll.replace_stats(
+        {
+            (UserMetric.USERS, ALL_TIME): 42,
+            (UserMetric.SIGNUPS, DAY): 1,
+            (UserMetric.ACTIVE_USERS, DAY): 7,
+        }
+    )
+    statistics = UserStatistics(bll=bll, flush_interval=3600)
+
+    statistics.reconcile(batch_size=2, today=NEXT_DAY)
+    statistics.close()
+
+    service = UserService()
+    assert service.count_users() == 5
+    assert service.count_signups(DAY) == 3
+    assert service.count_signups(NEXT_DAY) == 2
+    assert service.count_active_users(NEXT_DAY) == 2
+    assert service.count_active_users(DAY) == 7
@@ -0,0 +1,68 @@
+"""Unit tests for the LastLoginTracker class."""
+
+from datetime import datetime, timezone
+from typing import Generator
+from unittest.mock import MagicMock
+
+import pytest
+
+from auth.repository.tracking import LastLoginTracker
+
+
+@pytest.fixture
+def mock_bll() -> MagicMock:
+    """Fixture for a mocked UserBusinessLogicLayer."""
+    return MagicMock()
+
+
+@pytest.fixture
+def tracker(mock_bll: MagicMock) -> Generator[LastLoginTracker, None, None]:
+    """Fixture for instantiating a LastLoginTracker."""
+    tracker = LastLoginTracker(bll=mock_bll, flush_interval=3600)
+    yield tracker
+    tracker.close()
+
+
+@pytest.mark.smoke
+def test_record(tracker: LastLoginTracker, mock_bll: MagicMock) -> None:
+    """Test recording logins and flushing them in bulk."""
+    first_login = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    second_login = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+    tracker.record("first_user", first_login)
+    tracker.record("second_user", first_login)
+    tracker.record("first_user", second_login)
+    tracker.record("first_user", first_login)
+
+    assert tracker.flush() == 2
+    mock_bll.update_last_logins.assert_called_once_with(
+        {"first_user": second_login, "second_user": first_login}
+    )
+
+
+def test_record_defaults_to_now(tracker: LastLoginTracker, mock_bll: MagicMock) -> None:
+    """Test recording a login without an explicit timestamp."""
+    before = datetime.now(timezone.utc)
+    tracker.record("test_user")
+    tracker.flush()
+
+    (last_logins,), _ = mock_bll.update_last_logins.call_args
+    assert last_logins["test_user"] >= before
+
+
+def test_close_flushes(tracker: LastLoginTracker, mock_bll: MagicMock) -> None:
+    """Test closing the tracker writes the pending logins."""
+    tracker.record("test_user")
+    tracker.close()
+
+    mock_bll.update_last_logins.assert_called_once()
+
+
+def test_count_active(mock_bll: MagicMock) -> None:
+    """Test a tracker counting active users asks for it when flushing."""
+    tracker = LastLoginTracker(bll=mock_bll, flush_interval=3600, count_active=True)
+    tracker.record("test_user")
+    tracker.close()
+
+    _, kwargs = mock_bll.update_last_logins.call_args
+    assert kwargs == {"count_active": True}
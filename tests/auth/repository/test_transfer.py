@@ -0,0 +1,243 @@
+"""Unit tests for the user transfer module."""
+
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from auth.models import User, UserArchive
+from auth.repository.bll import UserBusinessLogicLayer
+from auth.repository.transfer import export_users, import_users
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+
+DatabaseFactory = Callable[..., DatabaseConnection]
+
+
+@pytest.fixture
+def database_factory(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseFactory, None, None]:
+    """Fixture for a factory of SQLite databases, optionally sharded."""
+    databases: list[DatabaseConnection] = []
+
+    def create_database(name: str, shards: int = 0) -> DatabaseConnection:
+        database = DatabaseConnection(
+            url=sqlite_url_factory(name),
+            replicas=ReplicaSet([]),
+            shards={
+                f"shard_{index}": create_engine(sqlite_url_factory(f"{name}_{index}"))
+                for index in range(shards)
+            },
+        )
+        databases.append(database)
+        return database
+
+    yield create_database
+    for database in databases:
+        database.dispose()
+
+
+def use_database(database: DatabaseConnection) -> ExitStack:
+    """Point the transfer module and the BLL at a database."""
+    stack = ExitStack()
+    stack.enter_context(patch("auth.repository.transfer.db", database))
+    stack.enter_context(patch("auth.repository.bll.db", database))
+    return stack
+
+
+def seed_users(database: DatabaseConnection, count: int) -> None:
+    """Register users in a database."""
+    session = database.get_session()
+    session.add_all(
+        User(
+            username=f"user_{index}",
+            password=f"password_{index}",
+            last_login=datetime(2024, 1, 1, 0, 0, index % 60) if index % 2 else None,
+        )
+        for index in range(count)
+    )
+    session.commit()
+    session.close()
+
+
+def dump_users(database: DatabaseConnection) -> list[tuple[Any, ...]]:
+    """Return the exported columns of every user of a database, by username."""
+    engines = list(database.get_shards().values()) or [database.get_engine()]
+    users = []
+    for engine in engines:
+        with Session(engine) as session:
+            users.extend(
+                session.execute(
+                    select(
+                        User.username,
+                        User.password,
+                        User.last_login,
+                        User.date_joined,
+                        User.created_at,
+                        User.modified_at,
+                    )
+                ).tuples()
+            )
+    return sorted(users)
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize(
+    "file_name", ["users.csv", "users.jsonl.gz", "users.bin.xz", "users.bin.bz2"]
+)
+def test_export_import(
+    database_factory: DatabaseFactory, tmp_path: Path, file_name: str
+) -> None:
+    """Test restoring exported users into an empty database."""
+    source = database_factory("source")
+    target = database_factory("target")
+    seed_users(source, 25)
+    path = tmp_path / file_name
+
+    with use_database(source):
+        assert export_users(path, batch_size=4) == 25
+    with use_database(target):
+        assert import_users(path, batch_size=4) == 25
+
+    assert dump_users(target) == dump_users(source)
+    assert not Path(f"{path}.checkpoint").exists()
+
+
+def test_export_import_sharded(
+    database_factory: DatabaseFactory, tmp_path: Path
+) -> None:
+    """Test moving users from a single database to a sharded one."""
+    source = database_factory("source")
+    target = database_factory("target", shards=3)
+    seed_users(source, 25)
+    path = tmp_path / "users.jsonl"
+
+    with use_database(source):
+        export_users(path)
+    with use_database(target):
+        import_users(path, batch_size=4)
+        assert export_users(tmp_path / "sharded.jsonl") == 25
+
+    assert dump_users(target) == dump_users(source)
+    for name, engine in target.get_shards().items():
+        with Session(engine) as session:
+            usernames = session.scalars(select(User.username)).all()
+        assert usernames
+        assert all(target.shard_for(username) == name for username in usernames)
+
+
+def test_export_import_archived_users(
+    database_factory: DatabaseFactory, tmp_path: Path
+) -> None:
+    """Test that archived users are restored into the archive, as archived."""
+    source = database_factory("source")
+    target = database_factory("target")
+    seed_users(source, 6)
+    archived_at = datetime(2024, 3, 1)
+    with source.unit_of_work() as session:
+        session.add_all(
+            UserArchive(
+                username=f"archived_{index}",
+                password="password",
+                date_joined=datetime(2020, 1, 1),
+                archived_at=archived_at,
+            )
+            for index in range(4)
+        )
+    path = tmp_path / "users.csv"
+
+    with use_database(source):
+        assert export_users(path) == 10
+    with use_database(target):
+        assert import_users(path, batch_size=3) == 10
+        assert import_users(path, batch_size=3) == 0
+
+    assert dump_users(target) == dump_users(source)
+    with Session(target.get_engine()) as session:
+        archived = session.execute(
+            select(UserArchive.username, UserArchive.archived_at)
+        ).all()
+    assert sorted(archived) == [
+        (f"archived_{index}", archived_at) for index in range(4)
+    ]
+
+
+def test_import_unarchived_dump(
+    database_factory: DatabaseFactory, tmp_path: Path
+) -> None:
+    """Test importing a dump written before users were archived."""
+    target = database_factory("target")
+    path = tmp_path / "users.csv"
+    path.write_text(
+        "username,password,last_login,date_joined,created_at,modified_at\n"
+        "alice,password,,2024-01-01T00:00:00,2024-01-01T00:00:00,"
+        "2024-01-01T00:00:00\n"
+    )
+
+    with use_database(target):
+        assert import_users(path) == 1
+
+    assert [user[0] for user in dump_users(target)] == ["alice"]
+
+
+def test_import_skips_registered_users(
+    database_factory: DatabaseFactory, tmp_path: Path
+) -> None:
+    """Test importing users into a database already holding some of them."""
+    source = database_factory("source")
+    target = database_factory("target")
+    seed_users(source, 10)
+    seed_users(target, 4)
+    path = tmp_path / "users.csv"
+
+    with use_database(source):
+        export_users(path)
+    with use_database(target):
+        assert import_users(path, batch_size=3) == 6
+        assert import_users(path, batch_size=3) == 0
+
+    assert len(dump_users(target)) == 10
+
+
+@pytest.mark.exception
+def test_resume_interrupted_import(
+    database_factory: DatabaseFactory, tmp_path: Path
+) -> None:
+    """Test resuming an import interrupted by a failed batch."""
+    source = database_factory("source")
+    target = database_factory("target")
+    seed_users(source, 10)
+    path = tmp_path / "users.bin"
+    checkpoint = tmp_path / "users.bin.checkpoint"
+
+    with use_database(source):
+        export_users(path)
+    with use_database(target):
+        bll = UserBusinessLogicLayer()
+        create_users = bll.create_users
+        calls = 0
+
+        def fail_second_batch(batch: list[dict[str, Any]]) -> int:
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise ConnectionError
+            return create_users(batch)
+
+        with patch.object(bll, "create_users", side_effect=fail_second_batch):
+            with pytest.raises(ConnectionError):
+                import_users(path, batch_size=4, bll=bll)
+        assert checkpoint.read_text() == "4"
+
+        with patch.object(bll, "create_users", side_effect=create_users) as resumed:
+            assert import_users(path, batch_size=4, bll=bll) == 6
+        assert [len(call.args[0]) for call in resumed.call_args_list] == [4, 2]
+
+    assert dump_users(target) == dump_users(source)
+    assert not checkpoint.exists()
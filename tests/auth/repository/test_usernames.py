@@ -0,0 +1,121 @@
+"""Unit tests for the reserved and blocked username policy."""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from auth.helpers.exceptions import UsernameNotAllowedError
+from auth.repository.bll import UserBusinessLogicLayer
+from auth.repository.usernames import UsernamePolicy, UsernameRules, normalize_username
+
+CONFIG = """
+[reserved]
+patterns = ["admin", "root"]
+files = ["reserved.txt"]
+
+[blocked]
+patterns = ["official"]
+files = []
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path: Path) -> Path:
+    """Fixture for the path of a policy pointing to a file of reserved names."""
+    (tmp_path / "reserved.txt").write_text("# Staff\nsupport\n\nhelp_desk\n")
+    path = tmp_path / "usernames.toml"
+    path.write_text(CONFIG)
+    return path
+
+
+def touch_later(path: Path, content: str) -> None:
+    """Rewrite a file with a modification time surely different from the last one."""
+    mtime = path.stat().st_mtime_ns
+    path.write_text(content)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+@pytest.mark.smoke
+def test_check(config_path: Path) -> None:
+    """Test reserved names and names with blocked words are refused."""
+    policy = UsernamePolicy(config_path)
+
+    for username in ["admin", "ROOT", "\uff21dmin", "help.desk", "the_official_bob"]:
+        with pytest.raises(UsernameNotAllowedError):
+            policy.check(username)
+    for username in ["administrator_fan", "grassroots", "supporter", "alice"]:
+        policy.check(username)
+
+
+def test_normalize_username() -> None:
+    """Test case, compatibility characters and separators are folded."""
+    assert normalize_username("Ad.Min-User_ \uff12") == "adminuser2"
+
+
+def test_rules_violation() -> None:
+    """Test the reason of a refusal names the blocked word."""
+    rules = UsernameRules(reserved=["Admin"], blocked=["Fake-Staff", ""])
+
+    assert rules.violation("ADMIN") == "Username ADMIN is reserved."
+    assert rules.violation("the_fakestaff") == (
+        "Username the_fakestaff contains the blocked word 'fakestaff'."
+    )
+    assert rules.violation("staff") is None
+
+
+def test_reload_on_change(config_path: Path) -> None:
+    """Test the rules are rebuilt in the background once a file of patterns changes."""
+    policy = UsernamePolicy(config_path, check_interval=0)
+    policy.check("moderator")
+
+    rules = policy.rules
+
+    touch_later(config_path.parent / "reserved.txt", "moderator\n")
+    policy.check("alice")
+    deadline = time.monotonic() + 5
+    while policy.rules is rules and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    with pytest.raises(UsernameNotAllowedError):
+        policy.check("moderator")
+    policy.check("support")
+
+
+def test_failed_reload_keeps_rules(config_path: Path) -> None:
+    """Test a configuration failing to load leaves the current rules in place."""
+    policy = UsernamePolicy(config_path, check_interval=0)
+    rules = policy.rules
+
+    touch_later(config_path, "[reserved\n")
+
+    assert policy.reload() is False
+    assert policy.rules is rules
+    with pytest.raises(UsernameNotAllowedError):
+        policy.check("admin")
+
+
+@pytest.mark.exception
+def test_create_user_checks_before_database(config_path: Path) -> None:
+    """Test users with a refused username are rejected before any database work."""
+    bll = UserBusinessLogicLayer(username_policy=UsernamePolicy(config_path))
+
+    with patch("auth.repository.bll.db", MagicMock()) as database:
+        with pytest.raises(UsernameNotAllowedError):
+            bll.create_user(username="root", password="password")
+        database.unit_of_work.assert_not_called()
+
+        session = database.unit_of_work.return_value.__enter__.return_value
+        # No user is archived.
+        session.execute.return_value.first.return_value = None
+        results = bll.create_user_group([("admin", "password"), ("alice", "password")])
+
+    assert isinstance(results[0], UsernameNotAllowedError)
+    assert not isinstance(results[1], Exception)
+
+
+def test_open_missing_policy(tmp_path: Path) -> None:
+    """Test no policy is loaded without a configuration."""
+    assert UsernamePolicy.open(tmp_path / "missing.toml") is None
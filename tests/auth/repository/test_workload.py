@@ -0,0 +1,123 @@
+"""Unit tests for the recording and replay of workloads."""
+
+from pathlib import Path
+from typing import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+
+from auth.helpers.exceptions import UserAlreadyExistsError
+from auth.repository.service import UserService
+from auth.repository.workload import (
+    Operation,
+    Outcome,
+    WorkloadRecorder,
+    read_workload,
+    replay_workload,
+    seed_users,
+    summarize_latencies,
+)
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+
+
+def connect(url: str) -> DatabaseConnection:
+    """Connect to a SQLite database with neither replicas nor shards."""
+    return DatabaseConnection(url=url, replicas=ReplicaSet([]), shards={})
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for an empty SQLite database."""
+    database = connect(sqlite_url_factory("primary"))
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.dal.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+@pytest.fixture
+def workload(database: DatabaseConnection, tmp_path: Path) -> Path:
+    """Fixture for a workload log of every outcome, recorded on the database."""
+    UserService().register("existing_user", "password")
+    path = tmp_path / "workload.bin.gz"
+    service = UserService(workload_recorder=WorkloadRecorder(path))
+    service.register("new_user", "password")
+    with pytest.raises(UserAlreadyExistsError):
+        service.register("existing_user", "password")
+    service.login("new_user", "password")
+    service.login("existing_user", "wrong_password")
+    service.login("unknown_user", "password")
+    service.close()
+    return path
+
+
+@pytest.mark.smoke
+def test_record(workload: Path) -> None:
+    """Test the operations are recorded with their outcome and anonymized users."""
+    entries = list(read_workload(workload))
+
+    assert [(entry.operation, entry.outcome) for entry in entries] == [
+        (Operation.REGISTER, Outcome.OK),
+        (Operation.REGISTER, Outcome.FAILED),
+        (Operation.LOGIN, Outcome.OK),
+        (Operation.LOGIN, Outcome.WRONG_PASSWORD),
+        (Operation.LOGIN, Outcome.UNKNOWN_USER),
+    ]
+    assert entries[0].user == entries[2].user
+    assert entries[1].user == entries[3].user
+    assert all(len(entry.user) == 16 and "user" not in entry.user for entry in entries)
+    assert all(entry.duration > 0 for entry in entries)
+    offsets = [entry.offset for entry in entries]
+    assert offsets == sorted(offsets)
+
+
+def test_anonymize_with_key(tmp_path: Path) -> None:
+    """Test usernames only hash the same under the same key."""
+    recorders = [
+        WorkloadRecorder(tmp_path / "first.bin", key=b"key"),
+        WorkloadRecorder(tmp_path / "second.bin", key=b"key"),
+        WorkloadRecorder(tmp_path / "third.bin"),
+    ]
+    users = {recorder.anonymize("test_user") for recorder in recorders}
+    for recorder in recorders:
+        recorder.close()
+
+    assert len(users) == 2
+
+
+def test_replay(
+    workload: Path, sqlite_url_factory: Callable[[str], str], tmp_path: Path
+) -> None:
+    """Test a seeded replay on another database reproduces the recorded outcomes."""
+    other = connect(sqlite_url_factory("replay"))
+    output = tmp_path / "replay.bin"
+    with (
+        patch("auth.repository.bll.db", other),
+        patch("auth.repository.dal.db", other),
+    ):
+        assert seed_users(workload) == 1
+        service = UserService(workload_recorder=WorkloadRecorder(output))
+        report = replay_workload(workload, service, speed=0, max_workers=1)
+        service.close()
+    other.dispose()
+
+    assert report.replayed == 5
+    assert report.mismatches == 0
+    assert [entry.outcome for entry in read_workload(output)] == [
+        entry.outcome for entry in read_workload(workload)
+    ]
+
+
+def test_summarize_latencies(workload: Path) -> None:
+    """Test the durations are summarized by operation."""
+    summaries = summarize_latencies(workload)
+
+    assert summaries[Operation.REGISTER]["count"] == 2
+    assert summaries[Operation.LOGIN]["count"] == 3
+    login = summaries[Operation.LOGIN]
+    assert login["p50"] <= login["p99"] <= login["max"]
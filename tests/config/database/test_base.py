@@ -0,0 +1,244 @@
+"""Unit tests for the DatabaseConnection class."""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generator
+
+import pytest
+from sqlalchemy import Engine, create_engine, select
+from sqlalchemy.orm import Session
+
+from auth.models import User
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+
+
+@pytest.fixture
+def replica_engines(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[list[Engine], None, None]:
+    """Fixture for engines connected to two SQLite replicas, each holding one user."""
+    engines = []
+    for index in range(2):
+        engine = create_engine(sqlite_url_factory(f"replica_{index}"))
+        with Session(engine) as session:
+            session.add(User(username=f"replica_{index}_user", password="password"))
+            session.commit()
+        engines.append(engine)
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str], replica_engines: list[Engine]
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a database connection with a primary and two replicas."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"),
+        replicas=ReplicaSet(replica_engines),
+        sticky_window=60,
+    )
+    yield database
+    database.dispose()
+
+
+def usernames(session: Session) -> set[str]:
+    """Return the usernames visible to a session."""
+    return set(session.scalars(select(User.username)))
+
+
+@pytest.mark.smoke
+def test_without_replicas(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test every statement goes to the primary when no replica is configured."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([])
+    )
+
+    session = database.get_session()
+    session.add(User(username="test_user", password="password"))
+    session.commit()
+
+    assert usernames(session) == {"test_user"}
+    assert session.get_bind() is database.get_engine()
+    database.dispose()
+
+
+def test_reads_go_to_replicas(database: DatabaseConnection) -> None:
+    """Test reads are spread over the replicas."""
+    session = database.get_session()
+
+    assert usernames(session) == {"replica_0_user"}
+    session.rollback()
+    assert usernames(session) == {"replica_1_user"}
+
+
+def test_writes_go_to_primary(database: DatabaseConnection) -> None:
+    """Test writes go to the primary and later reads in the context stick to it."""
+    session = database.get_session()
+    session.add(User(username="test_user", password="password"))
+    session.commit()
+
+    assert usernames(session) == {"test_user"}
+    with Session(database.get_engine()) as primary_session:
+        assert usernames(primary_session) == {"test_user"}
+
+
+def test_sticky_window_expires(database: DatabaseConnection) -> None:
+    """Test reads go back to the replicas once the sticky window is over."""
+    database._sticky_window = 0
+    session = database.get_session()
+    session.add(User(username="test_user", password="password"))
+    session.commit()
+
+    assert "test_user" not in usernames(session)
+
+
+def test_use_primary(database: DatabaseConnection) -> None:
+    """Test forcing reads to the primary."""
+    session = database.get_session()
+
+    with database.use_primary():
+        assert usernames(session) == set()
+
+
+def test_fall_back_to_primary(database: DatabaseConnection) -> None:
+    """Test reads fall back to the primary when no replica is healthy."""
+    replicas = database.get_replicas()
+    for engine in replicas.engines:
+        replicas.mark_unhealthy(engine)
+
+    assert usernames(database.get_session()) == set()
+
+
+def test_replicas_from_config(tmp_path_factory: pytest.TempPathFactory) -> None:
+    """Test reading the replica settings from the configuration file."""
+    config_path = tmp_path_factory.mktemp("config") / "alembic.ini"
+    config_path.write_text(
+        "[database]\n"
+        "replica_urls = sqlite:///first.db, sqlite:///second.db\n"
+        "replica_strategy = least_loaded\n"
+        "sticky_window = 1.5\n"
+    )
+    database = DatabaseConnection(config_path=str(config_path))
+
+    replicas = database.get_replicas()
+    assert [str(engine.url) for engine in replicas.engines] == [
+        "sqlite:///first.db",
+        "sqlite:///second.db",
+    ]
+    assert replicas.strategy == "least_loaded"
+    assert database._get_sticky_window() == 1.5
+
+
+@pytest.mark.smoke
+def test_unit_of_work_commits(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test a unit of work commits its session and returns its connection."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+
+    with database.unit_of_work() as session:
+        user = User(username="test_user", password="password")
+        session.add(user)
+
+    assert user.username == "test_user"
+    assert database.get_engine().pool.checkedout() == 0  # type: ignore[attr-defined]
+    with database.unit_of_work() as session:
+        assert usernames(session) == {"test_user"}
+    database.dispose()
+
+
+@pytest.mark.exception
+def test_unit_of_work_rolls_back(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test a unit of work rolls back its session when the block fails."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+
+    with pytest.raises(RuntimeError), database.unit_of_work() as session:
+        session.add(User(username="test_user", password="password"))
+        session.flush()
+        raise RuntimeError
+
+    assert database.get_engine().pool.checkedout() == 0  # type: ignore[attr-defined]
+    with database.unit_of_work() as session:
+        assert usernames(session) == set()
+    database.dispose()
+
+
+def test_unit_of_work_leak_detection(
+    sqlite_url_factory: Callable[[str], str], caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test a unit of work held too long is reported with the stack that opened it."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"),
+        replicas=ReplicaSet([]),
+        shards={},
+        leak_threshold=0.01,
+    )
+    leak_detector = database.get_leak_detector()
+    assert leak_detector is not None
+
+    with caplog.at_level(logging.WARNING), database.unit_of_work():
+        time.sleep(0.05)
+        leak_detector.check()
+
+    assert "Session held for" in caplog.text
+    assert "in test_unit_of_work_leak_detection" in caplog.text
+    assert "database.unit_of_work()" in caplog.text
+    assert len(leak_detector) == 0
+    database.dispose()
+
+
+def test_unit_of_work_without_leak_detection(
+    sqlite_url_factory: Callable[[str], str],
+) -> None:
+    """Test leaks are not tracked when the threshold is 0."""
+    database = DatabaseConnection(url=sqlite_url_factory("primary"), leak_threshold=0)
+
+    assert database.get_leak_detector() is None
+
+
+def test_lazy_setup_is_thread_safe(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test threads sharing a connection build a single engine and session factory."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        factories = list(
+            executor.map(lambda _: database.get_session_factory(), range(32))
+        )
+
+    assert all(factory is factories[0] for factory in factories)
+    assert all(factory.kw["bind"] is database.get_engine() for factory in factories)
+    database.dispose()
+
+
+def test_memory_stats(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test the live sessions, their objects and the connections in use are counted."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), replicas=ReplicaSet([]), shards={}
+    )
+    with database.unit_of_work() as session:
+        session.add(User(username="test_user", password="password"))
+
+    session = database.get_session_factory()()
+    users = session.scalars(select(User)).all()
+
+    assert database.get_memory_stats() == {
+        "sessions": 1,
+        "identity_map": 1,
+        "checked_out": 1,
+    }
+    session.close()
+    assert database.get_memory_stats() == {
+        "sessions": 1,
+        "identity_map": 0,
+        "checked_out": 0,
+    }
+    del session, users
+    assert database.get_memory_stats()["sessions"] == 0
+    database.dispose()
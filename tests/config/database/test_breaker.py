@@ -0,0 +1,130 @@
+"""Unit tests for the CircuitBreaker class."""
+
+import time
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+
+from config.database.breaker import CircuitBreaker, CircuitState, is_transient
+from config.database.exceptions import CircuitOpenError
+
+
+@pytest.fixture
+def breaker() -> CircuitBreaker:
+    """Fixture for a breaker opening after two failures, for 50 milliseconds."""
+    return CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+
+def open_circuit(breaker: CircuitBreaker) -> None:
+    """Record enough failures to open the circuit."""
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+@pytest.mark.smoke
+def test_open_after_threshold(breaker: CircuitBreaker) -> None:
+    """Test the circuit opens after consecutive failures and rejects calls."""
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_failures(breaker: CircuitBreaker) -> None:
+    """Test only consecutive failures count towards opening the circuit."""
+    for _ in range(5):
+        breaker.record_failure()
+        breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_trial_closes(breaker: CircuitBreaker) -> None:
+    """Test a successful trial after the reset timeout closes the circuit."""
+    open_circuit(breaker)
+    time.sleep(0.06)
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one trial at a time.
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    breaker.before_call()
+
+
+def test_half_open_trial_reopens(breaker: CircuitBreaker) -> None:
+    """Test a failed trial opens the circuit for another reset timeout."""
+    open_circuit(breaker)
+    time.sleep(0.06)
+
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_state_change_events(breaker: CircuitBreaker) -> None:
+    """Test listeners are called with each state change, even if one fails."""
+    transitions = []
+    breaker.listen(lambda *args: 1 / 0)
+    breaker.listen(lambda previous, state: transitions.append((previous, state)))
+
+    open_circuit(breaker)
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+
+    assert transitions == [
+        (CircuitState.CLOSED, CircuitState.OPEN),
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.CLOSED),
+    ]
+
+
+def test_release_frees_trial(breaker: CircuitBreaker) -> None:
+    """Test a released trial lets another one through, leaving the circuit half open."""
+    open_circuit(breaker)
+    time.sleep(0.06)
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.release()
+
+    breaker.before_call()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+class PostgresError(Exception):
+    """DBAPI error carrying a SQLSTATE, as raised by psycopg2."""
+
+    def __init__(self, pgcode: str) -> None:
+        """Initialize the error with its SQLSTATE."""
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def test_is_transient() -> None:
+    """Test lost connections are transient, unlike errors the database answered."""
+    assert is_transient(OperationalError(None, None, Exception("refused")))
+    assert is_transient(
+        ProgrammingError(
+            "SELECT 1", {}, Exception("closed"), connection_invalidated=True
+        )
+    )
+    assert is_transient(OperationalError("SELECT 1", {}, PostgresError("08006")))
+    assert is_transient(OperationalError("SELECT 1", {}, PostgresError("57P01")))
+    assert not is_transient(OperationalError("SELECT 1", {}, PostgresError("57014")))
+    assert not is_transient(OperationalError("SELECT 1", {}, Exception("locked")))
+    assert not is_transient(IntegrityError("INSERT", {}, Exception("duplicate")))
+    assert not is_transient(ValueError("not a database error"))
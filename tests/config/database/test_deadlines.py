@@ -0,0 +1,140 @@
+"""Unit tests for the deadlines of database operations."""
+
+import time
+from typing import Any, Callable
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import select, text
+
+from auth.models import User
+from config.database.base import DatabaseConnection
+from config.database.deadlines import (
+    DeadlineQueuePool,
+    _set_statement_timeout,
+    check_deadline,
+    create_deadline_engine,
+    deadline,
+    remaining,
+)
+from config.database.exceptions import DeadlineExceededError
+
+
+@pytest.mark.smoke
+def test_nested_deadlines() -> None:
+    """Test a nested deadline can shorten but never extend the enclosing one."""
+    assert remaining() is None
+    with deadline(10):
+        left = remaining()
+        assert left is not None and 9 < left <= 10
+        with deadline(1):
+            left = remaining()
+            assert left is not None and left <= 1
+            with deadline(100):
+                left = remaining()
+                assert left is not None and left <= 1
+        left = remaining()
+        assert left is not None and left > 9
+    assert remaining() is None
+
+
+@pytest.mark.exception
+def test_check_deadline() -> None:
+    """Test checking a passed deadline raises."""
+    check_deadline()
+    with deadline(0), pytest.raises(DeadlineExceededError):
+        check_deadline()
+
+
+@pytest.mark.exception
+def test_interrupt_slow_statement(slow_database: DatabaseConnection) -> None:
+    """Test a slow SQLite statement is interrupted once the deadline passes."""
+    start = time.monotonic()
+    with (
+        pytest.raises(DeadlineExceededError),
+        deadline(0.05),
+        slow_database.unit_of_work() as session,
+    ):
+        session.scalars(select(User)).all()
+
+    assert time.monotonic() - start < 0.25
+
+
+def test_slow_statement_without_deadline(slow_database: DatabaseConnection) -> None:
+    """Test statements run to completion once the deadline is gone."""
+    with (
+        pytest.raises(DeadlineExceededError),
+        deadline(0.05),
+        slow_database.unit_of_work() as session,
+    ):
+        session.scalars(select(User)).all()
+
+    # The same pooled connection no longer interrupts its statements.
+    with slow_database.unit_of_work() as session:
+        assert session.scalars(select(User)).all() == []
+
+
+@pytest.mark.exception
+def test_fail_fast_after_deadline(slow_database: DatabaseConnection) -> None:
+    """Test no connection is checked out once the deadline has passed."""
+    pool = slow_database.get_engine().pool
+    with deadline(0), pytest.raises(DeadlineExceededError):
+        with slow_database.unit_of_work():
+            pass
+
+    assert pool.checkedout() == 0  # type: ignore[attr-defined]
+
+
+@pytest.mark.exception
+def test_pool_checkout_timeout(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test waiting for a connection is cut short by the deadline."""
+    engine = create_deadline_engine(
+        sqlite_url_factory("primary"), pool_size=1, max_overflow=0, pool_timeout=30
+    )
+    assert isinstance(engine.pool, DeadlineQueuePool)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        start = time.monotonic()
+        with deadline(0.05), pytest.raises(DeadlineExceededError):
+            engine.connect()
+        assert time.monotonic() - start < 1
+    engine.dispose()
+
+
+def test_operation_timeout(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test the default budget of an operation comes from the operation timeout."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"), operation_timeout=5
+    )
+    with database.deadline():
+        left = remaining()
+        assert left is not None and 4 < left <= 5
+    with database.deadline(1):
+        left = remaining()
+        assert left is not None and left <= 1
+
+    unbounded = DatabaseConnection(
+        url=sqlite_url_factory("unbounded"), operation_timeout=0
+    )
+    with unbounded.deadline():
+        assert remaining() is None
+
+
+def test_statement_timeout_set_once_per_transaction() -> None:
+    """Test the statement timeout is only set again once the deadline draws near."""
+    info: dict[Any, Any] = {}
+    cursor = MagicMock()
+
+    for left in (5.0, 4.95, 4.91):
+        _set_statement_timeout(info, cursor, left)
+    _set_statement_timeout(info, cursor, 4.5)
+    _set_statement_timeout(info, cursor, 4.45)
+    info.clear()
+    _set_statement_timeout(info, cursor, 4.0)
+
+    assert [call.args[0] for call in cursor.execute.call_args_list] == [
+        "SET LOCAL statement_timeout = 5000",
+        "SET LOCAL statement_timeout = 4500",
+        "SET LOCAL statement_timeout = 4000",
+    ]
@@ -0,0 +1,209 @@
+"""Fault injection tests of the circuit breaker and the retries of reads."""
+
+import sqlite3
+import time
+from typing import Any, Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import Engine, event, select
+from sqlalchemy.exc import DBAPIError
+
+from auth.models import User
+from auth.repository.bll import UserBusinessLogicLayer
+from auth.repository.dal import UserDataAccessLayer
+from config.database.base import DatabaseConnection
+from config.database.breaker import CircuitBreaker, CircuitState
+from config.database.deadlines import deadline
+from config.database.exceptions import CircuitOpenError, DeadlineExceededError
+from config.database.replicas import ReplicaSet
+from config.database.retries import RetryPolicy
+
+
+class FaultyEngine:
+    """Wrap an engine to drop its connections or refuse new ones on demand."""
+
+    def __init__(self, engine: Engine) -> None:
+        """Start listening to the connections and statements of an engine."""
+        self.engine = engine
+        self.drops = 0
+        self.refuse = False
+        self.connects = 0
+        self.statements = 0
+        event.listen(engine, "do_connect", self._connect)
+        event.listen(engine, "before_cursor_execute", self._execute)
+
+    def _connect(self, *args: Any) -> None:
+        """Count a connection attempt, failing it while connections are refused."""
+        self.connects += 1
+        if self.refuse:
+            raise sqlite3.OperationalError("unable to open database file")
+
+    def _execute(self, connection: Any, cursor: Any, *args: Any) -> None:
+        """Close the connection under a statement while drops are pending."""
+        self.statements += 1
+        if self.drops:
+            self.drops -= 1
+            cursor.connection.close()
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a SQLite database with a breaker and fast retries."""
+    database = DatabaseConnection(
+        url=sqlite_url_factory("primary"),
+        replicas=ReplicaSet([]),
+        shards={},
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.1),
+        retry_policy=RetryPolicy(attempts=3, base_delay=0.001),
+    )
+    with (
+        patch("auth.repository.bll.db", database),
+        patch("auth.repository.dal.db", database),
+    ):
+        yield database
+    database.dispose()
+
+
+@pytest.fixture
+def faults(database: DatabaseConnection) -> FaultyEngine:
+    """Fixture for injecting faults into the database, holding one user."""
+    UserBusinessLogicLayer().create_user(username="test_user", password="password")
+    return FaultyEngine(database.get_engine())
+
+
+@pytest.fixture
+def transitions(database: DatabaseConnection) -> list[tuple[str, str]]:
+    """Fixture collecting the state changes of the circuit breaker."""
+    breaker = database.get_breaker()
+    assert breaker is not None
+    transitions: list[tuple[str, str]] = []
+    breaker.listen(lambda previous, state: transitions.append((previous, state)))
+    return transitions
+
+
+@pytest.mark.smoke
+def test_read_survives_dropped_connection(faults: FaultyEngine) -> None:
+    """Test a read is retried on a new connection after its connection dropped."""
+    faults.drops = 1
+
+    credentials = UserDataAccessLayer().get_credentials_by_username("test_user")
+
+    assert credentials is not None
+    assert credentials.username == "test_user"
+    assert faults.statements == 2
+
+
+@pytest.mark.exception
+def test_read_retries_are_bounded(faults: FaultyEngine) -> None:
+    """Test a read is attempted a bounded number of times."""
+    faults.drops = 10
+
+    with pytest.raises(DBAPIError):
+        UserDataAccessLayer().get_user_by_username("test_user")
+    assert faults.statements == 3
+
+
+@pytest.mark.exception
+def test_write_is_not_retried(
+    faults: FaultyEngine, database: DatabaseConnection
+) -> None:
+    """Test a write failing on a dropped connection is not retried."""
+    faults.drops = 1
+
+    with pytest.raises(DBAPIError):
+        UserBusinessLogicLayer().create_user(username="new_user", password="password")
+    assert faults.statements == 1
+    with database.unit_of_work() as session:
+        assert session.query(User).filter_by(username="new_user").first() is None
+
+
+@pytest.mark.exception
+def test_breaker_fails_fast(
+    faults: FaultyEngine,
+    database: DatabaseConnection,
+    transitions: list[tuple[str, str]],
+) -> None:
+    """Test reads fail fast without connecting once the database is unreachable."""
+    database.get_engine().pool.dispose()
+    faults.refuse = True
+
+    # Three attempts of the first read open the circuit.
+    with pytest.raises(DBAPIError):
+        UserDataAccessLayer().get_credentials_by_username("test_user")
+    assert transitions == [(CircuitState.CLOSED, CircuitState.OPEN)]
+
+    connects = faults.connects
+    start = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        UserDataAccessLayer().get_credentials_by_username("test_user")
+    assert time.monotonic() - start < 0.01
+    assert faults.connects == connects
+
+
+def test_breaker_recovers(
+    faults: FaultyEngine,
+    database: DatabaseConnection,
+    transitions: list[tuple[str, str]],
+) -> None:
+    """Test a successful trial closes the circuit once the database is back."""
+    database.get_engine().pool.dispose()
+    faults.refuse = True
+    with pytest.raises(DBAPIError):
+        UserDataAccessLayer().get_credentials_by_username("test_user")
+
+    faults.refuse = False
+    time.sleep(0.11)
+    assert UserDataAccessLayer().get_credentials_by_username("test_user") is not None
+
+    assert transitions == [
+        (CircuitState.CLOSED, CircuitState.OPEN),
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.CLOSED),
+    ]
+
+
+@pytest.mark.exception
+def test_breaker_reopens(
+    faults: FaultyEngine,
+    database: DatabaseConnection,
+    transitions: list[tuple[str, str]],
+) -> None:
+    """Test a failed trial opens the circuit again without further attempts."""
+    database.get_engine().pool.dispose()
+    faults.refuse = True
+    with pytest.raises(DBAPIError):
+        UserDataAccessLayer().get_credentials_by_username("test_user")
+
+    time.sleep(0.11)
+    connects = faults.connects
+    # The trial fails, and its retry is rejected by the reopened circuit.
+    with pytest.raises(CircuitOpenError):
+        UserDataAccessLayer().get_credentials_by_username("test_user")
+
+    assert faults.connects == connects + 1
+    assert transitions[-2:] == [
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.OPEN),
+    ]
+
+
+@pytest.mark.exception
+def test_breaker_ignores_missed_deadlines(
+    faults: FaultyEngine,
+    database: DatabaseConnection,
+    transitions: list[tuple[str, str]],
+) -> None:
+    """Test operations missing their own deadline do not open the circuit."""
+    for _ in range(5):
+        with (
+            pytest.raises(DeadlineExceededError),
+            deadline(0.01),
+            database.unit_of_work() as session,
+        ):
+            time.sleep(0.02)
+            session.execute(select(User.id))
+
+    assert transitions == []
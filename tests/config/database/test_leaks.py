@@ -0,0 +1,54 @@
+"""Unit tests for the SessionLeakDetector class."""
+
+import logging
+import time
+
+import pytest
+
+from config.database.leaks import SessionLeakDetector
+
+
+@pytest.mark.smoke
+def test_release() -> None:
+    """Test released sessions are no longer tracked."""
+    leak_detector = SessionLeakDetector(threshold=60)
+    lease = leak_detector.acquire()
+    assert len(leak_detector) == 1
+
+    leak_detector.release(lease)
+
+    assert len(leak_detector) == 0
+    assert leak_detector.check() == []
+    leak_detector.close()
+
+
+def test_report_once(caplog: pytest.LogCaptureFixture) -> None:
+    """Test a leaked session is reported once, with the stack that acquired it."""
+    leak_detector = SessionLeakDetector(threshold=0.01, check_interval=60)
+    lease = leak_detector.acquire(skip=0)
+    time.sleep(0.02)
+
+    with caplog.at_level(logging.WARNING):
+        assert leak_detector.check() == [lease]
+        assert leak_detector.check() == []
+
+    assert "test_report_once" in lease.format_stack()
+    assert "leak_detector.acquire(skip=0)" in lease.format_stack()
+    assert "acquired at" in caplog.text
+    leak_detector.release(lease)
+    leak_detector.close()
+
+
+def test_background_check(caplog: pytest.LogCaptureFixture) -> None:
+    """Test leaked sessions are reported by the background thread."""
+    leak_detector = SessionLeakDetector(threshold=0.01)
+
+    with caplog.at_level(logging.WARNING):
+        lease = leak_detector.acquire()
+        deadline = time.monotonic() + 5
+        while not lease.reported and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert lease.reported
+    leak_detector.release(lease)
+    leak_detector.close()
@@ -0,0 +1,34 @@
+"""Unit tests for the database mixins module."""
+
+import time
+from typing import Callable
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from auth.models import User
+
+
+def test_timestamps_are_evaluated_per_row(
+    sqlite_url_factory: Callable[[str], str],
+) -> None:
+    """Test the timestamps are taken when each row is written."""
+    engine = create_engine(sqlite_url_factory("database"))
+    with Session(engine) as session:
+        first_user = User(username="first_user", password="password")
+        session.add(first_user)
+        session.commit()
+        time.sleep(0.01)
+        second_user = User(username="second_user", password="password")
+        session.add(second_user)
+        session.commit()
+
+        assert first_user.modified_at is None
+        assert first_user.created_at < second_user.created_at
+        assert first_user.date_joined < second_user.date_joined
+
+        first_user.password = "new_password"
+        session.commit()
+        assert first_user.modified_at is not None
+        assert first_user.modified_at > second_user.created_at
+    engine.dispose()
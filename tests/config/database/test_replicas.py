@@ -0,0 +1,83 @@
+"""Unit tests for the ReplicaSet class."""
+
+from typing import Callable, Generator
+
+import pytest
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from config.database.replicas import ReplicaSet, ReplicaStrategy
+
+
+@pytest.fixture
+def engines(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[list[Engine], None, None]:
+    """Fixture for engines connected to two SQLite replicas."""
+    engines = [create_engine(sqlite_url_factory(f"replica_{i}")) for i in range(2)]
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.mark.smoke
+def test_round_robin(engines: list[Engine]) -> None:
+    """Test choosing the replicas in turn."""
+    replicas = ReplicaSet(engines)
+
+    chosen = [replicas.choose() for _ in range(4)]
+
+    assert chosen == [engines[0], engines[1], engines[0], engines[1]]
+
+
+def test_least_loaded(engines: list[Engine]) -> None:
+    """Test choosing the replica with the fewest checked out connections."""
+    replicas = ReplicaSet(engines, strategy=ReplicaStrategy.LEAST_LOADED)
+
+    with engines[0].connect():
+        assert replicas.load(engines[0]) == 1
+        assert replicas.choose() is engines[1]
+        with engines[1].connect(), engines[1].connect():
+            assert replicas.choose() is engines[0]
+
+    assert replicas.load(engines[0]) == 0
+
+
+def test_skip_unhealthy_replica(engines: list[Engine]) -> None:
+    """Test skipping a replica marked as unhealthy."""
+    replicas = ReplicaSet(engines)
+    replicas.mark_unhealthy(engines[0])
+
+    assert not replicas.is_healthy(engines[0])
+    assert [replicas.choose() for _ in range(3)] == [engines[1]] * 3
+
+
+def test_retry_unhealthy_replica(engines: list[Engine]) -> None:
+    """Test trying an unhealthy replica again after the retry interval."""
+    replicas = ReplicaSet(engines, retry_interval=0)
+    replicas.mark_unhealthy(engines[0])
+
+    assert replicas.is_healthy(engines[0])
+
+
+@pytest.mark.exception
+def test_connection_failure_marks_unhealthy(engines: list[Engine]) -> None:
+    """Test a replica failing to connect is marked as unhealthy."""
+    broken = create_engine("sqlite:////nonexistent/directory/replica.db")
+    replicas = ReplicaSet([broken, engines[0]])
+
+    with pytest.raises(OperationalError), broken.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert not replicas.is_healthy(broken)
+    assert replicas.choose() is engines[0]
+
+
+def test_no_healthy_replica(engines: list[Engine]) -> None:
+    """Test choosing no replica when all of them are unhealthy."""
+    replicas = ReplicaSet(engines)
+    for engine in engines:
+        replicas.mark_unhealthy(engine)
+
+    assert replicas.choose() is None
+    assert ReplicaSet([]).choose() is None
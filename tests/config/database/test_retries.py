@@ -0,0 +1,85 @@
+"""Unit tests for the RetryPolicy class."""
+
+from typing import Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from config.database.deadlines import deadline
+from config.database.retries import RetryPolicy
+
+
+def lost_connection() -> OperationalError:
+    """Return the error of a lost connection."""
+    return OperationalError(
+        "SELECT 1",
+        {},
+        Exception("server closed the connection"),
+        connection_invalidated=True,
+    )
+
+
+@pytest.fixture(autouse=True)
+def sleep() -> Generator[MagicMock, None, None]:
+    """Fixture for skipping the backoff sleeps."""
+    with patch("config.database.retries.time.sleep") as sleep:
+        yield sleep
+
+
+@pytest.mark.smoke
+def test_retry_transient_failures(sleep: MagicMock) -> None:
+    """Test transient failures are retried until an attempt succeeds."""
+    operation = MagicMock(side_effect=[lost_connection(), lost_connection(), "user"])
+
+    assert RetryPolicy(attempts=3).run(operation) == "user"
+    assert operation.call_count == 3
+    assert sleep.call_count == 2
+
+
+@pytest.mark.exception
+def test_bounded_attempts() -> None:
+    """Test the last error is raised once every attempt failed."""
+    operation = MagicMock(side_effect=lost_connection())
+
+    with pytest.raises(OperationalError):
+        RetryPolicy(attempts=3).run(operation)
+    assert operation.call_count == 3
+
+
+@pytest.mark.exception
+def test_no_retry_of_other_errors() -> None:
+    """Test errors the database answered are raised at once."""
+    operation = MagicMock(side_effect=IntegrityError("INSERT", {}, Exception()))
+
+    with pytest.raises(IntegrityError):
+        RetryPolicy(attempts=3).run(operation)
+    operation.assert_called_once()
+
+
+def test_jittered_backoff() -> None:
+    """Test the backoff is random, grows exponentially and is capped."""
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+
+    delays = [[policy.backoff(retry) for _ in range(200)] for retry in range(4)]
+
+    for retry, bound in enumerate([0.1, 0.2, 0.3, 0.3]):
+        assert all(0 <= delay <= bound for delay in delays[retry])
+        assert len(set(delays[retry])) > 1
+    assert max(delays[1]) > 0.1
+
+
+@pytest.mark.exception
+def test_no_retry_past_deadline(sleep: MagicMock) -> None:
+    """Test a retry that would outlive the deadline is not attempted."""
+    operation = MagicMock(side_effect=lost_connection())
+    policy = RetryPolicy(attempts=3, base_delay=10, max_delay=10)
+
+    with (
+        patch.object(policy, "backoff", return_value=5),
+        deadline(1),
+        pytest.raises(OperationalError),
+    ):
+        policy.run(operation)
+    operation.assert_called_once()
+    sleep.assert_not_called()
@@ -0,0 +1,246 @@
+"""Unit tests for the sharding module."""
+
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Generator
+
+import pytest
+from sqlalchemy import Engine, create_engine, select
+from sqlalchemy.orm import Session
+
+from auth.models import User
+from config.database.base import DatabaseConnection
+from config.database.sharding import HashRing, normalize_shard_key, reshard
+
+USERNAMES = [f"user_{index}" for index in range(200)]
+
+
+@pytest.fixture
+def shards(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[dict[str, Engine], None, None]:
+    """Fixture for engines connected to three SQLite shards."""
+    shards = {
+        f"shard_{index}": create_engine(sqlite_url_factory(f"shard_{index}"))
+        for index in range(3)
+    }
+    yield shards
+    for engine in shards.values():
+        engine.dispose()
+
+
+@pytest.fixture
+def database(
+    sqlite_url_factory: Callable[[str], str], shards: dict[str, Engine]
+) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a database connection sharding users over three shards."""
+    database = DatabaseConnection(url=sqlite_url_factory("primary"), shards=shards)
+    yield database
+    database.dispose()
+
+
+def usernames_on(engine: Engine) -> set[str]:
+    """Return the usernames stored on a shard."""
+    with Session(engine) as session:
+        return set(session.scalars(select(User.username)))
+
+
+@pytest.mark.smoke
+def test_hash_ring_is_deterministic() -> None:
+    """Test keys are always placed on the same shard."""
+    ring = HashRing(["shard_0", "shard_1", "shard_2"])
+    same_ring = HashRing(["shard_0", "shard_1", "shard_2"])
+
+    assert [ring.get_shard(key) for key in USERNAMES] == [
+        same_ring.get_shard(key) for key in USERNAMES
+    ]
+
+
+def test_hash_ring_spreads_keys() -> None:
+    """Test keys are spread over every shard."""
+    ring = HashRing(["shard_0", "shard_1", "shard_2"])
+
+    placement = Counter(ring.get_shard(key) for key in USERNAMES)
+
+    assert set(placement) == {"shard_0", "shard_1", "shard_2"}
+    assert min(placement.values()) > len(USERNAMES) / 6
+
+
+def test_hash_ring_moves_few_keys_on_growth() -> None:
+    """Test adding a shard only moves keys to the new shard."""
+    ring = HashRing(["shard_0", "shard_1", "shard_2"])
+    grown_ring = HashRing(["shard_0", "shard_1", "shard_2", "shard_3"])
+
+    moved = [
+        key for key in USERNAMES if ring.get_shard(key) != grown_ring.get_shard(key)
+    ]
+
+    assert {grown_ring.get_shard(key) for key in moved} == {"shard_3"}
+    assert len(moved) < len(USERNAMES) / 2
+
+
+def test_hash_ring_normalizes_keys() -> None:
+    """Test equivalent keys are placed on the same shard."""
+    ring = HashRing(["shard_0", "shard_1", "shard_2"])
+
+    assert normalize_shard_key("  Alice ") == "alice"
+    assert all(
+        ring.get_shard(key) == ring.get_shard(f" {key.upper()} ") for key in USERNAMES
+    )
+
+
+@pytest.mark.exception
+def test_hash_ring_without_shards() -> None:
+    """Test a hash ring needs at least one shard."""
+    with pytest.raises(ValueError, match="at least one shard"):
+        HashRing([])
+
+
+def test_sharded_session_places_users(
+    database: DatabaseConnection, shards: dict[str, Engine]
+) -> None:
+    """Test users are written to the shard owning their username."""
+    session = database.get_session()
+    session.add_all(
+        User(username=username, password="password") for username in USERNAMES
+    )
+    session.commit()
+
+    for name, engine in shards.items():
+        assert usernames_on(engine) == {
+            username for username in USERNAMES if database.shard_for(username) == name
+        }
+    assert usernames_on(database.get_engine()) == set()
+
+
+def test_sharded_session_queries(database: DatabaseConnection) -> None:
+    """Test queries run on every shard unless they carry a shard key."""
+    session = database.get_session()
+    session.add_all(
+        User(username=username, password="password") for username in USERNAMES
+    )
+    session.commit()
+
+    assert len(session.scalars(select(User)).all()) == len(USERNAMES)
+    user = session.scalars(
+        select(User)
+        .where(User.username == "user_7")
+        .execution_options(shard_key="user_7")
+    ).one()
+    assert user.username == "user_7"
+
+
+def test_partition_by_shard(database: DatabaseConnection) -> None:
+    """Test grouping shard keys by their owning shard."""
+    partitions = database.partition_by_shard(USERNAMES)
+
+    assert sorted(key for keys in partitions.values() for key in keys) == sorted(
+        USERNAMES
+    )
+    for shard, keys in partitions.items():
+        assert all(database.shard_for(key) == shard for key in keys)
+
+
+def test_not_sharded(sqlite_url_factory: Callable[[str], str]) -> None:
+    """Test every key belongs to no shard when sharding is not configured."""
+    database = DatabaseConnection(url=sqlite_url_factory("primary"), shards={})
+
+    assert database.get_hash_ring() is None
+    assert database.shard_for("user_1") is None
+    assert database.partition_by_shard(["user_1", "user_2"]) == {
+        None: ["user_1", "user_2"]
+    }
+
+
+def test_reshard(shards: dict[str, Engine]) -> None:
+    """Test moving users to a newly added shard and resuming the move."""
+    old_shards = {name: shards[name] for name in ("shard_0", "shard_1")}
+    old_ring = HashRing(list(old_shards))
+    for name, engine in old_shards.items():
+        with Session(engine) as session:
+            session.add_all(
+                User(username=username, password="password")
+                for username in USERNAMES
+                if old_ring.get_shard(username) == name
+            )
+            session.commit()
+
+    ring = HashRing(list(shards))
+    to_move = reshard(shards, ring, User.__table__, batch_size=7, dry_run=True)
+    moved = reshard(shards, ring, User.__table__, batch_size=7)
+
+    assert moved == to_move
+    assert moved["shard_2"] == 0
+    assert sum(moved.values()) == len(usernames_on(shards["shard_2"])) > 0
+    for name, engine in shards.items():
+        assert usernames_on(engine) == {
+            username for username in USERNAMES if ring.get_shard(username) == name
+        }
+    assert reshard(shards, ring, User.__table__) == dict.fromkeys(shards, 0)
+
+
+def test_reshard_skips_copied_users(shards: dict[str, Engine]) -> None:
+    """Test resuming a move interrupted after the users were copied."""
+    ring = HashRing(list(shards))
+    username = next(name for name in USERNAMES if ring.get_shard(name) == "shard_1")
+    joined = datetime(2024, 1, 1)
+    for name in ("shard_0", "shard_1"):
+        with Session(shards[name]) as session:
+            session.add(
+                User(
+                    username=username,
+                    password="password",
+                    date_joined=joined,
+                    created_at=joined,
+                    modified_at=joined,
+                )
+            )
+            session.commit()
+
+    assert reshard(shards, ring, User.__table__)["shard_0"] == 1
+    assert usernames_on(shards["shard_0"]) == set()
+    assert usernames_on(shards["shard_1"]) == {username}
+
+
+@pytest.mark.exception
+def test_reshard_keeps_conflicting_users(shards: dict[str, Engine]) -> None:
+    """Test a user is not deleted when its owner holds another user of that name."""
+    ring = HashRing(list(shards))
+    username = next(name for name in USERNAMES if ring.get_shard(name) == "shard_1")
+    for name in ("shard_0", "shard_1"):
+        with Session(shards[name]) as session:
+            session.add(User(username=username, password=f"password_{name}"))
+            session.commit()
+
+    assert reshard(shards, ring, User.__table__)["shard_0"] == 0
+    assert usernames_on(shards["shard_0"]) == {username}
+    with Session(shards["shard_1"]) as session:
+        assert session.scalars(select(User.password)).all() == ["password_shard_1"]
+
+
+def test_reshard_from_primary(
+    sqlite_url_factory: Callable[[str], str], shards: dict[str, Engine]
+) -> None:
+    """Test users registered before sharding are moved off the primary."""
+    primary = create_engine(sqlite_url_factory("primary"))
+    User.metadata.create_all(primary)
+    with Session(primary) as session:
+        session.add_all(User(username=name, password="password") for name in USERNAMES)
+        session.commit()
+    ring = HashRing(list(shards))
+
+    moved = reshard(
+        shards,
+        ring,
+        User.__table__,
+        batch_size=7,
+        sources={"primary": primary, **shards},
+    )
+
+    assert moved == {"primary": len(USERNAMES), **dict.fromkeys(shards, 0)}
+    assert usernames_on(primary) == set()
+    for name, engine in shards.items():
+        assert usernames_on(engine) == {
+            username for username in USERNAMES if ring.get_shard(username) == name
+        }
+    primary.dispose()
@@ -0,0 +1,140 @@
+"""Unit tests for the embedded SQLite mode."""
+
+import threading
+from typing import Callable, Generator
+
+import pytest
+from sqlalchemy import Engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+from auth.models import User
+from config.database.base import DatabaseConnection
+from config.database.replicas import ReplicaSet
+from config.database.sqlite import (
+    DEFAULT_PRAGMAS,
+    SQLiteRole,
+    create_sqlite_engine,
+    is_sqlite_file,
+)
+
+
+@pytest.fixture
+def sqlite_url(sqlite_url_factory: Callable[[str], str]) -> str:
+    """Fixture for the URL of a SQLite file holding all tables."""
+    return sqlite_url_factory("embedded")
+
+
+@pytest.fixture
+def database(sqlite_url: str) -> Generator[DatabaseConnection, None, None]:
+    """Fixture for a database connection in embedded mode, without replicas."""
+    database = DatabaseConnection(url=sqlite_url, shards={})
+    yield database
+    database.dispose()
+
+
+def pragma(engine: Engine, name: str) -> object:
+    """Read a pragma of a connection of an engine."""
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+@pytest.mark.smoke
+def test_pragmas_applied(sqlite_url: str) -> None:
+    """Test the pragmas are set on the connections of an engine."""
+    engine = create_sqlite_engine(sqlite_url, pragmas=DEFAULT_PRAGMAS)
+
+    assert pragma(engine, "journal_mode") == "wal"
+    assert pragma(engine, "synchronous") == 1
+    assert pragma(engine, "busy_timeout") == 5000
+    assert pragma(engine, "cache_size") == -65536
+    assert pragma(engine, "query_only") == 0
+    engine.dispose()
+
+
+@pytest.mark.exception
+def test_reader_is_read_only(sqlite_url: str) -> None:
+    """Test the connections of a reader engine cannot write."""
+    engine = create_sqlite_engine(sqlite_url, DEFAULT_PRAGMAS, SQLiteRole.READER)
+
+    with pytest.raises(OperationalError, match="readonly"):
+        with engine.begin() as connection:
+            connection.execute(insert(User).values(username="user", password="x"))
+    with engine.connect() as connection:
+        assert connection.execute(select(User)).first() is None
+    engine.dispose()
+
+
+def test_writer_takes_write_lock_on_begin(sqlite_url: str) -> None:
+    """Test a writer transaction holds the write lock before its first write."""
+    writer = create_sqlite_engine(sqlite_url, DEFAULT_PRAGMAS, SQLiteRole.WRITER)
+    other = create_sqlite_engine(sqlite_url, {**DEFAULT_PRAGMAS, "busy_timeout": 0})
+
+    with writer.begin() as connection:
+        connection.execute(select(User)).all()
+        with pytest.raises(OperationalError, match="locked"):
+            with other.begin() as other_connection:
+                other_connection.execute(
+                    insert(User).values(username="user", password="x")
+                )
+    writer.dispose()
+    other.dispose()
+
+
+def test_reads_and_writes_split(database: DatabaseConnection) -> None:
+    """Test a SQLite file without replicas gets a writer and read-only readers."""
+    writer = database.get_engine()
+    readers = database.get_replicas().engines
+
+    assert writer.pool.size() == 1
+    assert len(readers) == 1
+    assert pragma(readers[0], "query_only") == 1
+    assert database._get_sticky_window() == 0
+
+    with database.unit_of_work() as session:
+        session.add(User(username="test_user", password="password"))
+    with database.get_session_factory()() as session:
+        assert session.get_bind(clause=select(User)) is readers[0]
+        assert session.scalars(select(User.username)).all() == ["test_user"]
+
+
+def test_given_replicas_disable_split(sqlite_url: str) -> None:
+    """Test injected replicas keep the primary a shared SQLite engine."""
+    database = DatabaseConnection(url=sqlite_url, replicas=ReplicaSet([]), shards={})
+
+    assert database.get_engine().pool.size() == 5
+    assert pragma(database.get_engine(), "journal_mode") == "wal"
+    database.dispose()
+
+
+def test_concurrent_writers_never_locked(database: DatabaseConnection) -> None:
+    """Test concurrent writers and readers never fail with "database is locked"."""
+    errors: list[Exception] = []
+
+    def work(worker: int) -> None:
+        try:
+            for index in range(20):
+                with database.unit_of_work() as session:
+                    session.add(User(username=f"user_{worker}_{index}", password="x"))
+                with database.get_session_factory()() as session:
+                    session.scalars(select(User.username)).all()
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with database.unit_of_work() as session:
+        assert session.query(User).count() == 160
+
+
+def test_is_sqlite_file() -> None:
+    """Test SQLite files are told apart from in-memory SQLite and other databases."""
+    assert is_sqlite_file("sqlite:///auth.db")
+    assert is_sqlite_file("sqlite+pysqlite:////var/lib/auth.db")
+    assert not is_sqlite_file("sqlite://")
+    assert not is_sqlite_file("sqlite:///:memory:")
+    assert not is_sqlite_file("postgresql://user@localhost/auth")
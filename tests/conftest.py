@@ -1,13 +1,21 @@
 """Custom fixtures and configurations for pytest tests."""
 
-from typing import Generator
+from pathlib import Path
+from typing import Any, Callable, Generator
 
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
+import auth.models  # noqa: F401  # Register the models on the metadata.
+from config.database.base import DatabaseConnection
 from config.database.orm import Base
+from config.database.replicas import ReplicaSet
+
+# Each SELECT of a slow database first counts to this many, taking a fraction of a
+# second of SQLite work that progress handlers can interrupt.
+SLOW_QUERY_SPINS = 1_000_000
 
 
 def pytest_addoption(parser: pytest.Parser) -> None:
@@ -88,7 +96,7 @@ def db_session_factory(db_engine: Engine) -> scoped_session[Session]:
     scoped_session[Session]
         A scoped SQLAlchemy session factory.
     """
-    return scoped_session(sessionmaker(bind=db_engine))
+    return scoped_session(sessionmaker(bind=db_engine, expire_on_commit=False))
 
 
 @pytest.fixture(scope="function")
@@ -119,3 +127,70 @@ def db_session(
         session.commit()
 
     session.close()
+
+
+@pytest.fixture
+def sqlite_url_factory(tmp_path: Path) -> Callable[[str], str]:
+    """
+    Fixture providing a factory for SQLite databases with all tables created.
+
+    Parameters
+    ----------
+    tmp_path : Path
+        The temporary directory of the test function.
+
+    Returns
+    -------
+    Callable[[str], str]
+        A factory taking a database name and returning the URL of a new SQLite file.
+    """
+
+    def create_sqlite_database(name: str) -> str:
+        url = f"sqlite:///{tmp_path / name}.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+        return url
+
+    return create_sqlite_database
+
+
+@pytest.fixture
+def slow_database(
+    sqlite_url_factory: Callable[[str], str],
+) -> Generator[DatabaseConnection, None, None]:
+    """
+    Fixture providing a SQLite database where every SELECT is artificially slow.
+
+    Parameters
+    ----------
+    sqlite_url_factory : Callable[[str], str]
+        The factory of SQLite databases.
+
+    Yields
+    ------
+    DatabaseConnection
+        The connection to the slow database, which holds all tables.
+    """
+    database = DatabaseConnection(
+        url=sqlite_url_factory("slow"), replicas=ReplicaSet([]), shards={}
+    )
+    spin = (
+        "WITH RECURSIVE spin(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM spin "
+        f"WHERE x < {SLOW_QUERY_SPINS}) "
+    )
+
+    @event.listens_for(database.get_engine(), "before_cursor_execute", retval=True)
+    def slow_down(
+        connection: Any, cursor: Any, statement: str, parameters: Any, *args: Any
+    ) -> tuple[str, Any]:
+        # A CROSS JOIN is never reordered, so the count runs even without any row.
+        if statement.lstrip().upper().startswith("SELECT"):
+            statement = (
+                f"{spin}SELECT query.* FROM (SELECT count(*) FROM spin) "
+                f"CROSS JOIN ({statement}) AS query"
+            )
+        return statement, parameters
+
+    yield database
+    database.dispose()
@@ -0,0 +1,168 @@
+"""Unit tests for the BatchBuffer class."""
+
+import threading
+from pathlib import Path
+from typing import Generator
+from unittest.mock import MagicMock
+
+import pytest
+
+from toolkit.buffers import BatchBuffer
+
+
+@pytest.fixture
+def flush() -> MagicMock:
+    """Fixture for a mocked flush callback."""
+    return MagicMock()
+
+
+@pytest.fixture
+def spill_path(tmp_path: Path) -> Path:
+    """Fixture for the path of the spill file."""
+    return tmp_path / "buffer.spill"
+
+
+@pytest.fixture
+def buffer(
+    flush: MagicMock, spill_path: Path
+) -> Generator[BatchBuffer[int], None, None]:
+    """Fixture for a small buffer which only flushes when asked to."""
+    # Batches never fill up, so the flusher thread is never woken up early.
+    buffer: BatchBuffer[int] = BatchBuffer(
+        flush=flush,
+        max_size=4,
+        batch_size=5,
+        flush_interval=3600,
+        spill_path=str(spill_path),
+    )
+    yield buffer
+    flush.side_effect = None
+    buffer.close()
+
+
+def flushed_items(flush: MagicMock) -> list[int]:
+    """Return all items handed over to a mocked flush callback."""
+    return [item for call in flush.call_args_list for item in call.args[0]]
+
+
+@pytest.mark.smoke
+def test_flush_in_batches(flush: MagicMock) -> None:
+    """Test flushing buffered items in batches of the configured size."""
+    buffer: BatchBuffer[int] = BatchBuffer(
+        flush=flush, batch_size=3, flush_interval=3600
+    )
+    for item in range(4):
+        buffer.put(item)
+    buffer.close()
+
+    assert [call.args[0] for call in flush.call_args_list] == [[0, 1, 2], [3]]
+    assert len(buffer) == 0
+
+
+def test_flush_on_full_batch() -> None:
+    """Test flushing in the background once a full batch is waiting."""
+    flushed = threading.Event()
+    buffer: BatchBuffer[int] = BatchBuffer(
+        flush=lambda batch: flushed.set(), batch_size=2, flush_interval=3600
+    )
+    buffer.put(1)
+    buffer.put(2)
+
+    assert flushed.wait(timeout=5)
+    buffer.close()
+
+
+def test_spill_overflow(
+    buffer: BatchBuffer[int], flush: MagicMock, spill_path: Path
+) -> None:
+    """Test spilling items to disk once the in-memory queue is full."""
+    for item in range(6):
+        buffer.put(item)
+
+    assert len(buffer) == 4
+    assert buffer.spilled == 2
+    assert spill_path.read_text() == "4\n5\n"
+
+    assert buffer.flush() == 6
+    assert sorted(flushed_items(flush)) == list(range(6))
+    assert not spill_path.exists()
+
+
+@pytest.mark.exception
+def test_spill_failed_batch(
+    buffer: BatchBuffer[int], flush: MagicMock, spill_path: Path
+) -> None:
+    """Test spilling a batch that failed to flush and replaying it later."""
+    flush.side_effect = ConnectionError
+    buffer.put(1)
+    buffer.put(2)
+
+    with pytest.raises(ConnectionError):
+        buffer.flush()
+    assert buffer.spilled == 2
+
+    flush.side_effect = None
+    flush.reset_mock()
+    assert buffer.flush() == 2
+    assert flushed_items(flush) == [1, 2]
+
+
+@pytest.mark.exception
+def test_resume_interrupted_replay(flush: MagicMock, spill_path: Path) -> None:
+    """Test resuming a replay of spilled items after a failed batch."""
+    buffer: BatchBuffer[int] = BatchBuffer(
+        flush=flush, batch_size=3, flush_interval=3600, spill_path=str(spill_path)
+    )
+    spill_path.write_text("1\n2\n3\n4\n5\n")
+    flush.side_effect = [None, ConnectionError]
+
+    with pytest.raises(ConnectionError):
+        buffer.flush()
+
+    flush.side_effect = None
+    flush.reset_mock()
+    buffer.flush()
+    assert flushed_items(flush) == [4, 5]
+    buffer.close()
+
+
+def test_skip_truncated_spill_line(
+    buffer: BatchBuffer[int], flush: MagicMock, spill_path: Path
+) -> None:
+    """Test ignoring a spilled line cut short by a crash."""
+    spill_path.write_text("1\n2\n3")
+
+    assert buffer.flush() == 2
+    assert flushed_items(flush) == [1, 2]
+
+
+def test_drop_overflow_without_spill_path(flush: MagicMock) -> None:
+    """Test dropping overflowing items when spilling is disabled."""
+    buffer: BatchBuffer[int] = BatchBuffer(flush=flush, max_size=1, flush_interval=3600)
+    buffer.put(1)
+    buffer.put(2)
+    buffer.close()
+
+    assert buffer.dropped == 1
+    flush.assert_called_once_with([1])
+
+
+def test_close_spills_when_flush_fails(
+    buffer: BatchBuffer[int], flush: MagicMock, spill_path: Path
+) -> None:
+    """Test closing the buffer spills everything it could not flush."""
+    flush.side_effect = ConnectionError
+    for item in range(4):
+        buffer.put(item)
+    buffer.close()
+
+    assert spill_path.read_text() == "0\n1\n2\n3\n"
+
+
+@pytest.mark.exception
+def test_put_after_close(buffer: BatchBuffer[int]) -> None:
+    """Test writing to a closed buffer."""
+    buffer.close()
+
+    with pytest.raises(RuntimeError, match="closed buffer"):
+        buffer.put(1)
@@ -0,0 +1,115 @@
+"""Unit tests for the GroupCommit class."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from toolkit.buffers import GroupCommit, GroupCommitTimeoutError
+
+
+def double(items: list[int]) -> list[int | Exception]:
+    """Commit callback doubling positive items and rejecting the others."""
+    return [item * 2 if item > 0 else ValueError(item) for item in items]
+
+
+@pytest.mark.smoke
+def test_single_item() -> None:
+    """Test a caller arriving alone commits its item after the window."""
+    group_commit: GroupCommit[int, int] = GroupCommit(commit=double, window=0.01)
+
+    start = time.perf_counter()
+    assert group_commit.submit(1) == 2
+    assert time.perf_counter() - start >= 0.01
+    assert (group_commit.groups, group_commit.items) == (1, 1)
+
+
+def test_merge_concurrent_items() -> None:
+    """Test concurrent items are committed together, each caller getting its result."""
+    commit = MagicMock(side_effect=double)
+    group_commit: GroupCommit[int, int] = GroupCommit(
+        commit=commit, window=10, max_size=8
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(group_commit.submit, range(1, 9)))
+
+    # A full group is committed without waiting for the window.
+    assert results == [2, 4, 6, 8, 10, 12, 14, 16]
+    commit.assert_called_once()
+    assert sorted(commit.call_args.args[0]) == list(range(1, 9))
+
+
+def test_split_groups_at_max_size() -> None:
+    """Test groups never hold more than max_size items."""
+    commit = MagicMock(side_effect=double)
+    group_commit: GroupCommit[int, int] = GroupCommit(
+        commit=commit, window=0.05, max_size=4
+    )
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(group_commit.submit, range(1, 17)))
+
+    assert results == [item * 2 for item in range(1, 17)]
+    assert all(len(call.args[0]) <= 4 for call in commit.call_args_list)
+    assert group_commit.groups == commit.call_count >= 4
+    assert group_commit.items == 16
+
+
+@pytest.mark.exception
+def test_item_exception() -> None:
+    """Test a rejected item only raises in its own caller."""
+    group_commit: GroupCommit[int, int] = GroupCommit(
+        commit=double, window=10, max_size=3
+    )
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(group_commit.submit, item) for item in (1, -1, 2)]
+
+    assert futures[0].result() == 2
+    assert isinstance(futures[1].exception(), ValueError)
+    assert futures[2].result() == 4
+
+
+@pytest.mark.exception
+def test_commit_failure() -> None:
+    """Test a failed commit raises in every caller of the group."""
+    commit = MagicMock(side_effect=RuntimeError("database is down"))
+    group_commit: GroupCommit[int, int] = GroupCommit(
+        commit=commit, window=10, max_size=3
+    )
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(group_commit.submit, item) for item in (1, 2, 3)]
+
+    errors = [future.exception() for future in futures]
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    commit.assert_called_once()
+    # Each caller raises its own exception, the followers' chained to the leader's.
+    assert len({id(error) for error in errors}) == 3
+    leader = next(error for error in errors if error is commit.side_effect)
+    assert all(error.__cause__ is leader for error in errors if error is not leader)
+
+
+@pytest.mark.exception
+def test_follower_deadline() -> None:
+    """Test a caller waiting for a slow leader gives up when its time runs out."""
+    release = threading.Event()
+
+    def slow(items: list[int]) -> list[int | Exception]:
+        release.wait(timeout=5)
+        return double(items)
+
+    group_commit: GroupCommit[int, int] = GroupCommit(
+        commit=slow, window=10, max_size=2, remaining=lambda: 0.05
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(group_commit.submit, 1)
+        time.sleep(0.01)
+        follower = executor.submit(group_commit.submit, 2)
+        assert isinstance(follower.exception(timeout=5), GroupCommitTimeoutError)
+        release.set()
+        assert leader.result(timeout=5) == 2
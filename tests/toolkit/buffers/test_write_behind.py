@@ -0,0 +1,131 @@
+"""Unit tests for the WriteBehindBuffer class."""
+
+import threading
+from typing import Generator
+from unittest.mock import MagicMock
+
+import pytest
+
+from toolkit.buffers import WriteBehindBuffer
+
+
+@pytest.fixture
+def flush() -> MagicMock:
+    """Fixture for a mocked flush callback."""
+    return MagicMock()
+
+
+@pytest.fixture
+def buffer(flush: MagicMock) -> Generator[WriteBehindBuffer[str, int], None, None]:
+    """Fixture for a buffer which only flushes when asked to."""
+    buffer: WriteBehindBuffer[str, int] = WriteBehindBuffer(
+        flush=flush, merge=max, max_size=100, flush_interval=3600
+    )
+    yield buffer
+    buffer.close()
+
+
+@pytest.mark.smoke
+def test_flush(buffer: WriteBehindBuffer[str, int], flush: MagicMock) -> None:
+    """Test flushing buffered writes in one batch."""
+    buffer.put("a", 1)
+    buffer.put("b", 2)
+
+    assert len(buffer) == 2
+    assert buffer.flush() == 2
+    flush.assert_called_once_with({"a": 1, "b": 2})
+    assert len(buffer) == 0
+
+
+def test_merge_repeated_writes(
+    buffer: WriteBehindBuffer[str, int], flush: MagicMock
+) -> None:
+    """Test merging writes to the same key while they are buffered."""
+    buffer.put("a", 3)
+    buffer.put("a", 1)
+    buffer.put("a", 2)
+    buffer.flush()
+
+    flush.assert_called_once_with({"a": 3})
+
+
+def test_keep_newest_without_merge(flush: MagicMock) -> None:
+    """Test keeping the newest value when no merge function is given."""
+    buffer: WriteBehindBuffer[str, int] = WriteBehindBuffer(
+        flush=flush, flush_interval=3600
+    )
+    buffer.put("a", 3)
+    buffer.put("a", 1)
+    buffer.close()
+
+    flush.assert_called_once_with({"a": 1})
+
+
+def test_flush_empty_buffer(
+    buffer: WriteBehindBuffer[str, int], flush: MagicMock
+) -> None:
+    """Test flushing an empty buffer does not call the callback."""
+    assert buffer.flush() == 0
+    flush.assert_not_called()
+
+
+def test_flush_on_max_size() -> None:
+    """Test flushing in the background once the buffer is full."""
+    flushed = threading.Event()
+    buffer: WriteBehindBuffer[int, int] = WriteBehindBuffer(
+        flush=lambda batch: flushed.set(), max_size=3, flush_interval=3600
+    )
+    for key in range(3):
+        buffer.put(key, key)
+
+    assert flushed.wait(timeout=5)
+    buffer.close()
+
+
+def test_flush_on_interval() -> None:
+    """Test flushing in the background periodically."""
+    flushed = threading.Event()
+    buffer: WriteBehindBuffer[int, int] = WriteBehindBuffer(
+        flush=lambda batch: flushed.set(), flush_interval=0.01
+    )
+    buffer.put(1, 1)
+
+    assert flushed.wait(timeout=5)
+    buffer.close()
+
+
+def test_close_flushes_pending_writes(
+    buffer: WriteBehindBuffer[str, int], flush: MagicMock
+) -> None:
+    """Test closing the buffer flushes the pending writes."""
+    buffer.put("a", 1)
+    buffer.close()
+
+    flush.assert_called_once_with({"a": 1})
+
+
+@pytest.mark.exception
+def test_put_after_close(buffer: WriteBehindBuffer[str, int]) -> None:
+    """Test writing to a closed buffer."""
+    buffer.close()
+
+    with pytest.raises(RuntimeError, match="closed buffer"):
+        buffer.put("a", 1)
+
+
+@pytest.mark.exception
+def test_failed_flush_is_retried(
+    buffer: WriteBehindBuffer[str, int], flush: MagicMock
+) -> None:
+    """Test pending writes are kept and merged when a flush fails."""
+    flush.side_effect = ConnectionError
+    buffer.put("a", 5)
+
+    with pytest.raises(ConnectionError):
+        buffer.flush()
+
+    flush.side_effect = None
+    buffer.put("a", 2)
+    buffer.flush()
+
+    flush.assert_called_with({"a": 5})
@@ -0,0 +1,92 @@
+"""Unit tests for the MemoryMonitor class."""
+
+import logging
+import tracemalloc
+from collections.abc import Generator
+
+import pytest
+
+from toolkit.diagnostics import MemoryMonitor
+from toolkit.diagnostics.memory import MIB
+
+leaked: list[bytes] = []
+
+
+def leak(size: int) -> None:
+    """Allocate memory that is never freed."""
+    leaked.append(bytes(size))
+
+
+@pytest.fixture
+def monitor() -> Generator[MemoryMonitor, None, None]:
+    """Fixture for a started memory monitor, warning every MiB of growth."""
+    monitor = MemoryMonitor(growth_threshold=MIB, gauges=lambda: {"sessions": 3})
+    monitor.start()
+    yield monitor
+    monitor.stop()
+    leaked.clear()
+
+
+@pytest.mark.smoke
+def test_check_reports_growing_lines(monitor: MemoryMonitor) -> None:
+    """Test a check diffs the snapshots by line and reports the gauges."""
+    leak(256 * 1024)
+
+    report = monitor.check()
+
+    assert report.growth >= 256 * 1024
+    assert report.gauges == {"sessions": 3}
+    assert monitor.last_report is report
+    frame = report.top[0].traceback[0]
+    assert frame.filename == __file__
+    assert report.top[0].size_diff >= 256 * 1024
+    assert "sessions=3" in report.format()
+
+    report = monitor.check()
+
+    assert not any(
+        stat.traceback[0].filename == __file__ and stat.size_diff >= 256 * 1024
+        for stat in report.top
+    )
+
+
+def test_check_warns_once_per_threshold(
+    monitor: MemoryMonitor, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test growth past the threshold is warned about once per threshold."""
+    with caplog.at_level(logging.INFO, logger="toolkit.diagnostics.memory"):
+        monitor.check()
+        leak(2 * MIB)
+        monitor.check()
+        monitor.check()
+
+    warnings = [
+        record for record in caplog.records if record.levelno == logging.WARNING
+    ]
+    assert len(warnings) == 1
+    assert __file__ in warnings[0].getMessage()
+
+
+def test_stop_leaves_foreign_tracing() -> None:
+    """Test the monitor only stops the tracing it started."""
+    tracemalloc.start()
+    try:
+        monitor = MemoryMonitor()
+        monitor.start()
+        monitor.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    monitor.start()
+    monitor.stop()
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.exception
+def test_check_before_start() -> None:
+    """Test a monitor must be started before checking."""
+    with pytest.raises(RuntimeError):
+        MemoryMonitor().check()
+    with pytest.raises(ValueError):
+        MemoryMonitor(growth_threshold=0)
@@ -0,0 +1,188 @@
+"""Unit tests for the EventBus class."""
+
+import threading
+from functools import partial
+from typing import Generator
+
+import pytest
+
+from toolkit.events import EventBus, OverflowPolicy
+
+
+class Event:
+    """An event carrying a number."""
+
+    def __init__(self, number: int) -> None:
+        self.number = number
+
+
+class OtherEvent(Event):
+    """A subclass of the event."""
+
+
+@pytest.fixture
+def bus() -> Generator[EventBus, None, None]:
+    """Fixture for instantiating an EventBus."""
+    bus = EventBus(max_workers=2, block_timeout=0.1)
+    yield bus
+    bus.close(timeout=5)
+
+
+@pytest.mark.smoke
+def test_publish(bus: EventBus) -> None:
+    """Test events are handled in order by the subscriptions of their type."""
+    numbers: list[int] = []
+    others: list[int] = []
+    subscription = bus.subscribe(Event, lambda event: numbers.append(event.number))
+    bus.subscribe(OtherEvent, lambda event: others.append(event.number))
+
+    for number in range(500):
+        assert bus.publish(Event(number)) == 1
+    assert bus.publish(OtherEvent(500)) == 2
+
+    assert bus.join(timeout=5)
+    assert numbers == list(range(501))
+    assert others == [500]
+    assert subscription.handled == 501
+
+
+@pytest.mark.smoke
+def test_on_done_after_every_subscriber(bus: EventBus) -> None:
+    """Test the callback of an event runs once every subscription handled it."""
+    handled: list[str] = []
+    outcomes: list[bool] = []
+    done = threading.Event()
+    bus.subscribe(Event, lambda event: handled.append("first"))
+    bus.subscribe(Event, lambda event: handled.append("second"))
+
+    def on_done(delivered: bool) -> None:
+        outcomes.append(delivered and len(handled) == 2)
+        done.set()
+
+    bus.publish(Event(1), on_done=on_done)
+
+    assert done.wait(timeout=5)
+    assert outcomes == [True]
+    assert bus.publish(object(), on_done=outcomes.append) == 0
+    assert outcomes == [True, True]
+
+
+@pytest.mark.exception
+def test_on_done_after_failure(bus: EventBus) -> None:
+    """Test the callback of an event a subscription failed to handle reports it."""
+    outcomes: list[bool] = []
+
+    def fail(event: Event) -> None:
+        raise ValueError(event.number)
+
+    bus.subscribe(Event, fail)
+    bus.subscribe(Event, lambda event: None)
+
+    bus.publish(Event(1), on_done=outcomes.append)
+
+    assert bus.join(timeout=5)
+    assert outcomes == [False]
+
+
+@pytest.mark.exception
+def test_on_done_after_drop(bus: EventBus) -> None:
+    """Test the callback of an event dropped by a full subscription reports it."""
+    release = threading.Event()
+    started = threading.Event()
+    outcomes: dict[int, bool] = {}
+
+    def handle(event: Event) -> None:
+        started.set()
+        release.wait(timeout=5)
+
+    bus.subscribe(Event, handle, max_pending=1)
+    bus.publish(Event(0))
+    assert started.wait(timeout=5)
+    for number in (1, 2):
+        bus.publish(Event(number), on_done=partial(outcomes.__setitem__, number))
+    release.set()
+
+    assert bus.join(timeout=5)
+    assert outcomes == {1: True, 2: False}
+
+
+@pytest.mark.exception
+def test_failing_subscriber_is_isolated(bus: EventBus) -> None:
+    """Test a failing subscriber neither raises to the publisher nor stops others."""
+    numbers: list[int] = []
+
+    def fail(event: Event) -> None:
+        raise ValueError(event.number)
+
+    failing = bus.subscribe(Event, fail)
+    bus.subscribe(Event, lambda event: numbers.append(event.number))
+
+    bus.publish(Event(1))
+    bus.publish(Event(2))
+
+    assert bus.join(timeout=5)
+    assert numbers == [1, 2]
+    assert failing.failed == 2
+
+
+@pytest.mark.parametrize(
+    "overflow, expected",
+    [
+        (OverflowPolicy.DROP_NEWEST, [0, 1, 2]),
+        (OverflowPolicy.DROP_OLDEST, [0, 3, 4]),
+        (OverflowPolicy.BLOCK, [0, 1, 2]),
+    ],
+)
+def test_overflow(bus: EventBus, overflow: OverflowPolicy, expected: list[int]) -> None:
+    """Test a subscriber falling behind drops events according to its policy."""
+    release = threading.Event()
+    started = threading.Event()
+    numbers: list[int] = []
+
+    def handle(event: Event) -> None:
+        started.set()
+        release.wait(timeout=5)
+        numbers.append(event.number)
+
+    subscription = bus.subscribe(Event, handle, max_pending=2, overflow=overflow)
+    bus.publish(Event(0))
+    assert started.wait(timeout=5)
+
+    queued = [bus.publish(Event(number)) for number in range(1, 5)]
+    release.set()
+
+    assert bus.join(timeout=5)
+    assert numbers == expected
+    assert subscription.dropped == 2
+    assert sum(queued) == (4 if overflow == OverflowPolicy.DROP_OLDEST else 2)
+
+
+def test_block_waits_for_room() -> None:
+    """Test the blocking policy queues the event once the subscriber catches up."""
+    release = threading.Event()
+    numbers: list[int] = []
+
+    def handle(event: Event) -> None:
+        release.wait(timeout=5)
+        numbers.append(event.number)
+
+    bus = EventBus(max_workers=1, block_timeout=5)
+    try:
+        bus.subscribe(Event, handle, max_pending=1, overflow=OverflowPolicy.BLOCK)
+        bus.publish(Event(0))
+        bus.publish(Event(1))
+        threading.Timer(0.1, release.set).start()
+        assert bus.publish(Event(2)) == 1
+        assert bus.join(timeout=5)
+    finally:
+        bus.close(timeout=5)
+    assert numbers == [0, 1, 2]
+
+
+@pytest.mark.exception
+def test_publish_after_close(bus: EventBus) -> None:
+    """Test publishing to a closed bus raises an error."""
+    bus.close()
+
+    with pytest.raises(RuntimeError):
+        bus.publish(Event(1))
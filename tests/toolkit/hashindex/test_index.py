@@ -0,0 +1,115 @@
+"""Unit tests for the hash index module."""
+
+import pickle
+import random
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from toolkit.hashindex import HashIndex, HashIndexError, build_hash_index
+
+
+@pytest.fixture
+def hashes() -> list[bytes]:
+    """Fixture for a synthetic corpus of random hashes, sharing prefixes."""
+    generator = random.Random(1234)
+    hashes = [generator.randbytes(20) for _ in range(20_000)]
+    # Hashes on the edges of the fan-out buckets and of the partitions.
+    hashes += [bytes(20), b"\xff" * 20, b"\x00\x01" + bytes(18), b"\x01" + bytes(19)]
+    return hashes
+
+
+@pytest.fixture
+def index_path(tmp_path: Path, hashes: list[bytes]) -> Path:
+    """Fixture for the path of an index built from the synthetic corpus."""
+    path = tmp_path / "hashes.idx"
+    build_hash_index(reversed(hashes), path, width=20)
+    return path
+
+
+@pytest.mark.smoke
+def test_contains(index_path: Path, hashes: list[bytes]) -> None:
+    """Test every indexed hash is found and other hashes are not."""
+    generator = random.Random(5678)
+
+    with HashIndex(index_path) as index:
+        assert len(index) == len(hashes)
+        assert all(digest in index for digest in hashes)
+        assert not any(generator.randbytes(20) in index for _ in range(5_000))
+        assert b"\x00\x00" + b"\xff" * 18 not in index
+        assert b"short" not in index
+
+
+def test_sorted_fixed_width_file(index_path: Path, hashes: list[bytes]) -> None:
+    """Test the index file ends with the distinct hashes, sorted."""
+    data = index_path.read_bytes()
+
+    entries = data[len(data) - 20 * len(hashes) :]
+    assert entries == b"".join(sorted(hashes))
+
+
+def test_duplicates_are_dropped(tmp_path: Path) -> None:
+    """Test each hash is written once."""
+    path = tmp_path / "hashes.idx"
+
+    assert build_hash_index([b"ab", b"cd", b"ab"], path, width=2) == 2
+    with HashIndex(path) as index:
+        assert len(index) == 2
+        assert b"ab" in index
+
+
+def test_empty_index(tmp_path: Path) -> None:
+    """Test an index can be built without hashes."""
+    path = tmp_path / "hashes.idx"
+    build_hash_index([], path, width=20)
+
+    with HashIndex(path) as index:
+        assert len(index) == 0
+        assert bytes(20) not in index
+
+
+def test_pickle_reopens(index_path: Path, hashes: list[bytes]) -> None:
+    """Test a pickled index, as sent to worker processes, maps the same file."""
+    with HashIndex(index_path) as index:
+        copy = pickle.loads(pickle.dumps(index))
+
+    assert hashes[0] in copy
+    copy.close()
+
+
+@pytest.mark.exception
+def test_invalid_hashes(tmp_path: Path) -> None:
+    """Test hashes of another width and too narrow widths are rejected."""
+    with pytest.raises(ValueError):
+        build_hash_index([bytes(20), bytes(19)], tmp_path / "hashes.idx", width=20)
+    with pytest.raises(ValueError):
+        build_hash_index([b"a"], tmp_path / "hashes.idx", width=1)
+
+
+@pytest.mark.exception
+def test_failed_build_keeps_index(index_path: Path, hashes: list[bytes]) -> None:
+    """Test a build failing midway leaves the previous index and no partial file."""
+    with (
+        patch(
+            "toolkit.hashindex.index._sorted_partition",
+            side_effect=OSError("disk full"),
+        ),
+        pytest.raises(OSError),
+    ):
+        build_hash_index([bytes(20)], index_path, width=20)
+
+    assert list(index_path.parent.iterdir()) == [index_path]
+    with HashIndex(index_path) as index:
+        assert len(index) == len(hashes)
+
+
+@pytest.mark.exception
+@pytest.mark.parametrize("truncate", [0, 10, 25])
+def test_invalid_file(index_path: Path, truncate: int) -> None:
+    """Test truncated files are not opened."""
+    data = index_path.read_bytes()
+    index_path.write_bytes(data[:truncate] if truncate else b"not an index" * 10)
+
+    with pytest.raises(HashIndexError):
+        HashIndex(index_path)
@@ -0,0 +1,49 @@
+"""Unit tests for the Aho-Corasick automaton."""
+
+import random
+
+import pytest
+
+from toolkit.matching import AhoCorasick
+
+
+@pytest.mark.smoke
+def test_iter_matches() -> None:
+    """Test every occurrence is found, including overlapping and nested ones."""
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+
+    matches = list(automaton.iter_matches("ushers"))
+
+    assert matches == [(1, "she"), (2, "he"), (2, "hers")]
+    assert len(automaton) == 10
+
+
+def test_search() -> None:
+    """Test the pattern of the occurrence ending first is found."""
+    automaton = AhoCorasick(["admin", "min", "root"])
+
+    assert automaton.search("superadministrator") == "admin"
+    assert automaton.search("xroot") == "root"
+    assert automaton.search("rooadmi") is None
+    assert automaton.search("") is None
+    assert AhoCorasick([]).search("anything") is None
+    assert AhoCorasick(["", "ü"]).search("grün") == "ü"
+
+
+def test_matches_naive_search() -> None:
+    """Test the automaton finds the same occurrences as searching every pattern."""
+    generator = random.Random(42)
+    for _ in range(200):
+        patterns = [
+            "".join(generator.choices("abc", k=generator.randint(1, 4)))
+            for _ in range(generator.randint(1, 10))
+        ]
+        text = "".join(generator.choices("abcd", k=generator.randint(0, 30)))
+
+        expected = {
+            (start, pattern)
+            for pattern in patterns
+            for start in range(len(text))
+            if text.startswith(pattern, start)
+        }
+        assert set(AhoCorasick(patterns).iter_matches(text)) == expected
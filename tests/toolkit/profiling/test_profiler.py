@@ -0,0 +1,117 @@
+"""Unit tests for the OperationProfiler class and the collapsed stacks."""
+
+import cProfile
+import pstats
+import time
+from pathlib import Path
+
+import pytest
+
+from toolkit.profiling import (
+    OperationProfiler,
+    ProfileMode,
+    SamplingProfiler,
+    pstats_to_collapsed,
+)
+
+
+def inner() -> None:
+    """Spend time in a nested call."""
+    time.sleep(0.02)
+
+
+def outer() -> None:
+    """Spend time in two nested calls."""
+    inner()
+    inner()
+
+
+class Operations:
+    """Operations to instrument."""
+
+    def login(self, username: str) -> str:
+        """Spend time in a nested call and return the username."""
+        outer()
+        return username
+
+
+def read_collapsed(path: Path) -> dict[str, int]:
+    """Read a file of collapsed stacks."""
+    stacks = {}
+    for line in path.read_text().splitlines():
+        stack, weight = line.rsplit(" ", 1)
+        stacks[stack] = int(weight)
+    return stacks
+
+
+@pytest.mark.smoke
+def test_pstats_to_collapsed() -> None:
+    """Test the time of cProfile is attributed to the stacks of the calls."""
+    profile = cProfile.Profile()
+    profile.enable()
+    outer()
+    profile.disable()
+
+    stacks = pstats_to_collapsed(pstats.Stats(profile))
+
+    sleeping = [
+        stack for stack in stacks if stack.endswith("<built-in method time.sleep>")
+    ]
+    assert len(sleeping) == 1
+    assert "outer (test_profiler.py" in sleeping[0]
+    assert sleeping[0].index("outer") < sleeping[0].index("inner")
+    assert stacks[sleeping[0]] >= 40_000
+
+
+@pytest.mark.smoke
+def test_sampling_profiler() -> None:
+    """Test the sampling profiler counts the stacks of the calling thread."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    outer()
+    samples = profiler.stop()
+
+    assert any("outer (test_profiler.py" in stack for stack in samples)
+    assert sum(samples.values()) > 5
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("mode", list(ProfileMode))
+def test_instrument(tmp_path: Path, mode: ProfileMode) -> None:
+    """Test instrumented methods write a report of every Nth call."""
+    operations = Operations()
+    profiler = OperationProfiler(tmp_path, mode=mode, every=2, interval=0.001)
+    profiler.instrument(operations, ["login"])
+
+    assert [operations.login(f"user_{index}") for index in range(4)] == [
+        "user_0",
+        "user_1",
+        "user_2",
+        "user_3",
+    ]
+
+    assert profiler.profiled == 2
+    collapsed = sorted(tmp_path.glob("Operations.login-*.collapsed"))
+    assert [path.stem.rsplit("-", 1)[1] for path in collapsed] == ["2", "4"]
+    assert any("inner" in stack for stack in read_collapsed(collapsed[0]))
+    pstats_files = list(tmp_path.glob("*.pstats"))
+    assert len(pstats_files) == (2 if mode == ProfileMode.CPROFILE else 0)
+
+
+def test_overlapping_calls_are_not_profiled(tmp_path: Path) -> None:
+    """Test a call overlapping a profiled one runs without being profiled."""
+    profiler = OperationProfiler(tmp_path)
+
+    with profiler.profile("outer"), profiler.profile("nested"):
+        inner()
+
+    assert profiler.profiled == 1
+    assert profiler.skipped == 1
+    assert [path.name.split("-")[0] for path in tmp_path.glob("*.pstats")] == ["outer"]
+
+
+@pytest.mark.exception
+def test_invalid_every(tmp_path: Path) -> None:
+    """Test profiling less than every call is rejected."""
+    with pytest.raises(ValueError):
+        OperationProfiler(tmp_path, every=0)
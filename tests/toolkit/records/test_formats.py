@@ -0,0 +1,136 @@
+"""Unit tests for the record formats module."""
+
+import io
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from toolkit.records import (
+    Compression,
+    FieldType,
+    RecordFormat,
+    open_records,
+    read_records,
+    write_records,
+)
+
+SCHEMA = {
+    "name": FieldType.STRING,
+    "count": FieldType.INTEGER,
+    "active": FieldType.BOOLEAN,
+    "seen_at": FieldType.DATETIME,
+}
+
+RECORDS: list[dict[str, Any]] = [
+    {
+        "name": "alice",
+        "count": 42,
+        "active": True,
+        "seen_at": datetime(2024, 5, 1, 12, 30, 15, 123456),
+    },
+    {
+        "name": 'bob, "the builder"\nsecond line',
+        "count": -7,
+        "active": False,
+        "seen_at": datetime(1960, 1, 1, tzinfo=timezone(timedelta(hours=-5))),
+    },
+    {"name": "ünïcode ✓", "count": None, "active": None, "seen_at": None},
+]
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize("record_format", list(RecordFormat))
+@pytest.mark.parametrize("compression", list(Compression))
+def test_round_trip(
+    tmp_path: Path, record_format: RecordFormat, compression: Compression
+) -> None:
+    """Test reading back the written records in every format and compression."""
+    path = tmp_path / "records"
+    with open_records(path, "wb", compression) as file:
+        assert write_records(file, record_format, SCHEMA, iter(RECORDS)) == 3
+
+    with open_records(path, "rb", compression) as file:
+        assert list(read_records(file, record_format, SCHEMA)) == RECORDS
+
+
+@pytest.mark.parametrize("record_format", list(RecordFormat))
+def test_round_trip_without_records(record_format: RecordFormat) -> None:
+    """Test reading back an empty file."""
+    file = io.BytesIO()
+    assert write_records(file, record_format, SCHEMA, []) == 0
+
+    file.seek(0)
+    assert list(read_records(file, record_format, SCHEMA)) == []
+
+
+@pytest.mark.parametrize("record_format", list(RecordFormat))
+def test_append_batches(record_format: RecordFormat) -> None:
+    """Test records appended in batches without header read back as one file."""
+    file = io.BytesIO()
+    write_records(file, record_format, SCHEMA, RECORDS[:1])
+    write_records(file, record_format, SCHEMA, RECORDS[1:], header=False)
+
+    file.seek(0)
+    assert list(read_records(file, record_format, SCHEMA)) == RECORDS
+
+
+def test_binary_is_compact() -> None:
+    """Test the binary format is smaller than the text formats."""
+    records = RECORDS[:2] * 100
+    sizes = {}
+    for record_format in RecordFormat:
+        file = io.BytesIO()
+        write_records(file, record_format, SCHEMA, records)
+        sizes[record_format] = len(file.getvalue())
+
+    assert sizes[RecordFormat.BINARY] < sizes[RecordFormat.CSV]
+    assert sizes[RecordFormat.BINARY] < sizes[RecordFormat.JSONL]
+
+
+@pytest.mark.parametrize(
+    "path, record_format, compression",
+    [
+        ("users.csv", RecordFormat.CSV, Compression.NONE),
+        ("users.jsonl.gz", RecordFormat.JSONL, Compression.GZIP),
+        ("backup.users.bin.xz", RecordFormat.BINARY, Compression.LZMA),
+        ("users.csv.bz2", RecordFormat.CSV, Compression.BZ2),
+    ],
+)
+def test_guess_from_path(
+    path: str, record_format: RecordFormat, compression: Compression
+) -> None:
+    """Test guessing the format and compression from the suffixes of a path."""
+    assert RecordFormat.from_path(path) == record_format
+    assert Compression.from_path(path) == compression
+
+
+@pytest.mark.exception
+def test_guess_unknown_format() -> None:
+    """Test guessing the format of a path without a known suffix."""
+    with pytest.raises(ValueError, match="Cannot guess the record format"):
+        RecordFormat.from_path("users.txt.gz")
+
+
+@pytest.mark.exception
+@pytest.mark.parametrize("record_format", [RecordFormat.CSV, RecordFormat.BINARY])
+def test_read_with_other_schema(record_format: RecordFormat) -> None:
+    """Test reading a file written with another schema."""
+    file = io.BytesIO()
+    write_records(file, record_format, SCHEMA, RECORDS)
+    file.seek(0)
+
+    with pytest.raises(ValueError, match="Expected the"):
+        list(read_records(file, record_format, {"name": FieldType.STRING}))
+
+
+@pytest.mark.exception
+def test_read_truncated_binary() -> None:
+    """Test reading a binary file cut short in the middle of a record."""
+    file = io.BytesIO()
+    write_records(file, RecordFormat.BINARY, SCHEMA, RECORDS)
+    truncated = io.BytesIO(file.getvalue()[:-3])
+
+    with pytest.raises(ValueError, match="Unexpected end"):
+        list(read_records(truncated, RecordFormat.BINARY, SCHEMA))
@@ -0,0 +1,124 @@
+"""Unit tests for the Scheduler class."""
+
+import threading
+import time
+from typing import Generator
+
+import pytest
+
+from toolkit.scheduling import IntervalTrigger, Scheduler
+
+
+@pytest.fixture
+def scheduler() -> Generator[Scheduler, None, None]:
+    """Fixture for instantiating a Scheduler."""
+    scheduler = Scheduler(max_workers=1)
+    yield scheduler
+    scheduler.shutdown(timeout=5)
+
+
+@pytest.mark.smoke
+def test_runs_jobs(scheduler: Scheduler) -> None:
+    """Test jobs run periodically and their metrics are recorded."""
+    done = threading.Event()
+    runs: list[float] = []
+
+    def job() -> None:
+        runs.append(time.monotonic())
+        if len(runs) == 3:
+            done.set()
+
+    scheduled = scheduler.add_job("job", job, IntervalTrigger(0.01))
+    scheduler.start()
+
+    assert done.wait(timeout=5)
+    assert scheduler.shutdown(timeout=5)
+    assert scheduled.runs >= 3
+    assert scheduled.failures == 0
+    assert scheduled.last_started_at is not None
+    assert 0 <= scheduled.mean_duration <= scheduled.max_duration
+
+
+@pytest.mark.exception
+def test_failing_job_keeps_running(scheduler: Scheduler) -> None:
+    """Test a failing job is counted and run again."""
+    done = threading.Event()
+    calls: list[int] = []
+
+    def job() -> None:
+        calls.append(1)
+        if len(calls) == 2:
+            done.set()
+        raise ValueError("boom")
+
+    scheduled = scheduler.add_job("job", job, IntervalTrigger(0.01))
+    scheduler.start()
+
+    assert done.wait(timeout=5)
+    scheduler.shutdown(timeout=5)
+    assert scheduled.failures == scheduled.runs >= 2
+    assert scheduled.last_error == "ValueError('boom')"
+
+
+def test_skips_overlapping_runs(scheduler: Scheduler) -> None:
+    """Test a job due again while still running is skipped, not queued."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def job() -> None:
+        started.set()
+        release.wait(timeout=5)
+
+    scheduled = scheduler.add_job("job", job, IntervalTrigger(0.01))
+    scheduler.start()
+
+    assert started.wait(timeout=5)
+    time.sleep(0.1)
+    release.set()
+    scheduler.shutdown(timeout=5)
+    assert scheduled.skipped > 0
+    assert scheduled.runs == 1
+
+
+def test_bounds_concurrent_jobs() -> None:
+    """Test no more jobs than workers run at once."""
+    scheduler = Scheduler(max_workers=2)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def job() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    for index in range(5):
+        scheduler.add_job(f"job_{index}", job, IntervalTrigger(0.01))
+    scheduler.start()
+    time.sleep(0.2)
+    scheduler.shutdown(timeout=5)
+
+    assert peak == 2
+    assert sum(job.runs for job in scheduler.jobs.values()) > 2
+
+
+@pytest.mark.exception
+def test_duplicate_job(scheduler: Scheduler) -> None:
+    """Test scheduling two jobs of the same name raises an error."""
+    scheduler.add_job("job", lambda: None, IntervalTrigger(60))
+
+    with pytest.raises(ValueError):
+        scheduler.add_job("job", lambda: None, IntervalTrigger(60))
+
+
+@pytest.mark.exception
+def test_start_twice(scheduler: Scheduler) -> None:
+    """Test starting the scheduler twice raises an error."""
+    scheduler.start()
+
+    with pytest.raises(RuntimeError):
+        scheduler.start()
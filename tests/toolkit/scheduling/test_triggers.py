@@ -0,0 +1,62 @@
+"""Unit tests for the IntervalTrigger and CronTrigger classes."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from toolkit.scheduling import CronTrigger, IntervalTrigger
+
+NOW = datetime(2024, 5, 31, 22, 30, 15, tzinfo=timezone.utc)  # A Friday
+
+
+@pytest.mark.smoke
+def test_interval() -> None:
+    """Test the interval trigger adds its interval and at most its jitter."""
+    assert IntervalTrigger(60).next_run(NOW) == NOW + timedelta(seconds=60)
+
+    trigger = IntervalTrigger(60, jitter=10)
+    for _ in range(100):
+        delay = (trigger.next_run(NOW) - NOW).total_seconds()
+        assert 60 <= delay <= 70
+
+
+@pytest.mark.smoke
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("* * * * *", datetime(2024, 5, 31, 22, 31)),
+        ("*/15 * * * *", datetime(2024, 5, 31, 22, 45)),
+        ("0 3 * * *", datetime(2024, 6, 1, 3, 0)),
+        ("30 22 * * *", datetime(2024, 6, 1, 22, 30)),
+        ("0 0 1 * *", datetime(2024, 6, 1, 0, 0)),
+        ("0 9 * * 1-5", datetime(2024, 6, 3, 9, 0)),
+        ("0 9 * * 0", datetime(2024, 6, 2, 9, 0)),
+        ("0 9 * * 7", datetime(2024, 6, 2, 9, 0)),
+        ("0 0 29 2 *", datetime(2028, 2, 29, 0, 0)),
+        ("0 12 15 * 1", datetime(2024, 6, 3, 12, 0)),
+        ("5,10 1-2 * 6 *", datetime(2024, 6, 1, 1, 5)),
+    ],
+)
+def test_cron(expression: str, expected: datetime) -> None:
+    """Test the cron trigger finds the next matching minute."""
+    assert CronTrigger(expression).next_run(NOW) == expected.replace(
+        tzinfo=timezone.utc
+    )
+
+
+@pytest.mark.exception
+@pytest.mark.parametrize(
+    "expression",
+    ["* * * *", "60 * * * *", "* 24 * * *", "0 0 0 * *", "*/0 * * * *", "a * * * *"],
+)
+def test_invalid_cron(expression: str) -> None:
+    """Test malformed cron expressions are rejected."""
+    with pytest.raises(ValueError):
+        CronTrigger(expression)
+
+
+@pytest.mark.exception
+def test_cron_never_matching() -> None:
+    """Test a cron expression matching no day raises an error."""
+    with pytest.raises(ValueError):
+        CronTrigger("0 0 30 2 *").next_run(NOW)
@@ -0,0 +1,117 @@
+"""Unit tests for the shared hash table module."""
+
+import multiprocessing
+import os
+import time
+from collections.abc import Generator
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from toolkit.sharedmem import SharedHashTable, SharedTableError
+
+
+@pytest.fixture
+def table() -> Generator[SharedHashTable, None, None]:
+    """Fixture for an empty table of 8-byte values."""
+    with SharedHashTable(1000, key_size=16, value_size=8) as table:
+        yield table
+
+
+@pytest.mark.smoke
+def test_put_get_delete(table: SharedHashTable) -> None:
+    """Test storing, overwriting, reading and deleting keys."""
+    for number in range(500):
+        assert table.put(f"key-{number}".encode(), number.to_bytes(8, "little"))
+    assert table.put(b"key-7", b"overwrit")
+
+    found = [table.get(f"key-{number}".encode()) for number in range(500)]
+    assert sum(value is not None for value in found) > 450
+    assert table.get(b"key-7") == b"overwrit"
+    assert table.get(b"missing") is None
+    assert table.delete(b"key-7")
+    assert table.get(b"key-7") is None
+    assert not table.delete(b"key-7")
+
+
+def test_bounded_capacity(table: SharedHashTable) -> None:
+    """Test a full table evicts keys instead of growing."""
+    size = table.nbytes
+    for number in range(10 * table.capacity):
+        table.put(number.to_bytes(8, "little"), bytes(8))
+
+    assert table.nbytes == size
+    assert table.get((10 * table.capacity - 1).to_bytes(8, "little")) == bytes(8)
+    assert not table.put(b"a key longer than sixteen bytes", bytes(8))
+
+
+def _read_and_write(table: SharedHashTable, connection: Connection) -> None:
+    """Read a key written by the parent and write one back, in a forked process."""
+    value = table.get(b"parent")
+    table.put(b"child", os.getpid().to_bytes(8, "little"))
+    connection.send(value)
+    table.close()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="Requires fork")
+def test_shared_with_forked_process(table: SharedHashTable) -> None:
+    """Test a forked process reads and writes the table of its parent."""
+    table.put(b"parent", b"12345678")
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_read_and_write, args=(table, sender))
+    process.start()
+    assert receiver.recv() == b"12345678"
+    process.join()
+
+    assert process.exitcode == 0
+    assert table.get(b"child") == process.pid.to_bytes(8, "little")
+
+
+def test_attach(table: SharedHashTable) -> None:
+    """Test attaching by name, read-only without the lock."""
+    table.put(b"key", b"12345678")
+
+    with SharedHashTable.attach(table.name) as attached:
+        assert attached.get(b"key") == b"12345678"
+        with pytest.raises(RuntimeError, match="read-only"):
+            attached.put(b"key", bytes(8))
+    assert table.get(b"key") == b"12345678"
+
+
+@pytest.mark.exception
+def test_attach_other_memory() -> None:
+    """Test attaching a shared memory block that is not a table."""
+    memory = SharedMemory(create=True, size=128)
+    try:
+        with pytest.raises(SharedTableError, match="not a shared hash table"):
+            SharedHashTable.attach(memory.name)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+@pytest.mark.exception
+def test_held_lock(table: SharedHashTable) -> None:
+    """Test stores skip a held lock at once while deletions wait for it."""
+    assert table.put(b"key", bytes(8))
+    lock = table._lock
+    assert lock is not None
+
+    with lock:
+        start = time.perf_counter()
+        assert not table.put(b"other", bytes(8))
+        assert time.perf_counter() - start < table.lock_timeout
+        assert not table.delete(b"key")
+        assert time.perf_counter() - start >= table.lock_timeout
+
+    assert table.get(b"other") is None
+    assert table.delete(b"key")
+
+
+@pytest.mark.exception
+def test_put_value_of_wrong_size(table: SharedHashTable) -> None:
+    """Test storing a value of another size than the values of the table."""
+    with pytest.raises(ValueError, match="8 bytes long"):
+        table.put(b"key", b"short")
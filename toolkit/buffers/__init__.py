@@ -0,0 +1,4 @@
+from .batch import BatchBuffer as BatchBuffer
+from .group_commit import GroupCommit as GroupCommit
+from .group_commit import GroupCommitTimeoutError as GroupCommitTimeoutError
+from .write_behind import WriteBehindBuffer as WriteBehindBuffer
@@ -0,0 +1,260 @@
+"""Contains the BatchBuffer class for bounded, batched writes with a disk fallback."""
+
+import atexit
+import json
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BatchBuffer(Generic[T]):
+    """
+    Buffer items in a bounded in-memory queue and hand them over in batches.
+
+    A daemon thread flushes the queue in batches of ``batch_size`` items every
+    ``flush_interval`` seconds, or as soon as a full batch is waiting. The queue never
+    holds more than ``max_size`` items: when the flush callback is slow or failing, the
+    overflow and the failed batches are spilled to an append-only file at
+    ``spill_path``, one serialized item per line, and replayed once the callback
+    succeeds again. Spilled items are delivered at least once, so they may be replayed
+    twice if the process dies in the middle of a replay. Without a ``spill_path`` the
+    overflow and the failed batches are dropped and counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[T]], None],
+        max_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        spill_path: Optional[str] = None,
+        serializer: Callable[[T], Any] = lambda item: item,
+        deserializer: Callable[[Any], T] = lambda data: data,
+        name: str = "batch-buffer",
+    ) -> None:
+        """
+        Initialize the BatchBuffer and start its flusher thread.
+
+        Parameters
+        ----------
+        flush : Callable[[list[T]], None]
+            Callback receiving a batch of items.
+        max_size : int, optional
+            Maximum number of items held in memory. Defaults to 10_000.
+        batch_size : int, optional
+            Maximum number of items handed over per callback. Defaults to 500.
+        flush_interval : float, optional
+            Seconds between periodic flushes. Defaults to 1.0.
+        spill_path : Optional[str], optional
+            Path of the file that overflowing items are spilled to. Overflowing items
+            are dropped if not provided.
+        serializer : Callable[[T], Any], optional
+            Function converting an item to a JSON-serializable value before spilling.
+        deserializer : Callable[[Any], T], optional
+            Function converting a spilled value back to an item.
+        name : str, optional
+            Name of the flusher thread. Defaults to "batch-buffer".
+        """
+        self._flush = flush
+        self._max_size = max_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._spill_path = Path(spill_path) if spill_path else None
+        self._serializer = serializer
+        self._deserializer = deserializer
+
+        self._queue: deque[T] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._replay_offset = 0
+
+        self.dropped = 0
+        self.spilled = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __len__(self) -> int:
+        """
+        Return the number of items waiting in memory.
+
+        Returns
+        -------
+        int
+            The number of items in the in-memory queue.
+        """
+        return len(self._queue)
+
+    @property
+    def replay_path(self) -> Optional[Path]:
+        """
+        Path of the spill file currently being replayed.
+
+        Returns
+        -------
+        Optional[Path]
+            The replay file path, or None if spilling is disabled.
+        """
+        return self._spill_path.with_suffix(".replay") if self._spill_path else None
+
+    def put(self, item: T) -> None:
+        """
+        Buffer an item, spilling or dropping it if the queue is full.
+
+        Parameters
+        ----------
+        item : T
+            The item to buffer.
+
+        Raises
+        ------
+        RuntimeError
+            If the buffer is already closed.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot write to a closed buffer.")
+            is_full = len(self._queue) >= self._max_size
+            has_batch = False
+            if not is_full:
+                self._queue.append(item)
+                has_batch = len(self._queue) >= self._batch_size
+        if is_full:
+            self._spill([item])
+        elif has_batch:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Hand all queued and spilled items over to the flush callback in batches.
+
+        Returns
+        -------
+        int
+            The number of flushed items.
+        """
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [
+                        self._queue.popleft()
+                        for _ in range(min(self._batch_size, len(self._queue)))
+                    ]
+                if not batch:
+                    break
+                try:
+                    self._flush(batch)
+                except Exception:
+                    self._spill(batch)
+                    raise
+                flushed += len(batch)
+            flushed += self._replay()
+        if flushed:
+            logger.debug(f"Flushed {flushed} buffered items.")
+        return flushed
+
+    def close(self) -> None:
+        """Stop the flusher thread and flush the remaining items."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+
+        self._wakeup.set()
+        self._thread.join()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush buffered items on close.")
+            with self._lock:
+                remaining, self._queue = list(self._queue), deque()
+            self._spill(remaining)
+
+    def _spill(self, items: list[T]) -> None:
+        """
+        Append items to the spill file, or drop them if spilling is disabled.
+
+        Parameters
+        ----------
+        items : list[T]
+            The items that could not be kept in memory or flushed.
+        """
+        if not items:
+            return
+        if self._spill_path is None:
+            with self._spill_lock:
+                self.dropped += len(items)
+            logger.warning(f"Dropped {len(items)} buffered items.")
+            return
+
+        lines = "".join(json.dumps(self._serializer(item)) + "\n" for item in items)
+        with self._spill_lock:
+            self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._spill_path.open(mode="a", encoding="utf-8") as file:
+                file.write(lines)
+            self.spilled += len(items)
+
+    def _replay(self) -> int:
+        """
+        Hand the spilled items over to the flush callback in batches.
+
+        The spill file is renamed before being replayed, so items spilled during the
+        replay go to a fresh file.
+
+        Returns
+        -------
+        int
+            The number of replayed items.
+        """
+        replay_path = self.replay_path
+        if self._spill_path is None or replay_path is None:
+            return 0
+
+        with self._spill_lock:
+            if not replay_path.exists():
+                if not self._spill_path.exists():
+                    return 0
+                self._spill_path.rename(replay_path)
+                self._replay_offset = 0
+
+        replayed = 0
+        with replay_path.open(encoding="utf-8") as file:
+            file.seek(self._replay_offset)
+            while True:
+                # A line without a newline is a write cut short by a crash.
+                lines = [
+                    line
+                    for line in (file.readline() for _ in range(self._batch_size))
+                    if line.endswith("\n")
+                ]
+                if not lines:
+                    break
+                self._flush([self._deserializer(json.loads(line)) for line in lines])
+                self._replay_offset = file.tell()
+                replayed += len(lines)
+        replay_path.unlink()
+        return replayed
+
+    def _run(self) -> None:
+        """Flush the buffer periodically until it is closed."""
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush buffered items, spilled to disk.")
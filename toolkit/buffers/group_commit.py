@@ -0,0 +1,177 @@
+"""Contains the GroupCommit class for merging concurrent writes into one commit."""
+
+import copy
+import logging
+import threading
+from collections.abc import Callable, Sequence
+from typing import Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class GroupCommitTimeoutError(TimeoutError):
+    """Exception raised when a caller stops waiting for the commit of its group."""
+
+
+class _Group(Generic[T, R]):
+    """Items committed together and the result of each."""
+
+    __slots__ = ("done", "error", "full", "items", "results")
+
+    def __init__(self) -> None:
+        """Initialize an empty group."""
+        self.items: list[T] = []
+        self.results: Sequence[R | Exception] = []
+        self.error: Optional[Exception] = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class GroupCommit(Generic[T, R]):
+    """
+    Merge items submitted concurrently into groups handed over in a single commit.
+
+    The first caller finding no open group becomes its leader: it waits up to
+    ``window`` seconds for other callers to join, or until ``max_size`` items have
+    joined, then commits the whole group while the other callers wait for it. Every
+    caller gets back the result of its own item, or has its own exception raised, so
+    the commit callback decides which failures are shared by the group. There is no
+    background thread, and a caller arriving alone only pays the window. A caller
+    waiting for the leader gives up once the time left to it runs out, while its item
+    may still be committed.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[list[T]], Sequence[R | Exception]],
+        window: float = 0.002,
+        max_size: int = 64,
+        remaining: Optional[Callable[[], Optional[float]]] = None,
+    ) -> None:
+        """
+        Initialize the GroupCommit.
+
+        Parameters
+        ----------
+        commit : Callable[[list[T]], Sequence[R | Exception]]
+            Callback committing a group of items and returning the result of each item,
+            in order, or the exception its caller should raise.
+        window : float, optional
+            Seconds the leader of a group waits for other items. Defaults to 0.002.
+        max_size : int, optional
+            Maximum number of items committed together. Defaults to 64.
+        remaining : Optional[Callable[[], Optional[float]]], optional
+            Callback returning the seconds a caller has left to wait for the leader, or
+            None to wait until the commit is done. Callers always wait if not provided.
+        """
+        self._commit = commit
+        self._window = window
+        self._max_size = max_size
+        self._remaining = remaining
+
+        self._lock = threading.Lock()
+        self._open: Optional[_Group[T, R]] = None
+
+        self.groups = 0
+        self.items = 0
+
+    def submit(self, item: T) -> R:
+        """
+        Commit an item together with the items submitted concurrently.
+
+        Parameters
+        ----------
+        item : T
+            The item to commit.
+
+        Returns
+        -------
+        R
+            The result of the item.
+
+        Raises
+        ------
+        GroupCommitTimeoutError
+            If the caller runs out of time while waiting for the leader.
+        Exception
+            The exception of the item, or of the whole group if its commit failed,
+            copied for each caller other than the leader.
+        """
+        with self._lock:
+            group = self._open
+            is_leader = group is None
+            if group is None:
+                group = self._open = _Group()
+            index = len(group.items)
+            group.items.append(item)
+            if len(group.items) >= self._max_size:
+                self._open = None
+                group.full.set()
+
+        if is_leader:
+            group.full.wait(self._window)
+            with self._lock:
+                if self._open is group:
+                    self._open = None
+            self._commit_group(group)
+        else:
+            left = self._remaining() if self._remaining else None
+            if not group.done.wait(None if left is None else max(0.0, left)):
+                raise GroupCommitTimeoutError("Timed out waiting for a group commit.")
+
+        result = group.results[index]
+        if isinstance(result, Exception):
+            if result is group.error and not is_leader:
+                # Raising mutates an exception, so each thread raises its own.
+                raise _copy_error(result) from result
+            raise result
+        return result
+
+    def _commit_group(self, group: _Group[T, R]) -> None:
+        """
+        Commit a closed group and release its callers.
+
+        Parameters
+        ----------
+        group : _Group[T, R]
+            The group, which no caller can join anymore.
+        """
+        try:
+            results = self._commit(group.items)
+            if len(results) != len(group.items):
+                raise ValueError(
+                    f"Got {len(results)} results for {len(group.items)} items."
+                )
+            group.results = results
+        except Exception as err:
+            logger.exception(f"Failed to commit a group of {len(group.items)} items.")
+            group.error = err
+            group.results = [err] * len(group.items)
+        finally:
+            with self._lock:
+                self.groups += 1
+                self.items += len(group.items)
+            group.done.set()
+
+
+def _copy_error(err: Exception) -> Exception:
+    """
+    Copy the exception of a failed commit for a caller of the group.
+
+    Parameters
+    ----------
+    err : Exception
+        The exception raised by the commit.
+
+    Returns
+    -------
+    Exception
+        A copy of the exception, or a RuntimeError if it cannot be copied.
+    """
+    try:
+        return copy.copy(err)
+    except Exception:
+        return RuntimeError(f"The group commit failed: {err!r}")
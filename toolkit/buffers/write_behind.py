@@ -0,0 +1,169 @@
+"""Contains the WriteBehindBuffer class for coalescing keyed writes in memory."""
+
+import atexit
+import logging
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class WriteBehindBuffer(Generic[K, V]):
+    """
+    Buffer keyed writes in memory and hand them over to a flush callback in bulk.
+
+    Writes to the same key are merged while they wait in the buffer, so each key is
+    flushed at most once per batch. A daemon thread flushes the buffer every
+    ``flush_interval`` seconds, or as soon as it holds ``max_size`` keys. Pending writes
+    are flushed when the buffer is closed, either explicitly or at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[dict[K, V]], None],
+        merge: Optional[Callable[[V, V], V]] = None,
+        max_size: int = 1000,
+        flush_interval: float = 5.0,
+        name: str = "write-behind",
+    ) -> None:
+        """
+        Initialize the WriteBehindBuffer and start its flusher thread.
+
+        Parameters
+        ----------
+        flush : Callable[[dict[K, V]], None]
+            Callback receiving a batch of pending writes.
+        merge : Optional[Callable[[V, V], V]], optional
+            Function combining the buffered value with a new one for the same key.
+            Defaults to keeping the newest value.
+        max_size : int, optional
+            Number of buffered keys that triggers an early flush. Defaults to 1000.
+        flush_interval : float, optional
+            Seconds between periodic flushes. Defaults to 5.0.
+        name : str, optional
+            Name of the flusher thread. Defaults to "write-behind".
+        """
+        self._flush = flush
+        self._merge = merge
+        self._max_size = max_size
+        self._flush_interval = flush_interval
+
+        self._pending: dict[K, V] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __len__(self) -> int:
+        """
+        Return the number of keys waiting to be flushed.
+
+        Returns
+        -------
+        int
+            The number of pending keys.
+        """
+        return len(self._pending)
+
+    def put(self, key: K, value: V) -> None:
+        """
+        Buffer a write, merging it with any pending write for the same key.
+
+        Parameters
+        ----------
+        key : K
+            The key being written.
+        value : V
+            The value to write.
+
+        Raises
+        ------
+        RuntimeError
+            If the buffer is already closed.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot write to a closed buffer.")
+            self._store(key, value)
+            is_full = len(self._pending) >= self._max_size
+        if is_full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Hand all pending writes over to the flush callback.
+
+        Writes are put back into the buffer if the callback fails, so they are retried
+        by the next flush.
+
+        Returns
+        -------
+        int
+            The number of flushed keys.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            try:
+                self._flush(batch)
+            except Exception:
+                with self._lock:
+                    for key, value in batch.items():
+                        self._store(key, value, is_newer=False)
+                raise
+        logger.debug(f"Flushed {len(batch)} buffered writes.")
+        return len(batch)
+
+    def close(self) -> None:
+        """Stop the flusher thread and flush the remaining writes."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def _store(self, key: K, value: V, is_newer: bool = True) -> None:
+        """
+        Store a value in the pending batch, merging it with an existing one.
+
+        Parameters
+        ----------
+        key : K
+            The key being written.
+        value : V
+            The value to store.
+        is_newer : bool, optional
+            Whether ``value`` was written after the pending one. Defaults to True.
+        """
+        if key in self._pending:
+            old, new = (
+                (self._pending[key], value) if is_newer else (value, self._pending[key])
+            )
+            value = self._merge(old, new) if self._merge else new
+        self._pending[key] = value
+
+    def _run(self) -> None:
+        """Flush the buffer periodically until it is closed."""
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush buffered writes, retrying later.")
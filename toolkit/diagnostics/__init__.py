@@ -0,0 +1,2 @@
+from .memory import MemoryMonitor as MemoryMonitor
+from .memory import MemoryReport as MemoryReport
@@ -0,0 +1,214 @@
+"""Contains the MemoryMonitor class for tracking the memory growth of long processes."""
+
+import logging
+import threading
+import tracemalloc
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+MIB = 1024 * 1024
+
+# Allocations of tracemalloc itself and of the import machinery are left out of the
+# snapshots, as they are not allocations of the application.
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryReport:
+    """Memory traced at a check of the MemoryMonitor. Sizes are in bytes."""
+
+    __slots__ = ("gauges", "growth", "peak", "size", "taken_at", "top")
+
+    def __init__(
+        self,
+        size: int,
+        peak: int,
+        growth: int,
+        top: list[tracemalloc.StatisticDiff],
+        gauges: Mapping[str, int],
+    ) -> None:
+        """
+        Initialize the MemoryReport.
+
+        Parameters
+        ----------
+        size : int
+            The memory currently traced.
+        peak : int
+            The highest memory traced since tracing started.
+        growth : int
+            The growth of the memory traced since the monitor started.
+        top : list[tracemalloc.StatisticDiff]
+            The lines of code whose allocations grew the most since the last check,
+            largest first.
+        gauges : Mapping[str, int]
+            Other counts of the application, such as the objects held by sessions.
+        """
+        self.size = size
+        self.peak = peak
+        self.growth = growth
+        self.top = top
+        self.gauges = dict(gauges)
+        self.taken_at = datetime.now(timezone.utc)
+
+    def format(self) -> str:
+        """
+        Format the report for the logs.
+
+        Returns
+        -------
+        str
+            A summary line followed by a line per allocating line of code.
+        """
+        summary = (
+            f"Traced {self.size / MIB:.1f} MiB (peak {self.peak / MIB:.1f} MiB, "
+            f"{self.growth / MIB:+.1f} MiB since start)"
+        )
+        if self.gauges:
+            gauges = ", ".join(f"{name}={value}" for name, value in self.gauges.items())
+            summary = f"{summary}, {gauges}"
+        return "\n".join([f"{summary}.", *(f"  {stat}" for stat in self.top)])
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the report.
+
+        Returns
+        -------
+        str
+            A string containing the class name, the size, the growth, and the gauges.
+        """
+        return (
+            f"MemoryReport(size={self.size}, growth={self.growth}, "
+            f"gauges={self.gauges})"
+        )
+
+
+class MemoryMonitor:
+    """
+    Track the memory of a long-running process with snapshots of tracemalloc.
+
+    Each check takes a snapshot and diffs it with the previous one by file and line,
+    so the lines of code whose allocations keep growing stand out, and logs a warning
+    with the report whenever the memory traced grew by another ``growth_threshold``
+    bytes since the monitor started. Only the last snapshot is kept. Tracing slows
+    down allocations, so the monitor is meant to be turned on when looking for a leak
+    rather than left on.
+    """
+
+    def __init__(
+        self,
+        growth_threshold: int = 64 * MIB,
+        top: int = 10,
+        frames: int = 1,
+        gauges: Optional[Callable[[], Mapping[str, int]]] = None,
+    ) -> None:
+        """
+        Initialize the MemoryMonitor.
+
+        Parameters
+        ----------
+        growth_threshold : int, optional
+            Bytes of growth of the memory traced between warnings. Defaults to 64 MiB.
+        top : int, optional
+            The number of lines of code reported. Defaults to 10.
+        frames : int, optional
+            The number of frames traced per allocation, if the monitor starts tracing.
+            Defaults to 1.
+        gauges : Optional[Callable[[], Mapping[str, int]]], optional
+            A function counting other resources of the application at each check,
+            such as live sessions or connections in use.
+
+        Raises
+        ------
+        ValueError
+            If the growth threshold is not positive.
+        """
+        if growth_threshold <= 0:
+            raise ValueError("The growth threshold must be positive.")
+        self.growth_threshold = growth_threshold
+        self.top = top
+        self.frames = frames
+        self.gauges = gauges
+        self.last_report: Optional[MemoryReport] = None
+        self._lock = threading.Lock()
+        self._owns_tracing = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._baseline = 0
+        self._warn_at = 0
+
+    def start(self) -> None:
+        """Start tracing, unless already tracing, and take the first snapshot."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._owns_tracing = True
+            self._snapshot = self._take_snapshot()
+            self._baseline, _ = tracemalloc.get_traced_memory()
+            self._warn_at = self._baseline + self.growth_threshold
+        logger.info(f"Started tracking memory from {self._baseline / MIB:.1f} MiB.")
+
+    def check(self) -> MemoryReport:
+        """
+        Take a snapshot, diff it with the previous one and warn about growth.
+
+        Returns
+        -------
+        MemoryReport
+            The report of the check.
+
+        Raises
+        ------
+        RuntimeError
+            If the monitor is not started.
+        """
+        with self._lock:
+            if self._snapshot is None or not tracemalloc.is_tracing():
+                raise RuntimeError("The memory monitor is not started.")
+            snapshot = self._take_snapshot()
+            top = snapshot.compare_to(self._snapshot, "lineno")[: self.top]
+            self._snapshot = snapshot
+            size, peak = tracemalloc.get_traced_memory()
+            report = MemoryReport(
+                size=size,
+                peak=peak,
+                growth=size - self._baseline,
+                top=top,
+                gauges=self.gauges() if self.gauges else {},
+            )
+            self.last_report = report
+            grown = size >= self._warn_at
+            if grown:
+                self._warn_at = size + self.growth_threshold
+        if grown:
+            logger.warning(f"Memory keeps growing. {report.format()}")
+        else:
+            logger.info(report.format())
+        return report
+
+    def stop(self) -> None:
+        """Drop the last snapshot, and stop tracing if the monitor started it."""
+        with self._lock:
+            self._snapshot = None
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """
+        Take a snapshot of the allocations of the application.
+
+        Returns
+        -------
+        tracemalloc.Snapshot
+            The snapshot, without the allocations of tracemalloc and imports.
+        """
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
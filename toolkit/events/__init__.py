@@ -0,0 +1,3 @@
+from .bus import EventBus as EventBus
+from .bus import OverflowPolicy as OverflowPolicy
+from .bus import Subscription as Subscription
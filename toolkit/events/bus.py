@@ -0,0 +1,429 @@
+"""Contains the EventBus class for running event subscribers off the caller's thread."""
+
+import atexit
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+E = TypeVar("E")
+
+
+class OverflowPolicy(StrEnum):
+    """An enumeration class representing what to do when a subscriber falls behind."""
+
+    BLOCK = "block"
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+
+
+class _Delivery:
+    """Countdown of the subscribers an event is queued to, calling back at zero."""
+
+    __slots__ = ("_callback", "_delivered", "_lock", "_remaining")
+
+    def __init__(self, remaining: int, callback: Callable[[bool], None]) -> None:
+        """
+        Initialize the _Delivery.
+
+        Parameters
+        ----------
+        remaining : int
+            The number of subscribers the event is queued to.
+        callback : Callable[[bool], None]
+            Function called once every subscriber handled, failed or dropped the
+            event, with True only if every subscriber handled it.
+        """
+        self._remaining = remaining
+        self._callback = callback
+        self._delivered = True
+        self._lock = threading.Lock()
+
+    def done(self, handled: bool) -> None:
+        """
+        Count a subscriber as done with the event, calling back after the last.
+
+        Parameters
+        ----------
+        handled : bool
+            True if the subscriber handled the event, False if it failed or dropped it.
+        """
+        with self._lock:
+            self._remaining -= 1
+            self._delivered = self._delivered and handled
+            finished = not self._remaining
+        if finished:
+            try:
+                self._callback(self._delivered)
+            except Exception:
+                logger.exception("Failed to run the callback of a delivered event.")
+
+
+class Subscription(Generic[E]):
+    """
+    A handler of the events of a type, with its own bounded queue of pending events.
+
+    The events of a subscription are handled one at a time, in the order they were
+    published, while other subscriptions are handled concurrently, so a slow
+    subscriber only delays its own events. Counters of the handled, failed and dropped
+    events are kept for monitoring.
+    """
+
+    def __init__(
+        self,
+        event_type: type[E],
+        handler: Callable[[E], None],
+        max_pending: int,
+        overflow: OverflowPolicy,
+        name: str,
+        lock: threading.Lock,
+    ) -> None:
+        """
+        Initialize the Subscription.
+
+        Parameters
+        ----------
+        event_type : type[E]
+            The type of the events handled, subclasses included.
+        handler : Callable[[E], None]
+            Function handling an event.
+        max_pending : int
+            Maximum number of events waiting to be handled.
+        overflow : OverflowPolicy
+            What to do with an event published while the queue is full.
+        name : str
+            Name of the subscription, used in logs.
+        lock : threading.Lock
+            The lock of the bus, guarding the queue.
+        """
+        self.event_type = event_type
+        self.handler = handler
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.name = name
+
+        self._queue: deque[tuple[E, Optional[_Delivery]]] = deque()
+        self._not_full = threading.Condition(lock)
+        self._scheduled = False
+
+        self.handled = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of events waiting to be handled.
+
+        Returns
+        -------
+        int
+            The number of events in the queue of the subscription.
+        """
+        return len(self._queue)
+
+
+class EventBus:
+    """
+    Publish events to subscribers run on a bounded pool of worker threads.
+
+    Publishing an event only queues it to the subscriptions of its type and returns,
+    so the latency of the subscribers is kept off the path of the publisher. Each
+    subscription holds at most ``max_pending`` events: when a subscriber falls behind,
+    its overflow policy either drops the new event, drops its oldest pending event, or
+    blocks the publisher for up to ``block_timeout`` seconds before dropping the new
+    event. Exceptions of subscribers are logged and counted, never raised to the
+    publisher.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        batch_size: int = 100,
+        block_timeout: float = 1.0,
+        name: str = "event-bus",
+    ) -> None:
+        """
+        Initialize the EventBus and its worker pool.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Number of worker threads running the subscribers. Defaults to 4.
+        batch_size : int, optional
+            Maximum number of events a worker handles for a subscription before
+            moving on to the next one, so busy subscriptions do not starve the others.
+            Defaults to 100.
+        block_timeout : float, optional
+            Seconds a publisher waits for room in a full subscription with the
+            ``BLOCK`` policy before the event is dropped. Defaults to 1.0.
+        name : str, optional
+            Prefix of the names of the worker threads. Defaults to "event-bus".
+        """
+        self._batch_size = batch_size
+        self._block_timeout = block_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+
+        self._subscriptions: list[Subscription[Any]] = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._closed = False
+        atexit.register(self.close)
+
+    def subscribe(
+        self,
+        event_type: type[E],
+        handler: Callable[[E], None],
+        max_pending: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_NEWEST,
+        name: Optional[str] = None,
+    ) -> Subscription[E]:
+        """
+        Subscribe a handler to the events of a type.
+
+        Parameters
+        ----------
+        event_type : type[E]
+            The type of the events handled, subclasses included.
+        handler : Callable[[E], None]
+            Function handling an event.
+        max_pending : int, optional
+            Maximum number of events waiting to be handled. Defaults to 1000.
+        overflow : OverflowPolicy, optional
+            What to do with an event published while the queue is full. Defaults to
+            dropping it.
+        name : Optional[str], optional
+            Name of the subscription, used in logs. Defaults to the name of the
+            handler.
+
+        Returns
+        -------
+        Subscription[E]
+            The subscription, holding its counters.
+        """
+        subscription = Subscription(
+            event_type=event_type,
+            handler=handler,
+            max_pending=max_pending,
+            overflow=overflow,
+            name=name or str(getattr(handler, "__qualname__", handler)),
+            lock=self._lock,
+        )
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription[Any]) -> None:
+        """
+        Stop publishing to a subscription, leaving its pending events to be handled.
+
+        Parameters
+        ----------
+        subscription : Subscription[Any]
+            The subscription.
+        """
+        with self._lock:
+            self._subscriptions.remove(subscription)
+
+    def publish(
+        self, event: Any, on_done: Optional[Callable[[bool], None]] = None
+    ) -> int:
+        """
+        Queue an event to the subscriptions of its type.
+
+        Parameters
+        ----------
+        event : Any
+            The event.
+        on_done : Optional[Callable[[bool], None]], optional
+            Function called on a worker thread once every subscription handled, failed
+            or dropped the event, with True only if every subscription handled it.
+            Called immediately with True if no subscription matches.
+
+        Returns
+        -------
+        int
+            The number of subscriptions the event was queued to.
+
+        Raises
+        ------
+        RuntimeError
+            If the bus is already closed.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot publish to a closed event bus.")
+            subscriptions = [
+                subscription
+                for subscription in self._subscriptions
+                if isinstance(event, subscription.event_type)
+            ]
+        if not subscriptions:
+            if on_done:
+                on_done(True)
+            return 0
+
+        delivery = _Delivery(len(subscriptions), on_done) if on_done else None
+        return sum(
+            self._offer(subscription, event, delivery) for subscription in subscriptions
+        )
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every published event is handled or dropped.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximum number of seconds to wait. Waits indefinitely if not provided.
+
+        Returns
+        -------
+        bool
+            True if no event is pending, False if the timeout elapsed first.
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop accepting events, wait for the pending ones and stop the workers.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximum number of seconds to wait for the pending events, which are
+            abandoned afterwards. Waits indefinitely if not provided.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for subscription in self._subscriptions:
+                subscription._not_full.notify_all()
+        atexit.unregister(self.close)
+
+        if not self.join(timeout):
+            logger.warning(f"Abandoned {self._pending} pending events on close.")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            return
+        self._executor.shutdown()
+
+    def _offer(
+        self,
+        subscription: Subscription[Any],
+        event: Any,
+        delivery: Optional[_Delivery],
+    ) -> bool:
+        """
+        Queue an event to a subscription, applying its overflow policy when full.
+
+        Parameters
+        ----------
+        subscription : Subscription[Any]
+            The subscription.
+        event : Any
+            The event.
+        delivery : Optional[_Delivery]
+            The countdown of the subscriptions of the event, if any.
+
+        Returns
+        -------
+        bool
+            True if the event was queued, False if it was dropped.
+        """
+        item = (event, delivery)
+        dropped: Optional[tuple[Any, Optional[_Delivery]]] = None
+        schedule = False
+        with self._lock:
+            queue = subscription._queue
+            if (
+                len(queue) >= subscription.max_pending
+                and subscription.overflow == OverflowPolicy.BLOCK
+            ):
+                subscription._not_full.wait_for(
+                    lambda: len(queue) < subscription.max_pending or self._closed,
+                    self._block_timeout,
+                )
+            if len(queue) < subscription.max_pending:
+                queue.append(item)
+                self._pending += 1
+            elif subscription.overflow == OverflowPolicy.DROP_OLDEST:
+                dropped = queue.popleft()
+                queue.append(item)
+            else:
+                dropped = item
+            if dropped is not None:
+                subscription.dropped += 1
+            if dropped is not item and not subscription._scheduled:
+                subscription._scheduled = schedule = True
+
+        if dropped is not None:
+            logger.warning(f"Subscriber {subscription.name} dropped {dropped[0]!r}.")
+            if dropped[1] is not None:
+                dropped[1].done(False)
+        if schedule:
+            self._schedule(subscription)
+        return dropped is not item
+
+    def _drain(self, subscription: Subscription[Any]) -> None:
+        """
+        Handle a batch of the pending events of a subscription on a worker thread.
+
+        The subscription is scheduled again while events remain, so it is handled by
+        one worker at a time and its events stay in order.
+
+        Parameters
+        ----------
+        subscription : Subscription[Any]
+            The subscription.
+        """
+        with self._lock:
+            queue = subscription._queue
+            batch = [queue.popleft() for _ in range(min(self._batch_size, len(queue)))]
+            subscription._not_full.notify_all()
+
+        failed = 0
+        for event, delivery in batch:
+            handled = True
+            try:
+                subscription.handler(event)
+            except Exception:
+                handled = False
+                failed += 1
+                logger.exception(
+                    f"Subscriber {subscription.name} failed to handle {event!r}."
+                )
+            if delivery is not None:
+                delivery.done(handled)
+
+        with self._lock:
+            subscription.handled += len(batch) - failed
+            subscription.failed += failed
+            self._pending -= len(batch)
+            subscription._scheduled = reschedule = bool(subscription._queue)
+            if not self._pending:
+                self._idle.notify_all()
+        if reschedule:
+            self._schedule(subscription)
+
+    def _schedule(self, subscription: Subscription[Any]) -> None:
+        """
+        Submit the draining of a subscription to the worker pool.
+
+        Parameters
+        ----------
+        subscription : Subscription[Any]
+            The subscription.
+        """
+        try:
+            self._executor.submit(self._drain, subscription)
+        except RuntimeError:
+            # The pool was shut down by a close that gave up waiting.
+            logger.warning(f"Abandoned the events of subscriber {subscription.name}.")
@@ -0,0 +1,3 @@
+from .index import HashIndex as HashIndex
+from .index import HashIndexError as HashIndexError
+from .index import build_hash_index as build_hash_index
@@ -0,0 +1,380 @@
+"""Contains a sorted, fixed-width file of hashes, memory-mapped for membership tests."""
+
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+INDEX_MAGIC = b"HASHIDX1"
+FANOUT_BITS = 16
+PARTITIONS = 256
+
+# Magic, width of a hash in bytes, number of bits of the fan-out prefix and number of
+# hashes, followed by the fan-out table and the sorted hashes.
+_HEADER = struct.Struct("<8sHHQ")
+_OFFSET = struct.Struct("<Q")
+
+
+class HashIndexError(ValueError):
+    """Exception raised when a file is not a valid hash index."""
+
+
+def build_hash_index(
+    hashes: Iterable[bytes],
+    path: str | Path,
+    width: int,
+    temp_dir: str | Path | None = None,
+) -> int:
+    """
+    Write hashes to a hash index file, sorted and without duplicates.
+
+    The hashes are first spread over temporary partition files by their first byte,
+    then each partition is sorted in memory and appended to the index, so memory is
+    bounded by the size of the largest partition, about a 256th of the hashes.
+
+    Parameters
+    ----------
+    hashes : Iterable[bytes]
+        The hashes, in any order, each ``width`` bytes long.
+    path : str | Path
+        The path of the index file, replaced atomically if it exists.
+    width : int
+        The number of bytes of each hash, at least 2.
+    temp_dir : str | Path | None, optional
+        The directory of the partition files. Defaults to the directory of the index.
+
+    Returns
+    -------
+    int
+        The number of distinct hashes written.
+
+    Raises
+    ------
+    ValueError
+        If the width is too small or a hash does not have the given width.
+    """
+    if width < FANOUT_BITS // 8:
+        raise ValueError(f"Hashes must be at least {FANOUT_BITS // 8} bytes long.")
+    path = Path(path)
+    with tempfile.TemporaryDirectory(dir=temp_dir or path.parent) as partition_dir:
+        partition_paths = _partition(hashes, Path(partition_dir), width)
+
+        # The index is written next to its path and moved in place once complete, so
+        # readers never map a partial index, even if the build fails or crashes.
+        fd, temporary = tempfile.mkstemp(
+            prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+        )
+        try:
+            with open(fd, "wb") as index_file:
+                count = _write_index(index_file, partition_paths, width)
+                index_file.flush()
+                os.fsync(index_file.fileno())
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    return count
+
+
+def _write_index(index_file: IO[bytes], partition_paths: list[Path], width: int) -> int:
+    """
+    Write the header, the fan-out table and the sorted hashes of an index.
+
+    Parameters
+    ----------
+    index_file : IO[bytes]
+        The file of the index, opened for writing.
+    partition_paths : list[Path]
+        The paths of the partition files, in the order of their first byte, each
+        deleted once written.
+    width : int
+        The number of bytes of each hash.
+
+    Returns
+    -------
+    int
+        The number of distinct hashes written.
+    """
+    buckets = [0] * (1 << FANOUT_BITS)
+    count = 0
+    index_file.write(_HEADER.pack(INDEX_MAGIC, width, FANOUT_BITS, 0))
+    fanout_start = index_file.tell()
+    index_file.write(bytes(_OFFSET.size * (len(buckets) + 1)))
+    for partition_path in partition_paths:
+        for digest in _sorted_partition(partition_path, width):
+            index_file.write(digest)
+            buckets[int.from_bytes(digest[:2], "big")] += 1
+            count += 1
+        partition_path.unlink()
+
+    index_file.seek(0)
+    index_file.write(_HEADER.pack(INDEX_MAGIC, width, FANOUT_BITS, count))
+    index_file.seek(fanout_start)
+    offset = 0
+    for bucket in [*buckets, 0]:
+        index_file.write(_OFFSET.pack(offset))
+        offset += bucket
+    return count
+
+
+def _partition(hashes: Iterable[bytes], partition_dir: Path, width: int) -> list[Path]:
+    """
+    Spread hashes over partition files by their first byte.
+
+    Parameters
+    ----------
+    hashes : Iterable[bytes]
+        The hashes.
+    partition_dir : Path
+        The directory of the partition files.
+    width : int
+        The number of bytes of each hash.
+
+    Returns
+    -------
+    list[Path]
+        The paths of the partition files, in the order of their first byte.
+
+    Raises
+    ------
+    ValueError
+        If a hash does not have the given width.
+    """
+    paths = [partition_dir / f"{prefix:02x}.part" for prefix in range(PARTITIONS)]
+    files: list[IO[bytes]] = [open(path, "wb") for path in paths]
+    try:
+        for digest in hashes:
+            if len(digest) != width:
+                raise ValueError(f"Expected {width}-byte hashes, got {digest!r}.")
+            files[digest[0]].write(digest)
+    finally:
+        for partition_file in files:
+            partition_file.close()
+    return paths
+
+
+def _sorted_partition(path: Path, width: int) -> Iterator[bytes]:
+    """
+    Read a partition file and yield its distinct hashes in order.
+
+    Parameters
+    ----------
+    path : Path
+        The path of the partition file.
+    width : int
+        The number of bytes of each hash.
+
+    Yields
+    ------
+    bytes
+        The distinct hashes of the partition, in ascending order.
+    """
+    data = path.read_bytes()
+    digests = sorted(
+        data[start : start + width] for start in range(0, len(data), width)
+    )
+    previous = None
+    for digest in digests:
+        if digest != previous:
+            yield digest
+            previous = digest
+
+
+class _Entries:
+    """
+    Sequence of the hashes of a hash index, read from its mapping as integers.
+
+    Hashes are read through a view of the mapping instead of being sliced out of it, so
+    a probe of the binary search copies no bytes. Comparing the big-endian integers of
+    hashes of the same width orders them as the hashes themselves.
+    """
+
+    def __init__(self, view: memoryview, start: int, width: int, length: int) -> None:
+        """
+        Initialize the _Entries.
+
+        Parameters
+        ----------
+        view : memoryview
+            The view of the mapping of the index file.
+        start : int
+            The position of the first hash in the file.
+        width : int
+            The number of bytes of each hash.
+        length : int
+            The number of hashes.
+        """
+        self._view = view
+        self._start = start
+        self._width = width
+        self._length = length
+
+    def __len__(self) -> int:
+        """
+        Return the number of hashes.
+
+        Returns
+        -------
+        int
+            The number of hashes.
+        """
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Read a hash from the mapping.
+
+        Parameters
+        ----------
+        index : int
+            The position of the hash.
+
+        Returns
+        -------
+        int
+            The hash, as a big-endian integer.
+        """
+        position = self._start + index * self._width
+        return int.from_bytes(self._view[position : position + self._width], "big")
+
+
+class HashIndex:
+    """
+    Read-only, memory-mapped hash index file answering membership tests.
+
+    The file is never read into memory: a lookup reads the range of its 16-bit prefix
+    from the fan-out table and binary-searches it in the mapping, touching a handful
+    of pages. Pages are shared through the page cache by every process mapping the
+    same file. An index can be pickled, which reopens the file, to be sent to worker
+    processes.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        Open and map a hash index file.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path of the index file.
+
+        Raises
+        ------
+        HashIndexError
+            If the file is not a valid hash index.
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as index_file:
+            size = os.fstat(index_file.fileno()).st_size
+            if size < _HEADER.size:
+                raise HashIndexError(f"{self.path} is too small to be a hash index.")
+            self._buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, width, fanout_bits, count = _HEADER.unpack_from(self._buffer)
+        self.width: int = width
+        self._count: int = count
+        self._fanout_start = _HEADER.size
+        self._entries_start = self._fanout_start + _OFFSET.size * (
+            (1 << FANOUT_BITS) + 1
+        )
+        expected_size = self._entries_start + self._count * self.width
+        if magic != INDEX_MAGIC or fanout_bits != FANOUT_BITS or size != expected_size:
+            self._buffer.close()
+            raise HashIndexError(f"{self.path} is not a valid hash index.")
+        if hasattr(mmap, "MADV_RANDOM"):
+            # Lookups jump around the file, so reading ahead only wastes the cache.
+            self._buffer.madvise(mmap.MADV_RANDOM)
+        self._view = memoryview(self._buffer)
+
+    def __len__(self) -> int:
+        """
+        Return the number of hashes of the index.
+
+        Returns
+        -------
+        int
+            The number of hashes.
+        """
+        return self._count
+
+    def __contains__(self, digest: object) -> bool:
+        """
+        Check whether a hash is in the index.
+
+        Parameters
+        ----------
+        digest : object
+            The hash, ``width`` bytes long.
+
+        Returns
+        -------
+        bool
+            True if the index holds the hash.
+        """
+        if not isinstance(digest, bytes) or len(digest) != self.width:
+            return False
+        prefix = int.from_bytes(digest[:2], "big")
+        low, high = (
+            _OFFSET.unpack_from(
+                self._buffer, self._fanout_start + bucket * _OFFSET.size
+            )[0]
+            for bucket in (prefix, prefix + 1)
+        )
+        key = int.from_bytes(digest, "big")
+        entries = _Entries(self._view, self._entries_start, self.width, high)
+        position = bisect_left(entries, key, low, high)
+        return position < high and entries[position] == key
+
+    def __enter__(self) -> "HashIndex":
+        """
+        Enter the runtime context of the index.
+
+        Returns
+        -------
+        HashIndex
+            The index itself.
+        """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """
+        Close the index when leaving its runtime context.
+
+        Parameters
+        ----------
+        *args : Any
+            The exception details, if any.
+        """
+        self.close()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Get the state of the index to pickle, which is only its path.
+
+        Returns
+        -------
+        dict[str, Any]
+            The path of the index file.
+        """
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """
+        Reopen the index file of a pickled index.
+
+        Parameters
+        ----------
+        state : dict[str, Any]
+            The path of the index file.
+        """
+        self.__init__(state["path"])  # type: ignore[misc]
+
+    def close(self) -> None:
+        """Unmap the index file."""
+        # The mapping cannot be closed while a view of it is exported.
+        self._view.release()
+        self._buffer.close()
@@ -0,0 +1 @@
+from .automaton import AhoCorasick as AhoCorasick
@@ -0,0 +1,144 @@
+"""Contains the AhoCorasick class for matching many patterns in a single pass."""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import Optional
+
+# Transitions are keyed by the state shifted past the largest code point, or-ed with
+# the code point of the character, so a single flat dict holds the whole trie.
+_CHARACTER_BITS = 21
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton finding every occurrence of a set of patterns in a text.
+
+    The patterns are compiled once into a trie whose states are linked to the state of
+    their longest proper suffix, so a text is scanned in a single pass, in time linear
+    in its length plus the number of matches, however many patterns there are. The
+    automaton is immutable once built, so it can be shared between threads and
+    replaced atomically by rebuilding it.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """
+        Compile the patterns into an automaton.
+
+        Parameters
+        ----------
+        patterns : Iterable[str]
+            The patterns. Empty and repeated patterns are ignored.
+        """
+        self._goto: dict[int, int] = {}
+        self._fail = [0]
+        # The pattern ending at each state, and the nearest state along the suffix
+        # links, itself excluded, where a pattern ends.
+        self._output: list[Optional[str]] = [None]
+        self._next_output = [0]
+
+        children: list[list[int]] = [[]]
+        for pattern in patterns:
+            state = 0
+            for character in pattern:
+                key = state << _CHARACTER_BITS | ord(character)
+                child = self._goto.get(key)
+                if child is None:
+                    child = len(self._fail)
+                    self._goto[key] = child
+                    self._fail.append(0)
+                    self._output.append(None)
+                    self._next_output.append(0)
+                    children.append([])
+                    children[state].append(key)
+                state = child
+            if pattern:
+                self._output[state] = pattern
+        self._link(children)
+
+    def _link(self, children: list[list[int]]) -> None:
+        """
+        Link each state to the state of its longest proper suffix, breadth first.
+
+        Parameters
+        ----------
+        children : list[list[int]]
+            The transition keys leaving each state.
+        """
+        mask = (1 << _CHARACTER_BITS) - 1
+        queue = deque(self._goto[key] for key in children[0])
+        while queue:
+            state = queue.popleft()
+            for key in children[state]:
+                child = self._goto[key]
+                character = key & mask
+                suffix = self._fail[state]
+                while (
+                    suffix and (suffix << _CHARACTER_BITS | character) not in self._goto
+                ):
+                    suffix = self._fail[suffix]
+                self._fail[child] = self._goto.get(
+                    suffix << _CHARACTER_BITS | character, 0
+                )
+                fail = self._fail[child]
+                self._next_output[child] = (
+                    fail if self._output[fail] is not None else self._next_output[fail]
+                )
+                queue.append(child)
+
+    def __len__(self) -> int:
+        """
+        Return the number of states of the automaton.
+
+        Returns
+        -------
+        int
+            The number of states, including the root.
+        """
+        return len(self._fail)
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, str]]:
+        """
+        Find every occurrence of the patterns in a text.
+
+        Parameters
+        ----------
+        text : str
+            The text.
+
+        Yields
+        ------
+        tuple[int, str]
+            The position where each occurrence starts and its pattern, in the order
+            of the positions where they end.
+        """
+        goto, fail = self._goto, self._fail
+        state = 0
+        for end, character in enumerate(text, start=1):
+            code = ord(character)
+            while state and (state << _CHARACTER_BITS | code) not in goto:
+                state = fail[state]
+            state = goto.get(state << _CHARACTER_BITS | code, 0)
+            match = (
+                state if self._output[state] is not None else self._next_output[state]
+            )
+            while match:
+                pattern = self._output[match]
+                assert pattern is not None
+                yield end - len(pattern), pattern
+                match = self._next_output[match]
+
+    def search(self, text: str) -> Optional[str]:
+        """
+        Find the first pattern occurring in a text.
+
+        Parameters
+        ----------
+        text : str
+            The text.
+
+        Returns
+        -------
+        Optional[str]
+            The pattern of the occurrence ending first, or None if no pattern occurs.
+        """
+        return next((pattern for _, pattern in self.iter_matches(text)), None)
@@ -0,0 +1,5 @@
+from .profiler import OperationProfiler as OperationProfiler
+from .profiler import ProfileMode as ProfileMode
+from .profiler import SamplingProfiler as SamplingProfiler
+from .profiler import pstats_to_collapsed as pstats_to_collapsed
+from .profiler import write_collapsed as write_collapsed
@@ -0,0 +1,419 @@
+"""Contains the OperationProfiler class for profiling selected operations on demand."""
+
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from enum import StrEnum
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Recursion of the call graph of cProfile is cut at this depth when collapsing stacks.
+_MAX_DEPTH = 128
+
+# Stacks taking less time are dropped when collapsing, which bounds the walk of the
+# call graph of cProfile, whose number of paths grows exponentially.
+_MIN_TIME = 1e-6
+
+
+class ProfileMode(StrEnum):
+    """An enumeration class representing the profilers of operations."""
+
+    CPROFILE = "cprofile"
+    SAMPLING = "sampling"
+
+
+def _label(code: CodeType) -> str:
+    """
+    Build the label of a function in a collapsed stack.
+
+    Parameters
+    ----------
+    code : CodeType
+        The code of the function.
+
+    Returns
+    -------
+    str
+        The qualified name of the function, its file and first line.
+    """
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _pstats_label(function: tuple[str, int, str]) -> str:
+    """
+    Build the label of a function of cProfile in a collapsed stack.
+
+    Parameters
+    ----------
+    function : tuple[str, int, str]
+        The file, first line and name of the function, as keyed by pstats.
+
+    Returns
+    -------
+    str
+        The name of the function, its file and first line, or the name alone for
+        built-in functions.
+    """
+    filename, line, name = function
+    if filename == "~":
+        return name.replace(";", ",")
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def pstats_to_collapsed(stats: pstats.Stats) -> Counter[str]:
+    """
+    Convert the call graph of cProfile to collapsed stacks.
+
+    cProfile records the time of each call between a caller and a callee rather than
+    whole stacks, so the time of a function is split between the stacks of its
+    callers in proportion to the time spent in the calls from each of them. Recursive
+    calls are cut where a function appears again in its own stack, and stacks taking
+    less than a microsecond are dropped.
+
+    Parameters
+    ----------
+    stats : pstats.Stats
+        The statistics of a cProfile run.
+
+    Returns
+    -------
+    Counter[str]
+        The microseconds of own time of each stack, keyed by the stack of labels
+        separated by semicolons, from the outermost call.
+    """
+    entries: dict[Any, Any] = stats.stats  # type: ignore[attr-defined]
+    callees: dict[Any, list[tuple[Any, float]]] = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((function, cumulative))
+
+    stacks: Counter[str] = Counter()
+    for function, entry in entries.items():
+        if not entry[4]:
+            _collapse(entries, callees, [function], 1.0, stacks)
+    return stacks
+
+
+def _collapse(
+    entries: Mapping[Any, Any],
+    callees: Mapping[Any, list[tuple[Any, float]]],
+    stack: list[Any],
+    share: float,
+    stacks: Counter[str],
+) -> None:
+    """
+    Add the own time of the last function of a stack and of the stacks of its calls.
+
+    Parameters
+    ----------
+    entries : Mapping[Any, Any]
+        The statistics of each function, as kept by pstats.
+    callees : Mapping[Any, list[tuple[Any, float]]]
+        The functions called by each function, with the time spent in their calls.
+    stack : list[Any]
+        The stack of functions, from the outermost call.
+    share : float
+        The share of the time of the last function spent in this stack.
+    stacks : Counter[str]
+        The microseconds of own time of each stack, added to.
+    """
+    _, _, own_time, cumulative, _ = entries[stack[-1]]
+    if cumulative * share < _MIN_TIME:
+        return
+    microseconds = round(own_time * share * 1_000_000)
+    if microseconds:
+        stacks[";".join(_pstats_label(frame) for frame in stack)] += microseconds
+    if len(stack) >= _MAX_DEPTH:
+        return
+    for callee, edge_time in callees.get(stack[-1], ()):
+        callee_cumulative = entries[callee][3]
+        if callee in stack or not callee_cumulative:
+            continue
+        callee_share = share * min(edge_time / callee_cumulative, 1.0)
+        _collapse(entries, callees, [*stack, callee], callee_share, stacks)
+
+
+def write_collapsed(stacks: Mapping[str, int], path: Path) -> None:
+    """
+    Write collapsed stacks in the format of ``flamegraph.pl`` and speedscope.
+
+    Parameters
+    ----------
+    stacks : Mapping[str, int]
+        The weight of each stack, keyed by the stack of labels separated by semicolons.
+    path : Path
+        The path of the file.
+    """
+    with path.open("w", encoding="utf-8") as file:
+        for stack, weight in sorted(stacks.items()):
+            file.write(f"{stack} {weight}\n")
+
+
+class SamplingProfiler:
+    """
+    Sample the stack of a thread at a fixed interval from a background thread.
+
+    The profiled thread runs unchanged, so the overhead is the sampling thread taking
+    the interpreter lock once per interval, whatever the number of calls. The stacks
+    are counted in samples rather than measured in time.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        Initialize the SamplingProfiler.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Seconds between samples. Defaults to 0.005.
+        """
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: Optional[int] = None) -> None:
+        """
+        Start sampling a thread.
+
+        Parameters
+        ----------
+        thread_id : Optional[int], optional
+            The identifier of the thread. Defaults to the calling thread.
+        """
+        target = thread_id or threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(target,), name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        """
+        Stop sampling.
+
+        Returns
+        -------
+        Counter[str]
+            The number of samples of each stack, keyed by the stack of labels
+            separated by semicolons, from the outermost call.
+        """
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        return self.samples
+
+    def _run(self, target: int) -> None:
+        """
+        Sample the stack of a thread until stopped.
+
+        Parameters
+        ----------
+        target : int
+            The identifier of the thread.
+        """
+        while not self._stopped.wait(self.interval):
+            frame: Optional[FrameType] = sys._current_frames().get(target)
+            labels = []
+            while frame is not None:
+                labels.append(_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.samples[";".join(reversed(labels))] += 1
+
+
+class OperationProfiler:
+    """
+    Profile every Nth call of selected operations and write a report of each.
+
+    Each profiled call writes a ``.collapsed`` file of collapsed stacks, ready for
+    ``flamegraph.pl`` or speedscope, named after the operation, the process and the
+    number of the call. With cProfile, a ``.pstats`` file is written too, to be read
+    with ``pstats`` or snakeviz. Only one call is profiled at a time, so calls of
+    other threads overlapping a profiled one are not profiled. Profiling one call in
+    ``every`` keeps the overhead low enough to leave it on in production.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        mode: ProfileMode = ProfileMode.CPROFILE,
+        every: int = 1,
+        interval: float = 0.005,
+    ) -> None:
+        """
+        Initialize the OperationProfiler.
+
+        Parameters
+        ----------
+        output_dir : str | Path
+            The directory the reports are written to, created if missing.
+        mode : ProfileMode, optional
+            The profiler used. Defaults to cProfile.
+        every : int, optional
+            Profile one call of each operation in this many. Defaults to 1.
+        interval : float, optional
+            Seconds between samples of the sampling profiler. Defaults to 0.005.
+
+        Raises
+        ------
+        ValueError
+            If ``every`` is not positive.
+        """
+        if every < 1:
+            raise ValueError("Profiling needs every to be at least 1.")
+        self.output_dir = Path(output_dir)
+        self.mode = mode
+        self.every = every
+        self.interval = interval
+        self.profiled = 0
+        self.skipped = 0
+        self._calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """
+        Profile the block if it is the Nth call of an operation.
+
+        Parameters
+        ----------
+        name : str
+            The name of the operation.
+
+        Yields
+        ------
+        None
+            Control to the profiled block.
+        """
+        with self._lock:
+            self._calls[name] += 1
+            call = self._calls[name]
+        selected = not call % self.every
+        if selected and not self._active.acquire(blocking=False):
+            with self._lock:
+                self.skipped += 1
+            selected = False
+        if not selected:
+            yield
+            return
+
+        stem = f"{name}-{os.getpid()}-{call}"
+        try:
+            if self.mode == ProfileMode.CPROFILE:
+                with self._cprofile(stem):
+                    yield
+            else:
+                with self._sample(stem):
+                    yield
+            self.profiled += 1
+        finally:
+            self._active.release()
+
+    def wrap(self, function: F, name: str) -> F:
+        """
+        Wrap a function so each call is an operation to profile.
+
+        Parameters
+        ----------
+        function : F
+            The function.
+        name : str
+            The name of the operation.
+
+        Returns
+        -------
+        F
+            The wrapped function.
+        """
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.profile(name):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    def instrument(self, target: object, names: Iterable[str]) -> None:
+        """
+        Replace methods of an object with wrappers profiling them.
+
+        Parameters
+        ----------
+        target : object
+            The object.
+        names : Iterable[str]
+            The names of the methods, also naming the operations after the class of
+            the object.
+        """
+        for name in names:
+            method = getattr(target, name)
+            setattr(target, name, self.wrap(method, f"{type(target).__name__}.{name}"))
+
+    @contextmanager
+    def _cprofile(self, stem: str) -> Iterator[None]:
+        """
+        Profile the block with cProfile and write its reports.
+
+        Parameters
+        ----------
+        stem : str
+            The name of the reports, without suffix.
+
+        Yields
+        ------
+        None
+            Control to the profiled block.
+        """
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            stats = pstats.Stats(profile)
+            stats.dump_stats(self.output_dir / f"{stem}.pstats")
+            write_collapsed(
+                pstats_to_collapsed(stats), self.output_dir / f"{stem}.collapsed"
+            )
+            logger.info(f"Wrote the profile of {stem}.")
+
+    @contextmanager
+    def _sample(self, stem: str) -> Iterator[None]:
+        """
+        Profile the block with the sampling profiler and write its report.
+
+        Parameters
+        ----------
+        stem : str
+            The name of the report, without suffix.
+
+        Yields
+        ------
+        None
+            Control to the profiled block.
+        """
+        profiler = SamplingProfiler(self.interval)
+        profiler.start()
+        try:
+            yield
+        finally:
+            samples = profiler.stop()
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            write_collapsed(samples, self.output_dir / f"{stem}.collapsed")
+            logger.info(f"Wrote the samples of {stem}.")
@@ -0,0 +1,7 @@
+from .formats import Compression as Compression
+from .formats import FieldType as FieldType
+from .formats import RecordFormat as RecordFormat
+from .formats import Schema as Schema
+from .formats import open_records as open_records
+from .formats import read_records as read_records
+from .formats import write_records as write_records
@@ -0,0 +1,538 @@
+"""Contains streaming readers and writers of flat records in several file formats."""
+
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import struct
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime, timedelta, timezone
+from enum import StrEnum
+from pathlib import Path
+from typing import IO, Any, Literal, cast
+
+BINARY_MAGIC = b"RECORDS1"
+NAIVE_OFFSET = -(2**15)
+EPOCH = datetime(1970, 1, 1)
+
+_LENGTH = struct.Struct("<I")
+_INTEGER = struct.Struct("<q")
+_DATETIME = struct.Struct("<qh")
+
+
+class RecordFormat(StrEnum):
+    """An enumeration class representing record file formats."""
+
+    CSV = "csv"
+    JSONL = "jsonl"
+    BINARY = "bin"
+
+    @classmethod
+    def from_path(cls, path: str | Path) -> "RecordFormat":
+        """
+        Guess the format of a record file from its suffixes.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path of the record file, such as "users.csv.gz".
+
+        Returns
+        -------
+        RecordFormat
+            The format named by the first known suffix.
+
+        Raises
+        ------
+        ValueError
+            If no suffix names a known format.
+        """
+        for suffix in Path(path).suffixes:
+            try:
+                return cls(suffix.lstrip("."))
+            except ValueError:
+                continue
+        raise ValueError(f"Cannot guess the record format of {path}.")
+
+
+class Compression(StrEnum):
+    """An enumeration class representing record file compressions."""
+
+    NONE = "none"
+    GZIP = "gz"
+    BZ2 = "bz2"
+    LZMA = "xz"
+
+    @classmethod
+    def from_path(cls, path: str | Path) -> "Compression":
+        """
+        Guess the compression of a record file from its last suffix.
+
+        Parameters
+        ----------
+        path : str | Path
+            The path of the record file, such as "users.csv.gz".
+
+        Returns
+        -------
+        Compression
+            The compression named by the last suffix, or no compression.
+        """
+        try:
+            return cls(Path(path).suffix.lstrip("."))
+        except ValueError:
+            return cls.NONE
+
+
+class FieldType(StrEnum):
+    """An enumeration class representing the types of record fields."""
+
+    STRING = "string"
+    INTEGER = "integer"
+    BOOLEAN = "boolean"
+    DATETIME = "datetime"
+
+
+Schema = Mapping[str, FieldType]
+
+
+def open_records(
+    path: str | Path, mode: Literal["rb", "wb"], compression: Compression
+) -> IO[bytes]:
+    """
+    Open a record file as a binary stream, compressing or decompressing on the fly.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path of the record file.
+    mode : Literal["rb", "wb"]
+        Whether to read or write the file.
+    compression : Compression
+        The compression of the file.
+
+    Returns
+    -------
+    IO[bytes]
+        The binary stream of the uncompressed records.
+    """
+    if compression == Compression.GZIP:
+        return cast(IO[bytes], gzip.open(path, mode))
+    if compression == Compression.BZ2:
+        return bz2.open(path, mode)
+    if compression == Compression.LZMA:
+        return lzma.open(path, mode)
+    return open(path, mode)
+
+
+def write_records(
+    file: IO[bytes],
+    record_format: RecordFormat,
+    schema: Schema,
+    records: Iterable[Mapping[Any, Any]],
+    header: bool = True,
+) -> int:
+    """
+    Write records to a binary stream, one at a time.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        The binary stream to write to.
+    record_format : RecordFormat
+        The format of the records.
+    schema : Schema
+        The type of each field, in the order they are written.
+    records : Iterable[Mapping[Any, Any]]
+        The records, each mapping the schema fields to their values. Any field may be
+        None.
+    header : bool, optional
+        Whether to start with the header of the format, the field names of CSV or the
+        schema of the binary format. Defaults to True. Records appended to a stream
+        already holding the header, such as one batch at a time, are written without.
+
+    Returns
+    -------
+    int
+        The number of written records.
+    """
+    if record_format == RecordFormat.BINARY:
+        return _write_binary(file, schema, records, header)
+
+    written = 0
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    try:
+        if record_format == RecordFormat.CSV:
+            writer = csv.writer(text)
+            if header:
+                writer.writerow(schema)
+            for record in records:
+                writer.writerow(
+                    _to_text(record[name], field_type)
+                    for name, field_type in schema.items()
+                )
+                written += 1
+        else:
+            for record in records:
+                text.write(
+                    json.dumps(
+                        {
+                            name: _to_json(record[name], field_type)
+                            for name, field_type in schema.items()
+                        }
+                    )
+                    + "\n"
+                )
+                written += 1
+    finally:
+        # Leave the underlying stream open for the caller to close.
+        text.flush()
+        text.detach()
+    return written
+
+
+def read_records(
+    file: IO[bytes], record_format: RecordFormat, schema: Schema
+) -> Iterator[dict[str, Any]]:
+    """
+    Read records from a binary stream, one at a time.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        The binary stream to read from.
+    record_format : RecordFormat
+        The format of the records.
+    schema : Schema
+        The type of each field.
+
+    Yields
+    ------
+    Iterator[dict[str, Any]]
+        The records, each mapping the schema fields to their values.
+
+    Raises
+    ------
+    ValueError
+        If the fields of the file do not match the schema.
+    """
+    if record_format == RecordFormat.BINARY:
+        yield from _read_binary(file, schema)
+        return
+
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    if record_format == RecordFormat.CSV:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is not None and header != list(schema):
+            raise ValueError(f"Expected the fields {list(schema)}, got {header}.")
+        for row in reader:
+            yield {
+                name: _from_text(value, field_type)
+                for (name, field_type), value in zip(schema.items(), row, strict=True)
+            }
+    else:
+        for line in text:
+            data = json.loads(line)
+            yield {
+                name: _from_json(data[name], field_type)
+                for name, field_type in schema.items()
+            }
+
+
+def _to_text(value: Any, field_type: FieldType) -> str:
+    """
+    Convert a field value to a CSV cell, where None becomes an empty cell.
+
+    Parameters
+    ----------
+    value : Any
+        The field value.
+    field_type : FieldType
+        The type of the field.
+
+    Returns
+    -------
+    str
+        The text of the cell.
+    """
+    if value is None:
+        return ""
+    if field_type == FieldType.DATETIME:
+        return str(value.isoformat())
+    if field_type == FieldType.BOOLEAN:
+        return "1" if value else "0"
+    return str(value)
+
+
+def _from_text(value: str, field_type: FieldType) -> Any:
+    """
+    Convert a CSV cell back to a field value, where an empty cell becomes None.
+
+    Parameters
+    ----------
+    value : str
+        The text of the cell.
+    field_type : FieldType
+        The type of the field.
+
+    Returns
+    -------
+    Any
+        The field value.
+    """
+    if value == "":
+        return None
+    if field_type == FieldType.DATETIME:
+        return datetime.fromisoformat(value)
+    if field_type == FieldType.INTEGER:
+        return int(value)
+    if field_type == FieldType.BOOLEAN:
+        return value == "1"
+    return value
+
+
+def _to_json(value: Any, field_type: FieldType) -> Any:
+    """
+    Convert a field value to a JSON-serializable value.
+
+    Parameters
+    ----------
+    value : Any
+        The field value.
+    field_type : FieldType
+        The type of the field.
+
+    Returns
+    -------
+    Any
+        The JSON-serializable value.
+    """
+    if value is not None and field_type == FieldType.DATETIME:
+        return value.isoformat()
+    return value
+
+
+def _from_json(value: Any, field_type: FieldType) -> Any:
+    """
+    Convert a JSON value back to a field value.
+
+    Parameters
+    ----------
+    value : Any
+        The JSON value.
+    field_type : FieldType
+        The type of the field.
+
+    Returns
+    -------
+    Any
+        The field value.
+    """
+    if value is not None and field_type == FieldType.DATETIME:
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _write_binary(
+    file: IO[bytes],
+    schema: Schema,
+    records: Iterable[Mapping[Any, Any]],
+    header: bool = True,
+) -> int:
+    """
+    Write records in the compact binary format.
+
+    The file starts with a magic number and the JSON-encoded schema. Each record is a
+    bitmap of its None fields followed by the other fields: strings as their
+    length-prefixed UTF-8 bytes, integers as 8 bytes, booleans as 1 byte and
+    datetimes as microseconds since the epoch and an UTC offset in minutes.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        The binary stream to write to.
+    schema : Schema
+        The type of each field.
+    records : Iterable[Mapping[Any, Any]]
+        The records to write.
+    header : bool, optional
+        Whether to start with the magic number and the schema. Defaults to True.
+
+    Returns
+    -------
+    int
+        The number of written records.
+    """
+    if header:
+        encoded = json.dumps(dict(schema)).encode()
+        file.write(BINARY_MAGIC + _LENGTH.pack(len(encoded)) + encoded)
+
+    bitmap_size = (len(schema) + 7) // 8
+    written = 0
+    for record in records:
+        nulls = 0
+        chunks = []
+        for index, (name, field_type) in enumerate(schema.items()):
+            value = record[name]
+            if value is None:
+                nulls |= 1 << index
+            else:
+                chunks.append(_pack(value, field_type))
+        file.write(nulls.to_bytes(bitmap_size, "little") + b"".join(chunks))
+        written += 1
+    return written
+
+
+def _read_binary(file: IO[bytes], schema: Schema) -> Iterator[dict[str, Any]]:
+    """
+    Read records in the compact binary format.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        The binary stream to read from.
+    schema : Schema
+        The type of each field.
+
+    Yields
+    ------
+    Iterator[dict[str, Any]]
+        The records.
+
+    Raises
+    ------
+    ValueError
+        If the stream is not in the binary format or its schema does not match.
+    """
+    if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Not a binary record file.")
+    (header_size,) = _LENGTH.unpack(_read_exactly(file, _LENGTH.size))
+    header = json.loads(_read_exactly(file, header_size))
+    if header != dict(schema):
+        raise ValueError(f"Expected the schema {dict(schema)}, got {header}.")
+
+    bitmap_size = (len(schema) + 7) // 8
+    while bitmap := file.read(bitmap_size):
+        nulls = int.from_bytes(_read_remaining(file, bitmap, bitmap_size), "little")
+        yield {
+            name: None if nulls & (1 << index) else _unpack(file, field_type)
+            for index, (name, field_type) in enumerate(schema.items())
+        }
+
+
+def _pack(value: Any, field_type: FieldType) -> bytes:
+    """
+    Encode a field value in the binary format.
+
+    Parameters
+    ----------
+    value : Any
+        The field value, which is not None.
+    field_type : FieldType
+        The type of the field.
+
+    Returns
+    -------
+    bytes
+        The encoded value.
+    """
+    if field_type == FieldType.INTEGER:
+        return _INTEGER.pack(value)
+    if field_type == FieldType.BOOLEAN:
+        return b"\x01" if value else b"\x00"
+    if field_type == FieldType.DATETIME:
+        offset = value.utcoffset()
+        wall_time = value.replace(tzinfo=None)
+        microseconds = (wall_time - EPOCH) // timedelta(microseconds=1)
+        minutes = NAIVE_OFFSET if offset is None else offset // timedelta(minutes=1)
+        return _DATETIME.pack(microseconds, minutes)
+    encoded = str(value).encode()
+    return _LENGTH.pack(len(encoded)) + encoded
+
+
+def _unpack(file: IO[bytes], field_type: FieldType) -> Any:
+    """
+    Decode the next field value from a stream in the binary format.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        The binary stream to read from.
+    field_type : FieldType
+        The type of the field.
+
+    Returns
+    -------
+    Any
+        The field value.
+    """
+    if field_type == FieldType.INTEGER:
+        return _INTEGER.unpack(_read_exactly(file, _INTEGER.size))[0]
+    if field_type == FieldType.BOOLEAN:
+        return _read_exactly(file, 1) == b"\x01"
+    if field_type == FieldType.DATETIME:
+        microseconds, minutes = _DATETIME.unpack(_read_exactly(file, _DATETIME.size))
+        value = EPOCH + timedelta(microseconds=microseconds)
+        if minutes == NAIVE_OFFSET:
+            return value
+        return value.replace(tzinfo=timezone(timedelta(minutes=minutes)))
+    (size,) = _LENGTH.unpack(_read_exactly(file, _LENGTH.size))
+    return _read_exactly(file, size).decode()
+
+
+def _read_exactly(file: IO[bytes], size: int) -> bytes:
+    """
+    Read an exact number of bytes from a stream.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        The binary stream to read from.
+    size : int
+        The number of bytes to read.
+
+    Returns
+    -------
+    bytes
+        The bytes read.
+
+    Raises
+    ------
+    ValueError
+        If the stream ends first.
+    """
+    return _read_remaining(file, b"", size)
+
+
+def _read_remaining(file: IO[bytes], data: bytes, size: int) -> bytes:
+    """
+    Complete a partial read of an exact number of bytes.
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        The binary stream to read from.
+    data : bytes
+        The bytes already read.
+    size : int
+        The total number of bytes to read.
+
+    Returns
+    -------
+    bytes
+        The bytes read.
+
+    Raises
+    ------
+    ValueError
+        If the stream ends first.
+    """
+    while len(data) < size:
+        chunk = file.read(size - len(data))
+        if not chunk:
+            raise ValueError("Unexpected end of the binary record file.")
+        data += chunk
+    return data
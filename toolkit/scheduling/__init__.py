@@ -0,0 +1,5 @@
+from .scheduler import Job as Job
+from .scheduler import Scheduler as Scheduler
+from .triggers import CronTrigger as CronTrigger
+from .triggers import IntervalTrigger as IntervalTrigger
+from .triggers import Trigger as Trigger
@@ -0,0 +1,310 @@
+"""Contains the Scheduler class for running periodic jobs in background threads."""
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from .triggers import Trigger
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    A function run by the scheduler whenever its trigger fires.
+
+    Timing metrics of the runs are kept for monitoring. Durations are in seconds.
+    """
+
+    def __init__(
+        self, name: str, function: Callable[[], Any], trigger: Trigger
+    ) -> None:
+        """
+        Initialize the Job.
+
+        Parameters
+        ----------
+        name : str
+            The unique name of the job.
+        function : Callable[[], Any]
+            The function run, taking no arguments.
+        trigger : Trigger
+            The trigger computing the run times of the job.
+        """
+        self.name = name
+        self.function = function
+        self.trigger = trigger
+        self.next_run_at: Optional[datetime] = None
+        self.running = False
+
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started_at: Optional[datetime] = None
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def mean_duration(self) -> float:
+        """
+        Mean duration of the runs of the job.
+
+        Returns
+        -------
+        float
+            The mean duration in seconds, or 0 if the job never ran.
+        """
+        return self.total_duration / self.runs if self.runs else 0.0
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the job.
+
+        Returns
+        -------
+        str
+            A string containing the class name, the name, the trigger, and the next
+            run time.
+        """
+        return (
+            f"Job(name={self.name}, trigger={self.trigger!r}, "
+            f"next_run_at={self.next_run_at})"
+        )
+
+
+class Scheduler:
+    """
+    Run jobs at the times of their triggers, on a bounded number of worker threads.
+
+    A daemon thread sleeps until the next job is due and hands it over to the workers,
+    also daemon threads, so at most ``max_workers`` jobs run at once: with jobs taking
+    one database connection at a time, the scheduler never holds more than
+    ``max_workers`` connections of the pool shared with the requests. A job still
+    running, or waiting for a worker, when it is due again is skipped rather than
+    queued twice. Exceptions of jobs are logged and counted, never raised.
+    """
+
+    def __init__(self, max_workers: int = 1, name: str = "scheduler") -> None:
+        """
+        Initialize the Scheduler.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Maximum number of jobs running at once. Defaults to 1.
+        name : str, optional
+            Prefix of the names of the threads. Defaults to "scheduler".
+
+        Raises
+        ------
+        ValueError
+            If the number of workers is not positive.
+        """
+        if max_workers < 1:
+            raise ValueError("The scheduler needs at least one worker.")
+        self.max_workers = max_workers
+        self.name = name
+        self.jobs: dict[str, Job] = {}
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._queue: queue.SimpleQueue[Optional[Job]] = queue.SimpleQueue()
+        self._threads: list[threading.Thread] = []
+
+    def add_job(self, name: str, function: Callable[[], Any], trigger: Trigger) -> Job:
+        """
+        Schedule a function, first run at the next time of its trigger.
+
+        Parameters
+        ----------
+        name : str
+            The unique name of the job.
+        function : Callable[[], Any]
+            The function run, taking no arguments.
+        trigger : Trigger
+            The trigger computing the run times of the job.
+
+        Returns
+        -------
+        Job
+            The job, holding its metrics.
+
+        Raises
+        ------
+        ValueError
+            If a job of the same name is already scheduled.
+        """
+        job = Job(name, function, trigger)
+        job.next_run_at = trigger.next_run(self._now())
+        with self._lock:
+            if name in self.jobs:
+                raise ValueError(f"A job named {name} is already scheduled.")
+            self.jobs[name] = job
+        self._wakeup.set()
+        logger.info(f"Scheduled the job {name}, first run at {job.next_run_at}.")
+        return job
+
+    def remove_job(self, name: str) -> None:
+        """
+        Unschedule a job, letting its current run finish.
+
+        Parameters
+        ----------
+        name : str
+            The name of the job.
+        """
+        with self._lock:
+            self.jobs.pop(name, None)
+
+    def start(self) -> None:
+        """
+        Start the scheduling thread and the workers.
+
+        Raises
+        ------
+        RuntimeError
+            If the scheduler is already started or was shut down.
+        """
+        if self._threads or self._stopped.is_set():
+            raise RuntimeError("The scheduler can only be started once.")
+        self._threads = [
+            threading.Thread(target=self._run, name=self.name, daemon=True),
+            *(
+                threading.Thread(
+                    target=self._work, name=f"{self.name}-{index}", daemon=True
+                )
+                for index in range(self.max_workers)
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Started the scheduler with {len(self.jobs)} jobs.")
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop scheduling jobs and wait for the running ones to finish.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximum number of seconds to wait for each thread. The threads still
+            running afterwards are abandoned, and end with the process as daemons.
+            Waits indefinitely if not provided.
+
+        Returns
+        -------
+        bool
+            True if every thread stopped, False if the timeout elapsed first.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        for _ in range(self.max_workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        stopped = not any(thread.is_alive() for thread in self._threads)
+        if not stopped:
+            logger.warning("Abandoned running jobs on shutdown.")
+        logger.info("Stopped the scheduler.")
+        return stopped
+
+    def _run(self) -> None:
+        """Hand the due jobs over to the workers until the scheduler is shut down."""
+        while not self._stopped.is_set():
+            now = self._now()
+            with self._lock:
+                jobs = list(self.jobs.values())
+            for job in jobs:
+                if job.next_run_at is not None and job.next_run_at <= now:
+                    self._dispatch(job, now)
+            next_runs = [job.next_run_at for job in jobs if job.next_run_at]
+            delay = (
+                (min(next_runs) - self._now()).total_seconds() if next_runs else None
+            )
+            self._wakeup.wait(max(delay, 0.0) if delay is not None else None)
+            self._wakeup.clear()
+
+    def _dispatch(self, job: Job, now: datetime) -> None:
+        """
+        Queue a due job to the workers, unless its previous run is not finished.
+
+        Parameters
+        ----------
+        job : Job
+            The job.
+        now : datetime
+            The current time.
+        """
+        try:
+            job.next_run_at = job.trigger.next_run(now)
+        except ValueError:
+            logger.exception(f"Unscheduled the job {job.name}, it never runs again.")
+            job.next_run_at = None
+        with self._lock:
+            if job.running:
+                job.skipped += 1
+                skipped = True
+            else:
+                job.running = True
+                skipped = False
+        if skipped:
+            logger.warning(f"Skipped the job {job.name}, its last run is not done.")
+        else:
+            self._queue.put(job)
+
+    def _work(self) -> None:
+        """Run the queued jobs until the scheduler is shut down."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if self._stopped.is_set():
+                job.running = False
+                continue
+            self._execute(job)
+
+    def _execute(self, job: Job) -> None:
+        """
+        Run a job and record its metrics.
+
+        Parameters
+        ----------
+        job : Job
+            The job.
+        """
+        job.last_started_at = self._now()
+        start = time.perf_counter()
+        error = None
+        try:
+            job.function()
+        except Exception as err:
+            error = repr(err)
+            logger.exception(f"The job {job.name} failed.")
+        duration = time.perf_counter() - start
+        with self._lock:
+            job.runs += 1
+            job.failures += error is not None
+            job.last_error = error
+            job.last_duration = duration
+            job.total_duration += duration
+            job.max_duration = max(job.max_duration, duration)
+            job.running = False
+        logger.debug(f"The job {job.name} ran in {duration:.3f}s.")
+
+    @staticmethod
+    def _now() -> datetime:
+        """
+        Get the current time of the scheduler.
+
+        Returns
+        -------
+        datetime
+            The current time in UTC.
+        """
+        return datetime.now(timezone.utc)
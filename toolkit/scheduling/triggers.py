@@ -0,0 +1,284 @@
+"""Contains the triggers telling the Scheduler when to run a job."""
+
+import random
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+# The name, lowest and highest value of each field of a cron expression.
+_CRON_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+# The number of days searched for a match, which covers leap days.
+_CRON_HORIZON_DAYS = 4 * 366
+
+
+class Trigger(ABC):
+    """Base class of the triggers, computing the next run time of a job."""
+
+    def __init__(self, jitter: float = 0.0) -> None:
+        """
+        Initialize the Trigger.
+
+        Parameters
+        ----------
+        jitter : float, optional
+            Maximum number of seconds randomly added to each run time, so jobs of
+            several processes do not all hit the database at once. Defaults to 0.
+
+        Raises
+        ------
+        ValueError
+            If the jitter is negative.
+        """
+        if jitter < 0:
+            raise ValueError("The jitter cannot be negative.")
+        self.jitter = jitter
+
+    def next_run(self, after: datetime) -> datetime:
+        """
+        Compute the next run time after a time, jitter included.
+
+        Parameters
+        ----------
+        after : datetime
+            The time, usually now.
+
+        Returns
+        -------
+        datetime
+            The next run time.
+        """
+        next_run = self._next_run(after)
+        if self.jitter:
+            next_run += timedelta(seconds=random.uniform(0, self.jitter))
+        return next_run
+
+    @abstractmethod
+    def _next_run(self, after: datetime) -> datetime:
+        """
+        Compute the next run time after a time, without jitter.
+
+        Parameters
+        ----------
+        after : datetime
+            The time.
+
+        Returns
+        -------
+        datetime
+            The next run time.
+        """
+
+
+class IntervalTrigger(Trigger):
+    """Trigger running a job every fixed number of seconds."""
+
+    def __init__(self, seconds: float, jitter: float = 0.0) -> None:
+        """
+        Initialize the IntervalTrigger.
+
+        Parameters
+        ----------
+        seconds : float
+            The number of seconds between runs.
+        jitter : float, optional
+            Maximum number of seconds randomly added to each run time. Defaults to 0.
+
+        Raises
+        ------
+        ValueError
+            If the interval is not positive or the jitter is negative.
+        """
+        super().__init__(jitter)
+        if seconds <= 0:
+            raise ValueError("The interval must be positive.")
+        self.interval = timedelta(seconds=seconds)
+
+    def _next_run(self, after: datetime) -> datetime:
+        """
+        Compute the next run time after a time, without jitter.
+
+        Parameters
+        ----------
+        after : datetime
+            The time.
+
+        Returns
+        -------
+        datetime
+            The time one interval later.
+        """
+        return after + self.interval
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the trigger.
+
+        Returns
+        -------
+        str
+            A string containing the class name, the interval, and the jitter.
+        """
+        return (
+            f"IntervalTrigger(seconds={self.interval.total_seconds()}, "
+            f"jitter={self.jitter})"
+        )
+
+
+class CronTrigger(Trigger):
+    """
+    Trigger running a job at the times matching a cron expression.
+
+    The expression has the five fields of crontab, minute, hour, day of month, month
+    and day of week, where Sunday is 0 or 7. Each field is ``*``, a value, a range
+    such as ``1-5``, any of them followed by a step such as ``*/15``, or a list of
+    those separated by commas. As in crontab, a day matches if it matches either the
+    day of month or the day of week when both are restricted. Times are matched as
+    they are given, so jobs run in UTC when the scheduler's clock is in UTC.
+    """
+
+    def __init__(self, expression: str, jitter: float = 0.0) -> None:
+        """
+        Initialize the CronTrigger.
+
+        Parameters
+        ----------
+        expression : str
+            The cron expression, such as ``"30 3 * * *"`` for every day at 03:30.
+        jitter : float, optional
+            Maximum number of seconds randomly added to each run time. Defaults to 0.
+
+        Raises
+        ------
+        ValueError
+            If the expression is malformed or the jitter is negative.
+        """
+        super().__init__(jitter)
+        fields = expression.split()
+        if len(fields) != len(_CRON_FIELDS):
+            raise ValueError(f"The cron expression {expression!r} needs five fields.")
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            self._parse_field(field, *spec) for field, spec in zip(fields, _CRON_FIELDS)
+        )
+        self._minutes = minutes
+        self._hours = hours
+        self._days = days
+        self._months = months
+        # datetime.weekday counts from Monday, crontab from Sunday.
+        self._weekdays = frozenset((weekday - 1) % 7 for weekday in weekdays)
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _next_run(self, after: datetime) -> datetime:
+        """
+        Compute the first matching minute after a time.
+
+        Parameters
+        ----------
+        after : datetime
+            The time.
+
+        Returns
+        -------
+        datetime
+            The first matching time, at the start of its minute.
+
+        Raises
+        ------
+        ValueError
+            If no time matches in the next four years, such as for February 30.
+        """
+        candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=_CRON_HORIZON_DAYS)
+        while candidate < limit:
+            if candidate.month not in self._months or not self._matches_day(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self._hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self._minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"The cron expression {self.expression!r} never matches.")
+
+    def _matches_day(self, candidate: datetime) -> bool:
+        """
+        Tell whether the day of a time matches the day of month and day of week.
+
+        Parameters
+        ----------
+        candidate : datetime
+            The time.
+
+        Returns
+        -------
+        bool
+            True if the day matches.
+        """
+        day = candidate.day in self._days
+        weekday = candidate.weekday() in self._weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    @staticmethod
+    def _parse_field(field: str, name: str, low: int, high: int) -> frozenset[int]:
+        """
+        Parse a field of a cron expression into the values it matches.
+
+        Parameters
+        ----------
+        field : str
+            The field.
+        name : str
+            The name of the field, used in errors.
+        low : int
+            The lowest value of the field.
+        high : int
+            The highest value of the field.
+
+        Returns
+        -------
+        frozenset[int]
+            The values matched by the field.
+
+        Raises
+        ------
+        ValueError
+            If the field is malformed or out of range.
+        """
+        values: set[int] = set()
+        for part in field.split(","):
+            spec, _, step_text = part.partition("/")
+            try:
+                step = int(step_text) if step_text else 1
+                if spec == "*":
+                    start, end = low, high
+                elif "-" in spec:
+                    start, end = map(int, spec.split("-", 1))
+                else:
+                    start = int(spec)
+                    end = high if step_text else start
+            except ValueError as err:
+                raise ValueError(f"Invalid {name} field {field!r}.") from err
+            if step < 1 or not low <= start <= end <= high:
+                raise ValueError(f"Invalid {name} field {field!r}.")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def __repr__(self) -> str:
+        """
+        Return an unambiguous string representation of the trigger.
+
+        Returns
+        -------
+        str
+            A string containing the class name, the expression, and the jitter.
+        """
+        return f"CronTrigger(expression={self.expression!r}, jitter={self.jitter})"
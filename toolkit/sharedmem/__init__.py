@@ -0,0 +1,2 @@
+from .table import SharedHashTable as SharedHashTable
+from .table import SharedTableError as SharedTableError
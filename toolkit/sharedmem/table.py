@@ -0,0 +1,536 @@
+"""Contains a fixed-size hash table in shared memory, read without locks."""
+
+import atexit
+import multiprocessing
+import os
+import random
+import struct
+from hashlib import blake2b
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Lock
+from typing import Any, Optional
+
+TABLE_MAGIC = b"SHMTAB01"
+SLOTS_PER_BUCKET = 8
+
+# Magic, number of buckets, and size in bytes of the keys and values, padded to a
+# cache line.
+_HEADER = struct.Struct("<8sQHH")
+_HEADER_SIZE = 64
+_WORD = struct.Struct("<Q")
+_BUCKET = struct.Struct(f"<{SLOTS_PER_BUCKET}Q")
+
+# Reads of a slot retried while it is being written, before giving up on it.
+_READ_ATTEMPTS = 4
+
+
+class SharedTableError(ValueError):
+    """Exception raised when a shared memory block is not a valid hash table."""
+
+
+def _hash(key: bytes) -> int:
+    """
+    Hash a key the same way in every process.
+
+    Parameters
+    ----------
+    key : bytes
+        The key.
+
+    Returns
+    -------
+    int
+        A non-zero 64-bit hash, as zero marks empty slots.
+    """
+    return int.from_bytes(blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+class SharedHashTable:
+    """
+    Fixed-size hash table of byte strings in shared memory, shared by processes.
+
+    The table is split into buckets of ``SLOTS_PER_BUCKET`` slots, and a key is only
+    ever stored in the slots of the bucket of its hash, so a lookup reads the hashes
+    of one bucket at once and a handful of records. When its bucket is full, storing
+    a key evicts a random slot of the bucket, which makes the table a cache of fixed
+    memory rather than a map.
+
+    Lookups take no lock. Each slot has a sequence number, made odd while the slot is
+    written and even again afterwards, and a lookup reads the slot between two reads
+    of its sequence number, retrying when they differ, like the readers of a seqlock.
+    This relies on writes to shared memory becoming visible to other processes in the
+    order they are made, as they do on x86-64. Writers are serialized by a lock
+    inherited by forked processes. A store gives up at once when another process holds
+    the lock, as it only fills the cache, while a deletion, which keeps a stale value
+    from being read, waits up to ``lock_timeout`` seconds. Either way, a process killed
+    in the middle of a write leaves the slot unread and the table unwritable, but never
+    blocks the others.
+
+    The shared memory block is removed when the process that created the table closes
+    it, and only then. Forked processes use the table they inherit, and other
+    processes attach it by name, or unpickle it.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        key_size: int,
+        value_size: int,
+        name: Optional[str] = None,
+        lock_timeout: float = 0.1,
+    ) -> None:
+        """
+        Create a shared memory block holding an empty table.
+
+        Parameters
+        ----------
+        capacity : int
+            The number of slots, rounded up to a whole number of buckets.
+        key_size : int
+            The maximum size in bytes of a key.
+        value_size : int
+            The size in bytes of every value.
+        name : Optional[str], optional
+            The name of the shared memory block. Defaults to a random name.
+        lock_timeout : float, optional
+            Seconds a deletion waits for the lock before giving up. Defaults to 0.1.
+
+        Raises
+        ------
+        ValueError
+            If the capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError("The capacity of the table must be positive.")
+        buckets = -(-capacity // SLOTS_PER_BUCKET)
+        size = _HEADER_SIZE + buckets * SLOTS_PER_BUCKET * (
+            2 * _WORD.size + _record_size(key_size, value_size)
+        )
+        memory = SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(
+            _buffer(memory), 0, TABLE_MAGIC, buckets, key_size, value_size
+        )
+        self._setup(memory, multiprocessing.Lock(), lock_timeout)
+        self._owner_pid: Optional[int] = os.getpid()
+        atexit.register(self.close)
+
+    @classmethod
+    def attach(
+        cls, name: str, lock: Optional[Lock] = None, lock_timeout: float = 0.1
+    ) -> "SharedHashTable":
+        """
+        Attach a table created by another process.
+
+        Parameters
+        ----------
+        name : str
+            The name of the shared memory block of the table.
+        lock : Optional[Lock], optional
+            The lock of the writers of the table. The table is read-only if not
+            provided.
+        lock_timeout : float, optional
+            Seconds a deletion waits for the lock before giving up. Defaults to 0.1.
+
+        Returns
+        -------
+        SharedHashTable
+            The attached table.
+
+        Raises
+        ------
+        SharedTableError
+            If the shared memory block is not a valid hash table.
+        """
+        memory = SharedMemory(name=name)
+        # The creator removes the block, not the resource tracker of this process.
+        resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore[attr-defined]
+        if memory.size < _HEADER_SIZE or _buffer(memory)[:8] != TABLE_MAGIC:
+            memory.close()
+            raise SharedTableError(f"{name} is not a shared hash table.")
+        table = cls.__new__(cls)
+        table._setup(memory, lock, lock_timeout)
+        table._owner_pid = None
+        return table
+
+    def _setup(
+        self, memory: SharedMemory, lock: Optional[Lock], lock_timeout: float
+    ) -> None:
+        """
+        Lay the table out over its shared memory block.
+
+        Parameters
+        ----------
+        memory : SharedMemory
+            The shared memory block, starting with the header of the table.
+        lock : Optional[Lock]
+            The lock of the writers, or None for a read-only table.
+        lock_timeout : float
+            Seconds a deletion waits for the lock before giving up.
+        """
+        self._memory = memory
+        self._buffer = _buffer(memory)
+        _, buckets, key_size, value_size = _HEADER.unpack_from(self._buffer)
+        self._lock = lock
+        self.lock_timeout = lock_timeout
+        self.buckets: int = buckets
+        self.key_size: int = key_size
+        self.value_size: int = value_size
+        self.capacity = buckets * SLOTS_PER_BUCKET
+        self._record = struct.Struct(f"<H{key_size}s{value_size}s")
+        self._record_size = _record_size(key_size, value_size)
+        self._hashes_start = _HEADER_SIZE
+        self._sequences_start = self._hashes_start + self.capacity * _WORD.size
+        self._records_start = self._sequences_start + self.capacity * _WORD.size
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the shared memory block of the table.
+
+        Returns
+        -------
+        str
+            The name to attach the table by.
+        """
+        return self._memory.name
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the shared memory block of the table.
+
+        Returns
+        -------
+        int
+            The size in bytes.
+        """
+        return self._memory.size
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """
+        Look a key up, without taking any lock.
+
+        Parameters
+        ----------
+        key : bytes
+            The key.
+
+        Returns
+        -------
+        Optional[bytes]
+            The value of the key, or None if it is not in the table or its slot kept
+            being written while read.
+        """
+        key_hash = _hash(key)
+        first = key_hash % self.buckets * SLOTS_PER_BUCKET
+        hashes = _BUCKET.unpack_from(
+            self._buffer, self._hashes_start + first * _WORD.size
+        )
+        for index, slot_hash in enumerate(hashes):
+            if slot_hash == key_hash:
+                value = self._read(first + index, key)
+                if value is not None:
+                    return value
+        return None
+
+    def put(self, key: bytes, value: bytes) -> bool:
+        """
+        Store the value of a key, evicting another key if its bucket is full.
+
+        Parameters
+        ----------
+        key : bytes
+            The key.
+        value : bytes
+            The value, exactly ``value_size`` bytes long.
+
+        Returns
+        -------
+        bool
+            True if the value was stored, False if the key is too long or another
+            process holds the lock.
+
+        Raises
+        ------
+        ValueError
+            If the value does not have the size of the values of the table.
+        RuntimeError
+            If the table was attached without its lock.
+        """
+        if len(value) != self.value_size:
+            raise ValueError(f"Values must be {self.value_size} bytes long.")
+        if len(key) > self.key_size:
+            return False
+        key_hash = _hash(key)
+        first = key_hash % self.buckets * SLOTS_PER_BUCKET
+        if not self._acquire(block=False):
+            return False
+        try:
+            slot = self._find(first, key_hash, key)
+            if slot is None:
+                hashes = _BUCKET.unpack_from(
+                    self._buffer, self._hashes_start + first * _WORD.size
+                )
+                empty = [
+                    index for index, slot_hash in enumerate(hashes) if not slot_hash
+                ]
+                index = empty[0] if empty else random.randrange(SLOTS_PER_BUCKET)
+                slot = first + index
+            self._write(slot, key_hash, key, value)
+        finally:
+            self._release()
+        return True
+
+    def delete(self, key: bytes) -> bool:
+        """
+        Remove a key from the table.
+
+        Parameters
+        ----------
+        key : bytes
+            The key.
+
+        Returns
+        -------
+        bool
+            True if the key was removed, False if it was not in the table or the lock
+            was not acquired in time.
+
+        Raises
+        ------
+        RuntimeError
+            If the table was attached without its lock.
+        """
+        key_hash = _hash(key)
+        first = key_hash % self.buckets * SLOTS_PER_BUCKET
+        if not self._acquire(block=True):
+            return False
+        try:
+            slot = self._find(first, key_hash, key)
+            if slot is not None:
+                self._write(slot, 0, b"", bytes(self.value_size))
+        finally:
+            self._release()
+        return slot is not None
+
+    def close(self) -> None:
+        """Detach the table, removing its shared memory if this process made it."""
+        if self._memory.buf is None:
+            return
+        owner = self._owner_pid == os.getpid()
+        self._memory.close()
+        if owner:
+            atexit.unregister(self.close)
+            self._memory.unlink()
+
+    def __enter__(self) -> "SharedHashTable":
+        """
+        Enter the runtime context of the table.
+
+        Returns
+        -------
+        SharedHashTable
+            The table itself.
+        """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """
+        Close the table when leaving its runtime context.
+
+        Parameters
+        ----------
+        *args : Any
+            The exception details, if any.
+        """
+        self.close()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Get the state of the table to pickle, which is its name and lock.
+
+        The lock can only be pickled to start a process, so pickled tables are meant
+        to be given to new processes.
+
+        Returns
+        -------
+        dict[str, Any]
+            The name of the block, the lock and the lock timeout.
+        """
+        return {
+            "name": self.name,
+            "lock": self._lock,
+            "lock_timeout": self.lock_timeout,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """
+        Attach the table of a pickled table.
+
+        Parameters
+        ----------
+        state : dict[str, Any]
+            The name of the block, the lock and the lock timeout.
+        """
+        table = self.attach(**state)
+        self.__dict__.update(table.__dict__)
+
+    def _read(self, slot: int, key: bytes) -> Optional[bytes]:
+        """
+        Read the value of a slot if it holds a key, retrying while it is written.
+
+        Parameters
+        ----------
+        slot : int
+            The index of the slot.
+        key : bytes
+            The key.
+
+        Returns
+        -------
+        Optional[bytes]
+            The value, or None if the slot holds another key or kept changing.
+        """
+        buffer = self._buffer
+        sequence_offset = self._sequences_start + slot * _WORD.size
+        record_offset = self._records_start + slot * self._record_size
+        for _ in range(_READ_ATTEMPTS):
+            (before,) = _WORD.unpack_from(buffer, sequence_offset)
+            if before & 1:
+                continue
+            length, stored_key, value = self._record.unpack_from(buffer, record_offset)
+            (after,) = _WORD.unpack_from(buffer, sequence_offset)
+            if before == after:
+                return value if stored_key[:length] == key else None
+        return None
+
+    def _find(self, first: int, key_hash: int, key: bytes) -> Optional[int]:
+        """
+        Find the slot of a key in its bucket, with the lock held.
+
+        Parameters
+        ----------
+        first : int
+            The index of the first slot of the bucket.
+        key_hash : int
+            The hash of the key.
+        key : bytes
+            The key.
+
+        Returns
+        -------
+        Optional[int]
+            The index of the slot, or None if the key is not in the table.
+        """
+        hashes = _BUCKET.unpack_from(
+            self._buffer, self._hashes_start + first * _WORD.size
+        )
+        for index, slot_hash in enumerate(hashes):
+            if slot_hash == key_hash:
+                length, stored_key, _ = self._record.unpack_from(
+                    self._buffer,
+                    self._records_start + (first + index) * self._record_size,
+                )
+                if stored_key[:length] == key:
+                    return first + index
+        return None
+
+    def _write(self, slot: int, key_hash: int, key: bytes, value: bytes) -> None:
+        """
+        Write a slot, with the lock held, making its sequence number odd meanwhile.
+
+        Parameters
+        ----------
+        slot : int
+            The index of the slot.
+        key_hash : int
+            The hash of the key, or 0 to empty the slot.
+        key : bytes
+            The key.
+        value : bytes
+            The value.
+        """
+        buffer = self._buffer
+        sequence_offset = self._sequences_start + slot * _WORD.size
+        (sequence,) = _WORD.unpack_from(buffer, sequence_offset)
+        _WORD.pack_into(buffer, sequence_offset, sequence + 1)
+        _WORD.pack_into(buffer, self._hashes_start + slot * _WORD.size, key_hash)
+        self._record.pack_into(
+            buffer, self._records_start + slot * self._record_size, len(key), key, value
+        )
+        _WORD.pack_into(buffer, sequence_offset, sequence + 2)
+
+    def _acquire(self, block: bool) -> bool:
+        """
+        Take the lock of the writers.
+
+        Parameters
+        ----------
+        block : bool
+            Whether to wait at most ``lock_timeout`` seconds for the lock, rather than
+            giving up at once if it is held.
+
+        Returns
+        -------
+        bool
+            True if the lock was taken.
+
+        Raises
+        ------
+        RuntimeError
+            If the table was attached without its lock.
+        """
+        if self._lock is None:
+            raise RuntimeError("The table was attached read-only, without its lock.")
+        if not block:
+            return self._lock.acquire(block=False)
+        return self._lock.acquire(timeout=self.lock_timeout)
+
+    def _release(self) -> None:
+        """Release the lock of the writers."""
+        if self._lock is not None:
+            self._lock.release()
+
+
+def _record_size(key_size: int, value_size: int) -> int:
+    """
+    Compute the size of a record, aligned on 8 bytes.
+
+    Parameters
+    ----------
+    key_size : int
+        The maximum size of a key.
+    value_size : int
+        The size of a value.
+
+    Returns
+    -------
+    int
+        The size in bytes of the length of the key, the key and the value, padded.
+    """
+    return -(-(2 + key_size + value_size) // 8) * 8
+
+
+def _buffer(memory: SharedMemory) -> memoryview:
+    """
+    Get the buffer of an open shared memory block.
+
+    Parameters
+    ----------
+    memory : SharedMemory
+        The shared memory block.
+
+    Returns
+    -------
+    memoryview
+        The buffer of the block.
+
+    Raises
+    ------
+    ValueError
+        If the block was closed.
+    """
+    if memory.buf is None:
+        raise ValueError("The shared memory block is closed.")
+    return memory.buf